@@ -2,6 +2,8 @@
 ForumEngine - 监控和记录三个Engine的SummaryNode和ReportFormattingNode输出
 """
 
+from .host_worker import HostSpeechWorker
+from .message_bus import ForumMessageBus, get_message_bus
 from .monitor import LogMonitor
 
-__all__ = ['LogMonitor']
+__all__ = ['LogMonitor', 'ForumMessageBus', 'get_message_bus', 'HostSpeechWorker']
@@ -0,0 +1,193 @@
+"""
+主持人发言工作线程 - 在独立线程中异步生成主持人发言
+
+LogMonitor凑满一个发言窗口（默认5条agent发言）后只负责投递，不再阻塞等待LLM返回，
+日志监控循环可以在主持人生成发言期间继续读取三个Engine的日志。
+工作线程按投递顺序逐个处理窗口，生成结果按顺序写回论坛。
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+# 同时积压多个窗口时的合并策略
+COALESCE_MERGE = "merge"    # 合并所有积压窗口，一次生成覆盖全部发言的主持人发言
+COALESCE_LATEST = "latest"  # 只对最新的窗口生成发言，丢弃更早的窗口
+COALESCE_POLICIES = (COALESCE_MERGE, COALESCE_LATEST)
+
+
+class HostSpeechWorker:
+    """带有界队列的主持人发言工作线程"""
+
+    def __init__(self, generate_fn: Callable[[List[str]], Optional[str]],
+                 write_fn: Callable[[str, str], None], max_pending: int = 3,
+                 coalesce_policy: str = COALESCE_MERGE):
+        """
+        初始化工作线程
+
+        Args:
+            generate_fn: 主持人发言生成函数，输入agent发言日志行列表，返回发言内容或None
+            write_fn: 写回论坛的函数，签名为 write_fn(content, source)
+            max_pending: 等待生成的窗口数上限，队列满时丢弃最早的窗口
+            coalesce_policy: 多个窗口同时就绪时的合并策略（merge / latest）
+        """
+        if coalesce_policy not in COALESCE_POLICIES:
+            raise ValueError(f"不支持的合并策略: {coalesce_policy}")
+        self.generate_fn = generate_fn
+        self.write_fn = write_fn
+        self.max_pending = max(1, max_pending)
+        self.coalesce_policy = coalesce_policy
+
+        self._pending = deque()  # 元素为 (会话编号, 发言列表, 投递时间)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._running = False
+        self._session = 0  # 会话编号，论坛重置后丢弃旧会话的积压窗口和生成结果
+        self._generating = False
+
+        self._metrics = {
+            'submitted_windows': 0,   # 投递的窗口数
+            'dropped_windows': 0,     # 队列满时被丢弃的窗口数
+            'coalesced_windows': 0,   # 被合并（或按latest策略跳过）的窗口数
+            'generated': 0,           # 成功写回的主持人发言数
+            'failed': 0,              # 生成失败次数
+            'discarded_results': 0,   # 因会话已重置而丢弃的生成结果数
+            'max_queue_depth': 0,
+            'last_latency': None,     # 最近一次生成耗时（秒）
+            'max_latency': 0.0,
+            'total_latency': 0.0,
+            'last_queue_wait': None,  # 最近一次窗口在队列中等待的时间（秒）
+        }
+
+    def start(self):
+        """启动工作线程（已运行时忽略）"""
+        with self._condition:
+            self._running = True
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="ForumHostSpeechWorker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        """停止工作线程，丢弃尚未开始生成的窗口"""
+        with self._condition:
+            self._running = False
+            self._session += 1
+            self._pending.clear()
+            self._condition.notify_all()
+            thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=timeout)
+
+    def submit(self, speeches: List[str]) -> bool:
+        """
+        投递一个发言窗口，立即返回
+
+        Returns:
+            是否有更早的窗口因队列已满被丢弃（False表示未丢弃）
+        """
+        self.start()
+        dropped = False
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                self._pending.popleft()
+                self._metrics['dropped_windows'] += 1
+                dropped = True
+            self._pending.append((self._session, list(speeches), time.monotonic()))
+            self._metrics['submitted_windows'] += 1
+            self._metrics['max_queue_depth'] = max(self._metrics['max_queue_depth'], len(self._pending))
+            self._condition.notify()
+        if dropped:
+            logger.warning("ForumEngine: 主持人发言队列已满，丢弃最早的发言窗口")
+        return dropped
+
+    def reset(self):
+        """开始新的论坛会话：清空积压窗口，正在生成的结果不再写回"""
+        with self._condition:
+            self._session += 1
+            self._pending.clear()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等待队列清空且没有正在生成的发言，返回是否在超时前完成"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._generating:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def get_metrics(self) -> Dict:
+        """获取队列深度与生成耗时等指标"""
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics['queue_depth'] = len(self._pending)
+            metrics['is_generating'] = self._generating
+            metrics['coalesce_policy'] = self.coalesce_policy
+        completed = metrics['generated'] + metrics['failed'] + metrics['discarded_results']
+        total_latency = metrics.pop('total_latency')
+        metrics['avg_latency'] = total_latency / completed if completed else None
+        return metrics
+
+    def _take_batch(self):
+        """按合并策略从队列中取出一批窗口（需持有锁）"""
+        self._metrics['coalesced_windows'] += len(self._pending) - 1
+        if self.coalesce_policy == COALESCE_LATEST:
+            batch = [self._pending[-1]]
+        else:
+            batch = list(self._pending)
+        self._pending.clear()
+        return batch
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                batch = self._take_batch()
+                session = batch[-1][0]
+                self._generating = True
+
+            speeches = [speech for _, window, _ in batch for speech in window]
+            started = time.monotonic()
+            if len(batch) > 1:
+                logger.info(f"ForumEngine: 合并 {len(batch)} 个发言窗口生成主持人发言...")
+            else:
+                logger.info("ForumEngine: 正在生成主持人发言...")
+            try:
+                host_speech = self.generate_fn(speeches)
+            except Exception as e:
+                logger.exception(f"ForumEngine: 生成主持人发言时出错: {e}")
+                host_speech = None
+            latency = time.monotonic() - started
+
+            with self._condition:
+                # 持锁写回，避免与reset()交错时把旧会话的发言写进新会话；
+                # 单一工作线程保证结果按投递顺序写回
+                stale = session != self._session
+                if host_speech and not stale:
+                    self.write_fn(host_speech, "HOST")
+                    logger.info(f"ForumEngine: 主持人发言已记录（耗时 {latency:.1f}s）")
+                elif stale:
+                    logger.info("ForumEngine: 论坛会话已重置，丢弃过期的主持人发言")
+                else:
+                    logger.error("ForumEngine: 主持人发言生成失败")
+
+                if stale:
+                    self._metrics['discarded_results'] += 1
+                elif host_speech:
+                    self._metrics['generated'] += 1
+                else:
+                    self._metrics['failed'] += 1
+                self._metrics['last_latency'] = latency
+                self._metrics['max_latency'] = max(self._metrics['max_latency'], latency)
+                self._metrics['total_latency'] += latency
+                self._metrics['last_queue_wait'] = started - batch[0][2]
+                self._generating = False
+                self._condition.notify_all()
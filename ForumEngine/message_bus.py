@@ -0,0 +1,136 @@
+"""
+论坛消息总线 - 进程内发布/订阅通道
+
+LogMonitor写入论坛发言时直接发布结构化消息，订阅者（如Flask的Socket.IO推送）同步收到；
+最近的消息保存在有界环形缓冲区中，供后加入的页面按seq游标分页拉取。
+forum.log仅作为审计记录，不再作为消息的传输通道。
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+class ForumMessageBus:
+    """线程安全的论坛消息总线"""
+
+    def __init__(self, capacity: int = 2000):
+        """
+        初始化消息总线
+
+        Args:
+            capacity: 环形缓冲区保留的最大消息数
+        """
+        self.capacity = capacity
+        self._messages = deque(maxlen=capacity)
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self._next_seq = 1
+        self._session_start_seq = 1
+
+    def publish(self, content: str, source: Optional[str] = None, line: Optional[str] = None,
+                timestamp: Optional[str] = None) -> Dict:
+        """
+        发布一条论坛消息
+
+        Args:
+            content: 消息内容（单行）
+            source: 来源标签，如 INSIGHT / MEDIA / QUERY / HOST / SYSTEM
+            line: 与forum.log一致的完整日志行，缺省时按forum.log格式生成
+            timestamp: 时间（HH:MM:SS），缺省为当前时间
+
+        Returns:
+            发布的消息
+        """
+        timestamp = timestamp or datetime.now().strftime('%H:%M:%S')
+        if line is None:
+            line = f"[{timestamp}] [{source}] {content}" if source else f"[{timestamp}] {content}"
+
+        with self._lock:
+            message = {
+                'seq': self._next_seq,
+                'timestamp': timestamp,
+                'source': source,
+                'content': content,
+                'line': line,
+            }
+            self._next_seq += 1
+            self._messages.append(message)
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(message)
+            except Exception as e:
+                logger.exception(f"ForumEngine: 论坛消息订阅者处理失败: {e}")
+        return message
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        订阅新消息，回调在发布者线程中同步执行
+
+        Returns:
+            取消订阅的函数
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def start_session(self):
+        """标记新论坛会话的开始（forum.log被清空时调用）"""
+        with self._lock:
+            self._session_start_seq = self._next_seq
+
+    def get_since(self, since: Optional[int] = None, limit: Optional[int] = None) -> Dict:
+        """
+        获取seq大于since的消息
+
+        Args:
+            since: 游标，None表示从当前会话开始
+            limit: 最多返回的条数，None表示不限
+
+        Returns:
+            {'messages': [...], 'next_seq': 下次请求使用的游标, 'has_more': 是否还有下一页,
+             'truncated': 是否有消息已被环形缓冲区淘汰}
+        """
+        with self._lock:
+            if since is None:
+                since = self._session_start_seq - 1
+            messages = [message for message in self._messages if message['seq'] > since]
+            oldest_seq = self._messages[0]['seq'] if self._messages else self._next_seq
+            latest_seq = self._next_seq - 1
+
+        truncated = since + 1 < oldest_seq
+        has_more = limit is not None and len(messages) > limit
+        if has_more:
+            messages = messages[:limit]
+        # 服务重启后客户端游标可能超过最新seq，此时回退到最新seq
+        next_seq = messages[-1]['seq'] if messages else min(since, latest_seq)
+        return {
+            'messages': messages,
+            'next_seq': next_seq,
+            'has_more': has_more,
+            'truncated': truncated,
+        }
+
+
+_bus_instance = None
+_bus_lock = threading.Lock()
+
+
+def get_message_bus() -> ForumMessageBus:
+    """获取全局论坛消息总线"""
+    global _bus_instance
+    with _bus_lock:
+        if _bus_instance is None:
+            _bus_instance = ForumMessageBus()
+    return _bus_instance
@@ -13,6 +13,9 @@ from typing import Dict, Optional, List
 from threading import Lock
 from loguru import logger
 
+from .message_bus import get_message_bus
+from .host_worker import HostSpeechWorker, COALESCE_MERGE
+
 # 导入论坛主持人模块
 try:
     from .llm_host import generate_host_speech
@@ -21,6 +24,11 @@ except ImportError:
     logger.exception("ForumEngine: 论坛主持人模块未找到，将以纯监控模式运行")
     HOST_AVAILABLE = False
 
+# 等待生成的主持人发言窗口上限，超出时丢弃最早的窗口
+HOST_SPEECH_MAX_PENDING = 3
+# 多个发言窗口同时就绪时的合并策略：merge（合并生成一次）/ latest（只回应最新窗口）
+HOST_SPEECH_COALESCE_POLICY = COALESCE_MERGE
+
 class LogMonitor:
     """基于文件变化的智能日志监控器"""
    
@@ -39,8 +47,11 @@ class LogMonitor:
         # 监控状态
         self.is_monitoring = False
         self.monitor_thread = None
-        self.file_positions = {}  # 记录每个文件的读取位置
-        self.file_line_counts = {}  # 记录每个文件的行数
+        self.file_positions = {}  # 记录每个文件的读取位置（字节偏移）
+        self.file_identities = {}  # 记录每个文件的(st_dev, st_ino)，用于识别日志轮转
+        self.partial_lines = {}  # 记录每个文件末尾尚未写完的半行（字节）
+        self.file_handles = {}  # 每个文件保持打开的只读句柄，轮转后仍能读完旧文件
+        self.rotated_data = {}  # 轮转时从旧文件读出、尚未处理的剩余内容（字节）
         self.is_searching = False  # 是否正在搜索
         self.search_inactive_count = 0  # 搜索非活跃计数器
         self.write_lock = Lock()  # 写入锁，防止并发写入冲突
@@ -48,7 +59,13 @@ class LogMonitor:
         # 主持人相关状态
         self.agent_speeches_buffer = []  # agent发言缓冲区
         self.host_speech_threshold = 5  # 每5条agent发言触发一次主持人发言
-        self.is_host_generating = False  # 主持人是否正在生成发言
+        # 主持人发言在独立工作线程中生成，不阻塞日志监控循环
+        self.host_worker = HostSpeechWorker(
+            generate_host_speech,
+            self.write_to_forum_log,
+            max_pending=HOST_SPEECH_MAX_PENDING,
+            coalesce_policy=HOST_SPEECH_COALESCE_POLICY,
+        ) if HOST_AVAILABLE else None
        
         # 目标节点识别模式
         # 1. 类名（旧格式可能包含）
@@ -86,6 +103,8 @@ class LogMonitor:
             # 使用write_to_forum_log函数来写入开始标记，确保格式一致
             with open(self.forum_log_file, 'w', encoding='utf-8') as f:
                 pass  # 先创建空文件
+            # 新会话的消息从开始标记算起
+            get_message_bus().start_session()
             self.write_to_forum_log(f"=== ForumEngine 监控开始 - {start_time} ===", "SYSTEM")
                
             logger.info(f"ForumEngine: forum.log 已清空并初始化")
@@ -97,28 +116,32 @@ class LogMonitor:
             self.in_error_block = {}
             
             # 重置主持人相关状态
-            self.agent_speeches_buffer = []
-            self.is_host_generating = False
+            self._reset_host_state()
            
         except Exception as e:
             logger.exception(f"ForumEngine: 清空forum.log失败: {e}")
    
     def write_to_forum_log(self, content: str, source: str = None):
-        """写入内容到forum.log（线程安全）"""
+        """发布论坛消息到消息总线，并写入forum.log作为审计记录（线程安全）"""
         try:
-            with self.write_lock:  # 使用锁确保线程安全
-                with open(self.forum_log_file, 'a', encoding='utf-8') as f:
-                    timestamp = datetime.now().strftime('%H:%M:%S')
-                    # 将内容中的实际换行符转换为\n字符串，确保整个记录在一行
-                    content_one_line = content.replace('\n', '\\n').replace('\r', '\\r')
-                    # 如果提供了来源标签，则在时间戳后添加
-                    if source:
-                        f.write(f"[{timestamp}] [{source}] {content_one_line}\n")
-                    else:
-                        f.write(f"[{timestamp}] {content_one_line}\n")
-                    f.flush()
+            with self.write_lock:  # 使用锁确保线程安全，同时保证消息发布顺序与文件一致
+                timestamp = datetime.now().strftime('%H:%M:%S')
+                # 将内容中的实际换行符转换为\n字符串，确保整个记录在一行
+                content_one_line = content.replace('\n', '\\n').replace('\r', '\\r')
+                # 如果提供了来源标签，则在时间戳后添加
+                if source:
+                    line = f"[{timestamp}] [{source}] {content_one_line}"
+                else:
+                    line = f"[{timestamp}] {content_one_line}"
+                try:
+                    with open(self.forum_log_file, 'a', encoding='utf-8') as f:
+                        f.write(line + "\n")
+                        f.flush()
+                except Exception as e:
+                    logger.exception(f"ForumEngine: 写入forum.log失败: {e}")
+                get_message_bus().publish(content_one_line, source, line, timestamp)
         except Exception as e:
-            logger.exception(f"ForumEngine: 写入forum.log失败: {e}")
+            logger.exception(f"ForumEngine: 发布论坛消息失败: {e}")
     
     def get_log_level(self, line: str) -> Optional[str]:
         """检测日志行的级别（INFO/ERROR/WARNING/DEBUG等）
@@ -376,47 +399,136 @@ class LogMonitor:
         except:
             return 0
    
-    def get_file_line_count(self, file_path: Path) -> int:
-        """获取文件行数"""
+    def _stat_log_file(self, file_path: Path) -> Optional[os.stat_result]:
+        """获取文件状态，文件不存在时返回None"""
         try:
-            if not file_path.exists():
-                return 0
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return sum(1 for _ in f)
-        except:
-            return 0
+            return os.stat(file_path)
+        except OSError:
+            return None
+   
+    def _reset_json_state(self, app_name: str):
+        """重置JSON捕获状态"""
+        self.capturing_json[app_name] = False
+        self.json_buffer[app_name] = []
+        self.in_error_block[app_name] = False
+   
+    def _open_tail_handle(self, file_path: Path, app_name: str) -> Optional[os.stat_result]:
+        """关闭旧句柄并重新打开文件，返回新句柄的状态，文件不存在时返回None"""
+        self._close_tail_handle(app_name)
+        try:
+            handle = open(file_path, 'rb')
+        except OSError:
+            return None
+        self.file_handles[app_name] = handle
+        return os.fstat(handle.fileno())
+   
+    def _close_tail_handle(self, app_name: str):
+        handle = self.file_handles.pop(app_name, None)
+        if handle is not None:
+            handle.close()
+   
+    def reset_tail_position(self, file_path: Path, app_name: str, from_start: bool = False):
+        """
+        重新打开文件并设置读取基线
+        
+        Args:
+            from_start: 为True时从文件开头读取，否则把读取位置移到文件当前末尾
+        """
+        stat = self._open_tail_handle(file_path, app_name)
+        self.file_positions[app_name] = stat.st_size if stat and not from_start else 0
+        self.file_identities[app_name] = (stat.st_dev, stat.st_ino) if stat else None
+        self.partial_lines[app_name] = b''
+        self.rotated_data[app_name] = b''
+        self._reset_json_state(app_name)
+   
+    def _drain_rotated_file(self, app_name: str) -> bytes:
+        """读完轮转前的旧文件（通过仍打开的句柄），返回剩余内容，末尾未换行时补上换行"""
+        handle = self.file_handles.get(app_name)
+        if handle is None:
+            return b''
+        handle.seek(self.file_positions.get(app_name, 0))
+        data = self.partial_lines.get(app_name, b'') + handle.read()
+        self.partial_lines[app_name] = b''
+        if data and not data.endswith(b'\n'):
+            data += b'\n'
+        return data
+   
+    def check_file_change(self, file_path: Path, app_name: str) -> str:
+        """
+        基于字节偏移和inode检测日志文件变化，只做一次stat，开销与文件大小无关
+        
+        日志轮转（旧文件被改名）时先通过保持打开的句柄读完旧文件，再从头读取新文件，不丢行；
+        文件被清空、截断或删除后重建时视为新的会话，从新文件开头读取。
+        
+        Returns:
+            'grow'：有新内容（含轮转）；'shrink'：文件被清空、截断或删除（已重置基线）；'idle'：无变化
+        """
+        stat = self._stat_log_file(file_path)
+        last_position = self.file_positions.get(app_name, 0)
+        last_identity = self.file_identities.get(app_name)
+       
+        if stat is None:
+            # 文件被删除
+            if last_position > 0 or last_identity is not None:
+                self.reset_tail_position(file_path, app_name, from_start=True)
+                return 'shrink'
+            return 'idle'
+       
+        identity = (stat.st_dev, stat.st_ino)
+        if last_identity is None:
+            # 文件新建：从头读取
+            self.reset_tail_position(file_path, app_name, from_start=True)
+        elif identity != last_identity:
+            handle = self.file_handles.get(app_name)
+            if handle is not None and os.fstat(handle.fileno()).st_nlink > 0:
+                # 旧文件被改名（轮转）：读完旧文件后从头读取新文件
+                pending = self.rotated_data.get(app_name, b'') + self._drain_rotated_file(app_name)
+                self.reset_tail_position(file_path, app_name, from_start=True)
+                self.rotated_data[app_name] = pending
+                return 'grow'
+            # 旧文件已被删除，新文件属于新的会话
+            self.reset_tail_position(file_path, app_name, from_start=True)
+            return 'shrink'
+        elif stat.st_size < last_position:
+            # 被清空或截断，从头读取之后写入的内容
+            self.reset_tail_position(file_path, app_name, from_start=True)
+            return 'shrink'
+       
+        if stat.st_size > self.file_positions.get(app_name, 0) or self.rotated_data.get(app_name):
+            return 'grow'
+        return 'idle'
    
     def read_new_lines(self, file_path: Path, app_name: str) -> List[str]:
-        """读取文件中的新行"""
+        """从上次的字节偏移读取新增的完整行，未写完的半行留到下次"""
         new_lines = []
        
         try:
-            if not file_path.exists():
-                return new_lines
+            if app_name not in self.file_handles:
+                self.reset_tail_position(file_path, app_name, from_start=True)
+            handle = self.file_handles.get(app_name)
+            data = b''
+            if handle is not None:
+                # 通过已打开的句柄读取，检测之后文件刚好被轮转时仍读的是旧文件，剩余部分在下次轮转检测时读完
+                last_position = self.file_positions.get(app_name, 0)
+                size = os.fstat(handle.fileno()).st_size
+                if size > last_position:
+                    handle.seek(last_position)
+                    data = handle.read(size - last_position)
+                    self.file_positions[app_name] = last_position + len(data)
            
-            current_size = self.get_file_size(file_path)
-            last_position = self.file_positions.get(app_name, 0)
+            data = self.rotated_data.pop(app_name, b'') + self.partial_lines.get(app_name, b'') + data
+            complete, newline, partial = data.rpartition(b'\n')
+            if not newline:
+                complete, partial = b'', data
+            self.partial_lines[app_name] = partial
            
-            # 如果文件变小了，说明被清空了，重新从头开始
-            if current_size < last_position:
-                last_position = 0
-                # 重置JSON捕获状态
-                self.capturing_json[app_name] = False
-                self.json_buffer[app_name] = []
-                self.in_error_block[app_name] = False
+            # 过滤空行
+            new_lines = [
+                line.strip()
+                for line in complete.decode('utf-8', errors='replace').split('\n')
+                if line.strip()
+            ]
            
-            if current_size > last_position:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    f.seek(last_position)
-                    new_content = f.read()
-                    new_lines = new_content.split('\n')
-                   
-                    # 更新位置
-                    self.file_positions[app_name] = f.tell()
-                   
-                    # 过滤空行
-                    new_lines = [line.strip() for line in new_lines if line.strip()]
-                   
         except Exception as e:
             logger.exception(f"ForumEngine: 读取{app_name}日志失败: {e}")
        
@@ -522,41 +634,29 @@ class LogMonitor:
         return captured_contents
     
     def _trigger_host_speech(self):
-        """触发主持人发言（同步执行）"""
-        if not HOST_AVAILABLE or self.is_host_generating:
+        """把凑满的发言窗口投递给主持人工作线程（立即返回）"""
+        if self.host_worker is None:
             return
         
-        try:
-            # 设置生成标志
-            self.is_host_generating = True
-            
-            # 获取缓冲区的5条发言
-            recent_speeches = self.agent_speeches_buffer[:5]
-            if len(recent_speeches) < 5:
-                self.is_host_generating = False
-                return
-            
-            logger.info("ForumEngine: 正在生成主持人发言...")
-            
-            # 调用主持人生成发言（传入最近5条）
-            host_speech = generate_host_speech(recent_speeches)
-            
-            if host_speech:
-                # 写入主持人发言到forum.log
-                self.write_to_forum_log(host_speech, "HOST")
-                logger.info(f"ForumEngine: 主持人发言已记录")
-                
-                # 清空已处理的5条发言
-                self.agent_speeches_buffer = self.agent_speeches_buffer[5:]
-            else:
-                logger.error("ForumEngine: 主持人发言生成失败")
-            
-            # 重置生成标志
-            self.is_host_generating = False
-                
-        except Exception as e:
-            logger.exception(f"ForumEngine: 触发主持人发言时出错: {e}")
-            self.is_host_generating = False
+        while len(self.agent_speeches_buffer) >= self.host_speech_threshold:
+            window = self.agent_speeches_buffer[:self.host_speech_threshold]
+            self.agent_speeches_buffer = self.agent_speeches_buffer[self.host_speech_threshold:]
+            self.host_worker.submit(window)
+    
+    def _reset_host_state(self):
+        """重置主持人相关状态：清空发言缓冲区，丢弃尚未写回的主持人发言"""
+        self.agent_speeches_buffer = []
+        if self.host_worker is not None:
+            self.host_worker.reset()
+    
+    def get_host_metrics(self) -> Dict:
+        """获取主持人发言队列深度与生成耗时等指标"""
+        if self.host_worker is None:
+            return {'available': False}
+        metrics = self.host_worker.get_metrics()
+        metrics['available'] = True
+        metrics['buffered_speeches'] = len(self.agent_speeches_buffer)
+        return metrics
     
     def _clean_content_tags(self, content: str, app_name: str) -> str:
         """清理内容中的重复标签和多余前缀"""
@@ -585,14 +685,9 @@ class LogMonitor:
         """智能监控日志文件"""
         logger.info("ForumEngine: 论坛创建中...")
        
-        # 初始化文件行数和位置 - 记录当前状态作为基线
+        # 初始化文件位置 - 记录当前文件末尾作为基线
         for app_name, log_file in self.monitored_logs.items():
-            self.file_line_counts[app_name] = self.get_file_line_count(log_file)
-            self.file_positions[app_name] = self.get_file_size(log_file)
-            self.capturing_json[app_name] = False
-            self.json_buffer[app_name] = []
-            self.in_error_block[app_name] = False
-            # logger.info(f"ForumEngine: {app_name} 基线行数: {self.file_line_counts[app_name]}")
+            self.reset_tail_position(log_file, app_name)
        
         while self.is_monitoring:
             try:
@@ -603,10 +698,9 @@ class LogMonitor:
                
                 # 为每个log文件独立处理
                 for app_name, log_file in self.monitored_logs.items():
-                    current_lines = self.get_file_line_count(log_file)
-                    previous_lines = self.file_line_counts.get(app_name, 0)
+                    change = self.check_file_change(log_file, app_name)
                    
-                    if current_lines > previous_lines:
+                    if change == 'grow':
                         any_growth = True
                         # 立即读取新增内容
                         new_lines = self.read_new_lines(log_file, app_name)
@@ -643,22 +737,14 @@ class LogMonitor:
                                 self.agent_speeches_buffer.append(log_line)
                                 
                                 # 检查是否需要触发主持人发言
-                                if len(self.agent_speeches_buffer) >= self.host_speech_threshold and not self.is_host_generating:
-                                    # 同步触发主持人发言
+                                if len(self.agent_speeches_buffer) >= self.host_speech_threshold:
+                                    # 投递给主持人工作线程，不等待生成结果
                                     self._trigger_host_speech()
                    
-                    elif current_lines < previous_lines:
+                    elif change == 'shrink':
+                        # 读取位置已在check_file_change中重置到新文件开头
                         any_shrink = True
                         # logger.info(f"ForumEngine: 检测到 {app_name} 日志缩短，将重置基线")
-                        # 重置文件位置到新的文件末尾
-                        self.file_positions[app_name] = self.get_file_size(log_file)
-                        # 重置JSON捕获状态
-                        self.capturing_json[app_name] = False
-                        self.json_buffer[app_name] = []
-                        self.in_error_block[app_name] = False
-                   
-                    # 更新行数记录
-                    self.file_line_counts[app_name] = current_lines
                
                 # 检查是否应该结束当前搜索会话
                 if self.is_searching:
@@ -668,8 +754,7 @@ class LogMonitor:
                         self.is_searching = False
                         self.search_inactive_count = 0
                         # 重置主持人相关状态
-                        self.agent_speeches_buffer = []
-                        self.is_host_generating = False
+                        self._reset_host_state()
                         # 写入结束标记
                         end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                         self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
@@ -682,8 +767,7 @@ class LogMonitor:
                             self.is_searching = False
                             self.search_inactive_count = 0
                             # 重置主持人相关状态
-                            self.agent_speeches_buffer = []
-                            self.is_host_generating = False
+                            self._reset_host_state()
                             # 写入结束标记
                             end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                             self.write_to_forum_log(f"=== ForumEngine 论坛结束 - {end_time} ===", "SYSTEM")
@@ -732,6 +816,11 @@ class LogMonitor:
            
             if self.monitor_thread and self.monitor_thread.is_alive():
                 self.monitor_thread.join(timeout=2)
+            for app_name in list(self.file_handles):
+                self._close_tail_handle(app_name)
+            
+            if self.host_worker is not None:
+                self.host_worker.stop()
            
             # 写入结束标记
             end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -856,4 +945,8 @@ def stop_forum_monitoring():
 
 def get_forum_log():
     """获取forum.log内容"""
-    return get_monitor().get_forum_log_content()
\ No newline at end of file
+    return get_monitor().get_forum_log_content()
+
+def get_host_metrics():
+    """获取主持人发言队列与生成耗时指标"""
+    return get_monitor().get_host_metrics()
@@ -3,8 +3,10 @@ FoxTrends Flask主应用 - 多垂直社区需求追踪系统
 基于 BettaFish 架构改造，用于需求发现和分析
 """
 
+import gzip
 import os
 import sys
+import functools
 import subprocess
 import time
 import threading
@@ -22,6 +24,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 from config import settings, reload_settings
 
+# 日志游标读取与主项目共用 utils/log_cursor.py
+sys.path.append(str(Path(__file__).parent.parent / "utils"))
+from log_cursor import tail_log_page, read_log_after
+
 # 导入ReportEngine
 try:
     from ReportEngine.flask_interface import report_bp, initialize_report_engine
@@ -152,6 +158,10 @@ def write_config_values(updates):
     env_file_path.parent.mkdir(parents=True, exist_ok=True)
     env_file_path.write_text('\n'.join(env_lines) + '\n', encoding='utf-8')
     reload_settings()
+    
+    # 数据库配置可能已变更，重建共享连接池
+    from database.db_manager import reset_database_manager
+    reset_database_manager()
 
 
 # 系统状态管理
@@ -384,20 +394,26 @@ def write_log_to_file(app_name, line):
         logger.error(f"Error writing log for {app_name}: {e}")
 
 
+# /api/output 按游标分页时单页最多返回的行数
+OUTPUT_PAGE_SIZE = 1000
+# 不带游标请求 /api/output 时返回的最近行数
+OUTPUT_TAIL_LINES = 1000
+# JSON响应超过该大小且客户端支持时使用gzip压缩
+GZIP_MIN_SIZE = 1024
+
 def read_log_from_file(app_name, tail_lines=None):
-    """从文件读取日志"""
+    """从文件读取日志，指定tail_lines时从文件末尾向前读取，只读最后几行"""
     try:
         log_file_path = LOG_DIR / f"{app_name}.log"
         if not log_file_path.exists():
             return []
         
+        if tail_lines:
+            return tail_log_page(log_file_path, tail_lines)['lines']
+        
         with open(log_file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
-            
-            if tail_lines:
-                return lines[-tail_lines:]
-            return lines
+            return [line.rstrip('\n\r') for line in lines if line.strip()]
     except Exception as e:
         logger.exception(f"Error reading log for {app_name}: {e}")
         return []
@@ -564,34 +580,76 @@ def stop_app(app_name):
     return jsonify({'success': False, 'message': '该应用暂不支持停止操作'})
 
 
+@app.after_request
+def gzip_large_response(response):
+    """客户端支持时压缩较大的JSON响应（控制台输出等轮询接口）"""
+    if (response.direct_passthrough
+            or response.status_code != 200
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=5))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
 @app.route('/api/output/<app_name>')
 def get_output(app_name):
-    """获取应用输出"""
+    """获取应用输出
+
+    参数:
+        after: 字节偏移游标（上次响应的next_offset），只返回其后新增的行；
+               不传时返回最近的 OUTPUT_TAIL_LINES 行
+        limit: 传入after时单页最多返回的行数
+    """
     if app_name not in processes:
         return jsonify({'success': False, 'message': '未知应用'})
     
-    if app_name == 'forum':
-        try:
-            forum_log_content = read_log_from_file('forum')
+    try:
+        log_file_path = LOG_DIR / f"{app_name}.log"
+        after = request.args.get('after', type=int)
+        if after is None:
+            page = tail_log_page(log_file_path, OUTPUT_TAIL_LINES) if log_file_path.exists() else {
+                'lines': [], 'next_offset': 0
+            }
             return jsonify({
                 'success': True,
-                'output': forum_log_content,
-                'total_lines': len(forum_log_content)
+                'output': page['lines'],
+                'total_lines': len(page['lines']),
+                'next_offset': page['next_offset'],
+                'has_more': False,
+                'reset': False
             })
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'读取forum日志失败: {str(e)}'})
-    
-    output_lines = read_log_from_file(app_name)
-    
-    return jsonify({
-        'success': True,
-        'output': output_lines
-    })
+        
+        limit = request.args.get('limit', default=OUTPUT_PAGE_SIZE, type=int)
+        page = read_log_after(log_file_path, after, max(1, min(limit, OUTPUT_PAGE_SIZE)))
+        return jsonify({
+            'success': True,
+            'output': page['lines'],
+            'total_lines': len(page['lines']),
+            'next_offset': page['next_offset'],
+            'has_more': page['has_more'],
+            'reset': page['reset']
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'读取{app_name}日志失败: {str(e)}'})
 
 
 @app.route('/api/forum/log')
 def get_forum_log():
-    """获取ForumEngine的forum.log内容"""
+    """获取ForumEngine的forum.log内容
+
+    参数:
+        after: 字节偏移游标（上次响应的next_offset），只返回其后新增的行；不传时返回最近的 OUTPUT_TAIL_LINES 行
+        limit: 传入after时单页最多返回的行数
+    """
     try:
         forum_log_file = LOG_DIR / "forum.log"
         if not forum_log_file.exists():
@@ -599,12 +657,19 @@ def get_forum_log():
                 'success': True,
                 'log_lines': [],
                 'parsed_messages': [],
-                'total_lines': 0
+                'total_lines': 0,
+                'next_offset': 0,
+                'has_more': False
             })
         
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
+        after = request.args.get('after', type=int)
+        if after is None:
+            page = tail_log_page(forum_log_file, OUTPUT_TAIL_LINES)
+            page['has_more'] = False
+        else:
+            limit = request.args.get('limit', default=OUTPUT_PAGE_SIZE, type=int)
+            page = read_log_after(forum_log_file, after, max(1, min(limit, OUTPUT_PAGE_SIZE)))
+        lines = page['lines']
         
         parsed_messages = []
         for line in lines:
@@ -616,7 +681,9 @@ def get_forum_log():
             'success': True,
             'log_lines': lines,
             'parsed_messages': parsed_messages,
-            'total_lines': len(lines)
+            'total_lines': len(lines),
+            'next_offset': page['next_offset'],
+            'has_more': page['has_more']
         })
     except Exception as e:
         return jsonify({'success': False, 'message': f'读取forum.log失败: {str(e)}'})
@@ -677,14 +744,92 @@ def add_community():
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
+def _rollup_where(start_date, end_date, community_id=None, signal_type=None):
+    """
+    构建 demand_signal_daily_rollup 的筛选条件（按天）
+    
+    Returns:
+        (where 子句, 命名参数字典)
+    """
+    where_clauses = ["r.day >= :start_date AND r.day <= :end_date"]
+    params = {'start_date': start_date.date(), 'end_date': end_date.date()}
+    
+    if community_id:
+        where_clauses.append("r.community_id = :community_id")
+        params['community_id'] = community_id
+    
+    if signal_type:
+        where_clauses.append("r.signal_type = :signal_type")
+        params['signal_type'] = signal_type
+    
+    return " AND ".join(where_clauses), params
+
+
+def _rollup_window(days):
+    """
+    日汇总表的当前周期：含今天在内的最近 days 天
+    
+    Returns:
+        (start_date, end_date)，start_date 所在日即周期第一天
+    """
+    from datetime import timedelta
+    
+    end_date = datetime.now()
+    return end_date - timedelta(days=days - 1), end_date
+
+
+def _rollup_avg(total, count) -> float:
+    """由汇总表的 *_sum / *_n 计算均值，无数据时为 0.0"""
+    return float(total) / count if count else 0.0
+
+
+def cached_api_response(endpoint):
+    """
+    分析接口响应缓存
+
+    按 (endpoint, days, community_id, signal_type) 及其余查询参数缓存成功的响应，
+    有效期见 database.db_manager.RESULT_CACHE_TTL；demand_signals 写入新数据时失效
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            from database.db_manager import result_cache
+            
+            other_args = tuple(sorted(
+                (name, value) for name, value in request.args.items(multi=True)
+                if name not in ('days', 'community_id', 'signal_type')
+            ))
+            key = (
+                endpoint,
+                request.args.get('days', None, type=int),
+                request.args.get('community_id', None, type=int),
+                request.args.get('signal_type', None),
+                other_args
+            )
+            cached = result_cache.get(key)
+            if cached is not None:
+                body, status = cached
+                return app.response_class(body, status=status, mimetype='application/json')
+            
+            generation = result_cache.generation
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and response.is_json:
+                if (response.get_json(silent=True) or {}).get('success'):
+                    result_cache.set(key, (response.get_data(), response.status_code), generation)
+            return response
+        return wrapper
+    return decorator
+
+
 @app.route('/api/demands', methods=['GET'])
+@cached_api_response('list_demands')
 def list_demands():
     """获取需求信号列表"""
     try:
-        from database.db_manager import DatabaseManager
+        from database.db_manager import get_database_manager
         from datetime import datetime
         
-        db = DatabaseManager()
+        db = get_database_manager()
         
         # 获取查询参数
         limit = request.args.get('limit', 50, type=int)
@@ -762,9 +907,9 @@ def list_demands():
 def get_demand_detail(demand_id):
     """获取需求详情"""
     try:
-        from database.db_manager import DatabaseManager
+        from database.db_manager import get_database_manager
         
-        db = DatabaseManager()
+        db = get_database_manager()
         
         query = """
             SELECT 
@@ -822,56 +967,57 @@ def get_demand_detail(demand_id):
 
 
 @app.route('/api/analysis/metrics', methods=['GET'])
+@cached_api_response('analysis_metrics')
 def get_analysis_metrics():
     """获取分析指标"""
     try:
-        from database.db_manager import DatabaseManager
+        from database.db_manager import get_database_manager
+        from database.rollup import ensure_rollup_ready
         from datetime import datetime, timedelta
         
-        db = DatabaseManager()
+        db = get_database_manager()
+        ensure_rollup_ready(db.engine)
         days = request.args.get('days', 30, type=int)
         community_id = request.args.get('community_id', None, type=int)
         signal_type = request.args.get('signal_type', None)
         
-        # 计算时间范围
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        # 计算时间范围（按天汇总）：当前周期为含今天在内的最近 days 天，上一周期为之前的 days 天
+        start_date, end_date = _rollup_window(days)
         prev_start_date = start_date - timedelta(days=days)
         
-        # 构建查询
-        where_clauses = ["ds.created_at >= %s AND ds.created_at <= %s"]
-        params = [start_date, end_date]
-        
-        if community_id:
-            where_clauses.append("ds.community_id = %s")
-            params.append(community_id)
+        # 构建查询：一次扫描日汇总表同时得到当前周期和上一周期的指标
+        where_clause, params = _rollup_where(prev_start_date, end_date, community_id, signal_type)
+        params['start_day'] = start_date.date()
         
-        if signal_type:
-            where_clauses.append("ds.signal_type = %s")
-            params.append(signal_type)
-        
-        where_clause = " AND ".join(where_clauses)
-        
-        # 当前周期指标
-        current_query = f"""
+        query = f"""
             SELECT 
-                COUNT(*) as total_demands,
-                AVG(hotness_score) as avg_hotness,
-                SUM(discussion_count) as total_discussions,
-                SUM(participant_count) as total_participants,
-                AVG(sentiment_score) as avg_sentiment
-            FROM demand_signals ds
+                SUM(CASE WHEN r.day >= :start_day THEN r.signal_count ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.hotness_sum ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.hotness_n ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.discussion_sum ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.participant_sum ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.sentiment_sum ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.sentiment_n ELSE 0 END),
+                SUM(CASE WHEN r.day < :start_day THEN r.signal_count ELSE 0 END),
+                SUM(CASE WHEN r.day < :start_day THEN r.hotness_sum ELSE 0 END),
+                SUM(CASE WHEN r.day < :start_day THEN r.hotness_n ELSE 0 END),
+                SUM(CASE WHEN r.day < :start_day THEN r.discussion_sum ELSE 0 END),
+                SUM(CASE WHEN r.day < :start_day THEN r.participant_sum ELSE 0 END)
+            FROM demand_signal_daily_rollup r
             WHERE {where_clause}
         """
         
-        current_results = db.execute_query(current_query, tuple(params))
+        results = db.execute_query(query, params)
+        row = [value or 0 for value in results[0]] if results else [0] * 12
         
-        # 上一周期指标（用于计算变化）
-        prev_params = [prev_start_date, start_date] + params[2:]
-        prev_results = db.execute_query(current_query, tuple(prev_params))
-        
-        current = current_results[0] if current_results else (0, 0, 0, 0, 0)
-        prev = prev_results[0] if prev_results else (0, 0, 0, 0, 0)
+        current = (
+            int(row[0]),
+            _rollup_avg(row[1], row[2]),
+            int(row[3]),
+            int(row[4]),
+            _rollup_avg(row[5], row[6])
+        )
+        prev = (int(row[7]), _rollup_avg(row[8], row[9]), int(row[10]), int(row[11]))
         
         # 计算变化百分比
         def calc_change(current_val, prev_val):
@@ -880,16 +1026,16 @@ def get_analysis_metrics():
             return ((current_val - prev_val) / prev_val) * 100
         
         metrics = {
-            'total_demands': current[0] or 0,
-            'avg_hotness': float(current[1]) if current[1] else 0.0,
-            'total_discussions': current[2] or 0,
-            'total_participants': current[3] or 0,
-            'avg_sentiment': float(current[4]) if current[4] else 0.0,
+            'total_demands': current[0],
+            'avg_hotness': current[1],
+            'total_discussions': current[2],
+            'total_participants': current[3],
+            'avg_sentiment': current[4],
             'changes': {
-                'demands': calc_change(current[0] or 0, prev[0] or 0),
-                'hotness': calc_change(current[1] or 0, prev[1] or 0),
-                'discussions': calc_change(current[2] or 0, prev[2] or 0),
-                'participants': calc_change(current[3] or 0, prev[3] or 0)
+                'demands': calc_change(current[0], prev[0]),
+                'hotness': calc_change(current[1], prev[1]),
+                'discussions': calc_change(current[2], prev[2]),
+                'participants': calc_change(current[3], prev[3])
             }
         }
         
@@ -903,64 +1049,56 @@ def get_analysis_metrics():
 
 
 @app.route('/api/analysis/trend', methods=['GET'])
+@cached_api_response('analysis_trend')
 def get_analysis_trend():
     """获取趋势数据"""
     try:
-        from database.db_manager import DatabaseManager
-        from datetime import datetime, timedelta
+        from database.db_manager import get_database_manager
+        from database.rollup import ensure_rollup_ready
         
-        db = DatabaseManager()
+        db = get_database_manager()
+        ensure_rollup_ready(db.engine)
         days = request.args.get('days', 30, type=int)
         view = request.args.get('view', 'hotness')
         community_id = request.args.get('community_id', None, type=int)
         signal_type = request.args.get('signal_type', None)
         
-        # 计算时间范围
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # 构建查询
-        where_clauses = ["ds.created_at >= %s AND ds.created_at <= %s"]
-        params = [start_date, end_date]
-        
-        if community_id:
-            where_clauses.append("ds.community_id = %s")
-            params.append(community_id)
-        
-        if signal_type:
-            where_clauses.append("ds.signal_type = %s")
-            params.append(signal_type)
+        # 计算时间范围：与 metrics 相同，含今天在内的最近 days 天
+        start_date, end_date = _rollup_window(days)
         
-        where_clause = " AND ".join(where_clauses)
-        
-        # 根据视图类型选择聚合字段
-        if view == 'hotness':
-            agg_field = "AVG(hotness_score)"
-        elif view == 'volume':
-            agg_field = "COUNT(*)"
-        elif view == 'sentiment':
-            agg_field = "AVG(sentiment_score)"
-        else:
-            agg_field = "AVG(hotness_score)"
+        # 构建查询：日汇总表已按天分组，无需再对原始信号做 GROUP BY DATE(created_at)
+        where_clause, params = _rollup_where(start_date, end_date, community_id, signal_type)
         
         query = f"""
             SELECT 
-                DATE(ds.created_at) as date,
-                {agg_field} as value
-            FROM demand_signals ds
+                r.day,
+                SUM(r.signal_count),
+                SUM(r.hotness_sum),
+                SUM(r.hotness_n),
+                SUM(r.sentiment_sum),
+                SUM(r.sentiment_n)
+            FROM demand_signal_daily_rollup r
             WHERE {where_clause}
-            GROUP BY DATE(ds.created_at)
-            ORDER BY date
+            GROUP BY r.day
+            HAVING SUM(r.signal_count) > 0
+            ORDER BY r.day
         """
         
-        results = db.execute_query(query, tuple(params))
+        results = db.execute_query(query, params)
         
         dates = []
         values = []
         
         for row in results:
-            dates.append(row[0].strftime('%Y-%m-%d'))
-            values.append(float(row[1]) if row[1] else 0.0)
+            # 根据视图类型选择聚合值
+            if view == 'volume':
+                value = float(row[1])
+            elif view == 'sentiment':
+                value = _rollup_avg(row[4], row[5])
+            else:
+                value = _rollup_avg(row[2], row[3])
+            dates.append(row[0] if isinstance(row[0], str) else row[0].strftime('%Y-%m-%d'))
+            values.append(value)
         
         return jsonify({
             'success': True,
@@ -973,40 +1111,35 @@ def get_analysis_trend():
 
 
 @app.route('/api/analysis/type-distribution', methods=['GET'])
+@cached_api_response('type_distribution')
 def get_type_distribution():
     """获取需求类型分布"""
     try:
-        from database.db_manager import DatabaseManager
-        from datetime import datetime, timedelta
+        from database.db_manager import get_database_manager
+        from database.rollup import ensure_rollup_ready
         
-        db = DatabaseManager()
+        db = get_database_manager()
+        ensure_rollup_ready(db.engine)
         days = request.args.get('days', 30, type=int)
         community_id = request.args.get('community_id', None, type=int)
         
-        # 计算时间范围
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
+        # 计算时间范围：与 metrics 相同，含今天在内的最近 days 天
+        start_date, end_date = _rollup_window(days)
         
         # 构建查询
-        where_clauses = ["created_at >= %s AND created_at <= %s"]
-        params = [start_date, end_date]
-        
-        if community_id:
-            where_clauses.append("community_id = %s")
-            params.append(community_id)
-        
-        where_clause = " AND ".join(where_clauses)
+        where_clause, params = _rollup_where(start_date, end_date, community_id)
         
         query = f"""
             SELECT 
-                signal_type,
-                COUNT(*) as count
-            FROM demand_signals
+                r.signal_type,
+                SUM(r.signal_count) as count
+            FROM demand_signal_daily_rollup r
             WHERE {where_clause}
-            GROUP BY signal_type
+            GROUP BY r.signal_type
+            HAVING SUM(r.signal_count) > 0
         """
         
-        results = db.execute_query(query, tuple(params))
+        results = db.execute_query(query, params)
         
         type_names = {
             'pain_point': '痛点',
@@ -1018,8 +1151,10 @@ def get_type_distribution():
         values = []
         
         for row in results:
-            labels.append(type_names.get(row[0], row[0]))
-            values.append(row[1])
+            # 汇总表中空类型记为 ''
+            signal_type = row[0] or None
+            labels.append(type_names.get(signal_type, signal_type))
+            values.append(int(row[1]))
         
         return jsonify({
             'success': True,
@@ -1032,13 +1167,14 @@ def get_type_distribution():
 
 
 @app.route('/api/analysis/pain-points', methods=['GET'])
+@cached_api_response('pain_points')
 def get_pain_points():
     """获取关键痛点分析"""
     try:
-        from database.db_manager import DatabaseManager
+        from database.db_manager import get_database_manager
         from datetime import datetime, timedelta
         
-        db = DatabaseManager()
+        db = get_database_manager()
         days = request.args.get('days', 30, type=int)
         community_id = request.args.get('community_id', None, type=int)
         
@@ -1107,99 +1243,93 @@ def get_pain_points():
 
 
 @app.route('/api/analysis/insights', methods=['GET'])
+@cached_api_response('analysis_insights')
 def get_analysis_insights():
     """获取分析洞察"""
     try:
-        from database.db_manager import DatabaseManager
+        from database.db_manager import get_database_manager
+        from database.rollup import ensure_rollup_ready
         from datetime import datetime, timedelta
         
-        db = DatabaseManager()
+        db = get_database_manager()
+        ensure_rollup_ready(db.engine)
         days = request.args.get('days', 30, type=int)
         community_id = request.args.get('community_id', None, type=int)
         
-        # 计算时间范围
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        # 构建基础查询条件
-        where_clauses = ["created_at >= %s AND created_at <= %s"]
-        params = [start_date, end_date]
-        
-        if community_id:
-            where_clauses.append("community_id = %s")
-            params.append(community_id)
+        # 计算时间范围：当前周期为含今天在内的最近 days 天，上一周期为之前的 days 天，两者天数相同
+        start_date, end_date = _rollup_window(days)
+        prev_start = start_date - timedelta(days=days)
         
-        where_clause = " AND ".join(where_clauses)
+        # 按社区汇总当前周期与上一周期，一次查询得到总量、讨论数、增长率和最活跃社区
+        where_clause, params = _rollup_where(prev_start, end_date, community_id)
+        params['start_day'] = start_date.date()
         
-        # 增长最快的需求
-        fastest_query = f"""
+        summary_query = f"""
+            SELECT 
+                c.name,
+                SUM(CASE WHEN r.day >= :start_day THEN r.signal_count ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.hotness_sum ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.hotness_n ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.discussion_sum ELSE 0 END),
+                SUM(CASE WHEN r.day >= :start_day THEN r.discussion_n ELSE 0 END),
+                SUM(CASE WHEN r.day < :start_day THEN r.signal_count ELSE 0 END)
+            FROM demand_signal_daily_rollup r
+            LEFT JOIN communities c ON r.community_id = c.id
+            WHERE {where_clause}
+            GROUP BY r.community_id, c.name
+        """
+        summary_rows = []
+        for row in db.execute_query(summary_query, params):
+            # 第一列为社区名，其余汇总值为空时记为 0
+            summary_rows.append([row[0]] + [value or 0 for value in row[1:]])
+        
+        current_count = int(sum(row[1] for row in summary_rows))
+        hotness_sum = sum(row[2] for row in summary_rows)
+        hotness_n = sum(row[3] for row in summary_rows)
+        total_mentions = int(sum(row[4] for row in summary_rows))
+        discussion_n = sum(row[5] for row in summary_rows)
+        prev_count = int(sum(row[6] for row in summary_rows))
+        
+        # 增长最快的需求（需要标题，直接取原始表中热度最高的一条）
+        fastest_query = """
             SELECT title, hotness_score
             FROM demand_signals
-            WHERE {where_clause}
-            ORDER BY hotness_score DESC
-            LIMIT 1
+            WHERE created_at >= :start_date AND created_at <= :end_date
         """
-        fastest_result = db.execute_query(fastest_query, tuple(params))
+        # 与汇总表的当前周期一致，从起始日零点开始
+        fastest_params = {'start_date': datetime.combine(start_date.date(), datetime.min.time()), 'end_date': end_date}
+        if community_id:
+            fastest_query += " AND community_id = :community_id"
+            fastest_params['community_id'] = community_id
+        fastest_query += " ORDER BY hotness_score DESC LIMIT 1"
+        fastest_result = db.execute_query(fastest_query, fastest_params)
         fastest = f'"{fastest_result[0][0]}" (热度: {fastest_result[0][1]:.1f})' if fastest_result else '暂无数据'
         
         # 最活跃的社区
-        active_query = f"""
-            SELECT c.name, COUNT(*) as demand_count
-            FROM demand_signals ds
-            JOIN communities c ON ds.community_id = c.id
-            WHERE {where_clause}
-            GROUP BY c.name
-            ORDER BY demand_count DESC
-            LIMIT 1
-        """
-        active_result = db.execute_query(active_query, tuple(params))
-        active_community = f'{active_result[0][0]} ({active_result[0][1]} 个需求)' if active_result else '暂无数据'
+        community_rows = [row for row in summary_rows if row[0] is not None and row[1] > 0]
+        active_row = max(community_rows, key=lambda row: row[1]) if community_rows else None
+        active_community = f'{active_row[0]} ({int(active_row[1])} 个需求)' if active_row else '暂无数据'
         
         # 关键发现
-        total_query = f"""
-            SELECT COUNT(*), AVG(hotness_score)
-            FROM demand_signals
-            WHERE {where_clause}
-        """
-        total_result = db.execute_query(total_query, tuple(params))
-        
-        if total_result and total_result[0][0] > 0:
-            total_count = total_result[0][0]
-            avg_hotness = total_result[0][1]
-            key_finding = f'在过去 {days} 天内发现 {total_count} 个需求，平均热度 {avg_hotness:.1f}'
+        if current_count > 0:
+            avg_hotness = _rollup_avg(hotness_sum, hotness_n)
+            key_finding = f'在过去 {days} 天内发现 {current_count} 个需求，平均热度 {avg_hotness:.1f}'
         else:
             key_finding = '暂无足够数据进行分析'
         
         # 计算增长率
-        prev_start = start_date - timedelta(days=days)
-        prev_query = f"""
-            SELECT COUNT(*)
-            FROM demand_signals
-            WHERE created_at >= %s AND created_at < %s
-        """
-        prev_result = db.execute_query(prev_query, (prev_start, start_date))
-        prev_count = prev_result[0][0] if prev_result else 0
-        current_count = total_result[0][0] if total_result else 0
-        
         if prev_count > 0:
             growth_rate = round(((current_count - prev_count) / prev_count) * 100, 1)
         else:
             growth_rate = 0.0
         
-        # 计算总讨论数和平均值
-        mentions_query = f"""
-            SELECT SUM(discussion_count), AVG(discussion_count)
-            FROM demand_signals
-            WHERE {where_clause}
-        """
-        mentions_result = db.execute_query(mentions_query, tuple(params))
-        total_mentions = mentions_result[0][0] if mentions_result and mentions_result[0][0] else 0
-        avg_mentions = round(mentions_result[0][1], 1) if mentions_result and mentions_result[0][1] else 0
+        # 计算平均讨论数
+        avg_mentions = round(total_mentions / discussion_n, 1) if discussion_n else 0
         
         # 计算社区占比
-        if active_result and total_result and total_result[0][0] > 0:
-            community_percentage = round((active_result[0][1] / total_result[0][0]) * 100, 1)
-            top_community = active_result[0][0]
+        if active_row and current_count > 0:
+            community_percentage = round((active_row[1] / current_count) * 100, 1)
+            top_community = active_row[0]
         else:
             community_percentage = 0
             top_community = '暂无数据'
@@ -1262,12 +1392,13 @@ def download_report(report_id):
 
 
 @app.route('/api/dashboard/stats', methods=['GET'])
+@cached_api_response('dashboard_stats')
 def get_dashboard_stats():
     """获取Dashboard统计数据"""
     try:
-        from database.db_manager import DatabaseManager
+        from database.db_manager import get_database_manager
         
-        db = DatabaseManager()
+        db = get_database_manager()
         
         # 获取社区统计
         community_stats = db.execute_query("""
@@ -5,13 +5,29 @@ FoxTrends 数据库模块
 提供数据库连接、初始化和管理功能
 """
 
-from .db_manager import DatabaseManager, get_engine, get_async_engine
+from .db_manager import (
+    DatabaseManager,
+    get_engine,
+    get_async_engine,
+    get_database_manager,
+    reset_database_manager,
+    result_cache,
+    invalidate_result_cache,
+)
 from .init_database import init_database, init_database_async
+from .rollup import create_rollup_schema, rebuild_rollup, ensure_rollup_ready
 
 __all__ = [
     'DatabaseManager',
     'get_engine',
     'get_async_engine',
+    'get_database_manager',
+    'reset_database_manager',
+    'result_cache',
+    'invalidate_result_cache',
     'init_database',
     'init_database_async',
+    'create_rollup_schema',
+    'rebuild_rollup',
+    'ensure_rollup_ready',
 ]
@@ -5,11 +5,16 @@ FoxTrends 数据库管理器
 基于 BettaFish 的数据库连接代码改造，支持 PostgreSQL 和 MySQL
 """
 
+import re
 import sys
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import quote_plus
-from typing import Optional
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 from sqlalchemy import create_engine, text, inspect
+from sqlalchemy.sql.elements import TextClause
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy.engine import Engine
 from loguru import logger
@@ -20,6 +25,15 @@ sys.path.insert(0, str(project_root))
 
 from config import settings
 
+# 分析接口查询结果缓存的有效期（秒）
+RESULT_CACHE_TTL = 30
+
+# 写入 demand_signals 的语句，执行后需要使查询结果缓存失效
+_DEMAND_SIGNALS_WRITE_PATTERN = re.compile(
+    r'^\s*(INSERT\s+INTO|UPDATE|DELETE\s+FROM|REPLACE\s+INTO)\s+[`"]?demand_signals\b',
+    re.IGNORECASE,
+)
+
 
 class DatabaseManager:
     """
@@ -143,27 +157,143 @@ class DatabaseManager:
             with self.engine.connect() as conn:
                 # 如果 params 是元组或列表，转换为字典
                 if params and isinstance(params, (tuple, list)):
-                    # 将 ? 或 %s 占位符替换为命名参数
-                    param_dict = {}
-                    query_with_names = query
-                    for i, val in enumerate(params):
-                        param_name = f'param{i}'
-                        param_dict[param_name] = val
-                        # 替换 ? 或 %s 为命名参数（只替换第一个）
-                        if '?' in query_with_names:
-                            query_with_names = query_with_names.replace('?', f':{param_name}', 1)
-                        elif '%s' in query_with_names:
-                            query_with_names = query_with_names.replace('%s', f':{param_name}', 1)
-                    result = conn.execute(text(query_with_names), param_dict)
+                    # 占位符改写结果按查询形状缓存
+                    statement = _compile_positional_query(query, len(params))
+                    param_dict = {f'param{i}': val for i, val in enumerate(params)}
+                    result = conn.execute(statement, param_dict)
                 else:
                     # 字典参数或无参数
-                    result = conn.execute(text(query), params or {})
+                    result = conn.execute(_compile_query(query), params or {})
+                if _DEMAND_SIGNALS_WRITE_PATTERN.match(query):
+                    invalidate_result_cache()
                 return result.fetchall()
         except Exception as e:
             logger.error(f"查询执行失败: {e}")
             raise
 
 
+@lru_cache(maxsize=512)
+def _compile_query(query: str) -> TextClause:
+    """缓存 text() 语句对象，相同查询复用 SQLAlchemy 的编译缓存"""
+    return text(query)
+
+
+@lru_cache(maxsize=512)
+def _compile_positional_query(query: str, param_count: int) -> TextClause:
+    """
+    将 ? 或 %s 占位符依次替换为 :param0、:param1 ... 命名参数
+
+    结果按 (query, param_count) 缓存，同一形状的查询只改写一次
+    """
+    query_with_names = query
+    for i in range(param_count):
+        param_name = f'param{i}'
+        # 替换 ? 或 %s 为命名参数（只替换第一个）
+        if '?' in query_with_names:
+            query_with_names = query_with_names.replace('?', f':{param_name}', 1)
+        elif '%s' in query_with_names:
+            query_with_names = query_with_names.replace('%s', f':{param_name}', 1)
+    return text(query_with_names)
+
+
+_shared_manager: Optional[DatabaseManager] = None
+_shared_manager_lock = threading.Lock()
+
+
+def get_database_manager() -> DatabaseManager:
+    """
+    获取进程内共享的数据库管理器
+
+    引擎及其连接池只创建一次，供所有 HTTP 请求复用；不要对其调用 close()
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        with _shared_manager_lock:
+            if _shared_manager is None:
+                _shared_manager = DatabaseManager()
+    return _shared_manager
+
+
+def reset_database_manager():
+    """数据库配置变更后释放共享连接池，下次获取时按新配置重建"""
+    from database.rollup import reset_rollup_ready
+
+    global _shared_manager
+    with _shared_manager_lock:
+        manager, _shared_manager = _shared_manager, None
+    if manager is not None:
+        manager.close()
+    reset_rollup_ready()
+    invalidate_result_cache()
+
+
+class ResultCache:
+    """
+    查询结果的短期缓存
+
+    写入 demand_signals 后整体失效；失效前开始计算的结果不会写回缓存
+    """
+
+    def __init__(self, ttl: float = RESULT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """缓存代数，每次失效加一；计算前记录，写回时用于判断结果是否已过时"""
+        return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """获取未过期的缓存结果，未命中时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+        return None
+
+    def set(self, key: Hashable, value: Any, generation: int):
+        """写入缓存；generation 与当前代数不一致时说明期间有新数据写入，丢弃结果"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            now = time.monotonic()
+            if len(self._entries) >= 1024:
+                # 清理过期条目，避免键无限增长
+                self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            self._entries[key] = (now + self.ttl, value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        获取缓存结果，未命中或已过期时调用 compute 计算并缓存
+
+        Args:
+            key: 缓存键，如 (endpoint, days, community_id, signal_type)
+            compute: 计算结果的函数
+        """
+        value = self.get(key)
+        if value is None:
+            generation = self.generation
+            value = compute()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self):
+        """清空缓存"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+result_cache = ResultCache()
+
+
+def invalidate_result_cache():
+    """demand_signals 有新数据写入时使查询结果缓存失效"""
+    result_cache.invalidate()
+
+
 def build_database_url(async_mode: bool = False) -> str:
     """
     构建数据库连接 URL
@@ -19,6 +19,7 @@ sys.path.insert(0, str(project_root))
 
 from config import settings
 from database.db_manager import get_engine, get_async_engine
+from database.rollup import create_rollup_schema, rebuild_rollup
 
 
 def init_database():
@@ -307,6 +308,11 @@ def init_database():
             """))
             
             logger.info("✓ 创建索引完成")
+            
+            # 创建需求信号日汇总表及维护触发器，并回填已有数据
+            create_rollup_schema(conn)
+            rebuild_rollup(conn)
+            logger.info("✓ 创建 demand_signal_daily_rollup 汇总表")
         
         logger.info("✅ FoxTrends 数据库初始化完成")
         return True
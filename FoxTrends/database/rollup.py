@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+"""
+FoxTrends 需求信号日汇总表
+
+demand_signal_daily_rollup 按 (社区, 信号类型, 日期) 预聚合 demand_signals，
+由数据库触发器在插入/更新/删除时增量维护，分析接口直接读取汇总表，
+查询耗时与 demand_signals 的行数无关。
+
+回填/重建汇总表:
+    python -m database.rollup
+"""
+
+import sys
+import threading
+import weakref
+from pathlib import Path
+from typing import List
+from sqlalchemy import text, inspect
+from sqlalchemy.engine import Connection
+from loguru import logger
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+ROLLUP_TABLE = "demand_signal_daily_rollup"
+
+# 高热度需求阈值（与 Dashboard 高优先级统计一致）
+HIGH_HOTNESS_THRESHOLD = 70
+
+# 汇总指标: (列名, 是否为浮点数, 单行增量表达式)，{r} 替换为 NEW / OLD / demand_signals
+# 均值由 *_sum / *_n 计算，与 AVG() 一样忽略 NULL
+ROLLUP_MEASURES = [
+    ("signal_count", False, "1"),
+    ("hotness_sum", True, "COALESCE({r}.hotness_score, 0)"),
+    ("hotness_n", False, "CASE WHEN {r}.hotness_score IS NULL THEN 0 ELSE 1 END"),
+    ("sentiment_sum", True, "COALESCE({r}.sentiment_score, 0)"),
+    ("sentiment_n", False, "CASE WHEN {r}.sentiment_score IS NULL THEN 0 ELSE 1 END"),
+    ("discussion_sum", False, "COALESCE({r}.discussion_count, 0)"),
+    ("discussion_n", False, "CASE WHEN {r}.discussion_count IS NULL THEN 0 ELSE 1 END"),
+    ("participant_sum", False, "COALESCE({r}.participant_count, 0)"),
+    ("high_hotness_count", False, f"CASE WHEN {{r}}.hotness_score >= {HIGH_HOTNESS_THRESHOLD} THEN 1 ELSE 0 END"),
+]
+
+# 汇总键: 社区为空时记为 0，类型为空时记为 ''
+ROLLUP_KEYS = [
+    ("community_id", "COALESCE({r}.community_id, 0)"),
+    ("signal_type", "COALESCE({r}.signal_type, '')"),
+    ("day", "DATE({r}.created_at)"),
+]
+
+_MEASURE_NAMES = [name for name, _, _ in ROLLUP_MEASURES]
+_KEY_NAMES = [name for name, _ in ROLLUP_KEYS]
+_COLUMN_LIST = ", ".join(_KEY_NAMES + _MEASURE_NAMES)
+
+
+def _dialect_name(conn: Connection) -> str:
+    name = conn.dialect.name
+    return "postgresql" if name in ("postgresql", "postgres") else name
+
+
+def _row_values(row: str, sign: int) -> str:
+    """单行数据在汇总表中的键和增量（sign=-1 表示撤销该行）"""
+    keys = [expr.format(r=row) for _, expr in ROLLUP_KEYS]
+    measures = [expr.format(r=row) for _, _, expr in ROLLUP_MEASURES]
+    if sign < 0:
+        measures = [f"-({expr})" for expr in measures]
+    return ", ".join(keys + measures)
+
+
+def _upsert_sql(dialect: str, row: str, sign: int) -> str:
+    """把单行增量合并进汇总表的 upsert 语句"""
+    values = _row_values(row, sign)
+    if dialect == "mysql":
+        updates = ", ".join(f"{name} = {name} + VALUES({name})" for name in _MEASURE_NAMES)
+        return (f"INSERT INTO {ROLLUP_TABLE} ({_COLUMN_LIST}) VALUES ({values}) "
+                f"ON DUPLICATE KEY UPDATE {updates}")
+    updates = ", ".join(f"{name} = {ROLLUP_TABLE}.{name} + excluded.{name}" for name in _MEASURE_NAMES)
+    return (f"INSERT INTO {ROLLUP_TABLE} ({_COLUMN_LIST}) VALUES ({values}) "
+            f"ON CONFLICT ({', '.join(_KEY_NAMES)}) DO UPDATE SET {updates}")
+
+
+def _create_table_sql(dialect: str) -> str:
+    float_type = {"sqlite": "REAL", "postgresql": "DOUBLE PRECISION"}.get(dialect, "DOUBLE")
+    measure_columns = ",\n".join(
+        f"    {name} {float_type if is_float else 'BIGINT'} NOT NULL DEFAULT 0"
+        for name, is_float, _ in ROLLUP_MEASURES
+    )
+    index = ",\n    INDEX idx_rollup_day (day)" if dialect == "mysql" else ""
+    return f"""
+        CREATE TABLE IF NOT EXISTS {ROLLUP_TABLE} (
+            community_id INTEGER NOT NULL DEFAULT 0,
+            signal_type VARCHAR(50) NOT NULL DEFAULT '',
+            day DATE NOT NULL,
+        {measure_columns},
+            PRIMARY KEY (community_id, signal_type, day){index}
+        )
+    """
+
+
+def _trigger_statements(dialect: str) -> List[str]:
+    """在 demand_signals 上增量维护汇总表的触发器"""
+    if dialect == "sqlite":
+        return [
+            "DROP TRIGGER IF EXISTS trg_demand_signals_rollup_insert",
+            "DROP TRIGGER IF EXISTS trg_demand_signals_rollup_delete",
+            "DROP TRIGGER IF EXISTS trg_demand_signals_rollup_update_old",
+            "DROP TRIGGER IF EXISTS trg_demand_signals_rollup_update_new",
+            f"""
+            CREATE TRIGGER trg_demand_signals_rollup_insert AFTER INSERT ON demand_signals
+            WHEN NEW.created_at IS NOT NULL
+            BEGIN
+                {_upsert_sql(dialect, 'NEW', 1)};
+            END
+            """,
+            f"""
+            CREATE TRIGGER trg_demand_signals_rollup_delete AFTER DELETE ON demand_signals
+            WHEN OLD.created_at IS NOT NULL
+            BEGIN
+                {_upsert_sql(dialect, 'OLD', -1)};
+            END
+            """,
+            f"""
+            CREATE TRIGGER trg_demand_signals_rollup_update_old AFTER UPDATE ON demand_signals
+            WHEN OLD.created_at IS NOT NULL
+            BEGIN
+                {_upsert_sql(dialect, 'OLD', -1)};
+            END
+            """,
+            f"""
+            CREATE TRIGGER trg_demand_signals_rollup_update_new AFTER UPDATE ON demand_signals
+            WHEN NEW.created_at IS NOT NULL
+            BEGIN
+                {_upsert_sql(dialect, 'NEW', 1)};
+            END
+            """,
+        ]
+
+    if dialect == "postgresql":
+        return [
+            f"""
+            CREATE OR REPLACE FUNCTION demand_signals_rollup_apply() RETURNS TRIGGER AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.created_at IS NOT NULL THEN
+                    {_upsert_sql(dialect, 'OLD', -1)};
+                END IF;
+                IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.created_at IS NOT NULL THEN
+                    {_upsert_sql(dialect, 'NEW', 1)};
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS trg_demand_signals_rollup ON demand_signals",
+            """
+            CREATE TRIGGER trg_demand_signals_rollup
+            AFTER INSERT OR UPDATE OR DELETE ON demand_signals
+            FOR EACH ROW EXECUTE FUNCTION demand_signals_rollup_apply()
+            """,
+        ]
+
+    # mysql
+    return [
+        "DROP TRIGGER IF EXISTS trg_demand_signals_rollup_insert",
+        "DROP TRIGGER IF EXISTS trg_demand_signals_rollup_delete",
+        "DROP TRIGGER IF EXISTS trg_demand_signals_rollup_update",
+        f"""
+        CREATE TRIGGER trg_demand_signals_rollup_insert AFTER INSERT ON demand_signals
+        FOR EACH ROW BEGIN
+            IF NEW.created_at IS NOT NULL THEN
+                {_upsert_sql(dialect, 'NEW', 1)};
+            END IF;
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_demand_signals_rollup_delete AFTER DELETE ON demand_signals
+        FOR EACH ROW BEGIN
+            IF OLD.created_at IS NOT NULL THEN
+                {_upsert_sql(dialect, 'OLD', -1)};
+            END IF;
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_demand_signals_rollup_update AFTER UPDATE ON demand_signals
+        FOR EACH ROW BEGIN
+            IF OLD.created_at IS NOT NULL THEN
+                {_upsert_sql(dialect, 'OLD', -1)};
+            END IF;
+            IF NEW.created_at IS NOT NULL THEN
+                {_upsert_sql(dialect, 'NEW', 1)};
+            END IF;
+        END
+        """,
+    ]
+
+
+def create_rollup_schema(conn: Connection):
+    """
+    创建汇总表、索引和维护触发器（可重复执行）
+
+    Args:
+        conn: 已开启事务的数据库连接
+    """
+    dialect = _dialect_name(conn)
+    conn.execute(text(_create_table_sql(dialect)))
+    if dialect != "mysql":
+        conn.execute(text(f"""
+            CREATE INDEX IF NOT EXISTS idx_rollup_day
+            ON {ROLLUP_TABLE}(day)
+        """))
+    for statement in _trigger_statements(dialect):
+        conn.execute(text(statement))
+
+
+def rebuild_rollup(conn: Connection) -> int:
+    """
+    从 demand_signals 全量重建汇总表（回填历史数据）
+
+    Args:
+        conn: 已开启事务的数据库连接
+
+    Returns:
+        int: 汇总表行数
+    """
+    keys = [expr.format(r="demand_signals") for _, expr in ROLLUP_KEYS]
+    measures = [f"SUM({expr.format(r='demand_signals')})" for _, _, expr in ROLLUP_MEASURES]
+    conn.execute(text(f"DELETE FROM {ROLLUP_TABLE}"))
+    conn.execute(text(f"""
+        INSERT INTO {ROLLUP_TABLE} ({_COLUMN_LIST})
+        SELECT {', '.join(keys + measures)}
+        FROM demand_signals
+        WHERE demand_signals.created_at IS NOT NULL
+        GROUP BY {', '.join(keys)}
+    """))
+    return conn.execute(text(f"SELECT COUNT(*) FROM {ROLLUP_TABLE}")).scalar_one()
+
+
+# 已确认汇总表可用的引擎；弱引用随引擎释放而移除，新引擎复用旧引擎的内存地址时不会被误判为已检查
+_ready_engines = weakref.WeakSet()
+_ready_lock = threading.Lock()
+
+
+def reset_rollup_ready():
+    """清除所有引擎的检查结果，数据库配置变更后下次使用时重新检查"""
+    with _ready_lock:
+        _ready_engines.clear()
+
+
+def ensure_rollup_ready(engine) -> bool:
+    """
+    确保汇总表可用：汇总表不存在时自动创建触发器并回填（每个引擎只检查一次）
+
+    Returns:
+        bool: 汇总表是否可用（demand_signals 表不存在时为 False）
+    """
+    if engine in _ready_engines:
+        return True
+    with _ready_lock:
+        if engine in _ready_engines:
+            return True
+        tables = inspect(engine).get_table_names()
+        if "demand_signals" not in tables:
+            return False
+        if ROLLUP_TABLE not in tables:
+            logger.info(f"创建并回填 {ROLLUP_TABLE} 汇总表...")
+            with engine.begin() as conn:
+                create_rollup_schema(conn)
+                rows = rebuild_rollup(conn)
+            logger.info(f"✓ {ROLLUP_TABLE} 回填完成，共 {rows} 行")
+        _ready_engines.add(engine)
+        return True
+
+
+def main():
+    """创建汇总表与触发器，并从 demand_signals 全量回填"""
+    from database.db_manager import get_engine
+
+    engine = get_engine()
+    try:
+        with engine.begin() as conn:
+            create_rollup_schema(conn)
+            rows = rebuild_rollup(conn)
+        logger.info(f"✅ {ROLLUP_TABLE} 重建完成，共 {rows} 行")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
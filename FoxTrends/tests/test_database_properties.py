@@ -311,5 +311,250 @@ class TestDatabaseConfigValidation:
                 assert 'postgresql' in url.lower()
 
 
+
+class TestSharedDatabaseManager:
+    """共享连接池与查询结果缓存测试"""
+    
+    def test_shared_manager_creates_engine_once(self):
+        """验证 get_database_manager 在多次调用间复用同一引擎"""
+        from database import db_manager
+        
+        with patch('database.db_manager.create_engine') as mock_create_engine:
+            mock_create_engine.return_value = MagicMock()
+            db_manager.reset_database_manager()
+            
+            first = db_manager.get_database_manager()
+            second = db_manager.get_database_manager()
+            
+            assert first is second
+            assert mock_create_engine.call_count == 1
+            
+            db_manager.reset_database_manager()
+            assert first.engine.dispose.called
+    
+    def test_positional_query_compiled_once_per_shape(self):
+        """验证占位符改写按查询形状缓存"""
+        from database.db_manager import _compile_positional_query
+        
+        query = "SELECT * FROM demand_signals WHERE id = %s AND community_id = %s"
+        statement = _compile_positional_query(query, 2)
+        
+        assert str(statement) == "SELECT * FROM demand_signals WHERE id = :param0 AND community_id = :param1"
+        assert _compile_positional_query(query, 2) is statement
+    
+    def test_result_cache_invalidated_by_demand_signal_write(self):
+        """验证写入 demand_signals 后结果缓存失效"""
+        from database.db_manager import DatabaseManager, result_cache
+        
+        with patch('database.db_manager.create_engine') as mock_create_engine:
+            mock_create_engine.return_value = MagicMock()
+            db = DatabaseManager()
+            
+            key = ('analysis_metrics', 30, None, None)
+            result_cache.set(key, {'total': 1}, result_cache.generation)
+            assert result_cache.get(key) == {'total': 1}
+            
+            db.execute_query("SELECT COUNT(*) FROM demand_signals")
+            assert result_cache.get(key) == {'total': 1}
+            
+            db.execute_query("INSERT INTO demand_signals (title) VALUES (%s)", ('new',))
+            assert result_cache.get(key) is None
+    
+    def test_result_cache_drops_stale_result(self):
+        """验证失效前开始计算的结果不会写回缓存"""
+        from database.db_manager import ResultCache
+        
+        cache = ResultCache(ttl=60)
+        generation = cache.generation
+        cache.invalidate()
+        cache.set('key', 'stale', generation)
+        
+        assert cache.get('key') is None
+        assert cache.get_or_compute('key', lambda: 'fresh') == 'fresh'
+        assert cache.get('key') == 'fresh'
+
+
+
+class TestDemandSignalRollup:
+    """需求信号日汇总表测试"""
+    
+    def _create_engine(self):
+        from sqlalchemy import create_engine, text
+        
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("""
+                CREATE TABLE demand_signals (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    community_id INTEGER,
+                    signal_type VARCHAR(50),
+                    title TEXT NOT NULL,
+                    sentiment_score REAL,
+                    hotness_score REAL,
+                    discussion_count INTEGER DEFAULT 0,
+                    participant_count INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """))
+        return engine
+    
+    def _rollup_rows(self, conn):
+        from sqlalchemy import text
+        
+        return conn.execute(text("""
+            SELECT * FROM demand_signal_daily_rollup
+            WHERE signal_count != 0
+            ORDER BY community_id, signal_type, day
+        """)).fetchall()
+    
+    def test_triggers_match_full_rebuild(self):
+        """验证触发器增量维护的结果与全量重建一致"""
+        from datetime import datetime, timedelta
+        from sqlalchemy import text
+        from database.rollup import ensure_rollup_ready, rebuild_rollup
+        
+        engine = self._create_engine()
+        insert = text("""
+            INSERT INTO demand_signals (community_id, signal_type, title, hotness_score, discussion_count, created_at)
+            VALUES (:community_id, :signal_type, :title, :hotness, :discussions, :created_at)
+        """)
+        yesterday = datetime.now() - timedelta(days=1)
+        with engine.begin() as conn:
+            conn.execute(insert, dict(community_id=1, signal_type='pain_point', title='a',
+                                      hotness=80, discussions=3, created_at=yesterday))
+        
+        assert ensure_rollup_ready(engine)
+        
+        with engine.begin() as conn:
+            conn.execute(insert, dict(community_id=1, signal_type='pain_point', title='b',
+                                      hotness=None, discussions=2, created_at=yesterday))
+            conn.execute(insert, dict(community_id=None, signal_type=None, title='c',
+                                      hotness=90, discussions=1, created_at=datetime.now()))
+            conn.execute(text("UPDATE demand_signals SET hotness_score = 60 WHERE title = 'b'"))
+            conn.execute(text("DELETE FROM demand_signals WHERE title = 'c'"))
+            
+            incremental = self._rollup_rows(conn)
+            rebuild_rollup(conn)
+            assert self._rollup_rows(conn) == incremental
+        
+        row = incremental[0]
+        assert row.signal_count == 2
+        assert row.hotness_sum == 140
+        assert row.hotness_n == 2
+        assert row.discussion_sum == 5
+        assert row.high_hotness_count == 1
+    
+    def test_reset_database_manager_rechecks_rollup(self):
+        """验证数据库配置变更后重新检查汇总表，已记录的检查结果不会沿用到新数据库"""
+        from sqlalchemy import inspect, text
+        from database.db_manager import reset_database_manager
+        from database.rollup import ROLLUP_TABLE, ensure_rollup_ready
+        
+        engine = self._create_engine()
+        assert ensure_rollup_ready(engine)
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {ROLLUP_TABLE}"))
+        
+        # 检查结果按引擎缓存，未重置时不再访问数据库
+        assert ensure_rollup_ready(engine)
+        assert ROLLUP_TABLE not in inspect(engine).get_table_names()
+        
+        reset_database_manager()
+        assert ensure_rollup_ready(engine)
+        assert ROLLUP_TABLE in inspect(engine).get_table_names()
+    
+    def test_new_engine_is_checked_after_old_one_is_released(self):
+        """验证引擎释放后不再记为已检查，新引擎（可能复用同一内存地址）会创建汇总表"""
+        import gc
+        from sqlalchemy import inspect
+        from database.rollup import ROLLUP_TABLE, _ready_engines, ensure_rollup_ready
+        
+        gc.collect()
+        checked_before = len(_ready_engines)
+        engine = self._create_engine()
+        assert ensure_rollup_ready(engine)
+        assert engine in _ready_engines
+        engine.dispose()
+        del engine
+        gc.collect()
+        assert len(_ready_engines) == checked_before
+        
+        engine = self._create_engine()
+        assert ensure_rollup_ready(engine)
+        assert ROLLUP_TABLE in inspect(engine).get_table_names()
+    
+    def test_metrics_flat_traffic_has_no_change(self, monkeypatch):
+        """验证每天信号数相同时，当前周期与上一周期天数一致，变化百分比为 0"""
+        from datetime import datetime, timedelta
+        from sqlalchemy import text
+        from database.db_manager import DatabaseManager, invalidate_result_cache
+        from database.rollup import ensure_rollup_ready
+        
+        # 仓库根目录也有 app.py，确保导入的是 FoxTrends 的应用
+        monkeypatch.syspath_prepend(str(Path(__file__).parent.parent))
+        monkeypatch.delitem(sys.modules, 'app', raising=False)
+        from app import app as flask_app
+        
+        engine = self._create_engine()
+        today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        with engine.begin() as conn:
+            for offset in range(30):
+                conn.execute(text("""
+                    INSERT INTO demand_signals (community_id, signal_type, title, hotness_score,
+                                                discussion_count, participant_count, created_at)
+                    VALUES (1, 'pain_point', :title, 50, 2, 1, :created_at)
+                """), dict(title=f'day-{offset}', created_at=today - timedelta(days=offset)))
+        assert ensure_rollup_ready(engine)
+        
+        db = DatabaseManager.__new__(DatabaseManager)
+        db.engine = engine
+        invalidate_result_cache()
+        with patch('database.db_manager.get_database_manager', return_value=db):
+            response = flask_app.test_client().get('/api/analysis/metrics?days=7')
+        invalidate_result_cache()
+        
+        metrics = response.get_json()['metrics']
+        assert metrics['total_demands'] == 7
+        assert metrics['total_discussions'] == 14
+        assert metrics['changes'] == {'demands': 0.0, 'hotness': 0.0, 'discussions': 0.0, 'participants': 0.0}
+    
+    def test_metrics_total_matches_trend_and_type_distribution(self, monkeypatch):
+        """验证同一 days 下指标总数、趋势图与类型分布覆盖相同的天数"""
+        from datetime import datetime, timedelta
+        from sqlalchemy import text
+        from database.db_manager import DatabaseManager, invalidate_result_cache
+        from database.rollup import ensure_rollup_ready
+        
+        monkeypatch.syspath_prepend(str(Path(__file__).parent.parent))
+        monkeypatch.delitem(sys.modules, 'app', raising=False)
+        from app import app as flask_app
+        
+        engine = self._create_engine()
+        today = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        with engine.begin() as conn:
+            for offset in range(10):
+                conn.execute(text("""
+                    INSERT INTO demand_signals (community_id, signal_type, title, hotness_score,
+                                                discussion_count, participant_count, created_at)
+                    VALUES (1, 'pain_point', :title, 50, 2, 1, :created_at)
+                """), dict(title=f'day-{offset}', created_at=today - timedelta(days=offset)))
+        assert ensure_rollup_ready(engine)
+        
+        db = DatabaseManager.__new__(DatabaseManager)
+        db.engine = engine
+        invalidate_result_cache()
+        with patch('database.db_manager.get_database_manager', return_value=db):
+            client = flask_app.test_client()
+            metrics = client.get('/api/analysis/metrics?days=7').get_json()['metrics']
+            trend = client.get('/api/analysis/trend?days=7&view=volume').get_json()
+            distribution = client.get('/api/analysis/type-distribution?days=7').get_json()
+        invalidate_result_cache()
+        
+        assert metrics['total_demands'] == 7
+        assert len(trend['dates']) == 7
+        assert sum(trend['values']) == metrics['total_demands']
+        assert sum(distribution['values']) == metrics['total_demands']
+        
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -6,6 +6,7 @@ Deep Search Agent主类
 import json
 import os
 import re
+import threading
 from datetime import datetime
 from typing import Optional, Dict, Any, List, Union
 from loguru import logger
@@ -21,11 +22,14 @@ from .nodes import (
 )
 from .state import State
 from .tools import MediaCrawlerDB, DBResponse, keyword_optimizer, multilingual_sentiment_analyzer
+from search_cache import get_search_cache  # utils目录已由 .tools 加入 sys.path
+from paragraph_research import ParagraphResearchMixin
 from .utils.config import settings, Settings
-from .utils import format_search_results_for_prompt
+from .utils import format_search_results_for_prompt, pack_search_results_for_prompt
+from .utils import DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET
 
 
-class DeepSearchAgent:
+class DeepSearchAgent(ParagraphResearchMixin):
     """Deep Search Agent主类"""
     
     def __init__(self, config: Optional[Settings] = None):
@@ -46,10 +50,17 @@ class DeepSearchAgent:
         
         # 初始化情感分析器
         self.sentiment_analyzer = multilingual_sentiment_analyzer
+        # 情感模型的懒加载与推理在多个段落线程间串行执行
+        self._sentiment_lock = threading.Lock()
+        # 情感分析器为进程内共享的单例，本次研究的缓存统计相对于开始时的快照计算
+        self._sentiment_stats_since = None
         
         # 初始化节点
         self._initialize_nodes()
         
+        # 段落并发研究配置与在途LLM/搜索调用上限
+        self._init_concurrency_limits()
+        
         # 状态
         self.state = State()
         
@@ -77,6 +88,30 @@ class DeepSearchAgent:
         self.reflection_summary_node = ReflectionSummaryNode(self.llm_client)
         self.report_formatting_node = ReportFormattingNode(self.llm_client)
     
+    def _pack_search_results(self, search_results: List[Dict[str, Any]]) -> List[str]:
+        """
+        按token预算打包搜索结果（去重、按score排序、超出预算的结果截断或丢弃）
+        
+        配置项 SEARCH_RESULTS_TOKEN_BUDGET 未配置时使用默认预算，配置为0或负数时
+        退回逐条截断、不限总量的格式化方式
+        """
+        token_budget = getattr(self.config, 'SEARCH_RESULTS_TOKEN_BUDGET', None)
+        if token_budget is None:
+            token_budget = DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET
+        if token_budget <= 0:
+            return format_search_results_for_prompt(search_results, self.config.MAX_CONTENT_LENGTH)
+        
+        packed, stats = pack_search_results_for_prompt(
+            search_results, token_budget, self.config.MAX_CONTENT_LENGTH
+        )
+        if stats['duplicates'] or stats['dropped'] or stats['truncated']:
+            logger.info(
+                f"  - 搜索结果打包: 保留 {stats['kept']}/{stats['total']} 条，"
+                f"去重 {stats['duplicates']} 条，超出预算丢弃 {stats['dropped']} 条、截断 {stats['truncated']} 条，"
+                f"约 {stats['tokens_used']}/{token_budget} tokens（舍弃约 {stats['tokens_dropped']} tokens）"
+            )
+        return packed
+    
     def _validate_date_format(self, date_str: str) -> bool:
         """
         验证日期格式是否为YYYY-MM-DD
@@ -167,60 +202,50 @@ class DeepSearchAgent:
         logger.info(f"  🔍 原始查询: '{query}'")
         logger.info(f"  ✨ 优化后关键词: {optimized_response.optimized_keywords}")
         
-        # 使用优化后的关键词进行多次查询并整合结果
-        all_results = []
-        total_count = 0
-        
-        for keyword in optimized_response.optimized_keywords:
-            logger.info(f"    查询关键词: '{keyword}'")
-            
-            try:
-                if tool_name == "search_topic_globally":
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE
-                    response = self.search_agency.search_topic_globally(topic=keyword, limit_per_table=limit_per_table)
-                elif tool_name == "search_topic_by_date":
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
-                    limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
-                    if not start_date or not end_date:
-                        raise ValueError("search_topic_by_date工具需要start_date和end_date参数")
-                    response = self.search_agency.search_topic_by_date(topic=keyword, start_date=start_date, end_date=end_date, limit_per_table=limit_per_table)
-                elif tool_name == "get_comments_for_topic":
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // len(optimized_response.optimized_keywords)
-                    limit = max(limit, 50)
-                    response = self.search_agency.get_comments_for_topic(topic=keyword, limit=limit)
-                elif tool_name == "search_topic_on_platform":
-                    platform = kwargs.get("platform")
-                    start_date = kwargs.get("start_date")
-                    end_date = kwargs.get("end_date")
-                    # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // len(optimized_response.optimized_keywords)
-                    limit = max(limit, 30)
-                    if not platform:
-                        raise ValueError("search_topic_on_platform工具需要platform参数")
-                    response = self.search_agency.search_topic_on_platform(platform=platform, topic=keyword, start_date=start_date, end_date=end_date, limit=limit)
-                else:
-                    logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
-                    response = self.search_agency.search_topic_globally(topic=keyword, limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE)
-                
-                # 收集结果
-                if response.results:
-                    logger.info(f"     找到 {len(response.results)} 条结果")
-                    all_results.extend(response.results)
-                    total_count += len(response.results)
-                else:
-                    logger.info(f"     未找到结果")
-                    
-            except Exception as e:
-                logger.error(f"      查询'{keyword}'时出错: {str(e)}")
-                continue
-        
-        # 去重和整合结果
-        unique_results = self._deduplicate_results(all_results)
-        logger.info(f"  总计找到 {total_count} 条结果，去重后 {len(unique_results)} 条")
+        # 使用优化后的关键词并发查询（所有关键词 × 所有表一次性下发），边返回边合并去重
+        keywords = optimized_response.optimized_keywords
+        search_tool = tool_name
+        if tool_name == "search_topic_globally":
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            tool_kwargs = {"limit_per_table": self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE}
+        elif tool_name == "search_topic_by_date":
+            start_date = kwargs.get("start_date")
+            end_date = kwargs.get("end_date")
+            # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
+            tool_kwargs = {"start_date": start_date, "end_date": end_date, "limit_per_table": self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE}
+            if not start_date or not end_date:
+                tool_kwargs = None
+                missing_param_error = "search_topic_by_date工具需要start_date和end_date参数"
+        elif tool_name == "get_comments_for_topic":
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // len(keywords)
+            tool_kwargs = {"limit": max(limit, 50)}
+        elif tool_name == "search_topic_on_platform":
+            platform = kwargs.get("platform")
+            # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
+            limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // len(keywords)
+            tool_kwargs = {"platform": platform, "start_date": kwargs.get("start_date"), "end_date": kwargs.get("end_date"), "limit": max(limit, 30)}
+            if not platform:
+                tool_kwargs = None
+                missing_param_error = "search_topic_on_platform工具需要platform参数"
+        else:
+            logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
+            search_tool = "search_topic_globally"
+            tool_kwargs = {"limit_per_table": self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE}
+
+        results = []
+        if tool_kwargs is None:
+            logger.error(f"      查询出错: {missing_param_error}")
+        else:
+            logger.info(f"    并发查询 {len(keywords)} 个关键词: {keywords}")
+            response = self.search_agency.search_topics_concurrently(search_tool, keywords, **tool_kwargs)
+            if response.error_message:
+                logger.error(f"      查询出错: {response.error_message}")
+            results = response.results
+
+        # 结果在查询层已按URL/内容去重，这里保留一次兜底去重
+        unique_results = self._deduplicate_results(results)
+        logger.info(f"  总计找到 {len(unique_results)} 条去重后的结果")
         
         # 构建整合后的响应
         integrated_response = DBResponse(
@@ -274,14 +299,6 @@ class DeepSearchAgent:
             情感分析结果字典，如果失败则返回None
         """
         try:
-            # 初始化情感分析器（如果尚未初始化且未被禁用）
-            if not self.sentiment_analyzer.is_initialized and not self.sentiment_analyzer.is_disabled:
-                logger.info("    初始化情感分析模型...")
-                if not self.sentiment_analyzer.initialize():
-                    logger.info("     情感分析模型初始化失败，将直接透传原始文本")
-            elif self.sentiment_analyzer.is_disabled:
-                logger.info("     情感分析功能已禁用，直接透传原始文本")
-
             # 将查询结果转换为字典格式
             results_dict = []
             for result in results:
@@ -294,13 +311,25 @@ class DeepSearchAgent:
                 }
                 results_dict.append(result_dict)
             
-            # 执行情感分析
-            sentiment_analysis = self.sentiment_analyzer.analyze_query_results(
-                query_results=results_dict,
-                text_field="content",
-                min_confidence=0.5
-            )
-            
+            with self._sentiment_lock:
+                # 初始化情感分析器（如果尚未初始化且未被禁用）
+                if not self.sentiment_analyzer.is_initialized and not self.sentiment_analyzer.is_disabled:
+                    logger.info("    初始化情感分析模型...")
+                    if not self.sentiment_analyzer.initialize():
+                        logger.info("     情感分析模型初始化失败，将直接透传原始文本")
+                elif self.sentiment_analyzer.is_disabled:
+                    logger.info("     情感分析功能已禁用，直接透传原始文本")
+                
+                # 执行情感分析
+                sentiment_analysis = self.sentiment_analyzer.analyze_query_results(
+                    query_results=results_dict,
+                    text_field="content",
+                    min_confidence=0.5
+                )
+
+            cache_stats = self.sentiment_analyzer.get_cache_stats(self._sentiment_stats_since)
+            logger.info(f"    情感分析缓存命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']}")
+
             return sentiment_analysis.get("sentiment_analysis")
             
         except Exception as e:
@@ -384,6 +413,10 @@ class DeepSearchAgent:
         logger.info(f"开始深度研究: {query}")
         logger.info(f"{'='*60}")
         
+        # 每次研究单独统计情感分析缓存和搜索缓存的命中情况
+        self._sentiment_stats_since = self.sentiment_analyzer.cache.stats_snapshot()
+        get_search_cache().reset_stats()
+
         try:
             # Step 1: 生成报告结构
             self._generate_report_structure(query)
@@ -398,6 +431,16 @@ class DeepSearchAgent:
             if save_report:
                 self._save_report(final_report)
 
+            cache_stats = self.sentiment_analyzer.get_cache_stats(self._sentiment_stats_since)
+            logger.info(
+                f"情感分析缓存: 命中 {cache_stats['hits']} 次, 未命中 {cache_stats['misses']} 次, "
+                f"命中率 {cache_stats['hit_rate']:.1%}, 估计节省模型时间 {cache_stats['estimated_seconds_saved']}s"
+            )
+            search_stats = get_search_cache().get_stats()
+            logger.info(
+                f"搜索缓存: 命中 {search_stats['hits']} 次（其中共享文件 {search_stats['store_hits']} 次）, "
+                f"未命中 {search_stats['misses']} 次, 命中率 {search_stats['hit_rate']:.1%}"
+            )
             logger.info("深度研究完成！")
             
             return final_report
@@ -421,26 +464,6 @@ class DeepSearchAgent:
             _message += f"\n  {i}. {paragraph.title}"
         logger.info(_message)
     
-    def _process_paragraphs(self):
-        """处理所有段落"""
-        total_paragraphs = len(self.state.paragraphs)
-        
-        for i in range(total_paragraphs):
-            logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
-            logger.info("-" * 50)
-            
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
-            
-            # 反思循环
-            self._reflection_loop(i)
-            
-            # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
-            
-            progress = (i + 1) / total_paragraphs * 100
-            logger.info(f"段落处理完成 ({progress:.1f}%)")
-    
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
         paragraph = self.state.paragraphs[paragraph_index]
@@ -453,7 +476,8 @@ class DeepSearchAgent:
         
         # 生成搜索查询和工具选择
         logger.info("  - 生成搜索查询...")
-        search_output = self.first_search_node.run(search_input)
+        with self._llm_slots:
+            search_output = self.first_search_node.run(search_input)
         search_query = search_output["search_query"]
         search_tool = search_output.get("search_tool", "search_topic_globally")  # 默认工具
         reasoning = search_output["reasoning"]
@@ -516,7 +540,8 @@ class DeepSearchAgent:
                 limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT
             search_kwargs["limit"] = limit
         
-        search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+        with self._search_slots:
+            search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
         
         # 转换为兼容格式
         search_results = []
@@ -558,15 +583,14 @@ class DeepSearchAgent:
             "title": paragraph.title,
             "content": paragraph.content,
             "search_query": search_query,
-            "search_results": format_search_results_for_prompt(
-                search_results, self.config.MAX_CONTENT_LENGTH
-            )
+            "search_results": self._pack_search_results(search_results)
         }
         
         # 更新状态
-        self.state = self.first_summary_node.mutate_state(
-            summary_input, self.state, paragraph_index
-        )
+        with self._llm_slots:
+            self.state = self.first_summary_node.mutate_state(
+                summary_input, self.state, paragraph_index
+            )
         
         logger.info("  - 初始总结完成")
     
@@ -585,7 +609,8 @@ class DeepSearchAgent:
             }
             
             # 生成反思搜索查询
-            reflection_output = self.reflection_node.run(reflection_input)
+            with self._llm_slots:
+                reflection_output = self.reflection_node.run(reflection_input)
             search_query = reflection_output["search_query"]
             search_tool = reflection_output.get("search_tool", "search_topic_globally")  # 默认工具
             reasoning = reflection_output["reasoning"]
@@ -649,7 +674,8 @@ class DeepSearchAgent:
                     limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT
                 search_kwargs["limit"] = limit
             
-            search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+            with self._search_slots:
+                search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
             
             # 转换为兼容格式
             search_results = []
@@ -690,16 +716,15 @@ class DeepSearchAgent:
                 "title": paragraph.title,
                 "content": paragraph.content,
                 "search_query": search_query,
-                "search_results": format_search_results_for_prompt(
-                    search_results, self.config.MAX_CONTENT_LENGTH
-                ),
+                "search_results": self._pack_search_results(search_results),
                 "paragraph_latest_state": paragraph.research.latest_summary
             }
             
             # 更新状态
-            self.state = self.reflection_summary_node.mutate_state(
-                reflection_summary_input, self.state, paragraph_index
-            )
+            with self._llm_slots:
+                self.state = self.reflection_summary_node.mutate_state(
+                    reflection_summary_input, self.state, paragraph_index
+                )
             
             logger.info(f"    反思 {reflection_i + 1} 完成")
     
@@ -21,6 +21,7 @@ from .sentiment_analyzer import (
     multilingual_sentiment_analyzer,
     analyze_sentiment
 )
+from .sentiment_cache import SentimentResultCache
 
 __all__ = [
     "MediaCrawlerDB",
@@ -34,5 +35,6 @@ __all__ = [
     "SentimentResult",
     "BatchSentimentResult",
     "multilingual_sentiment_analyzer",
-    "analyze_sentiment"
+    "analyze_sentiment",
+    "SentimentResultCache"
 ]
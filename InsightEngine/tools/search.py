@@ -24,15 +24,37 @@ V3.0 核心更新:
 """
 
 import os
+import sys
 import json
+import importlib.util
+import time
+import threading
 from loguru import logger
 import asyncio
-from typing import List, Dict, Any, Optional, Literal
+from functools import partial
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
 from dataclasses import dataclass, field
-from ..utils.db import fetch_all
+from ..utils.db import fetch_all, iter_fetch_all_concurrently
+from ..utils import fulltext
 from datetime import datetime, timedelta, date
 from InsightEngine.utils.config import settings
 
+# 添加utils目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(os.path.dirname(current_dir))
+utils_dir = os.path.join(root_dir, 'utils')
+if utils_dir not in sys.path:
+    sys.path.append(utils_dir)
+
+from search_cache import cached_search
+
+# 热度权重唯一的来源：MediaCrawler 入库时用同一份配置计算 hotness_score 列，
+# 回退的 CAST 公式也由它生成，两种热度分的权重保持一致。该文件只依赖标准库，按路径加载。
+ENGAGEMENT_MODULE_PATH = os.path.join(root_dir, 'MindSpider', 'DeepSentimentCrawling', 'MediaCrawler', 'database', 'engagement.py')
+_engagement_spec = importlib.util.spec_from_file_location("mediacrawler_engagement", ENGAGEMENT_MODULE_PATH)
+engagement = importlib.util.module_from_spec(_engagement_spec)
+_engagement_spec.loader.exec_module(engagement)
+
 # --- 1. 数据结构定义 ---
 
 @dataclass
@@ -58,38 +80,63 @@ class DBResponse:
     results_count: int = 0
     error_message: Optional[str] = None
 
+# 一条待执行的查询：(SQL, 绑定参数, 行 -> QueryResult 的格式化函数)
+QueryJob = Tuple[str, Dict[str, Any], Callable[[Dict[str, Any]], QueryResult]]
+
+def _is_cacheable(response: DBResponse) -> bool:
+    """只缓存没有出错且有结果的响应（查询异常时工具返回空结果）"""
+    return response.error_message is None and bool(response.results)
+
+
 # --- 2. 核心客户端与专用工具集 ---
 
 class MediaCrawlerDB:
     """包含多种专用舆情数据库查询工具的客户端"""
-    # 权重定义
-    W_LIKE = 1.0
-    W_COMMENT = 5.0
-    W_SHARE = 10.0  # 分享/转发/收藏/投币等高价值互动
-    W_VIEW = 0.1
-    W_DANMAKU = 0.5
-
-    def __init__(self):
+    # 权重定义（见 MediaCrawler/database/engagement.py）
+    W_LIKE = engagement.W_LIKE
+    W_COMMENT = engagement.W_COMMENT
+    W_SHARE = engagement.W_SHARE
+    W_VIEW = engagement.W_VIEW
+    W_DANMAKU = engagement.W_DANMAKU
+    # 播放量等可能带小数的计数列，回退公式中按 DECIMAL 转换
+    DECIMAL_COUNT_COLUMNS = ('video_play_count', 'viewd_count')
+    # 入库时写入的互动整数列
+    ENGAGEMENT_NUM_COLUMNS = ('like_num', 'comment_num', 'share_num', 'collect_num', 'view_num')
+
+    # 同时在途的数据库查询数上限（需小于连接池容量 pool_size + max_overflow）
+    DEFAULT_MAX_CONCURRENCY = 8
+
+    def __init__(self, max_concurrency: Optional[int] = None):
         """
         初始化客户端。
+
+        Args:
+            max_concurrency: 并发查询上限，默认读取 settings.DB_MAX_CONCURRENT_QUERIES，未配置时为 8。
         """
-        pass
-        
-    def _execute_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        try:
-            # 获取或创建event loop
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-            except RuntimeError:
+        self.max_concurrency = max_concurrency or getattr(settings, 'DB_MAX_CONCURRENT_QUERIES', None) or self.DEFAULT_MAX_CONCURRENCY
+
+    # 所有调用线程共用的后台事件循环
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_lock = threading.Lock()
+
+    @classmethod
+    def _get_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._loop_lock:
+            if cls._loop is None or cls._loop.is_closed():
                 loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-            
-            # 直接运行协程
-            return loop.run_until_complete(fetch_all(query, params))
+                threading.Thread(target=loop.run_forever, name="MediaCrawlerDB-loop", daemon=True).start()
+                cls._loop = loop
+            return cls._loop
+
+    @classmethod
+    def _run_coroutine(cls, coro):
+        # 异步引擎的连接池绑定在创建连接的事件循环上，段落并发研究时多个线程同时查询，
+        # 因此统一提交到同一个后台事件循环执行，而不是每个线程各自新建事件循环
+        return asyncio.run_coroutine_threadsafe(coro, cls._get_loop()).result()
         
+    def _execute_query(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        try:
+            return self._run_coroutine(fetch_all(query, params))
         except Exception as e:
             logger.exception(f"数据库查询时发生错误: {e}")
             return []
@@ -107,18 +154,60 @@ class MediaCrawlerDB:
                 return datetime.fromisoformat(ts.split('+')[0].strip())
         except (ValueError, TypeError): return None
 
-    _table_columns_cache = {}
+    # 全文索引探测结果缓存 {table: [[columns], ...]}，定期刷新以便发现新建的索引
+    FULLTEXT_CACHE_TTL = 600
+    _fulltext_indexes_cache: Dict[str, List[List[str]]] = {}
+    _fulltext_indexes_loaded_at: float = 0.0
+
+    def _get_fulltext_indexes(self) -> Dict[str, List[List[str]]]:
+        """读取当前库中已建立的全文索引（见 InsightEngine/utils/fulltext.py）"""
+        cls = type(self)
+        if time.time() - cls._fulltext_indexes_loaded_at < self.FULLTEXT_CACHE_TTL:
+            return cls._fulltext_indexes_cache
+        grouped: Dict[str, Dict[str, List[str]]] = {}
+        for row in self._execute_query(fulltext.list_fulltext_indexes_sql()):
+            grouped.setdefault(row['table_name'], {}).setdefault(row['index_name'], []).append(row['column_name'])
+        cls._fulltext_indexes_cache = {table: list(indexes.values()) for table, indexes in grouped.items()}
+        cls._fulltext_indexes_loaded_at = time.time()
+        return cls._fulltext_indexes_cache
+
+    def _build_topic_clause(self, table: str, fields: List[str], topic: str, param_prefix: str = "term") -> Tuple[str, Dict[str, Any]]:
+        """
+        生成话题匹配的WHERE片段。
+        MySQL 下若该表存在覆盖这些列的 FULLTEXT(ngram) 索引则使用 MATCH ... AGAINST，
+        否则（包括 PostgreSQL，trigram GIN 索引可直接服务 LIKE，以及短于 ngram 分词长度的关键词）回退到 LIKE。
+        """
+        mode = (getattr(settings, 'FULLTEXT_SEARCH_MODE', None) or 'auto').lower()
+        if mode != 'like' and not fulltext.is_postgres() and fulltext.can_match_fulltext(topic):
+            indexed = self._get_fulltext_indexes().get(table, [])
+            if any(sorted(cols) == sorted(fields) for cols in indexed):
+                column_sql = ", ".join(self._wrap_query_field_with_dialect(f) for f in fields)
+                pname = f"{param_prefix}_ft"
+                return f"MATCH({column_sql}) AGAINST(:{pname} IN BOOLEAN MODE)", {pname: fulltext.build_boolean_phrase(topic)}
+
+        clauses, params = [], {}
+        for idx, field_name in enumerate(fields):
+            pname = f"{param_prefix}_{idx}"
+            clauses.append(f'{self._wrap_query_field_with_dialect(field_name)} LIKE :{pname}')
+            params[pname] = f"%{topic}%"
+        return " OR ".join(clauses), params
+
+    # 表结构缓存 {table: (读取时间, [columns])}，定期刷新，
+    # 运行中执行 backfill_engagement.py 迁移后无需重启即可切换到 hotness_score 列
+    COLUMNS_CACHE_TTL = 600
+    _table_columns_cache: Dict[str, Tuple[float, List[str]]] = {}
     def _get_table_columns(self, table_name: str) -> List[str]:
-        if table_name in self._table_columns_cache: return self._table_columns_cache[table_name]
+        cached = self._table_columns_cache.get(table_name)
+        if cached and time.time() - cached[0] < self.COLUMNS_CACHE_TTL: return cached[1]
         results = self._execute_query(f"SHOW COLUMNS FROM `{table_name}`")
         columns = [row['Field'] for row in results] if results else []
-        self._table_columns_cache[table_name] = columns
+        self._table_columns_cache[table_name] = (time.time(), columns)
         return columns
 
     def _extract_engagement(self, row: Dict[str, Any]) -> Dict[str, int]:
         """从数据行中提取并统一互动指标"""
         engagement = {}
-        mapping = { 'likes': ['liked_count', 'like_count', 'voteup_count', 'comment_like_count'], 'comments': ['video_comment', 'comments_count', 'comment_count', 'total_replay_num', 'sub_comment_count'], 'shares': ['video_share_count', 'shared_count', 'share_count', 'total_forwards'], 'views': ['video_play_count', 'viewd_count'], 'favorites': ['video_favorite_count', 'collected_count'], 'coins': ['video_coin_count'], 'danmaku': ['video_danmaku'], }
+        mapping = { 'likes': ['like_num', 'liked_count', 'like_count', 'voteup_count', 'comment_like_count'], 'comments': ['comment_num', 'video_comment', 'comments_count', 'comment_count', 'total_replay_num', 'sub_comment_count'], 'shares': ['share_num', 'video_share_count', 'shared_count', 'share_count', 'total_forwards'], 'views': ['view_num', 'video_play_count', 'viewd_count'], 'favorites': ['collect_num', 'video_favorite_count', 'collected_count'], 'coins': ['video_coin_count'], 'danmaku': ['video_danmaku'], }
         for key, potential_cols in mapping.items():
             for col in potential_cols:
                 if col in row and row[col] is not None:
@@ -127,6 +216,15 @@ class MediaCrawlerDB:
                     break
         return engagement
 
+    def _hotness_formula(self, table: str) -> str:
+        """未迁移表的热度计算SQL片段，权重与入库时的 hotness_score 相同"""
+        terms = []
+        for column, weight in engagement.HOTNESS_WEIGHTS[table].items():
+            cast_type = 'DECIMAL(20,2)' if column in self.DECIMAL_COUNT_COLUMNS else 'UNSIGNED'
+            terms.append(f"COALESCE(CAST({column} AS {cast_type}), 0) * {weight}")
+        return f"({' + '.join(terms)})"
+
+    @cached_search("mediacrawler_db", cacheable=_is_cacheable)
     def search_hot_content(
         self,
         time_period: Literal['24h', 'week', 'year'] = 'week',
@@ -148,38 +246,38 @@ class MediaCrawlerDB:
         now = datetime.now()
         start_time = now - timedelta(days={'24h': 1, 'week': 7}.get(time_period, 365))
 
-        # 定义各平台的热度计算SQL片段
-        hotness_formulas = {
-            'bilibili_video': f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(video_comment AS UNSIGNED), 0) * {self.W_COMMENT} + COALESCE(CAST(video_share_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_favorite_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_coin_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_danmaku AS UNSIGNED), 0) * {self.W_DANMAKU} + COALESCE(CAST(video_play_count AS DECIMAL(20,2)), 0) * {self.W_VIEW})",
-            'douyin_aweme':   f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(comment_count AS UNSIGNED), 0) * {self.W_COMMENT} + COALESCE(CAST(share_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(collected_count AS UNSIGNED), 0) * {self.W_SHARE})",
-            'weibo_note':     f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(comments_count AS UNSIGNED), 0) * {self.W_COMMENT} + COALESCE(CAST(shared_count AS UNSIGNED), 0) * {self.W_SHARE})",
-            'xhs_note':       f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(comment_count AS UNSIGNED), 0) * {self.W_COMMENT} + COALESCE(CAST(share_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(collected_count AS UNSIGNED), 0) * {self.W_SHARE})",
-            'kuaishou_video': f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(viewd_count AS DECIMAL(20,2)), 0) * {self.W_VIEW})",
-            'zhihu_content':  f"(COALESCE(CAST(voteup_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(comment_count AS UNSIGNED), 0) * {self.W_COMMENT})",
-        }
+        # 已迁移的表入库时写入了建有索引的 hotness_score 与互动整数列（见 MediaCrawler/database/engagement.py）。
+        # hotness_score 按 parse_count 解析 "1.2万" 等写法，CAST 公式做不到，两种分值不能放在同一个 ORDER BY 里比较，
+        # 因此只有所有表都已迁移时才读取 hotness_score，否则全部回退到逐行 CAST 计算
+        table_columns = {table: self._get_table_columns(table) for table in engagement.HOTNESS_WEIGHTS}
+        materialized = all('hotness_score' in columns for columns in table_columns.values())
+
+        all_queries, params = [], {'limit': limit}
+        for index, (table, columns) in enumerate(table_columns.items()):
+            score_sql = 'hotness_score' if materialized else self._hotness_formula(table)
+            engagement_sql = ", ".join(f"{col if col in columns else 'NULL'} as {col}" for col in self.ENGAGEMENT_NUM_COLUMNS)
 
-        all_queries, params = [], []
-        for table, formula in hotness_formulas.items():
-            time_filter_sql, time_filter_param = "", None
-            if table == 'weibo_note': time_filter_sql, time_filter_param = "`create_date_time` >= %s", start_time.strftime('%Y-%m-%d %H:%M:%S')
-            elif table in ['kuaishou_video', 'xhs_note', 'douyin_aweme']: time_col = 'time' if table == 'xhs_note' else 'create_time'; time_filter_sql, time_filter_param = f"`{time_col}` >= %s", str(int(start_time.timestamp() * 1000))
-            elif table == 'zhihu_content': time_filter_sql, time_filter_param = "CAST(`created_time` AS UNSIGNED) >= %s", str(int(start_time.timestamp()))
-            else: time_filter_sql, time_filter_param = "`create_time` >= %s", str(int(start_time.timestamp()))
+            ts_param, limit_param = f"ts_{index}", f"limit_{index}"
+            if table == 'weibo_note': time_filter_sql, time_filter_param = f"`create_date_time` >= :{ts_param}", start_time.strftime('%Y-%m-%d %H:%M:%S')
+            elif table in ['kuaishou_video', 'xhs_note', 'douyin_aweme']: time_col = 'time' if table == 'xhs_note' else 'create_time'; time_filter_sql, time_filter_param = f"`{time_col}` >= :{ts_param}", str(int(start_time.timestamp() * 1000))
+            elif table == 'zhihu_content': time_filter_sql, time_filter_param = f"CAST(`created_time` AS UNSIGNED) >= :{ts_param}", str(int(start_time.timestamp()))
+            else: time_filter_sql, time_filter_param = f"`create_time` >= :{ts_param}", str(int(start_time.timestamp()))
 
             content_type = 'note' if table in ['weibo_note', 'xhs_note'] else 'content' if table == 'zhihu_content' else 'video'
-            query_template = "SELECT '{platform}' as p, '{type}' as t, {title} as title, {author} as author, {url} as url, {ts} as ts, {formula} as hotness_score, source_keyword, '{tbl}' as tbl FROM `{tbl}` WHERE {time_filter}"
+            query_template = "SELECT '{platform}' as p, '{type}' as t, {title} as title, {author} as author, {url} as url, {ts} as ts, {formula} as hotness_score, {engagement}, source_keyword, '{tbl}' as tbl FROM `{tbl}` WHERE {time_filter} ORDER BY hotness_score DESC LIMIT :{limit_param}"
             
-            field_subs = {'platform': table.split('_')[0], 'type': content_type, 'title': 'title', 'author': 'nickname', 'url': 'video_url', 'ts': 'create_time', 'formula': formula, 'tbl': table, 'time_filter': time_filter_sql}
+            field_subs = {'platform': table.split('_')[0], 'type': content_type, 'title': 'title', 'author': 'nickname', 'url': 'video_url', 'ts': 'create_time', 'formula': score_sql, 'engagement': engagement_sql, 'tbl': table, 'time_filter': time_filter_sql, 'limit_param': limit_param}
             if table == 'weibo_note': field_subs.update({'title': 'content', 'url': 'note_url', 'ts': 'create_date_time'})
             elif table == 'xhs_note': field_subs.update({'ts': 'time', 'url': 'note_url'})
             elif table == 'zhihu_content': field_subs.update({'author': 'user_nickname', 'url': 'content_url', 'ts': 'created_time'})
             elif table == 'douyin_aweme': field_subs.update({'url': 'aweme_url'})
 
-            all_queries.append(query_template.format(**field_subs))
-            params.append(time_filter_param)
+            # 每个分支包成派生表，分支内的 ORDER BY/LIMIT 在 UNION ALL 中才合法
+            all_queries.append(f"SELECT * FROM ({query_template.format(**field_subs)}) AS hot_{index}")
+            params.update({ts_param: time_filter_param, limit_param: limit})
         
-        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY hotness_score DESC LIMIT %s"
-        raw_results = self._execute_query(final_query, tuple(params) + (limit,))
+        final_query = f"{' UNION ALL '.join(all_queries)} ORDER BY hotness_score DESC LIMIT :limit"
+        raw_results = self._execute_query(final_query, params)
 
         formatted_results = [QueryResult(platform=r['p'], content_type=r['t'], title_or_content=r['title'], author_nickname=r.get('author'), url=r['url'], publish_time=self._to_datetime(r['ts']), engagement=self._extract_engagement(r), hotness_score=r.get('hotness_score', 0.0), source_keyword=r.get('source_keyword'), source_table=r['tbl']) for r in raw_results]
         return DBResponse("search_hot_content", params_for_log, results=formatted_results, results_count=len(formatted_results))    
@@ -190,6 +288,156 @@ class MediaCrawlerDB:
             return f'"{field}"'
         return f'`{field}`'
 
+    # --- 查询计划：每个工具先生成 (SQL, 参数, 行格式化函数) 列表，再统一并发执行 ---
+
+    def _format_topic_row(self, table: str, content_type: str, row: Dict[str, Any]) -> QueryResult:
+        content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
+        time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
+        return QueryResult(
+            platform=table.split('_')[0], content_type=content_type,
+            title_or_content=content if content else '',
+            author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
+            url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
+            publish_time=self._to_datetime(time_key),
+            engagement=self._extract_engagement(row),
+            source_keyword=row.get('source_keyword'),
+            source_table=table
+        )
+
+    def _plan_topic_search(self, topic: str, search_configs: Dict[str, Dict[str, Any]], limit_per_table: int) -> List[QueryJob]:
+        jobs = []
+        for table, config in search_configs.items():
+            where_clause, param_dict = self._build_topic_clause(table, config['fields'], topic)
+            param_dict['limit'] = limit_per_table
+            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
+            jobs.append((query, param_dict, partial(self._format_topic_row, table, config['type'])))
+        return jobs
+
+    def _plan_search_topic_globally(self, topic: str, limit_per_table: int = 100) -> List[QueryJob]:
+        search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
+        return self._plan_topic_search(topic, search_configs, limit_per_table)
+
+    def _plan_search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> List[QueryJob]:
+        try:
+            start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+        except (ValueError, TypeError):
+            raise ValueError("日期格式错误，请使用 'YYYY-MM-DD' 格式。")
+        search_configs = {
+            'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'},
+            'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'},
+            'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'},
+            'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
+        }
+        return self._plan_topic_search(topic, search_configs, limit_per_table)
+
+    def _format_comment_row(self, row: Dict[str, Any]) -> QueryResult:
+        return QueryResult(platform=row['platform'], content_type='comment', title_or_content=row['content'], author_nickname=row['author'], publish_time=self._to_datetime(row['ts']), engagement={'likes': int(row['likes']) if str(row['likes']).isdigit() else 0}, source_table=row['source_table'])
+
+    def _plan_get_comments_for_topic(self, topic: str, limit: int = 500) -> List[QueryJob]:
+        comment_tables = ['bilibili_video_comment', 'douyin_aweme_comment', 'kuaishou_video_comment', 'weibo_note_comment', 'xhs_note_comment', 'zhihu_comment', 'tieba_comment']
+        
+        all_queries, params = [], {}
+        for table_idx, table in enumerate(comment_tables):
+            cols = self._get_table_columns(table)
+            author_col = 'user_nickname' if 'user_nickname' in cols else 'nickname'
+            like_col = 'comment_like_count' if 'comment_like_count' in cols else 'like_count' if 'like_count' in cols else None
+            time_col = 'publish_time' if 'publish_time' in cols else 'create_date_time' if 'create_date_time' in cols else 'create_time'
+            like_select = f"`{like_col}` as likes" if like_col else "'0' as likes"
+            
+            topic_clause, topic_params = self._build_topic_clause(table, ['content'], topic, param_prefix=f"term{table_idx}")
+            params.update(topic_params)
+            query = (f"SELECT '{table.split('_')[0]}' as platform, `content`, `{author_col}` as author, "
+                     f"`{time_col}` as ts, {like_select}, '{table}' as source_table "
+                     f"FROM `{table}` WHERE {topic_clause}")
+            all_queries.append(query)
+
+        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT :limit"
+        params['limit'] = limit
+        return [(final_query, params, self._format_comment_row)]
+
+    def _format_platform_row(self, platform: str, config: Dict[str, Any], row: Dict[str, Any]) -> QueryResult:
+        content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
+        time_key = config.get('time_col') and row.get(config.get('time_col'))
+        return QueryResult(platform=platform, content_type=config['type'], title_or_content=content if content else '', author_nickname=row.get('nickname') or row.get('user_nickname'), url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'), publish_time=self._to_datetime(time_key), engagement=self._extract_engagement(row), source_keyword=row.get('source_keyword'), source_table=config['table'])
+
+    def _plan_search_topic_on_platform(self, platform: str, topic: str, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: int = 20) -> List[QueryJob]:
+        all_configs = { 'bilibili': [{'table': 'bilibili_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, {'table': 'bilibili_video_comment', 'fields': ['content'], 'type': 'comment'}], 'douyin': [{'table': 'douyin_aweme', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'douyin_aweme_comment', 'fields': ['content'], 'type': 'comment'}], 'kuaishou': [{'table': 'kuaishou_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'kuaishou_video_comment', 'fields': ['content'], 'type': 'comment'}], 'weibo': [{'table': 'weibo_note', 'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'}, {'table': 'weibo_note_comment', 'fields': ['content'], 'type': 'comment'}], 'xhs': [{'table': 'xhs_note', 'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, {'table': 'xhs_note_comment', 'fields': ['content'], 'type': 'comment'}], 'zhihu': [{'table': 'zhihu_content', 'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'}, {'table': 'zhihu_comment', 'fields': ['content'], 'type': 'comment'}], 'tieba': [{'table': 'tieba_note', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, {'table': 'tieba_comment', 'fields': ['content'], 'type': 'comment'}] }
+        
+        if platform not in all_configs:
+            raise ValueError(f"不支持的平台: {platform}")
+
+        if start_date and end_date:
+            try:
+                start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
+            except ValueError:
+                raise ValueError("日期格式错误，请使用 'YYYY-MM-DD' 格式。")
+        else:
+            start_dt, end_dt = None, None
+
+        jobs = []
+        for config in all_configs[platform]:
+            table = config['table']
+            topic_clause, params = self._build_topic_clause(table, config['fields'], topic)
+            query = f"SELECT * FROM `{table}` WHERE ({topic_clause})"
+
+            if start_dt and end_dt and 'time_col' in config:
+                time_col, time_type = config['time_col'], config['time_type']
+                if time_type == 'sec': t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
+                elif time_type == 'ms': t_params = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
+                elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
+                else: t_params = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
+                
+                t_clause = f"`{time_col}` >= :start_ts AND `{time_col}` < :end_ts"
+                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= :start_ts AND CAST(`{time_col}` AS UNSIGNED) < :end_ts"
+                
+                query += f" AND ({t_clause})"
+                params['start_ts'], params['end_ts'] = t_params
+
+            query += f" ORDER BY id DESC LIMIT :limit"
+            params['limit'] = limit
+            jobs.append((query, params, partial(self._format_platform_row, platform, config)))
+        return jobs
+
+    @staticmethod
+    def _result_identifier(result: QueryResult) -> str:
+        """去重标识，与 DeepSearchAgent._deduplicate_results 保持一致"""
+        return result.url if result.url else result.title_or_content[:100]
+
+    async def _run_jobs_async(self, jobs: List[QueryJob], deduplicate: bool = False) -> List[QueryResult]:
+        """
+        并发执行查询计划，全部完成后按计划顺序合并（可选去重）。
+
+        查询完成顺序每次运行都可能不同，先按 (查询下标, 行下标) 排好再去重，
+        保证保留下来的重复项和最终顺序都与完成顺序无关。
+        """
+        rows_by_job: Dict[int, List[Dict[str, Any]]] = {}
+        async for job_index, rows in iter_fetch_all_concurrently(
+            [(query, params) for query, params, _ in jobs],
+            max_concurrency=self.max_concurrency,
+        ):
+            rows_by_job[job_index] = rows
+
+        seen = set()
+        merged: List[QueryResult] = []
+        for job_index, (_, _, formatter) in enumerate(jobs):
+            for row in rows_by_job.get(job_index, []):
+                result = formatter(row)
+                if deduplicate:
+                    identifier = self._result_identifier(result)
+                    if identifier in seen:
+                        continue
+                    seen.add(identifier)
+                merged.append(result)
+        return merged
+
+    def _run_jobs(self, jobs: List[QueryJob], deduplicate: bool = False) -> List[QueryResult]:
+        try:
+            return self._run_coroutine(self._run_jobs_async(jobs, deduplicate=deduplicate))
+        except Exception as e:
+            logger.exception(f"数据库查询时发生错误: {e}")
+            return []
+
+    @cached_search("mediacrawler_db", cacheable=_is_cacheable)
     def search_topic_globally(self, topic: str, limit_per_table: int = 100) -> DBResponse:
         """
         【工具】全局话题搜索: 在数据库中（内容、评论、标签、来源关键字）全面搜索指定话题。
@@ -204,35 +452,10 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit_per_table': limit_per_table}
         logger.info(f"--- TOOL: 全局话题搜索 (params: {params_for_log}) ---")
         
-        search_term, all_results = f"%{topic}%", []
-        search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
-        
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = " OR ".join(where_clauses)
-            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+        all_results = self._run_jobs(self._plan_search_topic_globally(topic, limit_per_table))
         return DBResponse("search_topic_globally", params_for_log, results=all_results, results_count=len(all_results))
 
+    @cached_search("mediacrawler_db", cacheable=_is_cacheable)
     def search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> DBResponse:
         """
         【工具】按日期搜索话题: 在明确的历史时间段内，搜索与特定话题相关的内容。
@@ -250,44 +473,14 @@ class MediaCrawlerDB:
         logger.info(f"--- TOOL: 按日期搜索话题 (params: {params_for_log}) ---")
         
         try:
-            start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-        except ValueError:
-            return DBResponse("search_topic_by_date", params_for_log, error_message="日期格式错误，请使用 'YYYY-MM-DD' 格式。")
+            jobs = self._plan_search_topic_by_date(topic, start_date, end_date, limit_per_table)
+        except ValueError as e:
+            return DBResponse("search_topic_by_date", params_for_log, error_message=str(e))
         
-        search_term, all_results = f"%{topic}%", []
-        search_configs = {
-            'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'},
-            'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'},
-            'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'},
-            'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
-        }
-
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = ' OR '.join(where_clauses)
-            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
-                all_results.append(QueryResult(
-                    platform=table.split('_')[0], content_type=config['type'],
-                    title_or_content=content if content else '',
-                    author_nickname=row.get('nickname') or row.get('user_nickname') or row.get('user_name'),
-                    url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'),
-                    publish_time=self._to_datetime(time_key),
-                    engagement=self._extract_engagement(row),
-                    source_keyword=row.get('source_keyword'),
-                    source_table=table
-                ))
+        all_results = self._run_jobs(jobs)
         return DBResponse("search_topic_by_date", params_for_log, results=all_results, results_count=len(all_results))
         
+    @cached_search("mediacrawler_db", cacheable=_is_cacheable)
     def get_comments_for_topic(self, topic: str, limit: int = 500) -> DBResponse:
         """
         【工具】获取话题评论: 专门搜索并返回所有平台中与特定话题相关的公众评论数据。
@@ -302,29 +495,10 @@ class MediaCrawlerDB:
         params_for_log = {'topic': topic, 'limit': limit}
         logger.info(f"--- TOOL: 获取话题评论 (params: {params_for_log}) ---")
         
-        search_term = f"%{topic}%"
-        comment_tables = ['bilibili_video_comment', 'douyin_aweme_comment', 'kuaishou_video_comment', 'weibo_note_comment', 'xhs_note_comment', 'zhihu_comment', 'tieba_comment']
-        
-        all_queries = []
-        for table in comment_tables:
-            cols = self._get_table_columns(table)
-            author_col = 'user_nickname' if 'user_nickname' in cols else 'nickname'
-            like_col = 'comment_like_count' if 'comment_like_count' in cols else 'like_count' if 'like_count' in cols else None
-            time_col = 'publish_time' if 'publish_time' in cols else 'create_date_time' if 'create_date_time' in cols else 'create_time'
-            like_select = f"`{like_col}` as likes" if like_col else "'0' as likes"
-            
-            query = (f"SELECT '{table.split('_')[0]}' as platform, `content`, `{author_col}` as author, "
-                     f"`{time_col}` as ts, {like_select}, '{table}' as source_table "
-                     f"FROM `{table}` WHERE `content` LIKE %s")
-            all_queries.append(query)
-
-        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY ts DESC LIMIT %s"
-        params = (search_term,) * len(comment_tables) + (limit,)
-        raw_results = self._execute_query(final_query, params)
-        
-        formatted = [QueryResult(platform=r['platform'], content_type='comment', title_or_content=r['content'], author_nickname=r['author'], publish_time=self._to_datetime(r['ts']), engagement={'likes': int(r['likes']) if str(r['likes']).isdigit() else 0}, source_table=r['source_table']) for r in raw_results]
+        formatted = self._run_jobs(self._plan_get_comments_for_topic(topic, limit))
         return DBResponse("get_comments_for_topic", params_for_log, results=formatted, results_count=len(formatted))
 
+    @cached_search("mediacrawler_db", cacheable=_is_cacheable)
     def search_topic_on_platform(
         self,
         platform: Literal['bilibili', 'weibo', 'douyin', 'kuaishou', 'xhs', 'zhihu', 'tieba'],
@@ -349,52 +523,48 @@ class MediaCrawlerDB:
         params_for_log = {'platform': platform, 'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit': limit}
         logger.info(f"--- TOOL: 平台定向搜索 (params: {params_for_log}) ---")
 
-        all_configs = { 'bilibili': [{'table': 'bilibili_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, {'table': 'bilibili_video_comment', 'fields': ['content'], 'type': 'comment'}], 'douyin': [{'table': 'douyin_aweme', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'douyin_aweme_comment', 'fields': ['content'], 'type': 'comment'}], 'kuaishou': [{'table': 'kuaishou_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'kuaishou_video_comment', 'fields': ['content'], 'type': 'comment'}], 'weibo': [{'table': 'weibo_note', 'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'}, {'table': 'weibo_note_comment', 'fields': ['content'], 'type': 'comment'}], 'xhs': [{'table': 'xhs_note', 'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, {'table': 'xhs_note_comment', 'fields': ['content'], 'type': 'comment'}], 'zhihu': [{'table': 'zhihu_content', 'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'}, {'table': 'zhihu_comment', 'fields': ['content'], 'type': 'comment'}], 'tieba': [{'table': 'tieba_note', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, {'table': 'tieba_comment', 'fields': ['content'], 'type': 'comment'}] }
-        
-        if platform not in all_configs:
-            return DBResponse("search_topic_on_platform", params_for_log, error_message=f"不支持的平台: {platform}")
+        try:
+            jobs = self._plan_search_topic_on_platform(platform, topic, start_date, end_date, limit)
+        except ValueError as e:
+            return DBResponse("search_topic_on_platform", params_for_log, error_message=str(e))
 
-        search_term, all_results = f"%{topic}%", []
-        platform_configs = all_configs[platform]
+        all_results = self._run_jobs(jobs)
+        return DBResponse("search_topic_on_platform", params_for_log, results=all_results, results_count=len(all_results))
 
-        time_clause, time_params_tuple = "", ()
-        if start_date and end_date:
-            try:
-                start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
-            except ValueError:
-                return DBResponse("search_topic_on_platform", params_for_log, error_message="日期格式错误，请使用 'YYYY-MM-DD' 格式。")
-        else:
-            start_dt, end_dt = None, None
+    @cached_search("mediacrawler_db", tool_param="tool_name", cacheable=_is_cacheable)
+    def search_topics_concurrently(self, tool_name: str, topics: List[str], **tool_kwargs) -> DBResponse:
+        """
+        多关键词并发搜索: 把每个关键词在每张表上的查询一次性并发下发（受 max_concurrency 限制），
+        结果按提交顺序合并去重。总耗时约等于最慢的单条查询，而不是所有查询之和。
 
-        for config in platform_configs:
-            table = config['table']
-            topic_clause = " OR ".join([f"`{field}` LIKE %s" for field in config['fields']])
-            query = f"SELECT * FROM `{table}` WHERE {topic_clause}"
-            params = [search_term] * len(config['fields'])
+        Args:
+            tool_name (str): search_topic_globally / search_topic_by_date / get_comments_for_topic / search_topic_on_platform
+            topics (List[str]): 关键词列表。
+            **tool_kwargs: 对应工具除 topic 外的参数（如 limit_per_table、start_date、platform 等）。
 
-            if start_dt and end_dt and 'time_col' in config:
-                time_col, time_type = config['time_col'], config['time_type']
-                if time_type == 'sec': t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
-                elif time_type == 'ms': t_params = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
-                elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
-                else: t_params = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
-                
-                t_clause = f"`{time_col}` >= %s AND `{time_col}` < %s"
-                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= %s AND CAST(`{time_col}` AS UNSIGNED) < %s"
-                
-                query += f" AND ({t_clause})"
-                params.extend(t_params)
+        Returns:
+            DBResponse: 合并去重后的结果。
+        """
+        planners = {
+            'search_topic_globally': self._plan_search_topic_globally,
+            'search_topic_by_date': self._plan_search_topic_by_date,
+            'get_comments_for_topic': self._plan_get_comments_for_topic,
+            'search_topic_on_platform': self._plan_search_topic_on_platform,
+        }
+        params_for_log = {'topics': topics, **tool_kwargs}
+        if tool_name not in planners:
+            return DBResponse(tool_name, params_for_log, error_message=f"不支持并发执行的工具: {tool_name}")
+        logger.info(f"--- TOOL: 并发{tool_name} (params: {params_for_log}) ---")
 
-            query += f" ORDER BY id DESC LIMIT %s"
-            params.append(limit)
+        jobs: List[QueryJob] = []
+        for topic in topics:
+            try:
+                jobs.extend(planners[tool_name](topic=topic, **tool_kwargs))
+            except ValueError as e:
+                return DBResponse(tool_name, params_for_log, error_message=str(e))
 
-            raw_results = self._execute_query(query, tuple(params))
-            for row in raw_results:
-                content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
-                time_key = config.get('time_col') and row.get(config.get('time_col'))
-                all_results.append(QueryResult(platform=platform, content_type=config['type'], title_or_content=content if content else '', author_nickname=row.get('nickname') or row.get('user_nickname'), url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'), publish_time=self._to_datetime(time_key), engagement=self._extract_engagement(row), source_keyword=row.get('source_keyword'), source_table=table))
-        
-        return DBResponse("search_topic_on_platform", params_for_log, results=all_results, results_count=len(all_results))
+        all_results = self._run_jobs(jobs, deduplicate=True)
+        return DBResponse(tool_name, params_for_log, results=all_results, results_count=len(all_results))
 
 # --- 3. 测试与使用示例 ---
 def print_response_summary(response: DBResponse):
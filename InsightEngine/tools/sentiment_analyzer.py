@@ -8,6 +8,9 @@ import sys
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 import re
+import time
+
+from .sentiment_cache import CACHE_PATH_ENV, SentimentResultCache
 
 try:
     import torch
@@ -31,6 +34,12 @@ except ImportError:
 # INFO：若想跳过情感分析，可手动切换此开关为False
 SENTIMENT_ANALYSIS_ENABLED = True
 
+# 情感分析模型ID（同时作为结果缓存键的一部分）
+MODEL_NAME = "tabularisai/multilingual-sentiment-analysis"
+
+# 批量推理时每个micro-batch的文本条数（CPU上建议16~64，GPU可适当调大）
+DEFAULT_INFERENCE_BATCH_SIZE = 32
+
 
 def _describe_missing_dependencies() -> str:
     missing = []
@@ -82,14 +91,24 @@ class WeiboMultilingualSentimentAnalyzer:
     封装WeiboMultilingualSentiment模型，为AI Agent提供情感分析功能
     """
 
-    def __init__(self):
-        """初始化情感分析器"""
+    def __init__(self, cache: Optional[SentimentResultCache] = None):
+        """
+        初始化情感分析器
+
+        Args:
+            cache: 结果缓存，默认创建内存LRU缓存；
+                   设置环境变量SENTIMENT_CACHE_PATH时同时持久化到该SQLite文件
+        """
         self.model = None
         self.tokenizer = None
         self.device = None
         self.is_initialized = False
         self.is_disabled = False
         self.disable_reason: Optional[str] = None
+        self.model_name = MODEL_NAME
+        self.cache = cache or SentimentResultCache(
+            persist_path=os.getenv(CACHE_PATH_ENV) or None
+        )
 
         # 情感标签映射（5级分类）
         self.sentiment_map = {
@@ -183,7 +202,7 @@ class WeiboMultilingualSentimentAnalyzer:
             assert AutoModelForSequenceClassification is not None
 
             # 使用多语言情感分析模型
-            model_name = "tabularisai/multilingual-sentiment-analysis"
+            model_name = self.model_name
             local_model_path = os.path.join(weibo_sentiment_path, "model")
 
             # 检查本地是否已有模型
@@ -258,12 +277,14 @@ class WeiboMultilingualSentimentAnalyzer:
 
         return text
 
-    def analyze_single_text(self, text: str) -> SentimentResult:
+    def analyze_single_text(self, text: str, check_cache: bool = True) -> SentimentResult:
         """
         对单个文本进行情感分析
 
         Args:
             text: 要分析的文本
+            check_cache: 是否先查询结果缓存；批量分析已查询过缓存、退回逐条推理时传False，
+                         避免同一文本被重复计为未命中
 
         Returns:
             SentimentResult对象
@@ -304,6 +325,13 @@ class WeiboMultilingualSentimentAnalyzer:
                     error_message="输入文本为空或无效内容",
                     analysis_performed=False,
                 )
+
+            cache_key = self.cache.make_key(self.model_name, processed_text)
+            cached = self.cache.get(cache_key) if check_cache else None
+            if cached is not None:
+                return SentimentResult(text=text, success=True, **cached)
+
+            started_at = time.perf_counter()
             assert self.tokenizer is not None
             # 分词编码
             inputs = self.tokenizer(
@@ -335,6 +363,16 @@ class WeiboMultilingualSentimentAnalyzer:
             for label_name, prob in zip(self.sentiment_map.values(), probabilities[0]):
                 prob_dist[label_name] = prob.item()
 
+            self.cache.record_inference(time.perf_counter() - started_at, 1)
+            self.cache.set(
+                cache_key,
+                {
+                    "sentiment_label": label,
+                    "confidence": confidence,
+                    "probability_distribution": prob_dist,
+                },
+            )
+
             return SentimentResult(
                 text=text,
                 sentiment_label=label,
@@ -354,15 +392,68 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False,
             )
 
+    def _predict_chunk(
+        self, raw_texts: List[str], processed_texts: List[str]
+    ) -> List[SentimentResult]:
+        """
+        对一个micro-batch执行一次前向推理
+
+        Args:
+            raw_texts: 原始文本（用于结果回填）
+            processed_texts: 预处理后的文本
+
+        Returns:
+            与输入顺序一致的SentimentResult列表
+        """
+        assert self.tokenizer is not None
+        assert torch is not None
+        assert self.model is not None
+
+        # padding=True 只补齐到本批次最长文本，即动态padding
+        inputs = self.tokenizer(
+            processed_texts,
+            max_length=512,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        )
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            probabilities = torch.softmax(outputs.logits, dim=1).cpu()
+
+        label_names = list(self.sentiment_map.values())
+        chunk_results = []
+        for raw_text, row in zip(raw_texts, probabilities.tolist()):
+            prediction = max(range(len(row)), key=row.__getitem__)
+            chunk_results.append(
+                SentimentResult(
+                    text=raw_text,
+                    sentiment_label=self.sentiment_map[prediction],
+                    confidence=row[prediction],
+                    probability_distribution=dict(zip(label_names, row)),
+                    success=True,
+                )
+            )
+        return chunk_results
+
     def analyze_batch(
-        self, texts: List[str], show_progress: bool = True
+        self,
+        texts: List[str],
+        show_progress: bool = True,
+        batch_size: Optional[int] = None,
     ) -> BatchSentimentResult:
         """
         批量情感分析
 
+        文本会先按长度排序并切分为micro-batch，每个批次只做一次分词和前向推理，
+        结果按输入顺序返回。
+
         Args:
             texts: 文本列表
-            show_progress: 是否显示进度
+            show_progress: 是否显示进度（按批次输出）
+            batch_size: 每个micro-batch的文本数，默认使用DEFAULT_INFERENCE_BATCH_SIZE
 
         Returns:
             BatchSentimentResult对象
@@ -399,18 +490,81 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False,
             )
 
-        results = []
-        success_count = 0
-        total_confidence = 0.0
+        batch_size = max(1, batch_size or DEFAULT_INFERENCE_BATCH_SIZE)
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
 
-        for i, text in enumerate(texts):
-            if show_progress and len(texts) > 1:
-                print(f"处理进度: {i + 1}/{len(texts)}")
+        # 先预处理，空文本直接给出失败结果，不进入模型
+        pending: List[tuple] = []
+        for index, text in enumerate(texts):
+            processed_text = self._preprocess_text(text)
+            if processed_text:
+                pending.append((index, processed_text))
+            else:
+                results[index] = SentimentResult(
+                    text=text,
+                    sentiment_label="输入错误",
+                    confidence=0.0,
+                    probability_distribution={},
+                    success=False,
+                    error_message="输入文本为空或无效内容",
+                    analysis_performed=False,
+                )
 
-            result = self.analyze_single_text(text)
-            results.append(result)
+        # 命中缓存的文本不再进入模型
+        if pending:
+            keys = [self.cache.make_key(self.model_name, processed) for _, processed in pending]
+            cached = self.cache.get_many(keys)
+            uncached = []
+            for (index, processed), key in zip(pending, keys):
+                if key in cached:
+                    results[index] = SentimentResult(
+                        text=texts[index], success=True, **cached[key]
+                    )
+                else:
+                    uncached.append((index, processed))
+            pending = uncached
+
+        # 按长度排序，使同一micro-batch内的文本长度接近，减少padding开销
+        pending.sort(key=lambda item: len(item[1]))
+        total_batches = (len(pending) + batch_size - 1) // batch_size
+
+        for batch_index in range(total_batches):
+            chunk = pending[batch_index * batch_size : (batch_index + 1) * batch_size]
+            if show_progress and total_batches > 1:
+                print(
+                    f"处理进度: 批次 {batch_index + 1}/{total_batches} "
+                    f"({min((batch_index + 1) * batch_size, len(pending))}/{len(pending)})"
+                )
 
-            if result.success:
+            try:
+                started_at = time.perf_counter()
+                chunk_results = self._predict_chunk(
+                    [texts[index] for index, _ in chunk],
+                    [processed for _, processed in chunk],
+                )
+                self.cache.record_inference(time.perf_counter() - started_at, len(chunk))
+                self.cache.set_many(
+                    {
+                        self.cache.make_key(self.model_name, processed): {
+                            "sentiment_label": result.sentiment_label,
+                            "confidence": result.confidence,
+                            "probability_distribution": result.probability_distribution,
+                        }
+                        for (_, processed), result in zip(chunk, chunk_results)
+                    }
+                )
+            except Exception as e:
+                # 整批失败时退回逐条推理，避免个别异常文本拖垮整批结果
+                print(f"批量推理失败，改为逐条处理: {e}")
+                chunk_results = [self.analyze_single_text(texts[index], check_cache=False) for index, _ in chunk]
+
+            for (index, _), result in zip(chunk, chunk_results):
+                results[index] = result
+
+        success_count = 0
+        total_confidence = 0.0
+        for result in results:
+            if result is not None and result.success:
                 success_count += 1
                 total_confidence += result.confidence
 
@@ -420,7 +574,7 @@ class WeiboMultilingualSentimentAnalyzer:
         failed_count = len(texts) - success_count
 
         return BatchSentimentResult(
-            results=results,
+            results=[result for result in results if result is not None],
             total_processed=len(texts),
             success_count=success_count,
             failed_count=failed_count,
@@ -469,6 +623,7 @@ class WeiboMultilingualSentimentAnalyzer:
         query_results: List[Dict[str, Any]],
         text_field: str = "content",
         min_confidence: float = 0.5,
+        batch_size: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         对查询结果进行情感分析
@@ -478,6 +633,7 @@ class WeiboMultilingualSentimentAnalyzer:
             query_results: 查询结果列表，每个元素包含文本内容
             text_field: 文本内容字段名，默认为"content"
             min_confidence: 最小置信度阈值
+            batch_size: 批量推理的micro-batch大小，默认使用DEFAULT_INFERENCE_BATCH_SIZE
 
         Returns:
             包含情感分析结果的字典
@@ -527,7 +683,9 @@ class WeiboMultilingualSentimentAnalyzer:
 
         # 执行批量情感分析
         print(f"正在对{len(texts_to_analyze)}条内容进行情感分析...")
-        batch_result = self.analyze_batch(texts_to_analyze, show_progress=True)
+        batch_result = self.analyze_batch(
+            texts_to_analyze, show_progress=True, batch_size=batch_size
+        )
 
         if not batch_result.analysis_performed:
             reason = self.disable_reason or "情感分析功能不可用"
@@ -589,6 +747,18 @@ class WeiboMultilingualSentimentAnalyzer:
             }
         }
 
+    def get_cache_stats(self, since: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        获取结果缓存统计
+
+        Args:
+            since: cache.stats_snapshot()返回的快照，传入时只统计快照之后的部分
+
+        Returns:
+            命中/未命中次数、命中率及估算节省的模型推理时间
+        """
+        return self.cache.get_stats(since)
+
     def get_model_info(self) -> Dict[str, Any]:
         """
         获取模型信息
@@ -597,7 +767,7 @@ class WeiboMultilingualSentimentAnalyzer:
             模型信息字典
         """
         return {
-            "model_name": "tabularisai/multilingual-sentiment-analysis",
+            "model_name": self.model_name,
             "supported_languages": [
                 "中文",
                 "英文",
@@ -625,6 +795,7 @@ class WeiboMultilingualSentimentAnalyzer:
             "sentiment_levels": list(self.sentiment_map.values()),
             "is_initialized": self.is_initialized,
             "device": str(self.device) if self.device else "未设置",
+            "cache": self.get_cache_stats(),
         }
 
 
@@ -0,0 +1,249 @@
+"""
+情感分析结果缓存
+以（模型ID + 预处理后文本）的内容哈希为键，内存中按LRU淘汰，可选持久化到本地SQLite文件
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# 内存中最多缓存的结果条数
+DEFAULT_CACHE_MAX_ENTRIES = 20000
+
+# 设置该环境变量后，缓存会同时写入对应的SQLite文件，Streamlit重启后仍可命中
+CACHE_PATH_ENV = "SENTIMENT_CACHE_PATH"
+
+
+class SentimentResultCache:
+    """
+    情感分析结果缓存
+
+    缓存值为可序列化的字典：sentiment_label / confidence / probability_distribution，
+    只缓存成功的分析结果。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        persist_path: Optional[str] = None,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 内存中最多保留的条数，超出后淘汰最久未使用的条目
+            persist_path: SQLite文件路径，为None时只使用内存缓存
+        """
+        self.max_entries = max(1, max_entries)
+        self.persist_path = persist_path
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._inference_seconds = 0.0
+        self._inferred_count = 0
+
+        if persist_path:
+            self._open_store(persist_path)
+
+    def _open_store(self, path: str) -> None:
+        """打开（必要时创建）SQLite持久化文件"""
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sentiment_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"情感分析缓存文件不可用，改为仅使用内存缓存: {e}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(model_id: str, processed_text: str) -> str:
+        """根据模型ID和预处理后的文本生成缓存键"""
+        digest = hashlib.sha256()
+        digest.update(model_id.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(processed_text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        """写入内存LRU（调用方需持有锁）"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量查询缓存
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            命中的 {key: value}，未命中的键不在返回值中
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                value = self._memory.get(key)
+                if value is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = value
+
+            if missing and self._conn is not None:
+                for key, value in self._load_from_store(missing):
+                    found[key] = value
+                    self._remember(key, value)
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查询单条缓存"""
+        return self.get_many([key]).get(key)
+
+    def _load_from_store(self, keys: List[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        """从SQLite中读取（调用方需持有锁）"""
+        assert self._conn is not None
+        loaded = []
+        try:
+            # SQLite默认单条语句最多999个参数
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = self._conn.execute(
+                    f"SELECT cache_key, payload FROM sentiment_cache WHERE cache_key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, payload in rows:
+                    loaded.append((key, json.loads(payload)))
+        except (sqlite3.Error, ValueError) as e:
+            print(f"读取情感分析缓存文件失败: {e}")
+        return loaded
+
+    def set_many(self, items: Dict[str, Dict[str, Any]]) -> None:
+        """
+        批量写入缓存
+
+        Args:
+            items: {key: value}
+        """
+        if not items:
+            return
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value)
+
+            if self._conn is not None:
+                now = time.time()
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO sentiment_cache (cache_key, payload, created_at) VALUES (?, ?, ?)",
+                        [
+                            (key, json.dumps(value, ensure_ascii=False), now)
+                            for key, value in items.items()
+                        ],
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"写入情感分析缓存文件失败: {e}")
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """写入单条缓存"""
+        self.set_many({key: value})
+
+    def record_inference(self, seconds: float, count: int) -> None:
+        """记录一次模型推理耗时，用于估算缓存节省的时间"""
+        if count <= 0:
+            return
+        with self._lock:
+            self._inference_seconds += seconds
+            self._inferred_count += count
+
+    def clear(self, include_store: bool = False) -> None:
+        """清空内存缓存，可选同时清空持久化文件"""
+        with self._lock:
+            self._memory.clear()
+            if include_store and self._conn is not None:
+                self._conn.execute("DELETE FROM sentiment_cache")
+                self._conn.commit()
+
+    def stats_snapshot(self) -> Dict[str, int]:
+        """
+        记录当前的累计统计
+
+        缓存实例由同一进程内的多个调用方共享，统计只累加不清零；
+        需要单独统计一段时间（例如一次研究）时先取快照，结束时把快照传给get_stats。
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def get_stats(self, since: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Args:
+            since: stats_snapshot()返回的快照，传入时只统计快照之后的命中与未命中；
+                   单条推理的平均耗时始终按全部推理记录估算
+
+        Returns:
+            包含命中/未命中次数、命中率和估算节省的模型时间的字典
+        """
+        since = since or {}
+        with self._lock:
+            hits = self.hits - since.get("hits", 0)
+            misses = self.misses - since.get("misses", 0)
+            lookups = hits + misses
+            avg_seconds = (
+                self._inference_seconds / self._inferred_count
+                if self._inferred_count
+                else 0.0
+            )
+            return {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions - since.get("evictions", 0),
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "persistent": self._conn is not None,
+                "avg_inference_seconds": round(avg_seconds, 6),
+                "estimated_seconds_saved": round(hits * avg_seconds, 3),
+            }
+
+    def close(self) -> None:
+        """关闭持久化连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -10,7 +10,9 @@ from __future__ import annotations
 from urllib.parse import quote_plus
 import asyncio
 import os
-from typing import Any, Dict, Iterable, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from loguru import logger
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy import text
@@ -19,6 +21,7 @@ from InsightEngine.utils.config import settings
 __all__ = [
     "get_async_engine",
     "fetch_all",
+    "iter_fetch_all_concurrently",
 ]
 
 
@@ -70,3 +73,30 @@ async def fetch_all(query: str, params: Optional[Union[Iterable[Any], Dict[str,
         return [dict(row) for row in rows]
 
 
+async def iter_fetch_all_concurrently(
+    queries: Sequence[Tuple[str, Optional[Union[Iterable[Any], Dict[str, Any]]]]],
+    max_concurrency: int = 8,
+) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    并发执行多条只读查询，按完成顺序逐条产出 (查询下标, 结果行)。
+
+    同时在途的查询数不超过 max_concurrency；单条查询失败只记录日志并产出空结果，
+    不影响其他查询。
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run(index: int, query: str, params) -> Tuple[int, List[Dict[str, Any]]]:
+        async with semaphore:
+            try:
+                return index, await fetch_all(query, params)
+            except Exception as e:
+                logger.exception(f"数据库查询时发生错误: {e}")
+                return index, []
+
+    tasks = [asyncio.ensure_future(_run(i, q, p)) for i, (q, p) in enumerate(queries)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
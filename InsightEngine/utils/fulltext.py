@@ -0,0 +1,397 @@
+"""
+舆情库全文索引工具（异步）
+
+为 MediaCrawlerDB 的话题搜索建立并维护支持中日韩文字的全文索引，替代 `LIKE '%关键词%'` 全表扫描：
+- MySQL: InnoDB FULLTEXT 索引 + ngram 分词器，查询改写为 MATCH ... AGAINST
+- PostgreSQL: pg_trgm 扩展 + GIN 索引，原有 LIKE 查询可直接命中索引，无需改写
+
+索引由数据库在写入时自动维护；`refresh` 子命令根据各表 `last_modify_ts` 的水位线，
+只对自上次刷新以来有新数据的表合并索引待处理队列（PostgreSQL 的 GIN pending list /
+MySQL 的 FULLTEXT 辅助表，仅合并索引不重建整表）。未建立索引的表、
+以及短于 ngram_token_size 的关键词在查询时自动回退到 LIKE。
+
+MySQL 上只合并 FULLTEXT 索引需要全局变量 innodb_optimize_fulltext_only=ON（否则 OPTIMIZE TABLE
+会重建整表）。该变量作用于整个实例、修改需要 SUPER 权限，应用默认不修改它：
+- 推荐由运维在维护窗口开启后执行 refresh，或直接执行：
+      SET GLOBAL innodb_optimize_fulltext_only = ON;
+      OPTIMIZE TABLE `weibo_note`;  -- 对需要合并的表逐一执行
+      SET GLOBAL innodb_optimize_fulltext_only = OFF;
+- 变量未开启时 refresh 跳过 MySQL 表的合并（不更新水位线，下次仍会处理）；
+  明确加上 --toggle-optimize-global 时才由本工具临时开启，并在结束后（包括失败时）恢复原值。
+
+用法:
+    python -m InsightEngine.utils.fulltext build     # 创建缺失的全文索引
+    python -m InsightEngine.utils.fulltext refresh   # 增量刷新有新数据的表
+    python -m InsightEngine.utils.fulltext status    # 查看各表索引与水位线
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from InsightEngine.utils.config import settings
+from InsightEngine.utils.db import get_async_engine
+
+__all__ = [
+    "FULLTEXT_TARGETS",
+    "STATE_TABLE",
+    "is_postgres",
+    "index_name",
+    "list_fulltext_indexes_sql",
+    "ngram_token_size",
+    "can_match_fulltext",
+    "build_boolean_phrase",
+    "build_indexes",
+    "refresh_indexes",
+    "index_status",
+]
+
+
+# 各表参与话题搜索的文本列（与 MediaCrawlerDB 中的搜索配置保持一致）
+FULLTEXT_TARGETS: Dict[str, List[str]] = {
+    'bilibili_video': ['title', 'desc', 'source_keyword'],
+    'bilibili_video_comment': ['content'],
+    'douyin_aweme': ['title', 'desc', 'source_keyword'],
+    'douyin_aweme_comment': ['content'],
+    'kuaishou_video': ['title', 'desc', 'source_keyword'],
+    'kuaishou_video_comment': ['content'],
+    'weibo_note': ['content', 'source_keyword'],
+    'weibo_note_comment': ['content'],
+    'xhs_note': ['title', 'desc', 'tag_list', 'source_keyword'],
+    'xhs_note_comment': ['content'],
+    'zhihu_content': ['title', 'desc', 'content_text', 'source_keyword'],
+    'zhihu_comment': ['content'],
+    'tieba_note': ['title', 'desc', 'source_keyword'],
+    'tieba_comment': ['content'],
+    'daily_news': ['title'],
+}
+
+# 记录每张表增量刷新水位线的状态表
+STATE_TABLE = "fulltext_index_state"
+
+
+def is_postgres() -> bool:
+    return (settings.DB_DIALECT or "mysql").lower() in ("postgresql", "postgres")
+
+
+def _quote(identifier: str) -> str:
+    return f'"{identifier}"' if is_postgres() else f"`{identifier}`"
+
+
+def index_name(table: str, column: Optional[str] = None) -> str:
+    """全文索引命名：MySQL 每表一个多列索引，PostgreSQL 每列一个 trigram 索引"""
+    return f"trgm_{table}_{column}" if column else f"ft_{table}"
+
+
+def list_fulltext_indexes_sql() -> str:
+    """
+    返回查询当前库中全文索引的SQL，结果列为 table_name / index_name / column_name。
+    """
+    if is_postgres():
+        return (
+            "SELECT t.relname AS table_name, i.relname AS index_name, a.attname AS column_name "
+            "FROM pg_index ix "
+            "JOIN pg_class t ON t.oid = ix.indrelid "
+            "JOIN pg_class i ON i.oid = ix.indexrelid "
+            "JOIN pg_opclass oc ON oc.oid = ANY(ix.indclass) "
+            "JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(ix.indkey) "
+            "WHERE oc.opcname = 'gin_trgm_ops'"
+        )
+    return (
+        "SELECT TABLE_NAME AS table_name, INDEX_NAME AS index_name, COLUMN_NAME AS column_name "
+        "FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT' "
+        "ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"
+    )
+
+
+def ngram_token_size() -> int:
+    """ngram 分词长度，需与 MySQL 的 ngram_token_size 一致（默认 2）"""
+    return int(getattr(settings, 'FULLTEXT_NGRAM_TOKEN_SIZE', None) or 2)
+
+
+def can_match_fulltext(topic: str) -> bool:
+    """
+    关键词能否由 ngram 全文索引匹配。
+    短于 ngram_token_size 的关键词不会产生任何 n-gram，MATCH 永远没有结果，需回退到 LIKE。
+    """
+    return len(topic.replace('"', ' ').strip()) >= ngram_token_size()
+
+
+def build_boolean_phrase(topic: str) -> str:
+    """
+    将关键词转换为 MySQL BOOLEAN MODE 短语。
+    ngram 分词下短语匹配要求所有 n-gram 连续出现，语义与 LIKE '%关键词%' 接近。
+    """
+    cleaned = topic.replace('"', ' ').strip()
+    return f'"{cleaned}"'
+
+
+async def _existing_tables(conn: AsyncConnection) -> List[str]:
+    if is_postgres():
+        sql = "SELECT tablename AS name FROM pg_tables WHERE schemaname = current_schema()"
+    else:
+        sql = "SELECT TABLE_NAME AS name FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()"
+    result = await conn.execute(text(sql))
+    return [row[0] for row in result.fetchall()]
+
+
+async def _existing_indexes(conn: AsyncConnection) -> Dict[str, Dict[str, List[str]]]:
+    """{table: {index_name: [columns]}}"""
+    result = await conn.execute(text(list_fulltext_indexes_sql()))
+    indexes: Dict[str, Dict[str, List[str]]] = {}
+    for row in result.mappings().all():
+        indexes.setdefault(row["table_name"], {}).setdefault(row["index_name"], []).append(row["column_name"])
+    return indexes
+
+
+async def _ensure_state_table(conn: AsyncConnection) -> None:
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {_quote(STATE_TABLE)} ("
+        f"{_quote('table_name')} VARCHAR(64) PRIMARY KEY, "
+        f"{_quote('last_modify_ts')} BIGINT NOT NULL DEFAULT 0, "
+        f"{_quote('refreshed_at')} BIGINT NOT NULL DEFAULT 0)"
+    ))
+
+
+async def build_indexes(tables: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    为目标表创建缺失的全文索引（已存在的索引跳过）。
+
+    Args:
+        tables: 只处理指定表，默认处理 FULLTEXT_TARGETS 中的全部表
+
+    Returns:
+        {table: 处理结果描述}
+    """
+    engine = get_async_engine()
+    targets = {t: c for t, c in FULLTEXT_TARGETS.items() if not tables or t in tables}
+    outcome: Dict[str, str] = {}
+
+    async with engine.begin() as conn:
+        if is_postgres():
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await _ensure_state_table(conn)
+        existing_tables = set(await _existing_tables(conn))
+        existing = await _existing_indexes(conn)
+
+    for table, columns in targets.items():
+        if table not in existing_tables:
+            outcome[table] = "表不存在，跳过"
+            continue
+        table_indexes = existing.get(table, {})
+        try:
+            # 大表建索引耗时较长，每张表单独提交，失败不影响其他表
+            async with engine.begin() as conn:
+                if is_postgres():
+                    created = []
+                    for column in columns:
+                        name = index_name(table, column)
+                        if name in table_indexes:
+                            continue
+                        await conn.execute(text(
+                            f"CREATE INDEX IF NOT EXISTS {_quote(name)} ON {_quote(table)} "
+                            f"USING gin ({_quote(column)} gin_trgm_ops)"
+                        ))
+                        created.append(column)
+                    outcome[table] = f"已创建 {len(created)} 个trigram索引" if created else "索引已存在"
+                else:
+                    if any(sorted(cols) == sorted(columns) for cols in table_indexes.values()):
+                        outcome[table] = "索引已存在"
+                        continue
+                    column_sql = ", ".join(_quote(c) for c in columns)
+                    await conn.execute(text(
+                        f"ALTER TABLE {_quote(table)} ADD FULLTEXT INDEX {_quote(index_name(table))} "
+                        f"({column_sql}) WITH PARSER ngram"
+                    ))
+                    outcome[table] = "已创建FULLTEXT(ngram)索引"
+            logger.info(f"[fulltext] {table}: {outcome[table]}")
+        except Exception as e:
+            outcome[table] = f"创建失败: {e}"
+            logger.exception(f"[fulltext] {table} 创建全文索引失败: {e}")
+
+    # 建完索引后以当前最大 last_modify_ts 作为初始水位线
+    await refresh_indexes(list(targets), force=True, record_only=True)
+    return outcome
+
+
+async def _max_modify_ts(conn: AsyncConnection, table: str) -> Optional[int]:
+    try:
+        result = await conn.execute(text(f"SELECT MAX({_quote('last_modify_ts')}) FROM {_quote(table)}"))
+        value = result.scalar()
+        return int(value) if value is not None else 0
+    except Exception:
+        # 表不存在或没有 last_modify_ts 列
+        return None
+
+
+async def _load_watermarks(conn: AsyncConnection) -> Dict[str, int]:
+    result = await conn.execute(text(
+        f"SELECT {_quote('table_name')}, {_quote('last_modify_ts')} FROM {_quote(STATE_TABLE)}"
+    ))
+    return {row[0]: int(row[1]) for row in result.fetchall()}
+
+
+async def _save_watermark(conn: AsyncConnection, table: str, modify_ts: int) -> None:
+    now = int(time.time())
+    params = {"t": table, "ts": modify_ts, "now": now}
+    if is_postgres():
+        await conn.execute(text(
+            f"INSERT INTO {_quote(STATE_TABLE)} (table_name, last_modify_ts, refreshed_at) VALUES (:t, :ts, :now) "
+            f"ON CONFLICT (table_name) DO UPDATE SET last_modify_ts = EXCLUDED.last_modify_ts, refreshed_at = EXCLUDED.refreshed_at"
+        ), params)
+    else:
+        await conn.execute(text(
+            f"INSERT INTO {_quote(STATE_TABLE)} (table_name, last_modify_ts, refreshed_at) VALUES (:t, :ts, :now) "
+            f"ON DUPLICATE KEY UPDATE last_modify_ts = VALUES(last_modify_ts), refreshed_at = VALUES(refreshed_at)"
+        ), params)
+
+
+async def _optimize_fulltext_only(engine, table: str, toggle_global: bool = False) -> bool:
+    """
+    只合并 FULLTEXT 辅助表中新写入/已删除的文档，不重建整张表。
+    InnoDB 上的 OPTIMIZE TABLE 默认会重建整表并长时间锁住正在写入的爬虫表，
+    只有 innodb_optimize_fulltext_only 开启时才只合并索引。
+
+    Args:
+        toggle_global: 变量未开启时是否临时开启（影响整个实例，需要 SUPER 权限），
+                       结束后无论成功与否都恢复原值
+
+    Returns:
+        是否执行了合并；变量未开启且不允许修改、或没有修改权限时返回 False，不会退化为整表重建
+    """
+    async with engine.connect() as conn:
+        previous = (await conn.execute(text("SELECT @@GLOBAL.innodb_optimize_fulltext_only"))).scalar()
+        if previous:
+            await conn.execute(text(f"OPTIMIZE TABLE {_quote(table)}"))
+            return True
+        if not toggle_global:
+            return False
+        try:
+            await conn.execute(text("SET GLOBAL innodb_optimize_fulltext_only = ON"))
+        except Exception as e:
+            logger.warning(f"[fulltext] {table} 无法开启innodb_optimize_fulltext_only: {e}")
+            return False
+        try:
+            await conn.execute(text(f"OPTIMIZE TABLE {_quote(table)}"))
+        finally:
+            await conn.execute(text("SET GLOBAL innodb_optimize_fulltext_only = :previous"), {"previous": previous})
+    return True
+
+
+async def refresh_indexes(
+    tables: Optional[List[str]] = None,
+    force: bool = False,
+    record_only: bool = False,
+    toggle_optimize_global: bool = False,
+) -> Dict[str, str]:
+    """
+    增量刷新：只处理 last_modify_ts 超过上次水位线的表。
+
+    Args:
+        tables: 只处理指定表，默认处理 FULLTEXT_TARGETS 中的全部表
+        force: 忽略水位线，强制刷新
+        record_only: 只记录水位线，不执行索引合并（刚建完索引时使用）
+        toggle_optimize_global: MySQL 上允许临时开启全局变量 innodb_optimize_fulltext_only，
+                                默认不修改，变量未开启时跳过合并
+
+    Returns:
+        {table: 处理结果描述}
+    """
+    engine = get_async_engine()
+    targets = [t for t in FULLTEXT_TARGETS if not tables or t in tables]
+    outcome: Dict[str, str] = {}
+
+    async with engine.begin() as conn:
+        await _ensure_state_table(conn)
+        watermarks = await _load_watermarks(conn)
+        existing = await _existing_indexes(conn)
+
+    for table in targets:
+        table_indexes = existing.get(table)
+        if not table_indexes:
+            outcome[table] = "未建立全文索引，查询将回退到LIKE"
+            continue
+        async with engine.connect() as conn:
+            current_ts = await _max_modify_ts(conn, table)
+        if current_ts is None:
+            outcome[table] = "无法读取last_modify_ts，跳过"
+            continue
+        if not force and current_ts <= watermarks.get(table, 0):
+            outcome[table] = "无新数据"
+            continue
+
+        try:
+            if record_only:
+                pass
+            elif is_postgres():
+                async with engine.begin() as conn:
+                    for name in table_indexes:
+                        await conn.execute(text("SELECT gin_clean_pending_list(CAST(:idx AS regclass))"), {"idx": name})
+            else:
+                if not await _optimize_fulltext_only(engine, table, toggle_global=toggle_optimize_global):
+                    outcome[table] = ("innodb_optimize_fulltext_only未开启，跳过索引合并（不重建整表），"
+                                      "请由运维开启后执行OPTIMIZE TABLE")
+                    continue
+            async with engine.begin() as conn:
+                await _save_watermark(conn, table, current_ts)
+            outcome[table] = f"已刷新至 last_modify_ts={current_ts}"
+        except Exception as e:
+            outcome[table] = f"刷新失败: {e}"
+            logger.exception(f"[fulltext] {table} 刷新失败: {e}")
+
+    return outcome
+
+
+async def index_status() -> List[Tuple[str, str, int]]:
+    """返回 [(table, 索引列描述, 水位线)]"""
+    engine = get_async_engine()
+    async with engine.begin() as conn:
+        await _ensure_state_table(conn)
+        watermarks = await _load_watermarks(conn)
+        existing = await _existing_indexes(conn)
+    rows = []
+    for table in FULLTEXT_TARGETS:
+        indexes = existing.get(table, {})
+        described = "; ".join(f"{name}({', '.join(cols)})" for name, cols in indexes.items()) or "无（回退LIKE）"
+        rows.append((table, described, watermarks.get(table, 0)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="InsightEngine 舆情库全文索引工具")
+    parser.add_argument("command", choices=["build", "refresh", "status"], help="build: 创建索引; refresh: 增量刷新; status: 查看状态")
+    parser.add_argument("--tables", nargs="*", help="只处理指定的表")
+    parser.add_argument("--force", action="store_true", help="refresh 时忽略水位线")
+    parser.add_argument("--toggle-optimize-global", action="store_true",
+                        help="MySQL 上临时开启全局变量 innodb_optimize_fulltext_only 以合并索引（影响整个实例，需要 SUPER 权限）")
+    args = parser.parse_args()
+
+    async def _run() -> None:
+        try:
+            if args.command == "build":
+                outcome = await build_indexes(args.tables)
+            elif args.command == "refresh":
+                outcome = await refresh_indexes(args.tables, force=args.force,
+                                                toggle_optimize_global=args.toggle_optimize_global)
+            else:
+                for table, described, watermark in await index_status():
+                    logger.info(f"{table}: {described} | last_modify_ts水位线={watermark}")
+                return
+            for table, message in outcome.items():
+                logger.info(f"{table}: {message}")
+        finally:
+            await get_async_engine().dispose()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,21 @@
 
 import re
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from json.decoder import JSONDecodeError
 
 
+# 每次总结调用中搜索结果部分的默认token预算
+DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET = 12000
+# 剩余预算低于该值时不再截断填充，直接跳过放不下的结果
+MIN_PARTIAL_RESULT_TOKENS = 200
+# 内容相似度达到该阈值的结果视为重复（转发、搬运的近似帖子）
+DUPLICATE_SIMILARITY_THRESHOLD = 0.85
+
+_CJK_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]')
+_NON_WORD_PATTERN = re.compile(r'[\W_]+')
+
+
 def clean_json_tags(text: str) -> str:
     """
     清理文本中的JSON标签
@@ -306,3 +317,124 @@ def format_search_results_for_prompt(search_results: List[Dict[str, Any]],
             formatted_results.append(truncated_content)
     
     return formatted_results
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的token数（不加载分词器）
+    
+    中日韩字符按约1个token/字计算，其余字符按约4个字符/token计算
+    
+    Args:
+        text: 输入文本
+        
+    Returns:
+        估算的token数
+    """
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+
+def _content_fingerprint(content: str, size: int = 3, max_chars: int = 2000) -> set:
+    """提取内容的字符n-gram集合，用于近似重复判断（只取前max_chars个有效字符）"""
+    normalized = _NON_WORD_PATTERN.sub('', content.lower())[:max_chars]
+    if len(normalized) <= size:
+        return {normalized}
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def _truncate_to_tokens(content: str, max_tokens: int) -> str:
+    """将内容截断到不超过max_tokens个估算token"""
+    keep = len(content)
+    while keep > 0:
+        keep = int(keep * max_tokens / max(estimate_tokens(content[:keep]), 1) * 0.95)
+        truncated = content[:keep] + "..."
+        if estimate_tokens(truncated) <= max_tokens:
+            return truncated
+    return ""
+
+
+def pack_search_results_for_prompt(search_results: List[Dict[str, Any]],
+                                   token_budget: Optional[int] = DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET,
+                                   max_length: int = 20000,
+                                   similarity_threshold: float = DUPLICATE_SIMILARITY_THRESHOLD
+                                   ) -> Tuple[List[str], Dict[str, int]]:
+    """
+    按token预算打包搜索结果用于提示词
+    
+    1. 按score（热度/相关度）从高到低排序，score缺失或相同时保持原顺序
+    2. 跳过与已选结果近似重复的内容（字符3-gram的Jaccard相似度达到阈值）
+    3. 每条结果先按max_length截断，再贪心放入预算，放不下时截断填充剩余预算
+    4. 剩余预算低于MIN_PARTIAL_RESULT_TOKENS（或更小的总预算）后停止，其余结果不再做去重比较，直接计入dropped
+    
+    Args:
+        search_results: 搜索结果列表
+        token_budget: 搜索结果部分的token预算，None或非正数表示不限制
+        max_length: 每个结果的最大长度
+        similarity_threshold: 近似重复的相似度阈值
+        
+    Returns:
+        (格式化后的内容列表, 打包统计)
+        统计包括 total / kept / duplicates / dropped / truncated / tokens_used / tokens_dropped / token_budget
+    """
+    unlimited = not token_budget or token_budget <= 0
+    stats = {
+        'total': 0,
+        'kept': 0,
+        'duplicates': 0,
+        'dropped': 0,
+        'truncated': 0,
+        'tokens_used': 0,
+        'tokens_dropped': 0,
+        'token_budget': 0 if unlimited else token_budget,
+    }
+
+    candidates = []
+    for index, result in enumerate(search_results):
+        content = result.get('content', '')
+        if content:
+            candidates.append((-(result.get('score') or 0), index, content))
+    candidates.sort(key=lambda item: (item[0], item[1]))
+    stats['total'] = len(candidates)
+
+    packed = []
+    seen_keys = set()
+    kept_fingerprints = []
+    min_remaining = 0 if unlimited else min(MIN_PARTIAL_RESULT_TOKENS, token_budget)
+    for position, (_, _, content) in enumerate(candidates):
+        if not unlimited and token_budget - stats['tokens_used'] < min_remaining:
+            # 预算已用尽：指纹计算和与已选结果的相似度比较开销最大，剩余结果只估算舍弃的token数
+            rest = candidates[position:]
+            stats['dropped'] += len(rest)
+            stats['tokens_dropped'] += sum(estimate_tokens(truncate_content(item[2], max_length)) for item in rest)
+            break
+        key = _NON_WORD_PATTERN.sub('', content.lower())
+        if key in seen_keys:
+            stats['duplicates'] += 1
+            continue
+        fingerprint = _content_fingerprint(content)
+        if any(len(fingerprint & kept) / len(fingerprint | kept) >= similarity_threshold
+               for kept in kept_fingerprints):
+            stats['duplicates'] += 1
+            continue
+
+        truncated_content = truncate_content(content, max_length)
+        tokens = estimate_tokens(truncated_content)
+        remaining = None if unlimited else token_budget - stats['tokens_used']
+        if remaining is not None and tokens > remaining:
+            # 循环开始时已保证剩余预算足够截断填充
+            partial_content = _truncate_to_tokens(truncated_content, remaining)
+            partial_tokens = estimate_tokens(partial_content)
+            stats['truncated'] += 1
+            stats['tokens_dropped'] += tokens - partial_tokens
+            truncated_content, tokens = partial_content, partial_tokens
+
+        seen_keys.add(key)
+        kept_fingerprints.append(fingerprint)
+        packed.append(truncated_content)
+        stats['kept'] += 1
+        stats['tokens_used'] += tokens
+
+    return packed, stats
@@ -42,6 +42,7 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
+from search_cache import cached_search
 
 # --- 1. 数据结构定义 ---
 from dataclasses import dataclass, field
@@ -86,6 +87,11 @@ class BochaResponse:
     modal_cards: List[ModalCardResult] = field(default_factory=list)
 
 
+def _is_cacheable(response: BochaResponse) -> bool:
+    """只缓存有内容的响应，搜索失败时返回的空响应不缓存"""
+    return bool(response.webpages or response.images or response.modal_cards or response.answer)
+
+
 # --- 2. 核心客户端与专用工具集 ---
 
 class BochaMultimodalSearch:
@@ -200,6 +206,7 @@ class BochaMultimodalSearch:
 
     # --- Agent 可用的工具方法 ---
 
+    @cached_search("bocha", cacheable=_is_cacheable)
     def comprehensive_search(self, query: str, max_results: int = 10) -> BochaResponse:
         """
         【工具】全面综合搜索: 执行一次标准的、包含所有信息类型的综合搜索。
@@ -213,6 +220,7 @@ class BochaMultimodalSearch:
             answer=True  # 开启AI总结
         )
 
+    @cached_search("bocha", cacheable=_is_cacheable)
     def web_search_only(self, query: str, max_results: int = 15) -> BochaResponse:
         """
         【工具】纯网页搜索: 只获取网页链接和摘要，不请求AI生成答案。
@@ -225,6 +233,7 @@ class BochaMultimodalSearch:
             answer=False # 关闭AI总结
         )
 
+    @cached_search("bocha", cacheable=_is_cacheable)
     def search_for_structured_data(self, query: str) -> BochaResponse:
         """
         【工具】结构化数据查询: 专门用于可能触发“模态卡”的查询。
@@ -239,6 +248,7 @@ class BochaMultimodalSearch:
             answer=True
         )
 
+    @cached_search("bocha", cacheable=_is_cacheable)
     def search_last_24_hours(self, query: str) -> BochaResponse:
         """
         【工具】搜索24小时内信息: 获取关于某个主题的最新动态。
@@ -247,6 +257,7 @@ class BochaMultimodalSearch:
         logger.info(f"--- TOOL: 搜索24小时内信息 (query: {query}) ---")
         return self._search_internal(query=query, freshness='oneDay', answer=True)
 
+    @cached_search("bocha", cacheable=_is_cacheable)
     def search_last_week(self, query: str) -> BochaResponse:
         """
         【工具】搜索本周信息: 获取关于某个主题过去一周内的主要报道。
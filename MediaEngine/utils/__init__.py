@@ -9,7 +9,10 @@ from .text_processing import (
     remove_reasoning_from_output,
     extract_clean_response,
     update_state_with_search_results,
-    format_search_results_for_prompt
+    format_search_results_for_prompt,
+    pack_search_results_for_prompt,
+    estimate_tokens,
+    DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET
 )
 
 from .config import Settings, settings
@@ -21,6 +24,9 @@ __all__ = [
     "extract_clean_response",
     "update_state_with_search_results",
     "format_search_results_for_prompt",
+    "pack_search_results_for_prompt",
+    "estimate_tokens",
+    "DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET",
     "Settings",
     "settings"
 ]
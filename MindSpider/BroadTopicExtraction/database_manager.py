@@ -25,6 +25,18 @@ except ImportError:
 
 from config import settings
 
+# 批量插入新闻时每批的行数
+NEWS_INSERT_CHUNK_SIZE = 500
+
+INSERT_DAILY_NEWS_SQL = text(
+    """
+    INSERT INTO daily_news (
+        news_id, source_platform, title, url, crawl_date,
+        rank_position, add_ts, last_modify_ts
+    ) VALUES (:news_id, :source_platform, :title, :url, :crawl_date, :rank_position, :add_ts, :last_modify_ts)
+    """
+)
+
 
 class DatabaseManager:
     """数据库管理器"""
@@ -76,6 +88,11 @@ class DatabaseManager:
         """
         保存每日新闻数据，如果当天已有数据则覆盖
 
+        删除当天旧数据和分批插入新数据在同一个事务中完成，提交前读者始终看到完整的旧数据，
+        提交后看到完整的新数据；保存失败时旧数据保持不变。
+        数据格式有误的新闻记录日志后跳过；每批在独立的保存点中批量插入，某一批失败时只回滚该批并逐条重试，
+        单条失败不影响其他新闻。
+
         Args:
             news_data: 新闻数据列表
             crawl_date: 爬取日期，默认为今天
@@ -87,59 +104,72 @@ class DatabaseManager:
             crawl_date = date.today()
 
         current_timestamp = int(datetime.now().timestamp())
+        rows = []
+        for news_item in news_data:
+            try:
+                rows.append(self._build_news_row(news_item, crawl_date, current_timestamp))
+            except Exception as e:
+                logger.exception(f"保存单条新闻失败: {e}")
 
         try:
             saved_count = 0
-            # 先独立事务执行删除，防止后续插入失败导致无法清理
             with self.engine.begin() as conn:
                 deleted = conn.execute(text("DELETE FROM daily_news WHERE crawl_date = :d"), {"d": crawl_date}).rowcount
                 if deleted and deleted > 0:
                     logger.info(f"覆盖模式：删除了当天已有的 {deleted} 条新闻记录")
 
-            # 逐条插入，单条失败不影响后续（每条独立事务）
-            for news_item in news_data:
-                try:
-                    # news_item.get('id') 已经是完整的 news_id（格式：source_item_id）
-                    # 为了支持同一条新闻在不同日期出现，将 crawl_date 加入到 news_id 中
-                    base_news_id = news_item.get(
-                        'id') or f"{news_item.get('source', 'unknown')}_rank_{news_item.get('rank', 0)}"
-                    # 将日期格式化为字符串并加入到 news_id 中，确保全局唯一性
-                    news_id = f"{base_news_id}_{crawl_date.strftime('%Y%m%d')}"
-
-                    title_val = (news_item.get("title", "") or "")
-                    if len(title_val) > 500:
-                        title_val = title_val[:500]
-                    with self.engine.begin() as conn:
-                        conn.execute(
-                            text(
-                                """
-                                INSERT INTO daily_news (
-                                    news_id, source_platform, title, url, crawl_date,
-                                    rank_position, add_ts, last_modify_ts
-                                ) VALUES (:news_id, :source_platform, :title, :url, :crawl_date, :rank_position, :add_ts, :last_modify_ts)
-                                """
-                            ),
-                            {
-                                "news_id": news_id,
-                                "source_platform": news_item.get("source", "unknown"),
-                                "title": title_val,
-                                "url": news_item.get("url", ""),
-                                "crawl_date": crawl_date,
-                                "rank_position": news_item.get("rank", None),
-                                "add_ts": current_timestamp,
-                                "last_modify_ts": current_timestamp,
-                            },
-                        )
-                    saved_count += 1
-                except Exception as e:
-                    logger.exception(f"保存单条新闻失败: {e}")
-                    continue
+                for start in range(0, len(rows), NEWS_INSERT_CHUNK_SIZE):
+                    saved_count += self._insert_news_chunk(conn, rows[start:start + NEWS_INSERT_CHUNK_SIZE])
             logger.info(f"成功保存 {saved_count} 条新闻记录")
             return saved_count
         except Exception as e:
             logger.exception(f"保存新闻数据失败: {e}")
             return 0
 
+    @staticmethod
+    def _build_news_row(news_item: Dict, crawl_date: date, current_timestamp: int) -> Dict:
+        """将新闻数据转换为daily_news表的一行"""
+        # news_item.get('id') 已经是完整的 news_id（格式：source_item_id）
+        # 为了支持同一条新闻在不同日期出现，将 crawl_date 加入到 news_id 中
+        base_news_id = news_item.get(
+            'id') or f"{news_item.get('source', 'unknown')}_rank_{news_item.get('rank', 0)}"
+        # 将日期格式化为字符串并加入到 news_id 中，确保全局唯一性
+        news_id = f"{base_news_id}_{crawl_date.strftime('%Y%m%d')}"
+
+        title_val = (news_item.get("title", "") or "")
+        if len(title_val) > 500:
+            title_val = title_val[:500]
+        return {
+            "news_id": news_id,
+            "source_platform": news_item.get("source", "unknown"),
+            "title": title_val,
+            "url": news_item.get("url", ""),
+            "crawl_date": crawl_date,
+            "rank_position": news_item.get("rank", None),
+            "add_ts": current_timestamp,
+            "last_modify_ts": current_timestamp,
+        }
+
+    @staticmethod
+    def _insert_news_chunk(conn, rows: List[Dict]) -> int:
+        """在保存点中批量插入一批新闻，失败时回滚该批并逐条重试，返回成功插入的数量"""
+        try:
+            with conn.begin_nested():
+                conn.execute(INSERT_DAILY_NEWS_SQL, rows)
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"批量插入 {len(rows)} 条新闻失败，改为逐条插入: {e}")
+
+        saved_count = 0
+        for row in rows:
+            try:
+                with conn.begin_nested():
+                    conn.execute(INSERT_DAILY_NEWS_SQL, row)
+                saved_count += 1
+            except Exception as e:
+                logger.exception(f"保存单条新闻失败: {e}")
+        return saved_count
+
     def get_daily_news(self, crawl_date: date = None) -> List[Dict]:
         """
         获取每日新闻数据
@@ -7,11 +7,14 @@ BroadTopicExtraction模块 - 新闻获取和收集
 
 import sys
 import asyncio
+import time
 import httpx
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime, date
 from pathlib import Path
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 from loguru import logger
 
 # 添加项目根目录到路径
@@ -42,6 +45,52 @@ SOURCE_NAMES = {
     "xueqiu": "雪球热榜"
 }
 
+# 请求头（所有新闻源共用）
+REQUEST_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Referer": BASE_URL,
+    "Connection": "keep-alive",
+}
+
+# 并发获取配置
+MAX_CONCURRENT_PER_HOST = 4           # 同一主机同时在途的请求数
+MIN_REQUEST_INTERVAL_PER_HOST = 0.1   # 同一主机相邻两次请求开始的最小间隔（秒）
+REQUEST_TIMEOUT = 10.0                # 单次请求超时（秒）
+SOURCE_TIMEOUT = 30.0                 # 单个新闻源（含重试）的总超时（秒）
+MAX_RETRIES = 2                       # 超时、连接错误、429和5xx响应的重试次数
+RETRY_BACKOFF = 0.5                   # 重试等待的基数（秒），按指数增长
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """按主机限制并发请求数和请求间隔（替代逐个新闻源之间的固定sleep）"""
+    
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT_PER_HOST,
+                 min_interval: float = MIN_REQUEST_INTERVAL_PER_HOST):
+        self.max_concurrent = max(1, max_concurrent)
+        self.min_interval = max(0.0, min_interval)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+    
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """占用该主机的一个请求名额，必要时等待到允许的请求时间"""
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_concurrent))
+        async with semaphore:
+            now = time.monotonic()
+            start = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
 class NewsCollector:
     """新闻收集器 - 整合API调用和数据库存储"""
     
@@ -49,6 +98,8 @@ class NewsCollector:
         """初始化新闻收集器"""
         self.db_manager = DatabaseManager()
         self.supported_sources = list(SOURCE_NAMES.keys())
+        # 各新闻源上次响应的ETag/Last-Modified及数据，用于条件请求（在收集器的生命周期内有效）
+        self._conditional_cache: Dict[str, Dict] = {}
     
     def close(self):
         """关闭资源"""
@@ -69,35 +120,38 @@ class NewsCollector:
     
     # ==================== 新闻API调用 ====================
     
-    async def fetch_news(self, source: str) -> dict:
-        """从指定源获取最新新闻"""
+    def _create_client(self) -> httpx.AsyncClient:
+        """创建一次收集中所有新闻源共用的连接池客户端"""
+        return httpx.AsyncClient(
+            headers=REQUEST_HEADERS,
+            timeout=REQUEST_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_PER_HOST * 2,
+                                max_keepalive_connections=MAX_CONCURRENT_PER_HOST),
+        )
+    
+    async def fetch_news(self, source: str, client: Optional[httpx.AsyncClient] = None,
+                         rate_limiter: Optional[HostRateLimiter] = None) -> dict:
+        """
+        从指定源获取最新新闻
+        
+        Args:
+            source: 新闻源ID
+            client: 共用的HTTP客户端，不提供时为本次请求单独创建
+            rate_limiter: 共用的主机限速器，不提供时不限速
+        """
         url = f"{BASE_URL}/api/s?id={source}&latest"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
-            "Referer": BASE_URL,
-            "Connection": "keep-alive",
-        }
         
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                
-                # 解析JSON响应
-                data = response.json()
-                return {
-                    "source": source,
-                    "status": "success",
-                    "data": data,
-                    "timestamp": datetime.now().isoformat()
-                }
-        except httpx.TimeoutException:
+            if client is None:
+                async with self._create_client() as own_client:
+                    return await asyncio.wait_for(
+                        self._fetch_with_retries(source, url, own_client, rate_limiter), SOURCE_TIMEOUT
+                    )
+            return await asyncio.wait_for(
+                self._fetch_with_retries(source, url, client, rate_limiter), SOURCE_TIMEOUT
+            )
+        except (httpx.TimeoutException, asyncio.TimeoutError):
             return {
                 "source": source,
                 "status": "timeout",
@@ -119,35 +173,95 @@ class NewsCollector:
                 "timestamp": datetime.now().isoformat()
             }
     
+    async def _fetch_with_retries(self, source: str, url: str, client: httpx.AsyncClient,
+                                  rate_limiter: Optional[HostRateLimiter]) -> dict:
+        """发送（条件）请求，超时、连接错误、429和5xx响应按指数退避重试"""
+        host = urlsplit(url).netloc
+        cached = self._conditional_cache.get(source)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        for attempt in range(MAX_RETRIES + 1):
+            retry_after = None
+            try:
+                if rate_limiter:
+                    async with rate_limiter.slot(host):
+                        response = await client.get(url, headers=headers)
+                else:
+                    response = await client.get(url, headers=headers)
+                
+                if response.status_code == 304 and cached:
+                    return {
+                        "source": source,
+                        "status": "success",
+                        "data": cached["data"],
+                        "not_modified": True,
+                        "timestamp": datetime.now().isoformat()
+                    }
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                    retry_after = response.headers.get("Retry-After")
+                    logger.warning(f"{source}: HTTP {response.status_code}，准备重试 ({attempt + 1}/{MAX_RETRIES})")
+                else:
+                    response.raise_for_status()
+                    
+                    # 解析JSON响应
+                    data = response.json()
+                    if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+                        self._conditional_cache[source] = {
+                            "etag": response.headers.get("ETag"),
+                            "last_modified": response.headers.get("Last-Modified"),
+                            "data": data
+                        }
+                    return {
+                        "source": source,
+                        "status": "success",
+                        "data": data,
+                        "timestamp": datetime.now().isoformat()
+                    }
+            except httpx.TransportError as e:
+                if attempt >= MAX_RETRIES:
+                    raise
+                logger.warning(f"{source}: {type(e).__name__}，准备重试 ({attempt + 1}/{MAX_RETRIES})")
+            
+            delay = RETRY_BACKOFF * (2 ** attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+    
     async def get_popular_news(self, sources: List[str] = None) -> List[dict]:
-        """获取热门新闻"""
+        """并发获取热门新闻（共用一个连接池客户端，按主机限速）"""
         if sources is None:
             sources = list(SOURCE_NAMES.keys())
         
-        logger.info(f"正在获取 {len(sources)} 个新闻源的最新内容...")
+        logger.info(f"正在并发获取 {len(sources)} 个新闻源的最新内容...")
         logger.info("=" * 80)
         
-        results = []
-        for source in sources:
-            source_name = SOURCE_NAMES.get(source, source)
-            logger.info(f"正在获取 {source_name} 的新闻...")
-            result = await self.fetch_news(source)
-            results.append(result)
-            
+        started = time.monotonic()
+        rate_limiter = HostRateLimiter()
+        async with self._create_client() as client:
+            results = await asyncio.gather(
+                *(self.fetch_news(source, client, rate_limiter) for source in sources)
+            )
+        
+        for result in results:
+            source_name = SOURCE_NAMES.get(result["source"], result["source"])
             if result["status"] == "success":
                 data = result["data"]
+                suffix = "（未变化，使用上次结果）" if result.get("not_modified") else ""
                 if 'items' in data and isinstance(data['items'], list):
                     count = len(data['items'])
-                    logger.info(f"✓ {source_name}: 获取成功，共 {count} 条新闻")
+                    logger.info(f"✓ {source_name}: 获取成功，共 {count} 条新闻{suffix}")
                 else:
-                    logger.info(f"✓ {source_name}: 获取成功")
+                    logger.info(f"✓ {source_name}: 获取成功{suffix}")
             else:
                 logger.error(f"✗ {source_name}: {result.get('error', '获取失败')}")
-            
-            # 避免请求过快
-            await asyncio.sleep(0.5)
         
-        return results
+        logger.info(f"新闻源获取完成，耗时 {time.monotonic() - started:.1f} 秒")
+        return list(results)
     
     # ==================== 数据处理和存储 ====================
     
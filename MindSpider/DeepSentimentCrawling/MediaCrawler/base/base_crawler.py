@@ -9,10 +9,14 @@
 # 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
 
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
 
+import httpx
 from playwright.async_api import BrowserContext, BrowserType, Playwright
 
+from tools.http_client import PooledHttpClient
+
 
 class AbstractCrawler(ABC):
 
@@ -54,6 +58,14 @@ class AbstractCrawler(ABC):
         # 默认实现：回退到标准模式
         return await self.launch_browser(playwright.chromium, playwright_proxy, user_agent, headless)
 
+    async def close_api_clients(self):
+        """
+        关闭爬虫持有的平台 API client 共享的 httpx 连接池
+        """
+        for value in list(vars(self).values()):
+            if isinstance(value, AbstractApiClient):
+                await value.close_http_client()
+
 
 class AbstractLogin(ABC):
 
@@ -116,3 +128,22 @@ class AbstractApiClient(ABC):
     @abstractmethod
     async def update_cookies(self, browser_context: BrowserContext):
         pass
+
+    @asynccontextmanager
+    async def http_client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        获取该平台 client 共享的带连接池的 httpx.AsyncClient
+        退出上下文时不关闭连接；self.proxy 变化时自动重建，旧 client 在其在途请求结束后关闭；
+        由 close_http_client 统一关闭
+        """
+        pool = self.__dict__.get("_http_pool")
+        if pool is None:
+            pool = self._http_pool = PooledHttpClient()
+        async with pool.acquire(getattr(self, "proxy", None)) as client:
+            yield client
+
+    async def close_http_client(self):
+        """关闭共享的 httpx.AsyncClient（在爬虫 close() 中调用）"""
+        pool = self.__dict__.get("_http_pool")
+        if pool is not None:
+            await pool.aclose()
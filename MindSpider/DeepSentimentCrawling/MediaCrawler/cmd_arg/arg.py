@@ -61,6 +61,7 @@ class SaveDataOptionEnum(str, Enum):
     CSV = "csv"
     DB = "db"
     JSON = "json"
+    JSONL = "jsonl"
     SQLITE = "sqlite"
     POSTGRESQL = "postgresql"
 
@@ -192,7 +193,7 @@ async def parse_cmd(argv: Optional[Sequence[str]] = None):
             SaveDataOptionEnum,
             typer.Option(
                 "--save_data_option",
-                help="数据保存方式 (csv=CSV文件 | db=MySQL数据库 | json=JSON文件 | sqlite=SQLite数据库 | postgresql=PostgreSQL数据库)",
+                help="数据保存方式 (csv=CSV文件 | db=MySQL数据库 | json=JSON文件 | jsonl=JSON Lines文件 | sqlite=SQLite数据库 | postgresql=PostgreSQL数据库)",
                 rich_help_panel="存储配置",
             ),
         ] = _coerce_enum(
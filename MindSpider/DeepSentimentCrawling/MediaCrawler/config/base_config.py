@@ -24,6 +24,14 @@ IP_PROXY_POOL_COUNT = 2
 # 代理IP提供商名称
 IP_PROXY_PROVIDER_NAME = "kuaidaili"  # kuaidaili | wandouhttp
 
+# 各平台 API client 共享的 httpx 连接池配置（长连接复用，减少每次请求的 TCP/TLS 握手）
+HTTPX_MAX_CONNECTIONS = 20
+HTTPX_MAX_KEEPALIVE_CONNECTIONS = 10
+# 空闲连接保活时间（秒）
+HTTPX_KEEPALIVE_EXPIRY = 30.0
+# 是否启用 HTTP/2，需要安装 h2（pip install httpx[http2]），未安装时自动回退到 HTTP/1.1
+HTTPX_ENABLE_HTTP2 = True
+
 # 设置为True不会打开浏览器（无头浏览器）
 # 设置False会打开一个浏览器
 # 小红书如果一直扫码登录不通过，打开浏览器手动过一下滑动验证码
@@ -60,8 +68,20 @@ BROWSER_LAUNCH_TIMEOUT = 30
 # 设置为False可以保持浏览器运行，便于调试
 AUTO_CLOSE_BROWSER = True
 
-# 数据保存类型选项配置,支持五种类型：csv、db、json、sqlite、postgresql, 最好保存到DB，有排重的功能。
-SAVE_DATA_OPTION = "postgresql"  # csv or db or json or sqlite or postgresql
+# 数据保存类型选项配置,支持六种类型：csv、db、json、jsonl、sqlite、postgresql, 最好保存到DB，有排重的功能。
+# jsonl 为逐行追加写入，数据量大时优先于 json（json 每写一条都会重写整个文件），
+# 需要 JSON 数组格式时可执行 python -m tools.async_file_writer data/<platform>/jsonl/xxx.jsonl 转换
+SAVE_DATA_OPTION = "postgresql"  # csv or db or json or jsonl or sqlite or postgresql
+
+# 数据库存储模式下内容/评论先写入内存缓冲区，按表批量 upsert
+# 单表缓冲条数达到该值时立即写库
+DB_WRITE_BATCH_SIZE = 200
+# 缓冲区最长停留时间（秒），超时后由后台任务写库；程序退出时会强制写完
+DB_WRITE_FLUSH_INTERVAL = 2.0
+
+# jsonl 存储模式下每追加多少条或间隔多少秒执行一次 fsync
+JSONL_FSYNC_EVERY_ITEMS = 100
+JSONL_FSYNC_INTERVAL = 5.0
 
 # 用户浏览器缓存的浏览器文件配置
 USER_DATA_DIR = "%s_user_data_dir"  # %s will be replaced by platform name
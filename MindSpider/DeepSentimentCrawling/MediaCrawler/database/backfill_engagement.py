@@ -0,0 +1,157 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 互动整数列 / hotness_score 迁移与历史数据回填
+#            用法：python -m database.backfill_engagement --db mysql [--tables weibo_note xhs_note] [--all]
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add project root to sys.path
+project_root = Path(__file__).resolve().parents[1]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from sqlalchemy import inspect, text
+
+from database.db_session import get_async_engine
+from database.engagement import ENGAGEMENT_COLUMNS, HOTNESS_WEIGHTS, engagement_metrics
+from database.models import Base
+from tools import utils
+
+# 每批回填的行数
+DEFAULT_BATCH_SIZE = 2000
+
+
+def _inspect_table(sync_conn, table_name: str) -> Dict[str, set]:
+    inspector = inspect(sync_conn)
+    if not inspector.has_table(table_name):
+        return {}
+    return {
+        "columns": {column["name"] for column in inspector.get_columns(table_name)},
+        "indexed": {
+            column
+            for index in inspector.get_indexes(table_name)
+            for column in index.get("column_names") or []
+        },
+    }
+
+
+async def migrate_table(engine, table_name: str) -> bool:
+    """
+    为已存在的表补齐互动整数列与 hotness_score 索引（新建的表由 create_tables 直接生成）
+    Args:
+        engine: AsyncEngine
+        table_name: 表名
+
+    Returns:
+        表是否存在
+    """
+    table = Base.metadata.tables[table_name]
+    async with engine.begin() as conn:
+        state = await conn.run_sync(_inspect_table, table_name)
+        if not state:
+            utils.logger.warning(f"[migrate_table] table {table_name} does not exist, skip")
+            return False
+
+        for column_name in list(ENGAGEMENT_COLUMNS[table_name]) + ["hotness_score"]:
+            if column_name in state["columns"]:
+                continue
+            column = table.columns[column_name]
+            column_type = column.type.compile(dialect=conn.dialect)
+            default = " DEFAULT 0" if column_name != "hotness_score" else ""
+            await conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_type}{default}"))
+            utils.logger.info(f"[migrate_table] added column {table_name}.{column_name}")
+
+        if "hotness_score" not in state["indexed"]:
+            for index in table.indexes:
+                if "hotness_score" in index.columns:
+                    await conn.run_sync(lambda sync_conn: index.create(sync_conn, checkfirst=True))
+                    utils.logger.info(f"[migrate_table] created index {index.name}")
+    return True
+
+
+async def backfill_table(
+    engine,
+    table_name: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    recompute_all: bool = False,
+) -> int:
+    """
+    按主键分批回填互动整数列与 hotness_score
+    Args:
+        engine: AsyncEngine
+        table_name: 表名
+        batch_size: 每批行数
+        recompute_all: True 时重算所有行（例如调整权重后），否则只处理 hotness_score 为空的行
+
+    Returns:
+        更新的行数
+    """
+    source_columns = sorted(set(ENGAGEMENT_COLUMNS[table_name].values()) | set(HOTNESS_WEIGHTS[table_name]))
+    target_columns = list(ENGAGEMENT_COLUMNS[table_name]) + ["hotness_score"]
+    pending_filter = "" if recompute_all else " AND hotness_score IS NULL"
+    select_sql = text(
+        f"SELECT id, {', '.join(source_columns)} FROM {table_name} "
+        f"WHERE id > :last_id{pending_filter} ORDER BY id LIMIT :limit"
+    )
+    update_sql = text(
+        f"UPDATE {table_name} SET {', '.join(f'{c} = :{c}' for c in target_columns)} WHERE id = :id"
+    )
+
+    last_id = 0
+    updated = 0
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(select_sql, {"last_id": last_id, "limit": batch_size})).mappings().all()
+            if not rows:
+                break
+            params: List[Dict] = []
+            for row in rows:
+                metrics = engagement_metrics(table_name, row)
+                metrics["id"] = row["id"]
+                params.append(metrics)
+            await conn.execute(update_sql, params)
+        last_id = rows[-1]["id"]
+        updated += len(rows)
+        utils.logger.info(f"[backfill_table] {table_name}: {updated} rows updated (last id {last_id})")
+    return updated
+
+
+async def run(db_type: Optional[str], tables: List[str], batch_size: int, recompute_all: bool):
+    engine = get_async_engine(db_type)
+    if engine is None:
+        utils.logger.error(f"[backfill_engagement] {db_type} is not a database storage option")
+        return
+    try:
+        for table_name in tables:
+            if await migrate_table(engine, table_name):
+                count = await backfill_table(engine, table_name, batch_size, recompute_all)
+                utils.logger.info(f"[backfill_engagement] {table_name} done, {count} rows updated")
+    finally:
+        await engine.dispose()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Add and backfill engagement columns / hotness_score")
+    parser.add_argument("--db", dest="db_type", default=None, help="sqlite | mysql | postgresql, defaults to config.SAVE_DATA_OPTION")
+    parser.add_argument("--tables", nargs="+", choices=sorted(ENGAGEMENT_COLUMNS), default=sorted(ENGAGEMENT_COLUMNS))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--all", dest="recompute_all", action="store_true", help="recompute rows that already have a hotness_score")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(run(args.db_type, args.tables, args.batch_size, args.recompute_all))
@@ -0,0 +1,232 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 数据库批量写入缓冲区
+#            DB 存储实现不再逐条 SELECT + INSERT/UPDATE + COMMIT，而是把数据按表放入缓冲区，
+#            条数或时间达到阈值后在一个事务里批量 upsert：
+#            - 业务主键带唯一约束时使用方言原生 upsert（INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE）
+#            - 否则一次 IN 查询区分新旧记录，再分别做批量 INSERT 和按主键的批量 UPDATE
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from sqlalchemy import insert, inspect, select, update
+
+import config
+from database.db_session import get_async_engine, get_session
+from tools import utils
+
+# MySQL / PostgreSQL 单条语句的参数个数有上限，IN 查询按此大小分片
+_LOOKUP_CHUNK_SIZE = 500
+
+
+class _PendingRow:
+    __slots__ = ("values", "insertable")
+
+    def __init__(self, values: Dict, insertable: bool):
+        self.values = values
+        self.insertable = insertable
+
+
+class BufferedUpsertWriter:
+    """按表缓冲待写入的数据，批量 upsert"""
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        """
+        Args:
+            batch_size: 单表缓冲条数阈值，默认 config.DB_WRITE_BATCH_SIZE
+            flush_interval: 缓冲最长停留秒数，默认 config.DB_WRITE_FLUSH_INTERVAL
+        """
+        self.batch_size = max(1, batch_size or config.DB_WRITE_BATCH_SIZE)
+        self.flush_interval = flush_interval or config.DB_WRITE_FLUSH_INTERVAL
+        # {model: {业务主键: _PendingRow}}
+        self._buffers: Dict[Type, Dict[str, _PendingRow]] = {}
+        self._key_columns: Dict[Type, str] = {}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def add(self, model: Type, key_column: str, item: Dict, insertable: bool = True):
+        """
+        放入一条待写入数据，同一业务主键在缓冲区内会合并为一次写入
+        Args:
+            model: ORM 模型类
+            key_column: 业务主键列名，如 comment_id
+            item: 数据字典
+            insertable: 为 False 时只更新已存在的记录，不新建
+        """
+        key = item.get(key_column)
+        if key is None:
+            return
+        self._key_columns[model] = key_column
+        buffer = self._buffers.setdefault(model, {})
+        pending = buffer.get(str(key))
+        if pending is None:
+            buffer[str(key)] = _PendingRow(dict(item), insertable)
+        else:
+            pending.values.update(item)
+            pending.insertable = pending.insertable or insertable
+
+        self._ensure_flush_task()
+        if len(buffer) >= self.batch_size:
+            await self.flush(model)
+
+    def _ensure_flush_task(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_periodically())
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                utils.logger.error(f"[BufferedUpsertWriter] periodic flush failed: {e}")
+
+    async def flush(self, model: Optional[Type] = None):
+        """
+        把缓冲区写入数据库
+        Args:
+            model: 只写入指定表，为 None 时写入全部
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            models = [model] if model is not None else list(self._buffers)
+            for current in models:
+                pending = self._buffers.pop(current, None)
+                if pending:
+                    await self._write_model(current, self._key_columns[current], pending)
+
+    async def close(self):
+        """停止后台任务并写完缓冲区（爬虫结束时调用）"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    def pending_count(self) -> int:
+        return sum(len(buffer) for buffer in self._buffers.values())
+
+    async def _write_model(self, model: Type, key_column: str, pending: Dict[str, _PendingRow]):
+        columns = set(inspect(model).column_attrs.keys())
+        now = utils.get_current_timestamp()
+        rows: List[Tuple[str, Dict, bool]] = []
+        for key, row in pending.items():
+            values = {k: v for k, v in row.values.items() if k in columns}
+            if "last_modify_ts" in columns:
+                values["last_modify_ts"] = now
+            rows.append((key, values, row.insertable))
+
+        try:
+            async with get_session() as session:
+                await self._upsert(session, model, key_column, columns, rows, now)
+            utils.logger.info(f"[BufferedUpsertWriter] flushed {len(rows)} rows into {model.__tablename__}")
+        except Exception as e:
+            # 整批失败时逐条重试，避免一条脏数据拖垮整批
+            utils.logger.error(f"[BufferedUpsertWriter] batch write into {model.__tablename__} failed, retrying row by row: {e}")
+            for row in rows:
+                try:
+                    async with get_session() as session:
+                        await self._upsert(session, model, key_column, columns, [row], now)
+                except Exception as row_error:
+                    utils.logger.error(f"[BufferedUpsertWriter] drop {model.__tablename__} row {key_column}={row[0]}: {row_error}")
+
+    async def _upsert(self, session, model: Type, key_column: str, columns: set, rows: List[Tuple[str, Dict, bool]], now: int):
+        dialect = get_async_engine(config.SAVE_DATA_OPTION).dialect.name
+        if _has_unique_key(model, key_column) and dialect in ("mysql", "postgresql", "sqlite") and all(r[2] for r in rows):
+            await _native_upsert(session, dialect, model, key_column, columns, [values for _, values, _ in rows], now)
+            return
+
+        key_attr = getattr(model, key_column)
+        existing: Dict[str, List[Any]] = {}
+        raw_keys = [values[key_column] for _, values, _ in rows]
+        for start in range(0, len(raw_keys), _LOOKUP_CHUNK_SIZE):
+            chunk = raw_keys[start:start + _LOOKUP_CHUNK_SIZE]
+            result = await session.execute(select(model.id, key_attr).where(key_attr.in_(chunk)))
+            for row_id, key in result.all():
+                existing.setdefault(str(key), []).append(row_id)
+
+        inserts, updates = [], []
+        for key, values, insertable in rows:
+            if key in existing:
+                values = {k: v for k, v in values.items() if k != "add_ts"}
+                updates.extend({**values, "id": row_id} for row_id in existing[key])
+            elif insertable:
+                if "add_ts" in columns:
+                    values.setdefault("add_ts", now)
+                inserts.append(values)
+
+        for group in _group_by_keys(inserts):
+            await session.execute(insert(model), group)
+        for group in _group_by_keys(updates):
+            await session.execute(update(model), group)
+
+
+def _has_unique_key(model: Type, key_column: str) -> bool:
+    table = model.__table__
+    if table.columns[key_column].unique:
+        return True
+    return any(
+        index.unique and [c.name for c in index.columns] == [key_column]
+        for index in table.indexes
+    )
+
+
+async def _native_upsert(session, dialect: str, model: Type, key_column: str, columns: set, rows: List[Dict], now: int):
+    for row in rows:
+        if "add_ts" in columns:
+            row.setdefault("add_ts", now)
+    for group in _group_by_keys(rows):
+        update_columns = [c for c in group[0] if c not in ("id", "add_ts", key_column)]
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert as dialect_insert
+            stmt = dialect_insert(model)
+            stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+        else:
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            stmt = dialect_insert(model)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[key_column],
+                set_={c: stmt.excluded[c] for c in update_columns},
+            )
+        await session.execute(stmt, group)
+
+
+def _group_by_keys(rows: List[Dict]) -> List[List[Dict]]:
+    """executemany 要求同一批参数的键一致，按键集合分组"""
+    groups: Dict[frozenset, List[Dict]] = {}
+    for row in rows:
+        groups.setdefault(frozenset(row), []).append(row)
+    return list(groups.values())
+
+
+_writer: Optional[BufferedUpsertWriter] = None
+
+
+def get_buffered_writer() -> BufferedUpsertWriter:
+    """进程内共享的写入缓冲区（各平台 store 每次调用都会新建实例，缓冲区需全局共享）"""
+    global _writer
+    if _writer is None:
+        _writer = BufferedUpsertWriter()
+    return _writer
+
+
+async def flush_buffered_writer():
+    """写完缓冲区并停止后台任务"""
+    if _writer is not None:
+        await _writer.close()
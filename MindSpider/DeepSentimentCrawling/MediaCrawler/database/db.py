@@ -13,6 +13,7 @@ if str(project_root) not in sys.path:
 
 from tools import utils
 from database.db_session import create_tables
+from database.buffered_writer import flush_buffered_writer
 
 async def init_table_schema(db_type: str):
     """
@@ -30,6 +31,6 @@ async def init_db(db_type: str = None):
 
 async def close():
     """
-    Placeholder for closing database connections if needed in the future.
+    Flush buffered DB writes (see database/buffered_writer.py) before exit.
     """
-    pass
+    await flush_buffered_writer()
@@ -0,0 +1,162 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 互动数据数值化与热度分计算
+#            各平台原始互动字段多为 Text（如 "1.2万"、"10万+"），入库时同步写入规整后的
+#            整数列（like_num / comment_num / share_num / collect_num / view_num）和
+#            hotness_score，使热点查询可以直接走 hotness_score 索引而无需逐行 CAST。
+import re
+from typing import Any, Dict, Optional
+
+# 热度权重；InsightEngine/tools/search.py 的 MediaCrawlerDB 直接读取这里的权重生成回退的热度公式
+W_LIKE = 1.0
+W_COMMENT = 5.0
+W_SHARE = 10.0  # 分享/转发/收藏/投币等高价值互动
+W_VIEW = 0.1
+W_DANMAKU = 0.5
+
+# 规整后的整数列 -> 各表对应的原始字段
+ENGAGEMENT_COLUMNS: Dict[str, Dict[str, str]] = {
+    "bilibili_video": {
+        "like_num": "liked_count",
+        "comment_num": "video_comment",
+        "share_num": "video_share_count",
+        "collect_num": "video_favorite_count",
+        "view_num": "video_play_count",
+    },
+    "douyin_aweme": {
+        "like_num": "liked_count",
+        "comment_num": "comment_count",
+        "share_num": "share_count",
+        "collect_num": "collected_count",
+    },
+    "kuaishou_video": {
+        "like_num": "liked_count",
+        "view_num": "viewd_count",
+    },
+    "weibo_note": {
+        "like_num": "liked_count",
+        "comment_num": "comments_count",
+        "share_num": "shared_count",
+    },
+    "xhs_note": {
+        "like_num": "liked_count",
+        "comment_num": "comment_count",
+        "share_num": "share_count",
+        "collect_num": "collected_count",
+    },
+    "zhihu_content": {
+        "like_num": "voteup_count",
+        "comment_num": "comment_count",
+    },
+}
+
+# 热度分：原始字段 -> 权重
+HOTNESS_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "bilibili_video": {
+        "liked_count": W_LIKE,
+        "video_comment": W_COMMENT,
+        "video_share_count": W_SHARE,
+        "video_favorite_count": W_SHARE,
+        "video_coin_count": W_SHARE,
+        "video_danmaku": W_DANMAKU,
+        "video_play_count": W_VIEW,
+    },
+    "douyin_aweme": {
+        "liked_count": W_LIKE,
+        "comment_count": W_COMMENT,
+        "share_count": W_SHARE,
+        "collected_count": W_SHARE,
+    },
+    "kuaishou_video": {
+        "liked_count": W_LIKE,
+        "viewd_count": W_VIEW,
+    },
+    "weibo_note": {
+        "liked_count": W_LIKE,
+        "comments_count": W_COMMENT,
+        "shared_count": W_SHARE,
+    },
+    "xhs_note": {
+        "liked_count": W_LIKE,
+        "comment_count": W_COMMENT,
+        "share_count": W_SHARE,
+        "collected_count": W_SHARE,
+    },
+    "zhihu_content": {
+        "voteup_count": W_LIKE,
+        "comment_count": W_COMMENT,
+    },
+}
+
+_UNIT_MULTIPLIERS = {"万": 10_000, "w": 10_000, "W": 10_000, "亿": 100_000_000, "k": 1_000, "K": 1_000}
+_COUNT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([万亿wWkK]?)")
+
+
+def parse_count(value: Any) -> int:
+    """
+    将平台返回的互动数转换为整数，兼容 "1234"、"1.2万"、"10万+"、"3k" 等写法
+    Args:
+        value: 原始值（int/float/str/None）
+
+    Returns:
+        整数，无法解析时返回 0
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return max(int(value), 0)
+    match = _COUNT_PATTERN.search(str(value).replace(",", ""))
+    if not match:
+        return 0
+    number, unit = match.groups()
+    return int(float(number) * _UNIT_MULTIPLIERS.get(unit, 1))
+
+
+def engagement_metrics(table_name: str, item: Dict) -> Dict[str, Any]:
+    """
+    计算规整后的互动整数列与热度分
+    Args:
+        table_name: 表名，如 weibo_note
+        item: 待入库的数据字典（原始字段）
+
+    Returns:
+        {like_num, comment_num, ..., hotness_score}；不支持的表返回空字典
+    """
+    columns = ENGAGEMENT_COLUMNS.get(table_name)
+    if columns is None:
+        return {}
+    metrics: Dict[str, Any] = {column: parse_count(item.get(source)) for column, source in columns.items()}
+    metrics["hotness_score"] = hotness_score(table_name, item)
+    return metrics
+
+
+def hotness_score(table_name: str, item: Dict) -> Optional[float]:
+    """按 HOTNESS_WEIGHTS 计算热度分"""
+    weights = HOTNESS_WEIGHTS.get(table_name)
+    if weights is None:
+        return None
+    return round(sum(parse_count(item.get(source)) * weight for source, weight in weights.items()), 2)
+
+
+def fill_engagement_metrics(table_name: str, item: Dict) -> Dict:
+    """
+    就地把规整后的互动列与热度分写入 item（入库前调用）
+    Args:
+        table_name: 表名
+        item: 待入库的数据字典
+
+    Returns:
+        同一个 item
+    """
+    item.update(engagement_metrics(table_name, item))
+    return item
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger
+from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -28,6 +28,13 @@ class BilibiliVideo(Base):
     video_comment = Column(Text)
     video_cover_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 规整后的互动数与热度分，见 database/engagement.py
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, index=True)
 
 class BilibiliVideoComment(Base):
     __tablename__ = 'bilibili_video_comment'
@@ -119,6 +126,12 @@ class DouyinAweme(Base):
     music_download_url = Column(Text)
     note_download_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 规整后的互动数与热度分，见 database/engagement.py
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, index=True)
 
 class DouyinAwemeComment(Base):
     __tablename__ = 'douyin_aweme_comment'
@@ -177,6 +190,10 @@ class KuaishouVideo(Base):
     video_cover_url = Column(Text)
     video_play_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 规整后的互动数与热度分，见 database/engagement.py
+    like_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, index=True)
 
 class KuaishouVideoComment(Base):
     __tablename__ = 'kuaishou_video_comment'
@@ -212,6 +229,11 @@ class WeiboNote(Base):
     shared_count = Column(Text)
     note_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 规整后的互动数与热度分，见 database/engagement.py
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, index=True)
 
 class WeiboNoteComment(Base):
     __tablename__ = 'weibo_note_comment'
@@ -289,6 +311,12 @@ class XhsNote(Base):
     note_url = Column(Text)
     source_keyword = Column(Text, default='')
     xsec_token = Column(Text)
+    # 规整后的互动数与热度分，见 database/engagement.py
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, index=True)
 
 class XhsNoteComment(Base):
     __tablename__ = 'xhs_note_comment'
@@ -386,6 +414,10 @@ class ZhihuContent(Base):
     user_url_token = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
+    # 规整后的互动数与热度分，见 database/engagement.py
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, index=True)
 
     # persist-1<persist1@126.com>
     # 原因：修复 ORM 模型定义错误，确保与数据库表结构一致。
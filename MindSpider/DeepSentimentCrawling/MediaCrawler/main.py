@@ -72,11 +72,17 @@ async def main():
 
 
     crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    try:
+        await crawler.start()
+    finally:
+        # 关闭各平台 client 共享的 httpx 连接池
+        await crawler.close_api_clients()
+        # 数据库模式下写完批量写入缓冲区
+        await db.close()
 
     # Generate wordcloud after crawling is complete
-    # Only for JSON save mode
-    if config.SAVE_DATA_OPTION == "json" and config.ENABLE_GET_WORDCLOUD:
+    # Only for JSON / JSON Lines save mode
+    if config.SAVE_DATA_OPTION in ["json", "jsonl"] and config.ENABLE_GET_WORDCLOUD:
         try:
             file_writer = AsyncFileWriter(
                 platform=config.PLATFORM,
@@ -91,8 +97,9 @@ def cleanup():
     if crawler:
         # asyncio.run(crawler.close())
         pass
-    if config.SAVE_DATA_OPTION in ["db", "sqlite"]:
-        asyncio.run(db.close())
+    if config.SAVE_DATA_OPTION in ["db", "sqlite", "postgresql"]:
+        # 复用主事件循环：数据库连接池绑定在该循环上，新建循环无法写完缓冲区
+        asyncio.get_event_loop().run_until_complete(db.close())
 
 
 if __name__ == "__main__":
@@ -49,7 +49,7 @@ class BilibiliClient(AbstractApiClient):
         self.cookie_dict = cookie_dict
 
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxy=self.proxy) as client:
+        async with self.http_client() as client:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
         try:
             data: Dict = response.json()
@@ -203,9 +203,9 @@ class BilibiliClient(AbstractApiClient):
 
     async def get_video_media(self, url: str) -> Union[bytes, None]:
         # Follow CDN 302 redirects and treat any 2xx as success (some endpoints return 206)
-        async with httpx.AsyncClient(proxy=self.proxy, follow_redirects=True) as client:
+        async with self.http_client() as client:
             try:
-                response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
+                response = await client.request("GET", url, timeout=self.timeout, headers=self.headers, follow_redirects=True)
                 response.raise_for_status()
                 if 200 <= response.status_code < 300:
                     return response.content
@@ -362,6 +362,8 @@ class DouYinCrawler(AbstractCrawler):
 
     async def close(self) -> None:
         """Close browser context"""
+        # 关闭共享的 httpx 连接池
+        await self.close_api_clients()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -426,6 +426,8 @@ class KuaishouCrawler(AbstractCrawler):
 
     async def close(self):
         """Close browser context"""
+        # 关闭共享的 httpx 连接池
+        await self.close_api_clients()
         # 如果使用CDP模式，需要特殊处理
         if self.cdp_manager:
             await self.cdp_manager.cleanup()
@@ -588,3 +588,37 @@ alter table douyin_aweme_comment add column `like_count` varchar(255) NOT NULL D
 alter table xhs_note add column xsec_token varchar(50) default null comment '签名算法';
 alter table douyin_aweme_comment add column `pictures` varchar(500) NOT NULL DEFAULT '' COMMENT '评论图片列表';
 alter table bilibili_video_comment add column `like_count` varchar(255) NOT NULL DEFAULT '0' COMMENT '点赞数';
+
+-- 规整后的互动数与热度分（database/engagement.py 入库时写入，python -m database.backfill_engagement 回填历史数据）
+alter table bilibili_video add column `like_num` bigint DEFAULT 0 COMMENT '点赞数（整数）';
+alter table bilibili_video add column `comment_num` bigint DEFAULT 0 COMMENT '评论数（整数）';
+alter table bilibili_video add column `share_num` bigint DEFAULT 0 COMMENT '分享/转发数（整数）';
+alter table bilibili_video add column `collect_num` bigint DEFAULT 0 COMMENT '收藏数（整数）';
+alter table bilibili_video add column `view_num` bigint DEFAULT 0 COMMENT '播放/浏览数（整数）';
+alter table bilibili_video add column `hotness_score` double DEFAULT NULL COMMENT '热度分';
+alter table bilibili_video add index `idx_bilibili_video_hotness_score` (`hotness_score`);
+alter table douyin_aweme add column `like_num` bigint DEFAULT 0 COMMENT '点赞数（整数）';
+alter table douyin_aweme add column `comment_num` bigint DEFAULT 0 COMMENT '评论数（整数）';
+alter table douyin_aweme add column `share_num` bigint DEFAULT 0 COMMENT '分享/转发数（整数）';
+alter table douyin_aweme add column `collect_num` bigint DEFAULT 0 COMMENT '收藏数（整数）';
+alter table douyin_aweme add column `hotness_score` double DEFAULT NULL COMMENT '热度分';
+alter table douyin_aweme add index `idx_douyin_aweme_hotness_score` (`hotness_score`);
+alter table kuaishou_video add column `like_num` bigint DEFAULT 0 COMMENT '点赞数（整数）';
+alter table kuaishou_video add column `view_num` bigint DEFAULT 0 COMMENT '播放/浏览数（整数）';
+alter table kuaishou_video add column `hotness_score` double DEFAULT NULL COMMENT '热度分';
+alter table kuaishou_video add index `idx_kuaishou_video_hotness_score` (`hotness_score`);
+alter table weibo_note add column `like_num` bigint DEFAULT 0 COMMENT '点赞数（整数）';
+alter table weibo_note add column `comment_num` bigint DEFAULT 0 COMMENT '评论数（整数）';
+alter table weibo_note add column `share_num` bigint DEFAULT 0 COMMENT '分享/转发数（整数）';
+alter table weibo_note add column `hotness_score` double DEFAULT NULL COMMENT '热度分';
+alter table weibo_note add index `idx_weibo_note_hotness_score` (`hotness_score`);
+alter table xhs_note add column `like_num` bigint DEFAULT 0 COMMENT '点赞数（整数）';
+alter table xhs_note add column `comment_num` bigint DEFAULT 0 COMMENT '评论数（整数）';
+alter table xhs_note add column `share_num` bigint DEFAULT 0 COMMENT '分享/转发数（整数）';
+alter table xhs_note add column `collect_num` bigint DEFAULT 0 COMMENT '收藏数（整数）';
+alter table xhs_note add column `hotness_score` double DEFAULT NULL COMMENT '热度分';
+alter table xhs_note add index `idx_xhs_note_hotness_score` (`hotness_score`);
+alter table zhihu_content add column `like_num` bigint DEFAULT 0 COMMENT '点赞数（整数）';
+alter table zhihu_content add column `comment_num` bigint DEFAULT 0 COMMENT '评论数（整数）';
+alter table zhihu_content add column `hotness_score` double DEFAULT NULL COMMENT '热度分';
+alter table zhihu_content add index `idx_zhihu_content_hotness_score` (`hotness_score`);
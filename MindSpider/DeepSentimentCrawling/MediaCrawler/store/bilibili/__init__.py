@@ -27,6 +27,7 @@ class BiliStoreFactory:
         "csv": BiliCsvStoreImplement,
         "db": BiliDbStoreImplement,
         "json": BiliJsonStoreImplement,
+        "jsonl": BiliJsonStoreImplement,
         "sqlite": BiliSqliteStoreImplement,
         "postgresql": BiliDbStoreImplement,
     }
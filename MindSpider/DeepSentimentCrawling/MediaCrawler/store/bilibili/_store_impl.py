@@ -27,7 +27,9 @@ from sqlalchemy.orm import sessionmaker
 import config
 from base.base_crawler import AbstractStore
 from database.db_session import get_session
+from database.buffered_writer import get_buffered_writer
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
+from database.engagement import fill_engagement_metrics
 from tools.async_file_writer import AsyncFileWriter
 from tools import utils, words
 from var import crawler_type_var
@@ -121,19 +123,9 @@ class BiliDbStoreImplement(AbstractStore):
         video_id = content_item.get("video_id")
         # 确保 video_id 为整数类型，匹配数据库 BigInteger 字段
         if video_id is not None:
-            video_id = int(video_id) if not isinstance(video_id, int) else video_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideo).where(BilibiliVideo.video_id == video_id))
-            video_detail = result.scalar_one_or_none()
-
-            if not video_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                new_content = BilibiliVideo(**content_item)
-                session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(video_detail, key, value)
-            await session.commit()
+            content_item["video_id"] = int(video_id) if not isinstance(video_id, int) else video_id
+        fill_engagement_metrics("bilibili_video", content_item)
+        await get_buffered_writer().add(BilibiliVideo, "video_id", content_item)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -144,19 +136,8 @@ class BiliDbStoreImplement(AbstractStore):
         comment_id = comment_item.get("comment_id")
         # 确保 comment_id 为整数类型，匹配数据库 BigInteger 字段
         if comment_id is not None:
-            comment_id = int(comment_id) if not isinstance(comment_id, int) else comment_id
-        async with get_session() as session:
-            result = await session.execute(select(BilibiliVideoComment).where(BilibiliVideoComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = BilibiliVideoComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+            comment_item["comment_id"] = int(comment_id) if not isinstance(comment_id, int) else comment_id
+        await get_buffered_writer().add(BilibiliVideoComment, "comment_id", comment_item)
 
     async def store_creator(self, creator: Dict):
         """
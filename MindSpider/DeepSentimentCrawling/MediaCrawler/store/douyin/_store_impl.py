@@ -24,7 +24,9 @@ from sqlalchemy import select
 import config
 from base.base_crawler import AbstractStore
 from database.db_session import get_session
+from database.buffered_writer import get_buffered_writer
 from database.models import DouyinAweme, DouyinAwemeComment, DyCreator
+from database.engagement import fill_engagement_metrics
 from tools import utils, words
 from tools.async_file_writer import AsyncFileWriter
 from var import crawler_type_var
@@ -87,20 +89,9 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
-        aweme_id = content_item.get("aweme_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id))
-            aweme_detail = result.scalar_one_or_none()
-
-            if not aweme_detail:
-                content_item["add_ts"] = utils.get_current_timestamp()
-                if content_item.get("title"):
-                    new_content = DouyinAweme(**content_item)
-                    session.add(new_content)
-            else:
-                for key, value in content_item.items():
-                    setattr(aweme_detail, key, value)
-            await session.commit()
+        fill_engagement_metrics("douyin_aweme", content_item)
+        # 没有标题的作品只更新已有记录，不新建
+        await get_buffered_writer().add(DouyinAweme, "aweme_id", content_item, insertable=bool(content_item.get("title")))
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -108,19 +99,7 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            result = await session.execute(select(DouyinAwemeComment).where(DouyinAwemeComment.comment_id == comment_id))
-            comment_detail = result.scalar_one_or_none()
-
-            if not comment_detail:
-                comment_item["add_ts"] = utils.get_current_timestamp()
-                new_comment = DouyinAwemeComment(**comment_item)
-                session.add(new_comment)
-            else:
-                for key, value in comment_item.items():
-                    setattr(comment_detail, key, value)
-            await session.commit()
+        await get_buffered_writer().add(DouyinAwemeComment, "comment_id", comment_item)
 
     async def store_creator(self, creator: Dict):
         """
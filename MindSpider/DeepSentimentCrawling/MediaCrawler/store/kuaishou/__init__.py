@@ -26,6 +26,7 @@ class KuaishouStoreFactory:
         "csv": KuaishouCsvStoreImplement,
         "db": KuaishouDbStoreImplement,
         "json": KuaishouJsonStoreImplement,
+        "jsonl": KuaishouJsonStoreImplement,
         "sqlite": KuaishouSqliteStoreImplement,
         "postgresql": KuaishouDbStoreImplement,
     }
@@ -23,6 +23,7 @@ class TieBaStoreFactory:
         "csv": TieBaCsvStoreImplement,
         "db": TieBaDbStoreImplement,
         "json": TieBaJsonStoreImplement,
+        "jsonl": TieBaJsonStoreImplement,
         "sqlite": TieBaSqliteStoreImplement,
         "postgresql": TieBaDbStoreImplement,
     }
@@ -29,6 +29,7 @@ from base.base_crawler import AbstractStore
 from database.models import TiebaNote, TiebaComment, TiebaCreator
 from tools import utils, words
 from database.db_session import get_session
+from database.buffered_writer import get_buffered_writer
 from var import crawler_type_var
 from tools.async_file_writer import AsyncFileWriter
 
@@ -94,18 +95,7 @@ class TieBaDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
-        note_id = content_item.get("note_id")
-        async with get_session() as session:
-            stmt = select(TiebaNote).where(TiebaNote.note_id == note_id)
-            res = await session.execute(stmt)
-            db_note = res.scalar_one_or_none()
-            if db_note:
-                for key, value in content_item.items():
-                    setattr(db_note, key, value)
-            else:
-                db_note = TiebaNote(**content_item)
-                session.add(db_note)
-            await session.commit()
+        await get_buffered_writer().add(TiebaNote, "note_id", content_item)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -113,18 +103,7 @@ class TieBaDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(TiebaComment).where(TiebaComment.comment_id == comment_id)
-            res = await session.execute(stmt)
-            db_comment = res.scalar_one_or_none()
-            if db_comment:
-                for key, value in comment_item.items():
-                    setattr(db_comment, key, value)
-            else:
-                db_comment = TiebaComment(**comment_item)
-                session.add(db_comment)
-            await session.commit()
+        await get_buffered_writer().add(TiebaComment, "comment_id", comment_item)
 
     async def store_creator(self, creator: Dict):
         """
@@ -27,6 +27,7 @@ class WeibostoreFactory:
         "csv": WeiboCsvStoreImplement,
         "db": WeiboDbStoreImplement,
         "json": WeiboJsonStoreImplement,
+        "jsonl": WeiboJsonStoreImplement,
         "sqlite": WeiboSqliteStoreImplement,
         "postgresql": WeiboDbStoreImplement,
     }
@@ -26,6 +26,7 @@ class XhsStoreFactory:
         "csv": XhsCsvStoreImplement,
         "db": XhsDbStoreImplement,
         "json": XhsJsonStoreImplement,
+        "jsonl": XhsJsonStoreImplement,
         "sqlite": XhsSqliteStoreImplement,
         "postgresql": XhsDbStoreImplement,
     }
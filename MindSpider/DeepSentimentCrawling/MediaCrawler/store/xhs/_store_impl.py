@@ -14,6 +14,8 @@ from sqlalchemy.orm import Session
 from base.base_crawler import AbstractStore
 from database.db_session import get_session
 from database.models import XhsNote, XhsNoteComment, XhsCreator
+from database.engagement import engagement_metrics
+from database.buffered_writer import get_buffered_writer
 
 from tools.async_file_writer import AsyncFileWriter
 from tools.time_util import get_current_timestamp
@@ -89,22 +91,15 @@ class XhsDbStoreImplement(AbstractStore):
         note_id = content_item.get("note_id")
         if not note_id:
             return
-        async with get_session() as session:
-            if await self.content_is_exist(session, note_id):
-                await self.update_content(session, content_item)
-            else:
-                await self.add_content(session, content_item)
+        await get_buffered_writer().add(XhsNote, "note_id", self._content_row(content_item))
 
-    async def add_content(self, session: AsyncSession, content_item: Dict):
-        add_ts = int(get_current_timestamp())
-        last_modify_ts = int(get_current_timestamp())
-        note = XhsNote(
+    @staticmethod
+    def _content_row(content_item: Dict) -> Dict:
+        return dict(
             user_id=content_item.get("user_id"),
             nickname=content_item.get("nickname"),
             avatar=content_item.get("avatar"),
             ip_location=content_item.get("ip_location"),
-            add_ts=add_ts,
-            last_modify_ts=last_modify_ts,
             note_id=content_item.get("note_id"),
             type=content_item.get("type"),
             title=content_item.get("title"),
@@ -120,51 +115,25 @@ class XhsDbStoreImplement(AbstractStore):
             tag_list=json.dumps(content_item.get("tag_list")),
             note_url=content_item.get("note_url"),
             source_keyword=content_item.get("source_keyword", ""),
-            xsec_token=content_item.get("xsec_token", "")
+            xsec_token=content_item.get("xsec_token", ""),
+            **engagement_metrics("xhs_note", content_item)
         )
-        session.add(note)
-
-    async def update_content(self, session: AsyncSession, content_item: Dict):
-        note_id = content_item.get("note_id")
-        last_modify_ts = int(get_current_timestamp())
-        update_data = {
-            "last_modify_ts": last_modify_ts,
-            "liked_count": str(content_item.get("liked_count")),
-            "collected_count": str(content_item.get("collected_count")),
-            "comment_count": str(content_item.get("comment_count")),
-            "share_count": str(content_item.get("share_count")),
-            "last_update_time": content_item.get("last_update_time"),
-        }
-        stmt = update(XhsNote).where(XhsNote.note_id == note_id).values(**update_data)
-        await session.execute(stmt)
-
-    async def content_is_exist(self, session: AsyncSession, note_id: str) -> bool:
-        stmt = select(XhsNote).where(XhsNote.note_id == note_id)
-        result = await session.execute(stmt)
-        return result.first() is not None
 
     async def store_comment(self, comment_item: Dict):
         if not comment_item:
             return
-        async with get_session() as session:
-            comment_id = comment_item.get("comment_id")
-            if not comment_id:
-                return
-            if await self.comment_is_exist(session, comment_id):
-                await self.update_comment(session, comment_item)
-            else:
-                await self.add_comment(session, comment_item)
+        comment_id = comment_item.get("comment_id")
+        if not comment_id:
+            return
+        await get_buffered_writer().add(XhsNoteComment, "comment_id", self._comment_row(comment_item))
 
-    async def add_comment(self, session: AsyncSession, comment_item: Dict):
-        add_ts = int(get_current_timestamp())
-        last_modify_ts = int(get_current_timestamp())
-        comment = XhsNoteComment(
+    @staticmethod
+    def _comment_row(comment_item: Dict) -> Dict:
+        return dict(
             user_id=comment_item.get("user_id"),
             nickname=comment_item.get("nickname"),
             avatar=comment_item.get("avatar"),
             ip_location=comment_item.get("ip_location"),
-            add_ts=add_ts,
-            last_modify_ts=last_modify_ts,
             comment_id=comment_item.get("comment_id"),
             create_time=comment_item.get("create_time"),
             note_id=comment_item.get("note_id"),
@@ -174,23 +143,6 @@ class XhsDbStoreImplement(AbstractStore):
             parent_comment_id=comment_item.get("parent_comment_id"),
             like_count=str(comment_item.get("like_count"))
         )
-        session.add(comment)
-
-    async def update_comment(self, session: AsyncSession, comment_item: Dict):
-        comment_id = comment_item.get("comment_id")
-        last_modify_ts = int(get_current_timestamp())
-        update_data = {
-            "last_modify_ts": last_modify_ts,
-            "like_count": str(comment_item.get("like_count")),
-            "sub_comment_count": comment_item.get("sub_comment_count"),
-        }
-        stmt = update(XhsNoteComment).where(XhsNoteComment.comment_id == comment_id).values(**update_data)
-        await session.execute(stmt)
-
-    async def comment_is_exist(self, session: AsyncSession, comment_id: str) -> bool:
-        stmt = select(XhsNoteComment).where(XhsNoteComment.comment_id == comment_id)
-        result = await session.execute(stmt)
-        return result.first() is not None
 
     async def store_creator(self, creator_item: Dict):
         user_id = creator_item.get("user_id")
@@ -243,12 +195,15 @@ class XhsDbStoreImplement(AbstractStore):
         return result.first() is not None
 
     async def get_all_content(self) -> List[Dict]:
+        # 先写完缓冲区，保证读到的是最新数据
+        await get_buffered_writer().flush()
         async with get_session() as session:
             stmt = select(XhsNote)
             result = await session.execute(stmt)
             return [item.__dict__ for item in result.scalars().all()]
 
     async def get_all_comments(self) -> List[Dict]:
+        await get_buffered_writer().flush()
         async with get_session() as session:
             stmt = select(XhsNoteComment)
             result = await session.execute(stmt)
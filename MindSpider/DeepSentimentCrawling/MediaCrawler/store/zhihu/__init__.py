@@ -28,6 +28,7 @@ class ZhihuStoreFactory:
         "csv": ZhihuCsvStoreImplement,
         "db": ZhihuDbStoreImplement,
         "json": ZhihuJsonStoreImplement,
+        "jsonl": ZhihuJsonStoreImplement,
         "sqlite": ZhihuSqliteStoreImplement,
         "postgresql": ZhihuDbStoreImplement,
     }
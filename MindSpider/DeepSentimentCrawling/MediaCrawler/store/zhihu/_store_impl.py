@@ -27,7 +27,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import config
 from base.base_crawler import AbstractStore
 from database.db_session import get_session
+from database.buffered_writer import get_buffered_writer
 from database.models import ZhihuContent, ZhihuComment, ZhihuCreator
+from database.engagement import fill_engagement_metrics
 from tools import utils, words
 from var import crawler_type_var
 from tools.async_file_writer import AsyncFileWriter
@@ -93,18 +95,8 @@ class ZhihuDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
-        content_id = content_item.get("content_id")
-        async with get_session() as session:
-            stmt = select(ZhihuContent).where(ZhihuContent.content_id == content_id)
-            result = await session.execute(stmt)
-            existing_content = result.scalars().first()
-            if existing_content:
-                for key, value in content_item.items():
-                    setattr(existing_content, key, value)
-            else:
-                new_content = ZhihuContent(**content_item)
-                session.add(new_content)
-            await session.commit()
+        fill_engagement_metrics("zhihu_content", content_item)
+        await get_buffered_writer().add(ZhihuContent, "content_id", content_item)
 
     async def store_comment(self, comment_item: Dict):
         """
@@ -112,18 +104,7 @@ class ZhihuDbStoreImplement(AbstractStore):
         Args:
             comment_item: comment item dict
         """
-        comment_id = comment_item.get("comment_id")
-        async with get_session() as session:
-            stmt = select(ZhihuComment).where(ZhihuComment.comment_id == comment_id)
-            result = await session.execute(stmt)
-            existing_comment = result.scalars().first()
-            if existing_comment:
-                for key, value in comment_item.items():
-                    setattr(existing_comment, key, value)
-            else:
-                new_comment = ZhihuComment(**comment_item)
-                session.add(new_comment)
-            await session.commit()
+        await get_buffered_writer().add(ZhihuComment, "comment_id", comment_item)
 
     async def store_creator(self, creator: Dict):
         """
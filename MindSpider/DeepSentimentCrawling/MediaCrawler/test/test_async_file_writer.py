@@ -0,0 +1,98 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : jsonl 追加写入与格式转换测试
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import config
+from tools import async_file_writer
+from tools.async_file_writer import AsyncFileWriter, close_jsonl_files, convert_jsonl_to_json, iter_json_items
+
+
+class TestJsonlWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin_cwd = os.getcwd()
+        self.origin_option = config.SAVE_DATA_OPTION
+        os.chdir(self.tmp_dir.name)
+        config.SAVE_DATA_OPTION = "jsonl"
+        self.items = [{"comment_id": str(i), "content": f"评论{i}", "pictures": [i]} for i in range(5)]
+
+    def tearDown(self):
+        close_jsonl_files()
+        config.SAVE_DATA_OPTION = self.origin_option
+        os.chdir(self.origin_cwd)
+        self.tmp_dir.cleanup()
+
+    def write_items(self):
+        writer = AsyncFileWriter(platform="wb", crawler_type="search")
+
+        async def run():
+            for item in self.items:
+                await writer.write_single_item_to_json(item, "comments")
+
+        asyncio.run(run())
+        close_jsonl_files()
+        return writer._get_file_path("jsonl", "comments")
+
+    def test_append_one_line_per_item(self):
+        path = self.write_items()
+        with open(path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.items)
+
+    def test_fsync_runs_off_event_loop_thread(self):
+        fsync_threads = []
+        real_fsync = os.fsync
+
+        def record_fsync(fd):
+            fsync_threads.append(threading.current_thread())
+            real_fsync(fd)
+
+        loop_threads = []
+        writer = AsyncFileWriter(platform="wb", crawler_type="search")
+
+        async def run():
+            loop_threads.append(threading.current_thread())
+            for item in self.items:
+                await writer.write_single_item_to_json(item, "comments")
+
+        with mock.patch.object(config, "JSONL_FSYNC_EVERY_ITEMS", 1), \
+                mock.patch.object(async_file_writer.os, "fsync", record_fsync):
+            asyncio.run(run())
+
+        self.assertEqual(len(fsync_threads), len(self.items))
+        self.assertNotIn(loop_threads[0], fsync_threads)
+
+    def test_convert_matches_legacy_json_format(self):
+        path = self.write_items()
+        output = convert_jsonl_to_json(path, os.path.join(self.tmp_dir.name, "out.json"))
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(f.read(), json.dumps(self.items, ensure_ascii=False, indent=4))
+
+    def test_iter_json_items_streams_legacy_array(self):
+        path = os.path.join(self.tmp_dir.name, "legacy.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.items, ensure_ascii=False, indent=4))
+        self.assertEqual(list(iter_json_items(path, chunk_size=8)), self.items)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 批量写入缓冲区测试（使用临时 sqlite 库）
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import config
+from config.db_config import sqlite_db_config
+from database import db_session
+from database.buffered_writer import BufferedUpsertWriter
+from database.models import BilibiliVideo, DouyinAweme, WeiboNoteComment
+
+
+class TestBufferedUpsertWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "test.db")
+        self._origin = (config.SAVE_DATA_OPTION, sqlite_db_config["db_path"])
+        config.SAVE_DATA_OPTION = "sqlite"
+        sqlite_db_config["db_path"] = self.db_path
+        db_session._engines.pop("sqlite", None)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(db_session.create_tables("sqlite"))
+
+    def tearDown(self):
+        engine = db_session._engines.pop("sqlite", None)
+        if engine is not None:
+            self.loop.run_until_complete(engine.dispose())
+        self.loop.close()
+        config.SAVE_DATA_OPTION, sqlite_db_config["db_path"] = self._origin
+        self.tmp_dir.cleanup()
+
+    def query(self, sql):
+        with sqlite3.connect(self.db_path) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_flush_on_batch_size(self):
+        writer = BufferedUpsertWriter(batch_size=2, flush_interval=60)
+
+        async def run():
+            await writer.add(WeiboNoteComment, "comment_id", {"comment_id": "1", "content": "a"})
+            self.assertEqual(writer.pending_count(), 1)
+            await writer.add(WeiboNoteComment, "comment_id", {"comment_id": "2", "content": "b"})
+            self.assertEqual(writer.pending_count(), 0)
+            await writer.close()
+
+        self.loop.run_until_complete(run())
+        self.assertEqual(self.query("select count(*) from weibo_note_comment"), [(2,)])
+
+    def test_upsert_updates_existing_rows(self):
+        writer = BufferedUpsertWriter(batch_size=100, flush_interval=60)
+
+        async def run():
+            await writer.add(WeiboNoteComment, "comment_id", {"comment_id": "1", "content": "old"})
+            await writer.add(BilibiliVideo, "video_id", {"video_id": 7, "video_url": "u", "title": "old"})
+            await writer.flush()
+            await writer.add(WeiboNoteComment, "comment_id", {"comment_id": "1", "content": "new"})
+            await writer.add(WeiboNoteComment, "comment_id", {"comment_id": "2", "content": "other"})
+            await writer.add(BilibiliVideo, "video_id", {"video_id": 7, "video_url": "u", "title": "new"})
+            await writer.close()
+
+        self.loop.run_until_complete(run())
+        self.assertEqual(
+            self.query("select comment_id, content from weibo_note_comment order by id"),
+            [(1, "new"), (2, "other")],
+        )
+        self.assertEqual(self.query("select video_id, title from bilibili_video"), [(7, "new")])
+
+    def test_not_insertable_rows_are_skipped(self):
+        writer = BufferedUpsertWriter(batch_size=100, flush_interval=60)
+
+        async def run():
+            await writer.add(DouyinAweme, "aweme_id", {"aweme_id": 1, "desc": "no title"}, insertable=False)
+            await writer.close()
+
+        self.loop.run_until_complete(run())
+        self.assertEqual(self.query("select count(*) from douyin_aweme"), [(0,)])
+
+    def test_periodic_flush(self):
+        writer = BufferedUpsertWriter(batch_size=100, flush_interval=0.1)
+
+        async def run():
+            await writer.add(WeiboNoteComment, "comment_id", {"comment_id": "1", "content": "a"})
+            await asyncio.sleep(0.5)
+            self.assertEqual(writer.pending_count(), 0)
+            await writer.close()
+
+        self.loop.run_until_complete(run())
+        self.assertEqual(self.query("select count(*) from weibo_note_comment"), [(1,)])
+
+
+if __name__ == '__main__':
+    unittest.main()
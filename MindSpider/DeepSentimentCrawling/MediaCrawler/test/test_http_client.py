@@ -0,0 +1,79 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 共享 httpx 连接池测试
+
+import asyncio
+import unittest
+
+import httpx
+
+from tools.http_client import PooledHttpClient
+
+
+class TestPooledHttpClient(unittest.TestCase):
+
+    def test_reuse_client_until_proxy_changes(self):
+        async def run():
+            pool = PooledHttpClient()
+            first = pool.get(None)
+            self.assertIs(pool.get(None), first)
+            second = pool.get("http://127.0.0.1:8888")
+            self.assertIsNot(second, first)
+            self.assertFalse(first.is_closed)
+            await pool.aclose()
+            self.assertTrue(first.is_closed)
+            self.assertTrue(second.is_closed)
+
+        asyncio.run(run())
+
+    def test_retired_client_closed_after_in_flight_requests(self):
+        async def run():
+            pool = PooledHttpClient()
+            async with pool.acquire(None) as first:
+                async with pool.acquire("http://127.0.0.1:8888") as second:
+                    # 代理切换时旧 client 仍有在途请求，不关闭
+                    self.assertIsNot(second, first)
+                    self.assertFalse(first.is_closed)
+                self.assertFalse(first.is_closed)
+            self.assertTrue(first.is_closed)
+            self.assertFalse(second.is_closed)
+
+            # 替换时已无在途请求的 client 在下一次 acquire 时关闭，不会累积
+            async with pool.acquire(None) as third:
+                pass
+            self.assertTrue(second.is_closed)
+            self.assertEqual(pool._retired, [])
+            await pool.aclose()
+            self.assertTrue(third.is_closed)
+
+        asyncio.run(run())
+
+    def test_response_cookies_are_not_stored(self):
+        def handler(request: httpx.Request):
+            return httpx.Response(200, headers={"Set-Cookie": "a=b; Path=/"}, text=request.headers.get("Cookie", ""))
+
+        async def run():
+            pool = PooledHttpClient()
+            client = pool.get(None)
+            client._transport = httpx.MockTransport(handler)
+            await client.get("http://example.com/")
+            response = await client.get("http://example.com/", headers={"Cookie": "web_session=1"})
+            self.assertEqual(len(client.cookies), 0)
+            self.assertEqual(response.text, "web_session=1")
+            await pool.aclose()
+
+        asyncio.run(run())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,176 @@
+import argparse
 import asyncio
+import atexit
 import csv
+import itertools
 import json
 import os
 import pathlib
-from typing import Dict, List
+import threading
+import time
+from typing import Dict, Iterator, Optional
 import aiofiles
 import config
 from tools.utils import utils
 from tools.words import AsyncWordCloudGenerator
 
+
+class _JsonlAppender:
+    """
+    单个 jsonl 文件的追加句柄：每条数据追加一行并 flush 到操作系统，
+    按条数/时间批量 fsync，避免每条都落盘带来的开销
+    所有方法都是阻塞调用，异步代码中通过 asyncio.to_thread 调用，不占用事件循环
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, line: str):
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if (self._unsynced >= config.JSONL_FSYNC_EVERY_ITEMS
+                    or time.monotonic() - self._last_sync >= config.JSONL_FSYNC_INTERVAL):
+                self._sync()
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            if self._unsynced:
+                self._sync()
+            self._file.close()
+
+
+# 同一进程内各 store 实例共享的 jsonl 句柄 {file_path: _JsonlAppender}
+_jsonl_appenders: Dict[str, _JsonlAppender] = {}
+_jsonl_appenders_lock = threading.Lock()
+
+
+def _get_jsonl_appender(file_path: str) -> _JsonlAppender:
+    with _jsonl_appenders_lock:
+        appender = _jsonl_appenders.get(file_path)
+        if appender is None:
+            appender = _JsonlAppender(file_path)
+            _jsonl_appenders[file_path] = appender
+        return appender
+
+
+def _append_jsonl_line(file_path: str, line: str):
+    _get_jsonl_appender(file_path).append(line)
+
+
+def close_jsonl_files():
+    """fsync 并关闭所有 jsonl 句柄（程序退出时自动调用）"""
+    with _jsonl_appenders_lock:
+        appenders = list(_jsonl_appenders.values())
+        _jsonl_appenders.clear()
+    for appender in appenders:
+        appender.close()
+
+
+atexit.register(close_jsonl_files)
+
+
+def iter_json_items(file_path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
+    """
+    流式读取数据文件中的每一条记录，兼容 jsonl（每行一条）和旧版 JSON 数组格式
+    Args:
+        file_path: 文件路径
+        chunk_size: 读取 JSON 数组时每次读入的字符数
+
+    Returns:
+        记录迭代器
+    """
+    if file_path.endswith('.jsonl'):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程被强制结束时最后一行可能不完整
+                    utils.logger.warning(f"[iter_json_items] skip broken line in {file_path}")
+        return
+
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        started = False
+        eof = False
+        while True:
+            buffer = buffer.lstrip(' \t\r\n,')
+            if not started:
+                if not buffer and not eof:
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buffer += chunk
+                    continue
+                if not buffer.startswith('['):
+                    # 单个对象而不是数组
+                    buffer += f.read()
+                    if buffer.strip():
+                        yield json.loads(buffer)
+                    return
+                buffer = buffer[1:]
+                started = True
+                continue
+            if buffer.startswith(']') or (eof and not buffer):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield item
+            buffer = buffer[end:]
+
+
+def convert_jsonl_to_json(jsonl_path: str, json_path: Optional[str] = None) -> str:
+    """
+    把 jsonl 文件转换为旧版 JSON 数组格式（与 write_single_item_to_json 的输出一致），逐条写出不占用额外内存
+    Args:
+        jsonl_path: jsonl 文件路径
+        json_path: 输出路径，默认同名 .json 放到 json 目录下
+
+    Returns:
+        输出文件路径
+    """
+    if json_path is None:
+        source = pathlib.Path(jsonl_path)
+        target_dir = source.parent.parent / 'json' if source.parent.name == 'jsonl' else source.parent
+        target_dir.mkdir(parents=True, exist_ok=True)
+        json_path = str(target_dir / f"{source.stem}.json")
+
+    count = 0
+    with open(json_path, 'w', encoding='utf-8') as out:
+        out.write('[')
+        for item in iter_json_items(jsonl_path):
+            body = json.dumps(item, ensure_ascii=False, indent=4).replace('\n', '\n    ')
+            out.write(('\n    ' if count == 0 else ',\n    ') + body)
+            count += 1
+        out.write('\n]' if count else ']')
+    utils.logger.info(f"[convert_jsonl_to_json] {count} items written to {json_path}")
+    return json_path
+
+
 class AsyncFileWriter:
     def __init__(self, platform: str, crawler_type: str):
         self.lock = asyncio.Lock()
@@ -33,6 +195,9 @@ class AsyncFileWriter:
                 await writer.writerow(item)
 
     async def write_single_item_to_json(self, item: Dict, item_type: str):
+        if config.SAVE_DATA_OPTION == 'jsonl':
+            await self.write_single_item_to_jsonl(item, item_type)
+            return
         file_path = self._get_file_path('json', item_type)
         async with self.lock:
             existing_data = []
@@ -46,12 +211,22 @@ class AsyncFileWriter:
                             existing_data = [existing_data]
                     except json.JSONDecodeError:
                         existing_data = []
-            
+
             existing_data.append(item)
 
             async with aiofiles.open(file_path, 'w', encoding='utf-8') as f:
                 await f.write(json.dumps(existing_data, ensure_ascii=False, indent=4))
 
+    async def write_single_item_to_jsonl(self, item: Dict, item_type: str):
+        """
+        以 JSON Lines 格式追加一条数据，每条只写一行，不再重读和重写整个文件
+        需要旧版 JSON 数组格式时可用 convert_jsonl_to_json 转换
+        """
+        file_path = self._get_file_path('jsonl', item_type)
+        line = json.dumps(item, ensure_ascii=False) + '\n'
+        # 打开文件、写入、flush 和定期 fsync 都是阻塞操作，放到线程中执行，避免卡住爬虫的事件循环
+        await asyncio.to_thread(_append_jsonl_line, file_path, line)
+
     async def generate_wordcloud_from_comments(self):
         """
         Generate wordcloud from comments data
@@ -64,33 +239,26 @@ class AsyncFileWriter:
             return
 
         try:
-            # Read comments from JSON file
-            comments_file_path = self._get_file_path('json', 'comments')
+            # Read comments from the JSON Lines file, or the legacy JSON array file
+            file_type = 'jsonl' if config.SAVE_DATA_OPTION == 'jsonl' else 'json'
+            comments_file_path = self._get_file_path(file_type, 'comments')
             if not os.path.exists(comments_file_path) or os.path.getsize(comments_file_path) == 0:
                 utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No comments file found at {comments_file_path}")
                 return
 
-            async with aiofiles.open(comments_file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-                if not content:
-                    utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Comments file is empty")
-                    return
-
-                comments_data = json.loads(content)
-                if not isinstance(comments_data, list):
-                    comments_data = [comments_data]
-
-            # Filter comments data to only include 'content' field
+            # Stream comment texts instead of loading the whole file
             # Handle different comment data structures across platforms
-            filtered_data = []
-            for comment in comments_data:
-                if isinstance(comment, dict):
-                    # Try different possible content field names
-                    content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
-                    if content_text:
-                        filtered_data.append({'content': content_text})
-
-            if not filtered_data:
+            def iter_comment_texts():
+                for comment in iter_json_items(comments_file_path):
+                    if isinstance(comment, dict):
+                        # Try different possible content field names
+                        content_text = comment.get('content') or comment.get('comment_text') or comment.get('text') or ''
+                        if content_text:
+                            yield content_text
+
+            comment_texts = iter_comment_texts()
+            first_text = next(comment_texts, None)
+            if first_text is None:
                 utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] No valid comment content found")
                 return
 
@@ -99,9 +267,20 @@ class AsyncFileWriter:
             pathlib.Path(words_base_path).mkdir(parents=True, exist_ok=True)
             words_file_prefix = f"{words_base_path}/{self.crawler_type}_comments_{utils.get_current_date()}"
 
-            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Generating wordcloud from {len(filtered_data)} comments")
-            await self.wordcloud_generator.generate_word_frequency_and_cloud(filtered_data, words_file_prefix)
+            utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Generating wordcloud from {comments_file_path}")
+            await self.wordcloud_generator.generate_word_frequency_and_cloud_from_texts(
+                itertools.chain([first_text], comment_texts), words_file_prefix
+            )
             utils.logger.info(f"[AsyncFileWriter.generate_wordcloud_from_comments] Wordcloud generated successfully at {words_file_prefix}")
 
         except Exception as e:
-            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
\ No newline at end of file
+            utils.logger.error(f"[AsyncFileWriter.generate_wordcloud_from_comments] Error generating wordcloud: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Convert JSON Lines data files to the legacy JSON array format")
+    parser.add_argument("files", nargs="+", help="data/<platform>/jsonl/*.jsonl")
+    parser.add_argument("--output", default=None, help="output path, only valid with a single input file")
+    args = parser.parse_args()
+    for path in args.files:
+        convert_jsonl_to_json(path, args.output if len(args.files) == 1 else None)
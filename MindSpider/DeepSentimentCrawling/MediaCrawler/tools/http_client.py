@@ -0,0 +1,144 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 各平台 API client 共享的长连接 httpx.AsyncClient
+#            每个平台 client 持有一个带连接池的 AsyncClient，复用 TCP/TLS 连接（keep-alive，可选 HTTP/2），
+#            代理变化时重建，被替换的 client 在途请求结束后关闭，爬虫 close() 时关闭全部。
+from contextlib import asynccontextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+import config
+from tools import utils
+
+_http2_available: Optional[bool] = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 依赖 h2 包（pip install httpx[http2]），未安装时回退到 HTTP/1.1"""
+    global _http2_available
+    if not config.HTTPX_ENABLE_HTTP2:
+        return False
+    if _http2_available is None:
+        try:
+            import h2  # noqa: F401
+            _http2_available = True
+        except ImportError:
+            utils.logger.warning("[http_client] HTTPX_ENABLE_HTTP2 is on but h2 is not installed, falling back to HTTP/1.1")
+            _http2_available = False
+    return _http2_available
+
+
+class _RejectAllCookiePolicy(DefaultCookiePolicy):
+    """
+    不保存响应中的 Set-Cookie：各平台 client 通过请求头显式携带登录态 Cookie，
+    共享的 AsyncClient 若累积 cookie 会覆盖显式的 Cookie 请求头，与原先每次新建 client 的行为不一致
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def create_pooled_http_client(proxy: Optional[str] = None) -> httpx.AsyncClient:
+    """
+    创建带连接池的 httpx.AsyncClient
+    Args:
+        proxy: httpx 代理地址
+
+    Returns:
+        httpx.AsyncClient
+    """
+    limits = httpx.Limits(
+        max_connections=config.HTTPX_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTPX_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTPX_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        proxy=proxy,
+        limits=limits,
+        http2=_http2_enabled(),
+        cookies=CookieJar(policy=_RejectAllCookiePolicy()),
+    )
+
+
+class PooledHttpClient:
+    """按当前代理维护一个共享的 AsyncClient，代理变化时重建"""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._proxy: Optional[str] = None
+        # 代理切换后被替换下来的 client，可能仍有请求在途，在途数归零后关闭
+        self._retired: List[httpx.AsyncClient] = []
+        # 通过 acquire 取得、尚未归还的 client 及其在途请求数
+        self._in_flight: Dict[httpx.AsyncClient, int] = {}
+
+    def get(self, proxy: Optional[str] = None) -> httpx.AsyncClient:
+        """
+        获取与 proxy 对应的共享 client（不计入在途请求，发起请求请使用 acquire）
+        Args:
+            proxy: 当前使用的代理，与上次不同时重建 client
+
+        Returns:
+            httpx.AsyncClient
+        """
+        if self._client is not None and not self._client.is_closed and self._proxy == proxy:
+            return self._client
+        if self._client is not None and not self._client.is_closed:
+            utils.logger.info("[PooledHttpClient.get] proxy changed, rebuilding http client")
+            self._retired.append(self._client)
+        self._client = create_pooled_http_client(proxy)
+        self._proxy = proxy
+        return self._client
+
+    @asynccontextmanager
+    async def acquire(self, proxy: Optional[str] = None) -> AsyncIterator[httpx.AsyncClient]:
+        """
+        取得与 proxy 对应的共享 client 并在上下文内计为在途，
+        退出时被替换下来且已无在途请求的 client 立即关闭，长时间频繁切换代理也不会累积连接池
+        Args:
+            proxy: 当前使用的代理
+
+        Returns:
+            httpx.AsyncClient
+        """
+        client = self.get(proxy)
+        self._in_flight[client] = self._in_flight.get(client, 0) + 1
+        try:
+            await self._close_idle_retired()
+            yield client
+        finally:
+            remaining = self._in_flight.pop(client) - 1
+            if remaining > 0:
+                self._in_flight[client] = remaining
+            await self._close_idle_retired()
+
+    async def _close_idle_retired(self):
+        """关闭已无在途请求的被替换 client"""
+        idle = [client for client in self._retired if client not in self._in_flight]
+        if not idle:
+            return
+        self._retired = [client for client in self._retired if client in self._in_flight]
+        for client in idle:
+            if not client.is_closed:
+                await client.aclose()
+
+    async def aclose(self):
+        """关闭当前及被替换下来的 client"""
+        clients = self._retired + ([self._client] if self._client is not None else [])
+        self._client = None
+        self._retired = []
+        self._in_flight = {}
+        for client in clients:
+            if not client.is_closed:
+                await client.aclose()
@@ -41,9 +41,13 @@ class AsyncWordCloudGenerator:
             return set(f.read().strip().split('\n'))
 
     async def generate_word_frequency_and_cloud(self, data, save_words_prefix):
-        all_text = ' '.join(item['content'] for item in data)
-        words = [word for word in jieba.lcut(all_text) if word not in self.stop_words and len(word.strip()) > 0]
-        word_freq = Counter(words)
+        await self.generate_word_frequency_and_cloud_from_texts((item['content'] for item in data), save_words_prefix)
+
+    async def generate_word_frequency_and_cloud_from_texts(self, texts, save_words_prefix):
+        """逐条分词累计词频，texts 可以是流式读取文件的迭代器，无需把全部评论载入内存"""
+        word_freq = Counter()
+        for text in texts:
+            word_freq.update(word for word in jieba.lcut(text) if word not in self.stop_words and len(word.strip()) > 0)
 
         # Save word frequency to file
         freq_file = f"{save_words_prefix}_word_freq.json"
@@ -10,7 +10,7 @@
 """
 
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String, BigInteger, Text, ForeignKey
+from sqlalchemy import Integer, String, BigInteger, Text, ForeignKey, Float
 
 # 使用 models_sa 中的 Base，确保所有表在同一个 metadata 中，外键引用可以正常工作
 from models_sa import Base
@@ -41,6 +41,13 @@ class BilibiliVideo(Base):
     source_keyword: Mapped[str | None] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 规整后的互动数与热度分，见 MediaCrawler/database/engagement.py
+    like_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[float | None] = mapped_column(Float, index=True, nullable=True)
 
 class BilibiliVideoComment(Base):
     __tablename__ = "bilibili_video_comment"
@@ -138,6 +145,12 @@ class DouyinAweme(Base):
     source_keyword: Mapped[str | None] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 规整后的互动数与热度分，见 MediaCrawler/database/engagement.py
+    like_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[float | None] = mapped_column(Float, index=True, nullable=True)
 
 class DouyinAwemeComment(Base):
     __tablename__ = "douyin_aweme_comment"
@@ -200,6 +213,10 @@ class KuaishouVideo(Base):
     source_keyword: Mapped[str | None] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 规整后的互动数与热度分，见 MediaCrawler/database/engagement.py
+    like_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[float | None] = mapped_column(Float, index=True, nullable=True)
 
 class KuaishouVideoComment(Base):
     __tablename__ = "kuaishou_video_comment"
@@ -237,6 +254,11 @@ class WeiboNote(Base):
     source_keyword: Mapped[str | None] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 规整后的互动数与热度分，见 MediaCrawler/database/engagement.py
+    like_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[float | None] = mapped_column(Float, index=True, nullable=True)
 
 class WeiboNoteComment(Base):
     __tablename__ = "weibo_note_comment"
@@ -319,6 +341,12 @@ class XhsNote(Base):
     xsec_token: Mapped[str | None] = mapped_column(Text, nullable=True)
     topic_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 规整后的互动数与热度分，见 MediaCrawler/database/engagement.py
+    like_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[float | None] = mapped_column(Float, index=True, nullable=True)
 
 
 class XhsNoteComment(Base):
@@ -423,6 +451,10 @@ class ZhihuContent(Base):
     last_modify_ts: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
     topic_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[str | None] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 规整后的互动数与热度分，见 MediaCrawler/database/engagement.py
+    like_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[int | None] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[float | None] = mapped_column(Float, index=True, nullable=True)
 
 class ZhihuComment(Base):
     __tablename__ = "zhihu_comment"
@@ -20,10 +20,13 @@ from .nodes import (
 )
 from .state import State
 from .tools import TavilyNewsAgency, TavilyResponse
-from .utils import Settings, format_search_results_for_prompt
+from search_cache import get_search_cache  # utils目录已由 .tools 加入 sys.path
+from paragraph_research import ParagraphResearchMixin
+from .utils import Settings, format_search_results_for_prompt, pack_search_results_for_prompt
+from .utils import DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET
 from loguru import logger
 
-class DeepSearchAgent:
+class DeepSearchAgent(ParagraphResearchMixin):
     """Deep Search Agent主类"""
     
     def __init__(self, config: Optional[Settings] = None):
@@ -46,6 +49,9 @@ class DeepSearchAgent:
         # 初始化节点
         self._initialize_nodes()
         
+        # 段落并发研究配置与在途LLM/搜索调用上限
+        self._init_concurrency_limits()
+        
         # 状态
         self.state = State()
         
@@ -72,6 +78,30 @@ class DeepSearchAgent:
         self.reflection_summary_node = ReflectionSummaryNode(self.llm_client)
         self.report_formatting_node = ReportFormattingNode(self.llm_client)
     
+    def _pack_search_results(self, search_results: List[Dict[str, Any]]) -> List[str]:
+        """
+        按token预算打包搜索结果（去重、按score排序、超出预算的结果截断或丢弃）
+        
+        配置项 SEARCH_RESULTS_TOKEN_BUDGET 未配置时使用默认预算，配置为0或负数时
+        退回逐条截断、不限总量的格式化方式
+        """
+        token_budget = getattr(self.config, 'SEARCH_RESULTS_TOKEN_BUDGET', None)
+        if token_budget is None:
+            token_budget = DEFAULT_SEARCH_RESULTS_TOKEN_BUDGET
+        if token_budget <= 0:
+            return format_search_results_for_prompt(search_results, self.config.SEARCH_CONTENT_MAX_LENGTH)
+        
+        packed, stats = pack_search_results_for_prompt(
+            search_results, token_budget, self.config.SEARCH_CONTENT_MAX_LENGTH
+        )
+        if stats['duplicates'] or stats['dropped'] or stats['truncated']:
+            logger.info(
+                f"  - 搜索结果打包: 保留 {stats['kept']}/{stats['total']} 条，"
+                f"去重 {stats['duplicates']} 条，超出预算丢弃 {stats['dropped']} 条、截断 {stats['truncated']} 条，"
+                f"约 {stats['tokens_used']}/{token_budget} tokens（舍弃约 {stats['tokens_dropped']} tokens）"
+            )
+        return packed
+    
     def _validate_date_format(self, date_str: str) -> bool:
         """
         验证日期格式是否为YYYY-MM-DD
@@ -153,6 +183,9 @@ class DeepSearchAgent:
         logger.info(f"开始深度研究: {query}")
         logger.info(f"{'='*60}")
         
+        # 每次研究单独统计搜索缓存命中情况
+        get_search_cache().reset_stats()
+        
         try:
             # Step 1: 生成报告结构
             self._generate_report_structure(query)
@@ -167,6 +200,11 @@ class DeepSearchAgent:
             if save_report:
                 self._save_report(final_report)
             
+            search_stats = get_search_cache().get_stats()
+            logger.info(
+                f"搜索缓存: 命中 {search_stats['hits']} 次（其中共享文件 {search_stats['store_hits']} 次）, "
+                f"未命中 {search_stats['misses']} 次, 命中率 {search_stats['hit_rate']:.1%}"
+            )
             logger.info(f"\n{'='*60}")
             logger.info("深度研究完成！")
             logger.info(f"{'='*60}")
@@ -194,26 +232,6 @@ class DeepSearchAgent:
             _message += f"\n  {i}. {paragraph.title}"
         logger.info(_message)
     
-    def _process_paragraphs(self):
-        """处理所有段落"""
-        total_paragraphs = len(self.state.paragraphs)
-        
-        for i in range(total_paragraphs):
-            logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
-            logger.info("-" * 50)
-            
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
-            
-            # 反思循环
-            self._reflection_loop(i)
-            
-            # 标记段落完成
-            self.state.paragraphs[i].research.mark_completed()
-            
-            progress = (i + 1) / total_paragraphs * 100
-            logger.info(f"段落处理完成 ({progress:.1f}%)")
-    
     def _initial_search_and_summary(self, paragraph_index: int):
         """执行初始搜索和总结"""
         paragraph = self.state.paragraphs[paragraph_index]
@@ -226,7 +244,8 @@ class DeepSearchAgent:
         
         # 生成搜索查询和工具选择
         logger.info("  - 生成搜索查询...")
-        search_output = self.first_search_node.run(search_input)
+        with self._llm_slots:
+            search_output = self.first_search_node.run(search_input)
         search_query = search_output["search_query"]
         search_tool = search_output.get("search_tool", "basic_search_news")  # 默认工具
         reasoning = search_output["reasoning"]
@@ -258,7 +277,8 @@ class DeepSearchAgent:
                 logger.info(f"  ⚠️  search_news_by_date工具缺少时间参数，改用基础搜索")
                 search_tool = "basic_search_news"
         
-        search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+        with self._search_slots:
+            search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
         
         # 转换为兼容格式
         search_results = []
@@ -292,15 +312,14 @@ class DeepSearchAgent:
             "title": paragraph.title,
             "content": paragraph.content,
             "search_query": search_query,
-            "search_results": format_search_results_for_prompt(
-                search_results, self.config.SEARCH_CONTENT_MAX_LENGTH
-            )
+            "search_results": self._pack_search_results(search_results)
         }
         
         # 更新状态
-        self.state = self.first_summary_node.mutate_state(
-            summary_input, self.state, paragraph_index
-        )
+        with self._llm_slots:
+            self.state = self.first_summary_node.mutate_state(
+                summary_input, self.state, paragraph_index
+            )
         
         logger.info("  - 初始总结完成")
     
@@ -319,7 +338,8 @@ class DeepSearchAgent:
             }
             
             # 生成反思搜索查询
-            reflection_output = self.reflection_node.run(reflection_input)
+            with self._llm_slots:
+                reflection_output = self.reflection_node.run(reflection_input)
             search_query = reflection_output["search_query"]
             search_tool = reflection_output.get("search_tool", "basic_search_news")  # 默认工具
             reasoning = reflection_output["reasoning"]
@@ -349,7 +369,8 @@ class DeepSearchAgent:
                     logger.info(f"    ⚠️  search_news_by_date工具缺少时间参数，改用基础搜索")
                     search_tool = "basic_search_news"
             
-            search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+            with self._search_slots:
+                search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
             
             # 转换为兼容格式
             search_results = []
@@ -382,16 +403,15 @@ class DeepSearchAgent:
                 "title": paragraph.title,
                 "content": paragraph.content,
                 "search_query": search_query,
-                "search_results": format_search_results_for_prompt(
-                    search_results, self.config.SEARCH_CONTENT_MAX_LENGTH
-                ),
+                "search_results": self._pack_search_results(search_results),
                 "paragraph_latest_state": paragraph.research.latest_summary
             }
             
             # 更新状态
-            self.state = self.reflection_summary_node.mutate_state(
-                reflection_summary_input, self.state, paragraph_index
-            )
+            with self._llm_slots:
+                self.state = self.reflection_summary_node.mutate_state(
+                    reflection_summary_input, self.state, paragraph_index
+                )
             
             logger.info(f"    反思 {reflection_i + 1} 完成")
     
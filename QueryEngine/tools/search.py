@@ -33,6 +33,7 @@ if utils_dir not in sys.path:
     sys.path.append(utils_dir)
 
 from retry_helper import with_graceful_retry, SEARCH_API_RETRY_CONFIG
+from search_cache import cached_search
 from dataclasses import dataclass, field
 
 # 运行前请确保已安装Tavily库: pip install tavily-python
@@ -72,6 +73,11 @@ class TavilyResponse:
     response_time: Optional[float] = None
 
 
+def _is_cacheable(response: TavilyResponse) -> bool:
+    """只缓存有内容的响应，搜索失败时返回的空响应不缓存"""
+    return bool(response.results or response.images or response.answer)
+
+
 # --- 2. 核心客户端与专用工具集 ---
 
 class TavilyNewsAgency:
@@ -124,6 +130,7 @@ class TavilyNewsAgency:
 
     # --- Agent 可用的工具方法 ---
 
+    @cached_search("tavily", cacheable=_is_cacheable)
     def basic_search_news(self, query: str, max_results: int = 7) -> TavilyResponse:
         """
         【工具】基础新闻搜索: 执行一次标准、快速的新闻搜索。
@@ -138,6 +145,7 @@ class TavilyNewsAgency:
             include_answer=False
         )
 
+    @cached_search("tavily", cacheable=_is_cacheable)
     def deep_search_news(self, query: str) -> TavilyResponse:
         """
         【工具】深度新闻分析: 对一个主题进行最全面、最深入的搜索。
@@ -149,6 +157,7 @@ class TavilyNewsAgency:
             query=query, search_depth="advanced", max_results=20, include_answer="advanced"
         )
 
+    @cached_search("tavily", cacheable=_is_cacheable)
     def search_news_last_24_hours(self, query: str) -> TavilyResponse:
         """
         【工具】搜索24小时内新闻: 获取关于某个主题的最新动态。
@@ -158,6 +167,7 @@ class TavilyNewsAgency:
         print(f"--- TOOL: 搜索24小时内新闻 (query: {query}) ---")
         return self._search_internal(query=query, time_range='d', max_results=10)
 
+    @cached_search("tavily", cacheable=_is_cacheable)
     def search_news_last_week(self, query: str) -> TavilyResponse:
         """
         【工具】搜索本周新闻: 获取关于某个主题过去一周内的主要新闻报道。
@@ -167,6 +177,7 @@ class TavilyNewsAgency:
         print(f"--- TOOL: 搜索本周新闻 (query: {query}) ---")
         return self._search_internal(query=query, time_range='w', max_results=10)
 
+    @cached_search("tavily", cacheable=_is_cacheable)
     def search_images_for_news(self, query: str) -> TavilyResponse:
         """
         【工具】查找新闻图片: 搜索与某个新闻主题相关的图片。
@@ -178,6 +189,7 @@ class TavilyNewsAgency:
             query=query, include_images=True, include_image_descriptions=True, max_results=5
         )
 
+    @cached_search("tavily", cacheable=_is_cacheable)
     def search_news_by_date(self, query: str, start_date: str, end_date: str) -> TavilyResponse:
         """
         【工具】按指定日期范围搜索新闻: 在一个明确的历史时间段内搜索新闻。
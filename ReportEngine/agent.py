@@ -7,13 +7,14 @@ import json
 import os
 from loguru import logger
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 
 from .llms import LLMClient
 from .nodes import (
     TemplateSelectionNode,
     HTMLGenerationNode
 )
+from .nodes.html_generation_node import DEFAULT_SECTION_CONCURRENCY, DEFAULT_SECTION_SOURCE_CHARS, GenerationCancelled
 from .state import ReportState
 from .utils.config import settings, Settings
 
@@ -178,7 +179,9 @@ class ReportAgent:
         self.html_generation_node = HTMLGenerationNode(self.llm_client)
     
     def generate_report(self, query: str, reports: List[Any], forum_logs: str = "", 
-                       custom_template: str = "", save_report: bool = True) -> str:
+                       custom_template: str = "", save_report: bool = True,
+                       stream_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                       cancel_check: Optional[Callable[[], bool]] = None) -> str:
         """
         生成综合报告
         
@@ -188,6 +191,8 @@ class ReportAgent:
             forum_logs: 论坛日志内容
             custom_template: 用户自定义模板（可选）
             save_report: 是否保存报告到文件
+            stream_callback: 分章节生成时的流式回调，见 HTMLGenerationNode.run_sectioned
+            cancel_check: 返回True时在下一步骤或章节开始前抛出GenerationCancelled
             
         Returns:
             dict: 包含HTML内容与保存文件信息
@@ -206,9 +211,12 @@ class ReportAgent:
         try:
             # Step 1: 模板选择
             template_result = self._select_template(query, reports, forum_logs, custom_template)
+            if cancel_check and cancel_check():
+                raise GenerationCancelled("报告任务已取消")
             
             # Step 2: 直接生成HTML报告
-            html_report = self._generate_html_report(query, reports, forum_logs, template_result)
+            html_report = self._generate_html_report(query, reports, forum_logs, template_result,
+                                                     stream_callback, cancel_check)
             
             # Step 3: 保存报告
             saved_files = {}
@@ -227,6 +235,9 @@ class ReportAgent:
                 **saved_files
             }
             
+        except GenerationCancelled:
+            logger.info(f"报告生成已取消: {query}")
+            raise
         except Exception as e:
             logger.exception(f"报告生成过程中发生错误: {str(e)}")
             raise e
@@ -271,8 +282,17 @@ class ReportAgent:
             self.state.metadata.template_used = fallback_template['template_name']
             return fallback_template
     
-    def _generate_html_report(self, query: str, reports: List[Any], forum_logs: str, template_result: Dict[str, Any]) -> str:
-        """生成HTML报告"""
+    def _generate_html_report(self, query: str, reports: List[Any], forum_logs: str, template_result: Dict[str, Any],
+                              stream_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                              cancel_check: Optional[Callable[[], bool]] = None) -> str:
+        """
+        生成HTML报告
+        
+        配置项（未配置时使用默认值）：
+            REPORT_SECTIONED_GENERATION: 是否按模板章节并行生成，默认开启；关闭时整份报告单次生成
+            REPORT_SECTION_CONCURRENCY: 同时生成的章节数，默认4
+            REPORT_SECTION_SOURCE_CHARS: 每个章节发送的报告与论坛日志摘录总字符数，默认16000
+        """
         logger.info("多轮生成HTML报告...")
         
         # 准备报告内容，确保有3个报告
@@ -295,7 +315,15 @@ class ReportAgent:
         }
         
         # 使用HTML生成节点生成报告
-        html_content = self.html_generation_node.run(html_input)
+        if getattr(self.config, 'REPORT_SECTIONED_GENERATION', True):
+            max_workers = getattr(self.config, 'REPORT_SECTION_CONCURRENCY', None) or DEFAULT_SECTION_CONCURRENCY
+            source_chars = getattr(self.config, 'REPORT_SECTION_SOURCE_CHARS', None) or DEFAULT_SECTION_SOURCE_CHARS
+            html_content = self.html_generation_node.run_sectioned(
+                html_input, max_workers=max_workers, stream_callback=stream_callback,
+                cancel_check=cancel_check, source_chars=source_chars
+            )
+        else:
+            html_content = self.html_generation_node.run(html_input)
         
         # 更新状态
         self.state.html_content = html_content
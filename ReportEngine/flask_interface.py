@@ -3,15 +3,20 @@ Report Engine Flask接口
 提供HTTP API用于报告生成
 """
 
+import copy
 import os
 import json
-import threading
-import time
-from datetime import datetime
-from flask import Blueprint, request, jsonify, Response, send_file
+from flask import Blueprint, request, jsonify, Response, send_file, stream_with_context
 from typing import Dict, Any
 from loguru import logger
 from .agent import ReportAgent, create_agent
+from .task_queue import (
+    ReportTask,
+    ReportTaskQueue,
+    DEFAULT_WORKER_COUNT,
+    DEFAULT_RETENTION_HOURS,
+    DEFAULT_MAX_RETAINED_TASKS
+)
 from .utils.config import settings
 
 
@@ -20,15 +25,32 @@ report_bp = Blueprint('report_engine', __name__)
 
 # 全局变量
 report_agent = None
-current_task = None
-task_lock = threading.Lock()
+task_queue = None
+
+# SSE连接空闲时发送心跳的间隔（秒）
+STREAM_KEEPALIVE_INTERVAL = 15
 
 
 def initialize_report_engine():
-    """初始化Report Engine"""
-    global report_agent
+    """
+    初始化Report Engine
+
+    配置项（未配置时使用默认值）：
+        REPORT_WORKER_COUNT: 并行生成报告的工作线程数，默认2
+        REPORT_TASK_RETENTION_HOURS: 已结束任务的保留时间（小时），默认72
+        REPORT_TASK_MAX_RETAINED: 最多保留的已结束任务数，默认200
+    """
+    global report_agent, task_queue
     try:
         report_agent = create_agent()
+        if task_queue is None:
+            task_queue = ReportTaskQueue(
+                run_report_generation,
+                worker_count=getattr(settings, 'REPORT_WORKER_COUNT', None) or DEFAULT_WORKER_COUNT,
+                retention_hours=getattr(settings, 'REPORT_TASK_RETENTION_HOURS', None) or DEFAULT_RETENTION_HOURS,
+                max_retained=getattr(settings, 'REPORT_TASK_MAX_RETAINED', None) or DEFAULT_MAX_RETAINED_TASKS
+            )
+            task_queue.start()
         logger.info("Report Engine初始化成功")
         return True
     except Exception as e:
@@ -36,50 +58,9 @@ def initialize_report_engine():
         return False
 
 
-class ReportTask:
-    """报告生成任务"""
-
-    def __init__(self, query: str, task_id: str, custom_template: str = ""):
-        self.task_id = task_id
-        self.query = query
-        self.custom_template = custom_template
-        self.status = "pending"  # pending, running, completed, error
-        self.progress = 0
-        self.result = None
-        self.error_message = ""
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
-        self.html_content = ""
-        self.report_file_path = ""
-        self.report_file_relative_path = ""
-        self.report_file_name = ""
-        self.state_file_path = ""
-        self.state_file_relative_path = ""
-
-    def update_status(self, status: str, progress: int = None, error_message: str = ""):
-        """更新任务状态"""
-        self.status = status
-        if progress is not None:
-            self.progress = progress
-        if error_message:
-            self.error_message = error_message
-        self.updated_at = datetime.now()
-
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        return {
-            'task_id': self.task_id,
-            'query': self.query,
-            'status': self.status,
-            'progress': self.progress,
-            'error_message': self.error_message,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'has_result': bool(self.html_content),
-            'report_file_ready': bool(self.report_file_path),
-            'report_file_name': self.report_file_name,
-            'report_file_path': self.report_file_relative_path
-        }
+def get_task(task_id: str):
+    """按ID获取任务，任务队列未初始化时返回None"""
+    return task_queue.get(task_id) if task_queue else None
 
 
 def check_engines_ready() -> Dict[str, Any]:
@@ -106,55 +87,50 @@ def check_engines_ready() -> Dict[str, Any]:
     )
 
 
-def run_report_generation(task: ReportTask, query: str, custom_template: str = ""):
-    """在后台线程中运行报告生成"""
-    global current_task
-
-    try:
-        task.update_status("running", 10)
-
-        # 检查输入文件
-        check_result = check_engines_ready()
-        if not check_result['ready']:
-            task.update_status("error", 0, f"输入文件未准备就绪: {check_result.get('missing_files', [])}")
-            return
-
-        task.update_status("running", 30)
-
-        # 加载输入文件
-        content = report_agent.load_input_files(check_result['latest_files'])
-
-        task.update_status("running", 50)
-
-        # 生成报告
-        generation_result = report_agent.generate_report(
-            query=query,
-            reports=content['reports'],
-            forum_logs=content['forum_logs'],
-            custom_template=custom_template,
-            save_report=True
-        )
-
-        html_report = generation_result.get('html_content', '')
+def run_report_generation(task: ReportTask):
+    """在工作线程中运行报告生成"""
+    task.update_status("running", 10)
+
+    # 检查提交时确定的输入文件
+    missing_files = [name for name, path in task.input_files.items() if not os.path.exists(path)]
+    if not task.input_files or missing_files:
+        task.update_status("error", 0, f"输入文件未准备就绪: {missing_files}")
+        return
+
+    task.update_status("running", 30)
+
+    # 加载输入文件
+    content = report_agent.load_input_files(task.input_files)
+    if task.is_cancelled():
+        return
+
+    task.update_status("running", 50)
+
+    # 生成报告：ReportAgent在生成过程中把当前报告记录在self.state中，
+    # 每个任务使用浅拷贝的agent（共享LLM客户端与节点），避免并行任务互相覆盖状态
+    agent = copy.copy(report_agent)
+    generation_result = agent.generate_report(
+        query=task.query,
+        reports=content['reports'],
+        forum_logs=content['forum_logs'],
+        custom_template=task.custom_template,
+        save_report=True,
+        stream_callback=task.publish,
+        cancel_check=task.is_cancelled
+    )
 
-        task.update_status("running", 90)
+    html_report = generation_result.get('html_content', '')
 
-        # 保存结果
-        task.html_content = html_report
-        task.report_file_path = generation_result.get('report_filepath', '')
-        task.report_file_relative_path = generation_result.get('report_relative_path', '')
-        task.report_file_name = generation_result.get('report_filename', '')
-        task.state_file_path = generation_result.get('state_filepath', '')
-        task.state_file_relative_path = generation_result.get('state_relative_path', '')
-        task.update_status("completed", 100)
+    task.update_status("running", 90)
 
-    except Exception as e:
-        logger.exception(f"报告生成过程中发生错误: {str(e)}")
-        task.update_status("error", 0, str(e))
-        # 只在出错时清理任务
-        with task_lock:
-            if current_task and current_task.task_id == task.task_id:
-                current_task = None
+    # 保存结果
+    task.html_content = html_report
+    task.report_file_path = generation_result.get('report_filepath', '')
+    task.report_file_relative_path = generation_result.get('report_relative_path', '')
+    task.report_file_name = generation_result.get('report_filename', '')
+    task.state_file_path = generation_result.get('state_filepath', '')
+    task.state_file_relative_path = generation_result.get('state_relative_path', '')
+    task.update_status("completed", 100)
 
 
 @report_bp.route('/status', methods=['GET'])
@@ -162,6 +138,7 @@ def get_status():
     """获取Report Engine状态"""
     try:
         engines_status = check_engines_ready()
+        latest_task = task_queue.latest_task() if task_queue else None
 
         return jsonify({
             'success': True,
@@ -169,7 +146,8 @@ def get_status():
             'engines_ready': engines_status['ready'],
             'files_found': engines_status.get('files_found', []),
             'missing_files': engines_status.get('missing_files', []),
-            'current_task': current_task.to_dict() if current_task else None
+            'current_task': latest_task.to_dict() if latest_task else None,
+            'queue': task_queue.get_stats() if task_queue else None
         })
     except Exception as e:
         logger.exception(f"获取Report Engine状态失败: {str(e)}")
@@ -181,33 +159,15 @@ def get_status():
 
 @report_bp.route('/generate', methods=['POST'])
 def generate_report():
-    """开始生成报告"""
-    global current_task
-
+    """提交报告生成任务（相同输入的任务正在进行时复用该任务）"""
     try:
-        # 检查是否有任务在运行
-        with task_lock:
-            if current_task and current_task.status == "running":
-                return jsonify({
-                    'success': False,
-                    'error': '已有报告生成任务在运行中',
-                    'current_task': current_task.to_dict()
-                }), 400
-
-            # 如果有已完成的任务，清理它
-            if current_task and current_task.status in ["completed", "error"]:
-                current_task = None
-
         # 获取请求参数
         data = request.get_json() or {}
         query = data.get('query', '智能舆情分析报告')
         custom_template = data.get('custom_template', '')
 
-        # 清空日志文件
-        clear_report_log()
-
         # 检查Report Engine是否初始化
-        if not report_agent:
+        if not report_agent or not task_queue:
             return jsonify({
                 'success': False,
                 'error': 'Report Engine未初始化'
@@ -222,25 +182,17 @@ def generate_report():
                 'missing_files': engines_status.get('missing_files', [])
             }), 400
 
-        # 创建新任务
-        task_id = f"report_{int(time.time())}"
-        task = ReportTask(query, task_id, custom_template)
-
-        with task_lock:
-            current_task = task
+        # 没有其他任务在进行时才清空日志文件，避免清掉并行任务的日志
+        if not task_queue.has_active():
+            clear_report_log()
 
-        # 在后台线程中运行报告生成
-        thread = threading.Thread(
-            target=run_report_generation,
-            args=(task, query, custom_template),
-            daemon=True
-        )
-        thread.start()
+        task, created = task_queue.submit(query, custom_template, engines_status['latest_files'])
 
         return jsonify({
             'success': True,
-            'task_id': task_id,
-            'message': '报告生成已启动',
+            'task_id': task.task_id,
+            'deduplicated': not created,
+            'message': '报告生成已启动' if created else '相同的报告正在生成，已复用该任务',
             'task': task.to_dict()
         })
 
@@ -252,11 +204,38 @@ def generate_report():
         }), 500
 
 
+@report_bp.route('/tasks', methods=['GET'])
+def list_tasks():
+    """获取全部报告任务（按创建时间倒序）"""
+    try:
+        if not task_queue:
+            return jsonify({
+                'success': False,
+                'error': 'Report Engine未初始化'
+            }), 500
+
+        status = request.args.get('status')
+        tasks = [task.to_dict() for task in task_queue.list_tasks() if not status or task.status == status]
+        return jsonify({
+            'success': True,
+            'tasks': tasks,
+            'queue': task_queue.get_stats()
+        })
+
+    except Exception as e:
+        logger.exception(f"获取报告任务列表失败: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @report_bp.route('/progress/<task_id>', methods=['GET'])
 def get_progress(task_id: str):
     """获取报告生成进度"""
     try:
-        if not current_task or current_task.task_id != task_id:
+        task = get_task(task_id)
+        if not task:
             # 如果任务不存在，可能是已经完成并被清理了
             # 返回一个默认的完成状态而不是404
             return jsonify({
@@ -275,7 +254,7 @@ def get_progress(task_id: str):
 
         return jsonify({
             'success': True,
-            'task': current_task.to_dict()
+            'task': task.to_dict()
         })
 
     except Exception as e:
@@ -286,25 +265,81 @@ def get_progress(task_id: str):
         }), 500
 
 
+@report_bp.route('/stream/<task_id>', methods=['GET'])
+def stream_report(task_id: str):
+    """
+    以SSE推送分章节生成的报告
+
+    事件依次为 shell（尚未填充章节的HTML外壳）、section（每个完成的章节片段）和
+    done（任务结束时的状态）。事件id为序号，断线重连时通过Last-Event-ID从断点继续。
+    """
+    task = get_task(task_id)
+    if not task:
+        return jsonify({
+            'success': False,
+            'error': '任务不存在'
+        }), 404
+
+    try:
+        start_index = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        start_index = 0
+
+    def format_event(event: str, data: Dict[str, Any], event_id: int = None) -> str:
+        message = f"event: {event}\n"
+        if event_id is not None:
+            message += f"id: {event_id}\n"
+        return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    def generate():
+        index = start_index
+        while True:
+            with task.stream_condition:
+                if index >= len(task.stream_events) and not task.is_finished():
+                    task.stream_condition.wait(STREAM_KEEPALIVE_INTERVAL)
+                pending = task.stream_events[index:]
+                finished = task.is_finished()
+
+            for event, data in pending:
+                yield format_event(event, data, index)
+                index += 1
+
+            if finished and index >= len(task.stream_events):
+                yield format_event("done", task.to_dict())
+                return
+            if not pending:
+                yield ": keep-alive\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @report_bp.route('/result/<task_id>', methods=['GET'])
 def get_result(task_id: str):
     """获取报告生成结果"""
     try:
-        if not current_task or current_task.task_id != task_id:
+        task = get_task(task_id)
+        if not task:
             return jsonify({
                 'success': False,
                 'error': '任务不存在'
             }), 404
 
-        if current_task.status != "completed":
+        if task.status != "completed":
             return jsonify({
                 'success': False,
                 'error': '报告尚未完成',
-                'task': current_task.to_dict()
+                'task': task.to_dict()
             }), 400
 
         return Response(
-            current_task.html_content,
+            task.get_html_content(),
             mimetype='text/html'
         )
 
@@ -320,23 +355,24 @@ def get_result(task_id: str):
 def get_result_json(task_id: str):
     """获取报告生成结果（JSON格式）"""
     try:
-        if not current_task or current_task.task_id != task_id:
+        task = get_task(task_id)
+        if not task:
             return jsonify({
                 'success': False,
                 'error': '任务不存在'
             }), 404
 
-        if current_task.status != "completed":
+        if task.status != "completed":
             return jsonify({
                 'success': False,
                 'error': '报告尚未完成',
-                'task': current_task.to_dict()
+                'task': task.to_dict()
             }), 400
 
         return jsonify({
             'success': True,
-            'task': current_task.to_dict(),
-            'html_content': current_task.html_content
+            'task': task.to_dict(),
+            'html_content': task.get_html_content()
         })
 
     except Exception as e:
@@ -351,27 +387,28 @@ def get_result_json(task_id: str):
 def download_report(task_id: str):
     """下载已生成的报告HTML文件"""
     try:
-        if not current_task or current_task.task_id != task_id:
+        task = get_task(task_id)
+        if not task:
             return jsonify({
                 'success': False,
                 'error': '任务不存在'
             }), 404
 
-        if current_task.status != "completed" or not current_task.report_file_path:
+        if task.status != "completed" or not task.report_file_path:
             return jsonify({
                 'success': False,
                 'error': '报告尚未完成或尚未保存'
             }), 400
 
-        if not os.path.exists(current_task.report_file_path):
+        if not os.path.exists(task.report_file_path):
             return jsonify({
                 'success': False,
                 'error': '报告文件不存在或已被删除'
             }), 404
 
-        download_name = current_task.report_file_name or os.path.basename(current_task.report_file_path)
+        download_name = task.report_file_name or os.path.basename(task.report_file_path)
         return send_file(
-            current_task.report_file_path,
+            task.report_file_path,
             mimetype='text/html',
             as_attachment=True,
             download_name=download_name
@@ -387,25 +424,18 @@ def download_report(task_id: str):
 
 @report_bp.route('/cancel/<task_id>', methods=['POST'])
 def cancel_task(task_id: str):
-    """取消报告生成任务"""
-    global current_task
-
+    """取消排队中或生成中的报告任务"""
     try:
-        with task_lock:
-            if current_task and current_task.task_id == task_id:
-                if current_task.status == "running":
-                    current_task.update_status("cancelled", 0, "用户取消任务")
-                current_task = None
-
-                return jsonify({
-                    'success': True,
-                    'message': '任务已取消'
-                })
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': '任务不存在或无法取消'
-                }), 404
+        if task_queue and task_queue.cancel(task_id):
+            return jsonify({
+                'success': True,
+                'message': '任务已取消'
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': '任务不存在或无法取消'
+            }), 404
 
     except Exception as e:
         logger.exception(f"取消报告生成任务失败: {str(e)}")
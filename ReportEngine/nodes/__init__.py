@@ -5,11 +5,12 @@ Report Engine节点处理模块
 
 from .base_node import BaseNode, StateMutationNode
 from .template_selection_node import TemplateSelectionNode
-from .html_generation_node import HTMLGenerationNode
+from .html_generation_node import HTMLGenerationNode, GenerationCancelled
 
 __all__ = [
     "BaseNode",
     "StateMutationNode", 
     "TemplateSelectionNode",
-    "HTMLGenerationNode"
+    "HTMLGenerationNode",
+    "GenerationCancelled"
 ]
@@ -3,17 +3,143 @@ HTML生成节点
 将整合后的内容转换为美观的HTML报告
 """
 
+import html
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable
 from loguru import logger
 
 from .base_node import StateMutationNode
 from ..llms.base import LLMClient
 from ..state.state import ReportState
-from ..prompts import SYSTEM_PROMPT_HTML_GENERATION
+from ..prompts import SYSTEM_PROMPT_HTML_GENERATION, SYSTEM_PROMPT_HTML_SECTION_GENERATION
 # 不再需要text_processing依赖
 
+# 默认同时生成的章节数
+DEFAULT_SECTION_CONCURRENCY = 4
+
+# 每个章节随请求发送的引擎报告与论坛日志摘录的默认总字符数
+DEFAULT_SECTION_SOURCE_CHARS = 16000
+# 摘录片段的最大字符数
+SOURCE_CHUNK_CHARS = 1200
+# 按章节摘录的输入字段
+SECTION_SOURCE_KEYS = ('query_engine_report', 'media_engine_report', 'insight_engine_report', 'forum_logs')
+
+
+class GenerationCancelled(Exception):
+    """报告任务被取消，停止生成剩余内容"""
+
+
+_HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+_PARAGRAPH_SPLIT_PATTERN = re.compile(r'\n\s*\n')
+_NON_WORD_PATTERN = re.compile(r'[\W_]+')
+_TOP_LEVEL_ITEM_PATTERN = re.compile(r'^[-*+]\s+(.+?)\s*$')
+
+
+def _clean_outline_title(text: str) -> str:
+    """去除大纲标题中的markdown强调符号"""
+    return text.replace('**', '').replace('__', '').strip(' *_#')
+
+
+def split_template_sections(template_content: str) -> Dict[str, Any]:
+    """
+    将报告模板拆分为可独立生成的章节
+    
+    优先按二级标题（##）拆分；没有二级标题时按顶格列表项（如 "- **1.0 报告摘要**"）拆分，
+    子列表和正文归入所属章节。第一个章节之前的一级/三级标题作为报告标题。
+    
+    Args:
+        template_content: 模板内容（markdown）
+        
+    Returns:
+        {'title': 报告标题, 'sections': [{'title': 章节标题, 'outline': 章节大纲}, ...]}
+    """
+    lines = (template_content or '').splitlines()
+    heading_levels = [len(m.group(1)) for m in map(_HEADING_PATTERN.match, lines) if m]
+    split_on_heading = 2 in heading_levels
+
+    title = ''
+    sections = []
+    for line in lines:
+        heading = _HEADING_PATTERN.match(line)
+        item = _TOP_LEVEL_ITEM_PATTERN.match(line)
+        if split_on_heading and heading and len(heading.group(1)) == 2:
+            sections.append({'title': _clean_outline_title(heading.group(2)), 'lines': [line]})
+        elif not split_on_heading and item:
+            sections.append({'title': _clean_outline_title(item.group(1)), 'lines': [line]})
+        elif sections:
+            sections[-1]['lines'].append(line)
+        elif heading and not title:
+            title = _clean_outline_title(heading.group(2))
+
+    return {
+        'title': title,
+        'sections': [
+            {'title': section['title'], 'outline': '\n'.join(section['lines']).strip()}
+            for section in sections
+        ]
+    }
+
+
+def split_source_chunks(text: str, max_chars: int = SOURCE_CHUNK_CHARS) -> List[str]:
+    """按空行把报告切分为片段：相邻的短段落合并，超过max_chars的段落按长度切开"""
+    chunks = []
+    current = ''
+    for paragraph in _PARAGRAPH_SPLIT_PATTERN.split(text or ''):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _char_bigrams(text: str) -> set:
+    normalized = _NON_WORD_PATTERN.sub('', (text or '').lower())
+    return {normalized[i:i + 2] for i in range(len(normalized) - 1)}
+
+
+def select_section_excerpts(text: str, section_text: str, max_chars: int) -> str:
+    """
+    从报告中摘录与章节最相关的片段
+    
+    报告不超过max_chars时原样返回；否则按与章节标题、大纲共有的字符二元组数给片段打分，
+    从高到低选入直到字数上限，再按原文顺序拼接，省略处以"..."分隔。
+    
+    Args:
+        text: 引擎报告或论坛日志
+        section_text: 章节标题与大纲
+        max_chars: 摘录的最大字符数
+        
+    Returns:
+        摘录内容
+    """
+    if not text or len(text) <= max_chars:
+        return text or ''
+    chunks = split_source_chunks(text)
+    keywords = _char_bigrams(section_text)
+    ranked = sorted(range(len(chunks)), key=lambda i: (-len(_char_bigrams(chunks[i]) & keywords), i))
+    selected = []
+    used = 0
+    for i in ranked:
+        if used + len(chunks[i]) <= max_chars:
+            selected.append(i)
+            used += len(chunks[i])
+    return '\n\n...\n\n'.join(chunks[i] for i in sorted(selected))
+
 
 class HTMLGenerationNode(StateMutationNode):
     """HTML生成处理节点"""
@@ -73,6 +199,331 @@ class HTMLGenerationNode(StateMutationNode):
             # 返回备用HTML
             return self._generate_fallback_html(input_data)
     
+    def run_sectioned(self, input_data: Dict[str, Any], max_workers: int = DEFAULT_SECTION_CONCURRENCY,
+                      stream_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                      cancel_check: Optional[Callable[[], bool]] = None,
+                      source_chars: int = DEFAULT_SECTION_SOURCE_CHARS) -> str:
+        """
+        按模板章节并行生成HTML报告
+        
+        每个章节单独调用LLM生成HTML片段，完成后填入统一的HTML外壳。单个章节失败时只用
+        该章节的备用内容代替，不影响其他章节；模板无法拆分出多个章节时退回单次生成（run）。
+        每个章节只发送引擎报告与论坛日志中与该章节相关的摘录（见 select_section_excerpts），
+        输入token数不随章节数成倍增长。
+        
+        Args:
+            input_data: 与run相同的报告数据
+            max_workers: 同时生成的章节数
+            stream_callback: 流式回调，签名为 stream_callback(event, data)，在调用线程中依次收到：
+                - "shell": {'html': 尚未填充章节的HTML外壳, 'sections': 章节标题列表}
+                - "section": {'index', 'title', 'html', 'status'(completed/failed), 'completed', 'total'}
+            cancel_check: 返回True时不再开始新的章节，正在生成的章节结束后抛出GenerationCancelled
+            source_chars: 每个章节发送的报告与日志摘录总字符数
+                
+        Returns:
+            拼接完成的HTML内容
+        """
+        outline = split_template_sections(input_data.get('selected_template', ''))
+        sections = outline['sections']
+        if len(sections) < 2:
+            logger.info("模板无法拆分为多个章节，使用单次生成")
+            return self.run(input_data)
+
+        query = input_data.get('query', '') or '智能舆情分析报告'
+        report_title = outline['title'] or query
+        total = len(sections)
+        logger.info(f"开始分章节生成HTML报告: 共 {total} 个章节，并发数 {max_workers}")
+
+        if stream_callback:
+            stream_callback("shell", {
+                'html': self.render_report_shell(query, report_title, sections),
+                'sections': [section['title'] for section in sections]
+            })
+
+        def generate(index: int) -> str:
+            # 排队的章节开始前检查取消标志，已取消的任务不再发起LLM调用
+            if cancel_check and cancel_check():
+                raise GenerationCancelled("报告任务已取消")
+            return self._generate_section(input_data, report_title, outline, index, source_chars)
+
+        fragments = {}
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total)),
+                                thread_name_prefix="report-section") as executor:
+            futures = {executor.submit(generate, index): index for index in range(total)}
+            for future in as_completed(futures):
+                if cancel_check and cancel_check():
+                    for pending in futures:
+                        pending.cancel()
+                    logger.info(f"报告任务已取消，停止生成剩余章节（已完成 {len(fragments)}/{total}）")
+                    raise GenerationCancelled("报告任务已取消")
+                index = futures[future]
+                section = sections[index]
+                try:
+                    fragments[index] = future.result()
+                    status = "completed"
+                    logger.info(f"章节 {index + 1}/{total} 生成完成: {section['title']}")
+                except Exception as e:
+                    logger.exception(f"章节 {index + 1}/{total} 生成失败: {section['title']}，使用备用内容: {str(e)}")
+                    fragments[index] = self._generate_fallback_section(section, index)
+                    status = "failed"
+                    failed += 1
+
+                if stream_callback:
+                    stream_callback("section", {
+                        'index': index,
+                        'title': section['title'],
+                        'html': fragments[index],
+                        'status': status,
+                        'completed': len(fragments),
+                        'total': total
+                    })
+
+        if failed == total:
+            logger.error("所有章节均生成失败，使用备用HTML")
+            return self._generate_fallback_html(input_data)
+
+        logger.info(f"HTML报告分章节生成完成（失败 {failed}/{total} 个章节）")
+        return self.render_report_shell(query, report_title, sections, fragments)
+
+    def _section_sources(self, input_data: Dict[str, Any], section: Dict[str, str],
+                         source_chars: int) -> Dict[str, str]:
+        """按章节摘录引擎报告与论坛日志，总字符数平均分配给非空的来源"""
+        sources = {key: input_data.get(key, '') or '' for key in SECTION_SOURCE_KEYS}
+        non_empty = [key for key, text in sources.items() if text]
+        if not non_empty:
+            return sources
+        per_source = max(SOURCE_CHUNK_CHARS, source_chars // len(non_empty))
+        section_text = f"{section['title']}\n{section['outline']}"
+        return {key: select_section_excerpts(text, section_text, per_source) for key, text in sources.items()}
+
+    def _generate_section(self, input_data: Dict[str, Any], report_title: str,
+                          outline: Dict[str, Any], index: int,
+                          source_chars: int = DEFAULT_SECTION_SOURCE_CHARS) -> str:
+        """调用LLM生成单个章节的HTML片段"""
+        section = outline['sections'][index]
+        sources = self._section_sources(input_data, section, source_chars)
+        llm_input = {
+            "query": input_data.get('query', ''),
+            "report_title": report_title,
+            "section_index": index + 1,
+            "section_title": section['title'],
+            "section_outline": section['outline'],
+            "template_outline": input_data.get('selected_template', ''),
+            "element_id_prefix": f"s{index + 1}-",
+            **sources
+        }
+        message = json.dumps(llm_input, ensure_ascii=False, indent=2)
+        response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_HTML_SECTION_GENERATION, message)
+
+        fragment = self.process_output(response)
+        # 模型偶尔仍返回完整文档，只保留body中的内容
+        body = re.search(r'<body[^>]*>(.*)</body>', fragment, re.S | re.I)
+        if body:
+            fragment = body.group(1).strip()
+        if not fragment.strip():
+            raise ValueError("LLM返回的章节内容为空")
+        return fragment
+
+    def _generate_fallback_section(self, section: Dict[str, str], index: int) -> str:
+        """生成备用章节内容（单个章节生成失败时使用）"""
+        return f"""<section class="fallback-section">
+    <h2>{html.escape(section['title'])}</h2>
+    <div class="card highlight">本章节自动生成失败，以下为模板中的章节大纲。</div>
+    <pre>{html.escape(section['outline'])}</pre>
+</section>"""
+
+    def render_report_shell(self, query: str, report_title: str, sections: List[Dict[str, str]],
+                            fragments: Optional[Dict[int, str]] = None) -> str:
+        """
+        渲染报告的HTML外壳
+        
+        外壳包含统一的样式、目录、暗色模式与打印按钮以及Chart.js，每个章节占用一个
+        id为 report-section-<序号> 的容器；fragments中没有的章节显示为生成中占位。
+        
+        Args:
+            query: 原始查询
+            report_title: 报告标题
+            sections: 章节列表
+            fragments: 已生成的章节HTML片段，键为章节序号
+            
+        Returns:
+            HTML内容
+        """
+        fragments = fragments or {}
+        generation_time = datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
+        toc_items = "\n".join(
+            f'                <li><a href="#report-section-{index}">{html.escape(section["title"])}</a></li>'
+            for index, section in enumerate(sections)
+        )
+        section_blocks = "\n".join(
+            f'        <div class="report-section" id="report-section-{index}">\n'
+            + (fragments[index] if index in fragments else
+               f'<div class="section-pending">正在生成：{html.escape(section["title"])}...</div>')
+            + '\n        </div>'
+            for index, section in enumerate(sections)
+        )
+
+        return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{html.escape(query)} - {html.escape(report_title)}</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+        :root {{
+            --bg: #f5f7fa;
+            --card-bg: #ffffff;
+            --text: #2c3e50;
+            --muted: #6c757d;
+            --accent: #3498db;
+            --border: #e9ecef;
+        }}
+        body.dark {{
+            --bg: #1e1f24;
+            --card-bg: #2a2c33;
+            --text: #e4e6eb;
+            --muted: #a0a4ab;
+            --accent: #5dade2;
+            --border: #3a3d45;
+        }}
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'PingFang SC', 'Microsoft YaHei', sans-serif;
+            line-height: 1.8;
+            color: var(--text);
+            background: var(--bg);
+            margin: 0;
+            padding: 20px;
+            transition: background 0.3s, color 0.3s;
+        }}
+        .container {{
+            max-width: 1200px;
+            margin: 0 auto;
+            background: var(--card-bg);
+            padding: 40px;
+            border-radius: 12px;
+            box-shadow: 0 2px 12px rgba(0,0,0,0.08);
+        }}
+        .toolbar {{
+            display: flex;
+            justify-content: flex-end;
+            gap: 10px;
+        }}
+        .toolbar button {{
+            border: 1px solid var(--border);
+            background: var(--card-bg);
+            color: var(--text);
+            padding: 6px 14px;
+            border-radius: 6px;
+            cursor: pointer;
+        }}
+        h1 {{
+            border-bottom: 3px solid var(--accent);
+            padding-bottom: 10px;
+        }}
+        h2 {{
+            margin-top: 40px;
+            border-left: 4px solid var(--accent);
+            padding-left: 12px;
+        }}
+        .meta, .toc {{
+            background: var(--bg);
+            padding: 15px 20px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+            color: var(--muted);
+        }}
+        .toc a {{
+            color: var(--accent);
+            text-decoration: none;
+        }}
+        .card {{
+            background: var(--bg);
+            border: 1px solid var(--border);
+            border-radius: 8px;
+            padding: 16px 20px;
+            margin: 16px 0;
+        }}
+        .highlight {{
+            border-left: 4px solid #f39c12;
+        }}
+        .data-table {{
+            width: 100%;
+            border-collapse: collapse;
+            margin: 16px 0;
+        }}
+        .data-table th, .data-table td {{
+            border: 1px solid var(--border);
+            padding: 8px 12px;
+            text-align: left;
+        }}
+        .chart-container {{
+            position: relative;
+            max-width: 800px;
+            margin: 20px auto;
+        }}
+        .positive {{ color: #27ae60; }}
+        .negative {{ color: #e74c3c; }}
+        .neutral {{ color: #7f8c8d; }}
+        .section-pending {{
+            color: var(--muted);
+            padding: 30px;
+            text-align: center;
+            border: 1px dashed var(--border);
+            border-radius: 8px;
+            margin: 30px 0;
+        }}
+        pre {{
+            background: var(--bg);
+            padding: 15px;
+            border-radius: 5px;
+            white-space: pre-wrap;
+        }}
+        .footer {{
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid var(--border);
+            text-align: center;
+            color: var(--muted);
+        }}
+        @media (max-width: 768px) {{
+            body {{ padding: 0; }}
+            .container {{ padding: 20px; border-radius: 0; }}
+        }}
+        @media print {{
+            .toolbar {{ display: none; }}
+            .container {{ box-shadow: none; }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="toolbar">
+            <button onclick="document.body.classList.toggle('dark')">暗色模式</button>
+            <button onclick="window.print()">打印 / 导出PDF</button>
+        </div>
+        <h1>{html.escape(query)}</h1>
+        <div class="meta">
+            <strong>报告类型:</strong> {html.escape(report_title)}<br>
+            <strong>报告生成时间:</strong> {generation_time}<br>
+            <strong>数据来源:</strong> QueryEngine、MediaEngine、InsightEngine、ForumEngine
+        </div>
+        <nav class="toc">
+            <strong>目录</strong>
+            <ol>
+{toc_items}
+            </ol>
+        </nav>
+{section_blocks}
+        <div class="footer">
+            <p>本报告由智能舆情分析平台自动生成</p>
+            <p>ReportEngine v1.0 | 生成时间: {generation_time}</p>
+        </div>
+    </div>
+</body>
+</html>"""
+
     def mutate_state(self, input_data: Dict[str, Any], state: ReportState, **kwargs) -> ReportState:
         """
         修改报告状态，添加生成的HTML内容
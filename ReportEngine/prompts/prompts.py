@@ -30,6 +30,24 @@ input_schema_html_generation = {
     }
 }
 
+# HTML章节生成输入Schema
+input_schema_html_section_generation = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string"},
+        "report_title": {"type": "string"},
+        "section_index": {"type": "integer"},
+        "section_title": {"type": "string"},
+        "section_outline": {"type": "string"},
+        "template_outline": {"type": "string"},
+        "element_id_prefix": {"type": "string"},
+        "query_engine_report": {"type": "string"},
+        "media_engine_report": {"type": "string"},
+        "insight_engine_report": {"type": "string"},
+        "forum_logs": {"type": "string"}
+    }
+}
+
 # HTML报告生成输出Schema - 已简化，不再使用JSON格式
 # output_schema_html_generation = {
 #     "type": "object",
@@ -133,3 +151,28 @@ SYSTEM_PROMPT_HTML_GENERATION = f"""
 
 **重要：直接返回完整的HTML代码，不要包含任何解释、说明或其他文本。只返回HTML代码本身。**
 """
+
+# HTML章节生成的系统提示词（按模板章节并行生成，由程序拼接到统一的HTML外壳中）
+SYSTEM_PROMPT_HTML_SECTION_GENERATION = f"""
+你是一位专业的HTML报告生成专家。一份完整的分析报告按模板章节拆分，由多位专家并行撰写，你只负责其中一个章节。
+你将接收三个分析引擎报告与论坛监控日志中与本章节相关的摘录（篇幅较长时只保留相关段落，省略处以“...”分隔）、完整的模板大纲以及你负责的章节（section_title和section_outline）。
+
+<INPUT JSON SCHEMA>
+{json.dumps(input_schema_html_section_generation, indent=2, ensure_ascii=False)}
+</INPUT JSON SCHEMA>
+
+**你的任务：**
+1. 只撰写section_outline中列出的内容，不要撰写其他章节的内容，也不要重复报告标题和目录
+2. 整合三个引擎的分析结果，结合论坛中的相互讨论数据（forum_logs），从不同角度分析
+3. 内容详实，本章节不少于3000字
+
+**HTML片段要求：**
+1. 只返回一个 <section> 元素作为HTML片段，不要包含DOCTYPE、html、head、body、style标签
+2. 章节标题使用 <h2>，小节标题使用 <h3>
+3. 页面已提供统一的CSS样式，可使用以下class：card、highlight、data-table、chart-container、positive、negative、neutral
+4. 如需数据可视化，使用Chart.js（页面已加载）：<canvas> 放在 class="chart-container" 的div中，
+   紧跟一个 <script> 完成绘制；所有元素id必须以element_id_prefix开头，避免与其他章节冲突
+5. 不要使用需要展开的折叠效果，内容一次性完整显示
+
+**重要：直接返回HTML片段本身，不要包含任何解释、说明或其他文本。**
+"""
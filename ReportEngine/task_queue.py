@@ -0,0 +1,434 @@
+"""
+Report Engine任务队列
+报告生成任务写入SQLite持久化，由固定数量的工作线程并行执行
+
+- 相同（查询、输入文件集合、模板）的任务在排队或生成期间只生成一次，重复请求直接复用同一任务
+- 任务状态、进度和报告文件路径在服务重启后仍可查询，超过保留期的已结束任务被清理
+- 排队中的任务可直接取消；生成中的任务取消后不再更新状态，并在下一个生成步骤或章节开始前停止
+  （已发出的LLM调用仍会完成），生成结果被丢弃，工作线程随即处理下一个任务
+"""
+
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+# 默认并行执行报告生成的工作线程数
+DEFAULT_WORKER_COUNT = 2
+
+# 已结束任务的默认保留时间（小时）与最多保留的任务数
+DEFAULT_RETENTION_HOURS = 72
+DEFAULT_MAX_RETAINED_TASKS = 200
+
+# 设置该环境变量可修改任务数据库路径，设置为空字符串时只在内存中保存任务
+TASK_DB_PATH_ENV = "REPORT_TASK_DB_PATH"
+DEFAULT_TASK_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "report_tasks.db")
+
+ACTIVE_STATUSES = ("pending", "running")
+FINISHED_STATUSES = ("completed", "error", "cancelled")
+
+# 章节生成阶段在总进度中的区间
+SECTION_PROGRESS_START = 55
+SECTION_PROGRESS_END = 90
+
+# 持久化的任务字段
+_PERSISTED_FIELDS = (
+    "task_id", "query", "custom_template", "dedupe_key", "input_files", "status", "progress",
+    "error_message", "created_at", "updated_at", "report_file_path", "report_file_relative_path",
+    "report_file_name", "state_file_path", "state_file_relative_path",
+)
+
+
+class ReportTask:
+    """报告生成任务"""
+
+    def __init__(self, query: str, task_id: str, custom_template: str = "",
+                 input_files: Optional[Dict[str, str]] = None, dedupe_key: str = ""):
+        self.task_id = task_id
+        self.query = query
+        self.custom_template = custom_template
+        self.input_files = input_files or {}  # 提交时确定的输入文件（query/media/insight/forum）
+        self.dedupe_key = dedupe_key
+        self.status = "pending"  # pending, running, completed, error, cancelled
+        self.progress = 0
+        self.result = None
+        self.error_message = ""
+        self.created_at = datetime.now()
+        self.updated_at = datetime.now()
+        self.html_content = ""
+        self.report_file_path = ""
+        self.report_file_relative_path = ""
+        self.report_file_name = ""
+        self.state_file_path = ""
+        self.state_file_relative_path = ""
+        # 流式事件（HTML外壳与已完成的章节），供 /stream/<task_id> 按顺序推送
+        self.stream_events = []
+        self.stream_condition = threading.Condition()
+        # 协作式取消标志，生成过程在各步骤和章节之间检查
+        self.cancel_event = threading.Event()
+
+    def update_status(self, status: str, progress: int = None, error_message: str = ""):
+        """更新任务状态（任务取消后不再更新）"""
+        with self.stream_condition:
+            if self.status == "cancelled":
+                return
+            self.status = status
+            if progress is not None:
+                self.progress = progress
+            if error_message:
+                self.error_message = error_message
+            self.updated_at = datetime.now()
+            self.stream_condition.notify_all()
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        """记录一个流式事件，并按章节完成情况推进进度"""
+        with self.stream_condition:
+            self.stream_events.append((event, data))
+            if event == "shell":
+                self.progress = SECTION_PROGRESS_START
+            elif event == "section" and data.get('total'):
+                span = SECTION_PROGRESS_END - SECTION_PROGRESS_START
+                self.progress = SECTION_PROGRESS_START + int(span * data['completed'] / data['total'])
+            self.updated_at = datetime.now()
+            self.stream_condition.notify_all()
+
+    def is_cancelled(self) -> bool:
+        """任务是否已被取消，生成过程据此提前停止"""
+        return self.cancel_event.is_set() or self.status == "cancelled"
+
+    def is_finished(self) -> bool:
+        """任务是否已结束（完成、出错或取消）"""
+        return self.status in FINISHED_STATUSES
+
+    def get_html_content(self) -> str:
+        """获取报告HTML，服务重启后内存中没有时从报告文件读取"""
+        if not self.html_content and self.report_file_path and os.path.exists(self.report_file_path):
+            with open(self.report_file_path, 'r', encoding='utf-8') as f:
+                self.html_content = f.read()
+        return self.html_content
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式"""
+        return {
+            'task_id': self.task_id,
+            'query': self.query,
+            'status': self.status,
+            'progress': self.progress,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+            'has_result': bool(self.html_content or self.report_file_path),
+            'report_file_ready': bool(self.report_file_path),
+            'report_file_name': self.report_file_name,
+            'report_file_path': self.report_file_relative_path
+        }
+
+    def to_record(self) -> Dict[str, Any]:
+        """转换为持久化记录"""
+        record = {name: getattr(self, name) for name in _PERSISTED_FIELDS}
+        record['input_files'] = json.dumps(self.input_files, ensure_ascii=False)
+        record['created_at'] = self.created_at.isoformat()
+        record['updated_at'] = self.updated_at.isoformat()
+        return record
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "ReportTask":
+        """从持久化记录恢复任务"""
+        task = cls(record['query'], record['task_id'], record['custom_template'] or "",
+                   json.loads(record['input_files'] or "{}"), record['dedupe_key'] or "")
+        for name in ("status", "progress", "error_message", "report_file_path", "report_file_relative_path",
+                     "report_file_name", "state_file_path", "state_file_relative_path"):
+            if record[name] is not None:
+                setattr(task, name, record[name])
+        task.created_at = datetime.fromisoformat(record['created_at'])
+        task.updated_at = datetime.fromisoformat(record['updated_at'])
+        return task
+
+
+def make_dedupe_key(query: str, input_files: Dict[str, str], custom_template: str = "") -> str:
+    """
+    计算任务去重键：查询 + 输入文件集合（路径、修改时间与大小）+ 自定义模板
+
+    Args:
+        query: 报告查询
+        input_files: 输入文件路径字典
+        custom_template: 自定义模板内容
+
+    Returns:
+        去重键（sha256）
+    """
+    files = {}
+    for name, path in sorted(input_files.items()):
+        try:
+            stat = os.stat(path)
+            files[name] = [os.path.abspath(path), stat.st_mtime_ns, stat.st_size]
+        except OSError:
+            files[name] = [os.path.abspath(path), None, None]
+    raw = json.dumps({'query': query.strip(), 'files': files, 'template': custom_template or ""},
+                     ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ReportTaskQueue:
+    """持久化的报告任务队列与工作线程池"""
+
+    def __init__(self, run_fn: Callable[[ReportTask], None], worker_count: int = DEFAULT_WORKER_COUNT,
+                 persist_path: Optional[str] = None, retention_hours: float = DEFAULT_RETENTION_HOURS,
+                 max_retained: int = DEFAULT_MAX_RETAINED_TASKS):
+        """
+        初始化任务队列
+
+        Args:
+            run_fn: 执行单个任务的函数，负责更新任务进度和结果
+            worker_count: 工作线程数
+            persist_path: SQLite文件路径，None时读取环境变量或使用默认路径，空字符串表示不持久化
+            retention_hours: 已结束任务的保留时间（小时）
+            max_retained: 最多保留的已结束任务数
+        """
+        self.run_fn = run_fn
+        self.worker_count = max(1, worker_count)
+        self.retention = timedelta(hours=retention_hours)
+        self.max_retained = max(1, max_retained)
+
+        self._tasks: Dict[str, ReportTask] = {}
+        self._queue = queue.Queue()
+        self._lock = threading.RLock()
+        self._workers: List[threading.Thread] = []
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if persist_path is None:
+            persist_path = os.getenv(TASK_DB_PATH_ENV, DEFAULT_TASK_DB_PATH)
+        if persist_path:
+            self._open_store(persist_path)
+
+    def _open_store(self, path: str) -> None:
+        """打开任务数据库，失败时退化为只在内存中保存任务"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = ", ".join(
+                f"{name} TEXT PRIMARY KEY" if name == "task_id" else
+                f"{name} INTEGER" if name == "progress" else f"{name} TEXT"
+                for name in _PERSISTED_FIELDS
+            )
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS report_tasks ({columns})")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_report_tasks_dedupe ON report_tasks (dedupe_key)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"报告任务数据库不可用，任务只保存在内存中: {e}")
+            self._conn = None
+
+    def start(self) -> None:
+        """恢复持久化的任务并启动工作线程（已启动时忽略）"""
+        with self._lock:
+            if self._workers:
+                return
+            self._restore()
+            for index in range(self.worker_count):
+                worker = threading.Thread(target=self._run_worker, name=f"ReportWorker-{index + 1}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        logger.info(f"报告任务队列已启动，工作线程数: {self.worker_count}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        停止工作线程：正在生成的任务结束后线程退出，排队中的任务保留，再次 start() 时继续执行
+
+        Args:
+            timeout: 等待每个工作线程退出的最长时间（秒）
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+            # 先取出排队中的任务，让退出信号排在最前面
+            pending = []
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for _ in workers:
+                self._queue.put(None)
+        for worker in workers:
+            worker.join(timeout)
+        for task_id in pending:
+            self._queue.put(task_id)
+        if workers:
+            logger.info(f"报告任务队列已停止，{len(pending)} 个任务保留在队列中")
+
+    def _restore(self) -> None:
+        """从数据库恢复任务：排队中的任务重新入队，上次运行中断的任务标记为出错"""
+        if not self._conn:
+            return
+        try:
+            rows = self._conn.execute("SELECT * FROM report_tasks ORDER BY created_at").fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"恢复报告任务失败: {e}")
+            return
+
+        for row in rows:
+            if row['task_id'] in self._tasks:
+                # stop() 后再次启动时内存中的任务仍然有效
+                continue
+            task = ReportTask.from_record(dict(row))
+            self._tasks[task.task_id] = task
+            if task.status == "running":
+                task.update_status("error", error_message="服务重启，任务已中断")
+                self._persist(task)
+            elif task.status == "pending":
+                self._queue.put(task.task_id)
+        if rows:
+            logger.info(f"已恢复 {len(rows)} 个报告任务，其中 {self._queue.qsize()} 个重新排队")
+        self._prune()
+
+    def submit(self, query: str, custom_template: str = "",
+               input_files: Optional[Dict[str, str]] = None) -> Tuple[ReportTask, bool]:
+        """
+        提交报告任务，相同输入的任务正在排队或生成时直接返回该任务
+
+        Returns:
+            (任务, 是否为新建任务)
+        """
+        input_files = input_files or {}
+        dedupe_key = make_dedupe_key(query, input_files, custom_template)
+        with self._lock:
+            for task in self._tasks.values():
+                if task.dedupe_key == dedupe_key and task.status in ACTIVE_STATUSES:
+                    logger.info(f"相同报告任务已在处理中，复用任务: {task.task_id}")
+                    return task, False
+
+            task_id = f"report_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+            task = ReportTask(query, task_id, custom_template, input_files, dedupe_key)
+            self._tasks[task_id] = task
+            self._persist(task)
+            self._queue.put(task_id)
+        logger.info(f"报告任务已入队: {task_id}（排队中 {self._queue.qsize()} 个）")
+        return task, True
+
+    def get(self, task_id: str) -> Optional[ReportTask]:
+        """按ID获取任务"""
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def list_tasks(self) -> List[ReportTask]:
+        """获取全部任务，按创建时间倒序"""
+        with self._lock:
+            tasks = list(self._tasks.values())
+        return sorted(tasks, key=lambda task: task.created_at, reverse=True)
+
+    def latest_task(self) -> Optional[ReportTask]:
+        """获取最近的任务，优先返回正在排队或生成的任务"""
+        tasks = self.list_tasks()
+        active = [task for task in tasks if task.status in ACTIVE_STATUSES]
+        return (active or tasks or [None])[0]
+
+    def has_active(self) -> bool:
+        """是否有正在排队或生成的任务"""
+        with self._lock:
+            return any(task.status in ACTIVE_STATUSES for task in self._tasks.values())
+
+    def cancel(self, task_id: str) -> bool:
+        """
+        取消排队中或生成中的任务，返回是否取消成功
+
+        生成中的任务通过 cancel_event 协作式停止：run_fn 在各步骤和章节之间检查 task.is_cancelled()
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if not task or task.status not in ACTIVE_STATUSES:
+                return False
+            task.cancel_event.set()
+            task.update_status("cancelled", error_message="用户取消任务")
+            self._persist(task)
+        logger.info(f"报告任务已取消: {task_id}")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取各状态的任务数"""
+        with self._lock:
+            counts = {}
+            for task in self._tasks.values():
+                counts[task.status] = counts.get(task.status, 0) + 1
+        return {
+            'workers': self.worker_count,
+            'queued': self._queue.qsize(),
+            'tasks': counts,
+        }
+
+    def _run_worker(self) -> None:
+        while True:
+            task_id = self._queue.get()
+            if task_id is None:
+                return
+            with self._lock:
+                task = self._tasks.get(task_id)
+                if not task or task.status != "pending":
+                    continue
+                task.update_status("running", 0)
+                self._persist(task)
+
+            logger.info(f"{threading.current_thread().name} 开始生成报告: {task_id}")
+            try:
+                self.run_fn(task)
+            except Exception as e:
+                if task.is_cancelled():
+                    logger.info(f"报告任务已取消，停止生成: {task_id}")
+                else:
+                    logger.exception(f"报告任务执行失败: {task_id}: {e}")
+                    task.update_status("error", 0, str(e))
+
+            with self._lock:
+                if task.status == "running":
+                    task.update_status("error", 0, "任务未正常结束")
+                self._persist(task)
+                self._prune()
+
+    def _persist(self, task: ReportTask) -> None:
+        """写入任务记录（需持有锁）"""
+        if not self._conn:
+            return
+        record = task.to_record()
+        placeholders = ", ".join("?" for _ in _PERSISTED_FIELDS)
+        try:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO report_tasks ({', '.join(_PERSISTED_FIELDS)}) VALUES ({placeholders})",
+                [record[name] for name in _PERSISTED_FIELDS],
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"保存报告任务失败: {e}")
+
+    def _prune(self) -> None:
+        """清理超过保留期或超出数量上限的已结束任务（需持有锁，不删除报告文件）"""
+        finished = sorted(
+            (task for task in self._tasks.values() if task.is_finished()),
+            key=lambda task: task.updated_at, reverse=True,
+        )
+        cutoff = datetime.now() - self.retention
+        expired = [task for index, task in enumerate(finished)
+                   if index >= self.max_retained or task.updated_at < cutoff]
+        if not expired:
+            return
+
+        for task in expired:
+            self._tasks.pop(task.task_id, None)
+        if self._conn:
+            try:
+                self._conn.executemany("DELETE FROM report_tasks WHERE task_id = ?",
+                                       [(task.task_id,) for task in expired])
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"清理报告任务失败: {e}")
+        logger.info(f"已清理 {len(expired)} 个过期的报告任务")
@@ -6,6 +6,7 @@ import os
 import pickle
 from abc import ABC, abstractmethod
 from typing import List, Tuple, Dict, Any
+import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score, f1_score, classification_report
 from utils import load_corpus
@@ -42,6 +43,40 @@ class BaseModel(ABC):
         predictions = self.predict([text])
         return predictions[0], 0.0  # 默认置信度为0
     
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """批量预测文本为正面情感的概率
+        
+        有vectorizer的模型先整批转换特征再计算概率，其他模型默认逐条调用predict_single，
+        支持批量计算的模型应重写该方法
+        
+        Args:
+            texts: 待预测文本列表
+            
+        Returns:
+            形状为 (len(texts),) 的正面概率数组
+        """
+        if not self.is_trained:
+            raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
+        
+        if self.vectorizer is not None:
+            return self.predict_proba_from_features(self.vectorizer.transform(texts))
+        
+        probs = []
+        for text in texts:
+            prediction, confidence = self.predict_single(text)
+            probs.append(confidence if prediction == 1 else 1 - confidence)
+        return np.asarray(probs, dtype=np.float64)
+    
+    def predict_proba_from_features(self, X) -> np.ndarray:
+        """根据已转换的特征矩阵预测正面概率
+        
+        X须与self.vectorizer.transform的结果等价，集成预测时多个模型共用一次分词和计数的结果。
+        默认实现适用于带predict_proba的sklearn分类器。
+        """
+        probabilities = self.model.predict_proba(X)
+        positive_index = list(self.model.classes_).index(1)
+        return np.asarray(probabilities[:, positive_index], dtype=np.float64)
+    
     def evaluate(self, test_data: List[Tuple[str, int]]) -> Dict[str, float]:
         """评估模型性能"""
         if not self.is_trained:
@@ -9,6 +9,7 @@ import torch
 import torch.nn as nn
 from torch.utils.data import Dataset, DataLoader
 from transformers import BertTokenizer, BertModel
+import numpy as np
 from sklearn.metrics import accuracy_score, f1_score, classification_report, roc_auc_score
 from typing import List, Tuple
 import warnings
@@ -16,6 +17,7 @@ import requests
 from pathlib import Path
 
 from base_model import BaseModel
+from feature_cache import FeatureStore, DEFAULT_ENCODE_BATCH_SIZE
 from utils import load_corpus_bert
 
 # 忽略transformers的警告
@@ -23,15 +25,17 @@ warnings.filterwarnings("ignore")
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 
-class BertDataset(Dataset):
-    """BERT数据集"""
+class BertFeatureDataset(Dataset):
+    """从特征缓存读取预先计算的BERT [CLS] 特征的数据集"""
     
-    def __init__(self, data: List[Tuple[str, int]]):
-        self.data = [item[0] for item in data]
-        self.labels = [item[1] for item in data]
+    def __init__(self, store: FeatureStore, rows: np.ndarray, labels: List[int]):
+        self.features = store.features
+        self.rows = rows
+        self.labels = labels
     
     def __getitem__(self, index):
-        return self.data[index], self.labels[index]
+        feature = torch.from_numpy(np.asarray(self.features[self.rows[index]], dtype=np.float32))
+        return feature, self.labels[index]
     
     def __len__(self):
         return len(self.labels)
@@ -54,9 +58,11 @@ class BertClassifier(nn.Module):
 class BertModel_Custom(BaseModel):
     """BERT情感分析模型"""
     
-    def __init__(self, model_path: str = "./model/chinese_wwm_pytorch"):
+    def __init__(self, model_path: str = "./model/chinese_wwm_pytorch",
+                 feature_cache_dir: str = "./model/feature_cache"):
         super().__init__("BERT")
         self.model_path = model_path
+        self.feature_cache_dir = feature_cache_dir
         self.tokenizer = None
         self.bert = None
         self.classifier = None
@@ -136,8 +142,21 @@ class BertModel_Custom(BaseModel):
                 print(f"❌ 在线模型也加载失败: {e2}")
                 raise FileNotFoundError(f"无法加载BERT模型，请检查网络连接或手动下载模型到: {self.model_path}")
     
+    def _encode_texts(self, texts: List[str], max_length: int = 512) -> np.ndarray:
+        """用冻结的BERT编码一批文本，返回 [CLS] 特征"""
+        tokens = self.tokenizer(texts, padding=True, truncation=True,
+                              max_length=max_length, return_tensors='pt')
+        input_ids = tokens["input_ids"].to(self.device)
+        attention_mask = tokens["attention_mask"].to(self.device)
+        
+        with torch.no_grad():
+            bert_outputs = self.bert(input_ids, attention_mask=attention_mask)
+            bert_output = bert_outputs[0][:, 0]  # [CLS] token的输出
+        
+        return bert_output.float().cpu().numpy()
+    
     def train(self, train_data: List[Tuple[str, int]], **kwargs) -> None:
-        """训练BERT模型"""
+        """训练BERT模型（BERT参数冻结，先把语料编码进特征缓存，再只训练分类器）"""
         print(f"开始训练 {self.model_name} 模型...")
         
         # 加载BERT
@@ -149,12 +168,27 @@ class BertModel_Custom(BaseModel):
         batch_size = kwargs.get('batch_size', 100)
         input_size = kwargs.get('input_size', 768)
         decay_rate = kwargs.get('decay_rate', 0.9)
+        max_length = kwargs.get('max_length', 512)
+        encode_batch_size = kwargs.get('encode_batch_size', DEFAULT_ENCODE_BATCH_SIZE)
         
         print(f"BERT超参数: lr={learning_rate}, epochs={num_epochs}, "
               f"batch_size={batch_size}, input_size={input_size}")
         
+        # 预计算特征：BERT只对缓存中没有的文本运行一次，之后每个epoch直接读取缓存
+        self.bert.eval()  # BERT始终保持评估模式
+        store = FeatureStore(
+            kwargs.get('feature_cache_dir', self.feature_cache_dir),
+            f"bert|{self.bert.name_or_path}|cls|max_length={max_length}",
+            input_size
+        )
+        rows = store.encode_corpus(
+            [item[0] for item in train_data],
+            lambda texts: self._encode_texts(texts, max_length),
+            batch_size=encode_batch_size
+        )
+        
         # 创建数据集
-        train_dataset = BertDataset(train_data)
+        train_dataset = BertFeatureDataset(store, rows, [item[1] for item in train_data])
         train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
         
         # 创建分类器
@@ -166,25 +200,16 @@ class BertModel_Custom(BaseModel):
         scheduler = torch.optim.lr_scheduler.ExponentialLR(optimizer, gamma=decay_rate)
         
         # 训练循环
-        self.bert.eval()  # BERT始终保持评估模式
         self.classifier.train()
         
         for epoch in range(num_epochs):
             total_loss = 0
             num_batches = 0
             
-            for i, (words, labels) in enumerate(train_loader):
-                # 分词和编码
-                tokens = self.tokenizer(words, padding=True, truncation=True, 
-                                      max_length=512, return_tensors='pt')
-                input_ids = tokens["input_ids"].to(self.device)
-                attention_mask = tokens["attention_mask"].to(self.device)
-                labels = torch.tensor(labels, dtype=torch.float32).to(self.device)
-                
-                # 获取BERT输出（冻结参数）
-                with torch.no_grad():
-                    bert_outputs = self.bert(input_ids, attention_mask=attention_mask)
-                    bert_output = bert_outputs[0][:, 0]  # [CLS] token的输出
+            for i, (features, labels) in enumerate(train_loader):
+                # 缓存中的BERT [CLS] 特征
+                bert_output = features.to(self.device)
+                labels = labels.to(self.device, dtype=torch.float32)
                 
                 # 分类器前向传播
                 optimizer.zero_grad()
@@ -220,11 +245,14 @@ class BertModel_Custom(BaseModel):
     
     def predict(self, texts: List[str]) -> List[int]:
         """预测文本情感"""
+        return (self.predict_proba(texts) > 0.5).astype(int).tolist()
+    
+    def predict_proba(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """批量预测文本为正面情感的概率"""
         if not self.is_trained:
             raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
         
-        predictions = []
-        batch_size = 32
+        probs = []
         
         self.bert.eval()
         self.classifier.eval()
@@ -233,25 +261,14 @@ class BertModel_Custom(BaseModel):
             for i in range(0, len(texts), batch_size):
                 batch_texts = texts[i:i+batch_size]
                 
-                # 分词和编码
-                tokens = self.tokenizer(batch_texts, padding=True, truncation=True,
-                                      max_length=512, return_tensors='pt')
-                input_ids = tokens["input_ids"].to(self.device)
-                attention_mask = tokens["attention_mask"].to(self.device)
-                
                 # 获取BERT输出
-                bert_outputs = self.bert(input_ids, attention_mask=attention_mask)
-                bert_output = bert_outputs[0][:, 0]
+                bert_output = torch.from_numpy(self._encode_texts(batch_texts)).to(self.device)
                 
                 # 分类器预测
                 outputs = self.classifier(bert_output)
-                outputs = outputs.view(-1)
-                
-                # 转换为类别标签
-                preds = (outputs > 0.5).cpu().numpy()
-                predictions.extend(preds.astype(int).tolist())
+                probs.extend(outputs.view(-1).cpu().numpy().tolist())
         
-        return predictions
+        return np.asarray(probs, dtype=np.float64)
     
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感"""
@@ -350,6 +367,8 @@ def main():
                         help='模型保存路径')
     parser.add_argument('--bert_path', type=str, default='./model/chinese_wwm_pytorch',
                         help='BERT预训练模型路径')
+    parser.add_argument('--feature_cache_dir', type=str, default='./model/feature_cache',
+                        help='BERT特征缓存目录')
     parser.add_argument('--epochs', type=int, default=10,
                         help='训练轮数')
     parser.add_argument('--batch_size', type=int, default=100,
@@ -362,7 +381,7 @@ def main():
     args = parser.parse_args()
     
     # 创建模型
-    model = BertModel_Custom(args.bert_path)
+    model = BertModel_Custom(args.bert_path, args.feature_cache_dir)
     
     if args.eval_only:
         # 仅评估模式
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+集成预测的共享特征与加权投票
+分词方式相同的词袋/TF-IDF模型共用一次分词计数，各模型的正面概率按权重合并为最终预测。
+只依赖numpy/scipy/sklearn，不加载任何模型。
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+
+# 决定分词与计数结果的vectorizer参数，这些参数相同的vectorizer可以共用一次分词
+ANALYZER_PARAMS = (
+    'input', 'encoding', 'decode_error', 'strip_accents', 'lowercase',
+    'preprocessor', 'tokenizer', 'analyzer', 'stop_words', 'token_pattern', 'ngram_range'
+)
+
+
+def _analyzer_signature(vectorizer) -> Optional[tuple]:
+    """返回vectorizer分词方式的签名，不是CountVectorizer/TfidfVectorizer时返回None"""
+    if not isinstance(vectorizer, CountVectorizer) or not hasattr(vectorizer, 'vocabulary_'):
+        return None
+
+    params = vectorizer.get_params()
+    signature = []
+    for name in ANALYZER_PARAMS:
+        value = params.get(name)
+        if isinstance(value, (list, set, frozenset)):
+            value = tuple(sorted(value))
+        elif callable(value):
+            value = id(value)
+        signature.append((name, value))
+    return tuple(signature)
+
+
+class SharedTextFeatures:
+    """在分词方式相同的多个vectorizer之间共享分词和计数
+
+    先用这些vectorizer词表的并集对文本计数一次，再按列取出各模型词表对应的计数矩阵，
+    TF-IDF模型在计数矩阵上套用自己的TF-IDF变换，结果与各自调用transform相同。
+    """
+
+    def __init__(self, vectorizers: Dict[str, CountVectorizer]):
+        self.groups = []
+        grouped = {}
+        for name, vectorizer in vectorizers.items():
+            grouped.setdefault(_analyzer_signature(vectorizer), []).append(name)
+
+        for signature, names in grouped.items():
+            if signature is None:
+                continue
+
+            # 各vectorizer词表的并集
+            union_vocabulary = {}
+            for name in names:
+                for term in vectorizers[name].vocabulary_:
+                    union_vocabulary.setdefault(term, len(union_vocabulary))
+
+            base_params = {key: value for key, value in vectorizers[names[0]].get_params().items()
+                           if key in ANALYZER_PARAMS}
+            counter = CountVectorizer(vocabulary=union_vocabulary, **base_params)
+
+            # 每个vectorizer的第j列对应并集词表中的哪一列
+            members = {}
+            for name in names:
+                vocabulary = vectorizers[name].vocabulary_
+                columns = np.empty(len(vocabulary), dtype=np.int64)
+                for term, index in vocabulary.items():
+                    columns[index] = union_vocabulary[term]
+                members[name] = (vectorizers[name], columns)
+
+            self.groups.append((counter, members))
+
+    @property
+    def model_names(self) -> List[str]:
+        """可以使用共享特征的模型"""
+        return [name for _, members in self.groups for name in members]
+
+    def transform(self, texts: List[str], model_names: List[str] = None) -> Dict[str, sp.csr_matrix]:
+        """对文本做一次分词计数，返回每个模型对应的特征矩阵
+
+        Args:
+            texts: 预处理后的文本
+            model_names: 只计算这些模型的特征，为None时计算全部
+        """
+        features = {}
+        for counter, members in self.groups:
+            wanted = [name for name in members if model_names is None or name in model_names]
+            if not wanted:
+                continue
+            counts = counter.transform(texts).tocsc()
+            for name in wanted:
+                vectorizer, columns = members[name]
+                X = counts[:, columns].tocsr()
+                if vectorizer.binary:
+                    X.data[:] = 1
+                if isinstance(vectorizer, TfidfVectorizer):
+                    X = self._apply_tfidf(X, vectorizer)
+                else:
+                    X = X.astype(vectorizer.dtype)
+                features[name] = X
+        return features
+
+    @staticmethod
+    def _apply_tfidf(X: sp.csr_matrix, vectorizer: TfidfVectorizer) -> sp.csr_matrix:
+        """按vectorizer的公开参数（sublinear_tf、use_idf/idf_、norm）做TF-IDF变换，
+        与TfidfVectorizer.transform在计数之后的步骤相同"""
+        X = X.astype(np.float64)
+        if vectorizer.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        if vectorizer.use_idf:
+            X = X @ sp.diags(vectorizer.idf_)
+        if vectorizer.norm:
+            X = normalize(X, norm=vectorizer.norm, copy=False)
+        return X.astype(vectorizer.dtype).tocsr()
+
+
+def weighted_vote(model_names: List[str], probs: np.ndarray,
+                  weights: Dict[str, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """对各模型的正面概率加权平均，预测失败（NaN）的模型不参与
+
+    Args:
+        model_names: probs每一行对应的模型
+        probs: 形状为 (模型数, 文本数) 的正面概率
+        weights: 模型权重，为None时平均权重，未列出的模型权重为0
+
+    Returns:
+        (predictions, confidences)；没有可用模型（或可用模型权重都为0）的文本返回 (0, 0.5)
+    """
+    weight_vector = np.array([
+        1.0 if weights is None else weights.get(name, 0.0) for name in model_names
+    ], dtype=np.float64)[:, None]
+    valid = ~np.isnan(probs)
+
+    total_weight = (weight_vector * valid).sum(axis=0)
+    weighted_prob = (weight_vector * np.where(valid, probs, 0.0)).sum(axis=0)
+    final_prob = np.divide(weighted_prob, total_weight,
+                           out=np.full(probs.shape[1], 0.5), where=total_weight > 0)
+
+    predictions = (final_prob > 0.5).astype(int)
+    confidences = np.where(predictions == 1, final_prob, 1 - final_prob)
+    return predictions, confidences
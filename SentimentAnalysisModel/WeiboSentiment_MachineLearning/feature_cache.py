@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+冻结编码器的特征缓存
+BERT / Qwen3-Embedding 参数冻结时，同一文本每个epoch得到的特征完全相同。
+训练前先把语料编码一次，以float16写入内存映射文件，按（模型 + 文本哈希）索引，
+之后每个epoch只需从缓存读取特征训练分类头，再次训练同一语料时也直接复用。
+"""
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+
+# 特征文件、文本哈希索引和元信息的文件名
+FEATURES_FILE = "features.f16"
+KEYS_FILE = "keys.txt"
+META_FILE = "meta.json"
+
+# 预计算时每次送入编码器的文本条数
+DEFAULT_ENCODE_BATCH_SIZE = 64
+
+
+def text_hash(text: str) -> str:
+    """文本内容哈希，作为特征缓存的键"""
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+
+class FeatureStore:
+    """
+    单个编码器的特征缓存
+
+    目录结构：<cache_dir>/<模型键哈希>/ 下的 features.f16（按行追加的float16矩阵）、
+    keys.txt（每行一个文本哈希，行号即特征行号）和 meta.json。
+    每批编码完成后立即追加写入，预计算中断后再次运行只编码缺失的文本。
+    """
+
+    def __init__(self, cache_dir: str, model_key: str, dim: int):
+        """
+        Args:
+            cache_dir: 缓存根目录
+            model_key: 唯一标识编码方式的字符串（模型名、截断长度、取向量方式等），变化时使用新的缓存
+            dim: 特征维度
+        """
+        self.model_key = model_key
+        self.dim = dim
+        digest = hashlib.sha1(model_key.encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(cache_dir, digest)
+        self.features_path = os.path.join(self.path, FEATURES_FILE)
+        self.keys_path = os.path.join(self.path, KEYS_FILE)
+        self._index: Dict[str, int] = {}
+        self._features: Optional[np.memmap] = None
+        self._load()
+
+    def __len__(self):
+        return len(self._index)
+
+    def _load(self):
+        """读取已有的索引，丢弃中断时写了一半的行"""
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, META_FILE)
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"model_key": self.model_key, "dim": self.dim}, f, ensure_ascii=False)
+
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path, "r", encoding="utf-8") as f:
+                keys = [line.strip() for line in f if line.strip()]
+
+        row_bytes = self.dim * np.dtype(np.float16).itemsize
+        feature_rows = os.path.getsize(self.features_path) // row_bytes if os.path.exists(self.features_path) else 0
+        rows = min(len(keys), feature_rows)
+        if rows < len(keys) or (os.path.exists(self.features_path)
+                                and os.path.getsize(self.features_path) != rows * row_bytes):
+            with open(self.keys_path, "w", encoding="utf-8") as f:
+                f.writelines(key + "\n" for key in keys[:rows])
+            with open(self.features_path, "ab") as f:
+                f.truncate(rows * row_bytes)
+
+        self._index = {key: row for row, key in enumerate(keys[:rows])}
+        self._features = None
+
+    def _append(self, hashes: List[str], features: np.ndarray):
+        """追加一批特征，先写特征再写索引，保证索引中的行都已写入"""
+        features = np.asarray(features, dtype=np.float16).reshape(len(hashes), self.dim)
+        with open(self.features_path, "ab") as f:
+            f.write(features.tobytes())
+        with open(self.keys_path, "a", encoding="utf-8") as f:
+            f.writelines(key + "\n" for key in hashes)
+        start = len(self._index)
+        for offset, key in enumerate(hashes):
+            self._index[key] = start + offset
+        self._features = None
+
+    def encode_corpus(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray],
+                      batch_size: int = DEFAULT_ENCODE_BATCH_SIZE, show_progress: bool = True) -> np.ndarray:
+        """
+        确保所有文本的特征都在缓存中，返回与texts一一对应的特征行号
+
+        Args:
+            texts: 语料文本
+            encode_fn: 编码函数，输入一批文本，返回形状为 (批大小, dim) 的数组
+            batch_size: 每次编码的文本条数
+
+        Returns:
+            行号数组，配合 features 属性读取特征
+        """
+        hashes = [text_hash(text) for text in texts]
+        missing = {}
+        for key, text in zip(hashes, texts):
+            if key not in self._index and key not in missing:
+                missing[key] = str(text)
+
+        if missing:
+            # 按长度排序后分批，同一批文本长度接近，减少填充带来的无效计算
+            pending = sorted(missing.items(), key=lambda item: len(item[1]))
+            total_batches = (len(pending) + batch_size - 1) // batch_size
+            if show_progress:
+                print(f"特征缓存: {len(set(hashes))} 条不同文本中需要编码 {len(pending)} 条")
+            for batch_index, start in enumerate(range(0, len(pending), batch_size)):
+                batch = pending[start:start + batch_size]
+                features = encode_fn([text for _, text in batch])
+                self._append([key for key, _ in batch], features)
+                if show_progress and ((batch_index + 1) % 50 == 0 or batch_index + 1 == total_batches):
+                    print(f"特征预计算: [{batch_index + 1}/{total_batches}]")
+        elif show_progress:
+            print(f"特征缓存: 全部 {len(texts)} 条文本已缓存")
+
+        return np.array([self._index[key] for key in hashes], dtype=np.int64)
+
+    @property
+    def features(self) -> np.ndarray:
+        """只读的内存映射特征矩阵，形状为 (缓存条数, dim)，类型为float16"""
+        if self._features is None:
+            if not self._index:
+                return np.zeros((0, self.dim), dtype=np.float16)
+            self._features = np.memmap(self.features_path, dtype=np.float16, mode="r",
+                                       shape=(len(self._index), self.dim))
+        return self._features
+
+    def get_features(self, rows: np.ndarray) -> np.ndarray:
+        """按行号读取一批特征，转换为float32"""
+        return np.asarray(self.features[np.asarray(rows)], dtype=np.float32)
@@ -200,6 +200,26 @@ class LSTMModel(BaseModel):
         
         return predictions
     
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """批量预测文本为正面情感的概率，没有有效词向量的文本返回0.5"""
+        if not self.is_trained:
+            raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
+        
+        # 用文本下标作为标签，批处理按长度重排后仍能写回原位置
+        test_dataset = LSTMDataset([(text, index) for index, text in enumerate(texts)], self.word2vec_model)
+        test_loader = DataLoader(test_dataset, batch_size=32, collate_fn=collate_fn)
+        
+        probs = np.full(len(texts), 0.5, dtype=np.float64)
+        self.model.eval()
+        
+        with torch.no_grad():
+            for x, indices, lengths in test_loader:
+                x = x.to(self.device)
+                outputs = self.model(x, lengths)
+                probs[indices.long().numpy()] = outputs.view(-1).cpu().numpy()
+        
+        return probs
+    
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感"""
         if not self.is_trained:
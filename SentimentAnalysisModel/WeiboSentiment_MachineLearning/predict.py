@@ -10,14 +10,21 @@ from typing import Dict, Tuple, List
 import warnings
 warnings.filterwarnings("ignore")
 
+import numpy as np
+import pandas as pd
+
 # 导入所有模型类
 from bayes_train import BayesModel
 from svm_train import SVMModel
 from xgboost_train import XGBoostModel
 from lstm_train import LSTMModel
 from bert_train import BertModel_Custom
-from utils import processing
+from utils import processing, processing_batch
+from ensemble import SharedTextFeatures, weighted_vote
+
 
+# 批量集成预测时每次处理的文本条数，限制特征矩阵占用的内存
+ENSEMBLE_CHUNK_SIZE = 10000
 
 class SentimentPredictor:
     """情感分析预测器"""
@@ -31,6 +38,8 @@ class SentimentPredictor:
             'lstm': LSTMModel,
             'bert': BertModel_Custom
         }
+        # 已加载模型之间共享的分词计数，模型变化时重新构建
+        self._shared_features = None
         
     def load_model(self, model_type: str, model_path: str, **kwargs) -> None:
         """加载指定类型的模型
@@ -59,6 +68,7 @@ class SentimentPredictor:
             
             model.load_model(model_path)
             self.models[model_type] = model
+            self._shared_features = None
             print(f"{model_type.upper()} 模型加载成功")
             
         except Exception as e:
@@ -128,7 +138,7 @@ class SentimentPredictor:
             Dict[model_type, predictions]
         """
         # 文本预处理
-        processed_texts = [processing(text) for text in texts]
+        processed_texts = processing_batch(texts)
         
         if model_type:
             if model_type not in self.models:
@@ -149,43 +159,114 @@ class SentimentPredictor:
         
         return results
     
-    def ensemble_predict(self, text: str, weights: Dict[str, float] = None) -> Tuple[int, float]:
-        """集成预测（多个模型投票）
+    def _get_shared_features(self) -> SharedTextFeatures:
+        """已加载的词袋/TF-IDF模型共用的特征提取器"""
+        if self._shared_features is None:
+            self._shared_features = SharedTextFeatures({
+                name: model.vectorizer for name, model in self.models.items()
+                if getattr(model, 'vectorizer', None) is not None
+            })
+        return self._shared_features
+    
+    def predict_proba_batch(self, texts: List[str], model_types: List[str] = None,
+                            processed: bool = False,
+                            chunk_size: int = ENSEMBLE_CHUNK_SIZE) -> Tuple[List[str], np.ndarray]:
+        """批量计算各模型的正面概率
+        
+        每条文本只做一次预处理（jieba分词，见processing_batch），分词方式相同的Bayes、SVM、XGBoost共用一次计数，
+        文本按chunk_size分块计算以限制内存占用。
         
         Args:
-            text: 待预测文本
+            texts: 待预测文本列表
+            model_types: 参与预测的模型，为None时使用所有已加载的模型
+            processed: texts是否已经过processing预处理
+            chunk_size: 每块文本条数
+            
+        Returns:
+            (model_names, probs)，probs形状为 (模型数, 文本数)，预测失败的模型对应行为NaN
+        """
+        model_names = list(model_types) if model_types else list(self.models.keys())
+        for name in model_names:
+            if name not in self.models:
+                raise ValueError(f"模型 {name} 未加载")
+        
+        # 文本预处理
+        processed_texts = list(texts) if processed else processing_batch(texts)
+        
+        probs = np.full((len(model_names), len(processed_texts)), np.nan)
+        shared = self._get_shared_features()
+        failed = set()
+        
+        for start in range(0, len(processed_texts), chunk_size):
+            chunk = processed_texts[start:start + chunk_size]
+            end = start + len(chunk)
+            features = shared.transform(chunk, [name for name in model_names if name not in failed])
+            
+            for row, name in enumerate(model_names):
+                if name in failed:
+                    continue
+                model = self.models[name]
+                try:
+                    if name in features:
+                        probs[row, start:end] = model.predict_proba_from_features(features[name])
+                    else:
+                        probs[row, start:end] = model.predict_proba(chunk)
+                except Exception as e:
+                    print(f"模型 {name} 预测失败: {e}")
+                    failed.add(name)
+                    probs[row, :] = np.nan
+        
+        return model_names, probs
+    
+    def ensemble_predict_batch(self, texts: List[str], weights: Dict[str, float] = None,
+                               processed: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """批量集成预测（多个模型加权投票）
+        
+        Args:
+            texts: 待预测文本列表
             weights: 模型权重，如果为None则平均权重
+            processed: texts是否已经过processing预处理
             
         Returns:
-            (prediction, confidence)
+            (predictions, confidences)，均为长度为len(texts)的数组
         """
         if len(self.models) == 0:
             raise ValueError("没有加载任何模型")
         
-        results = self.predict_single(text)
-        
-        if weights is None:
-            weights = {name: 1.0 for name in results.keys()}
-        
-        # 加权平均
-        total_weight = 0
-        weighted_prob = 0
+        model_names, probs = self.predict_proba_batch(texts, processed=processed)
+        return weighted_vote(model_names, probs, weights)
+    
+    def ensemble_predict(self, text: str, weights: Dict[str, float] = None) -> Tuple[int, float]:
+        """集成预测（多个模型投票）
         
-        for model_name, (pred, conf) in results.items():
-            if model_name in weights:
-                weight = weights[model_name]
-                prob = conf if pred == 1 else 1 - conf
-                weighted_prob += prob * weight
-                total_weight += weight
+        Args:
+            text: 待预测文本
+            weights: 模型权重，如果为None则平均权重
+            
+        Returns:
+            (prediction, confidence)
+        """
+        predictions, confidences = self.ensemble_predict_batch([text], weights)
+        return int(predictions[0]), float(confidences[0])
+    
+    def predict_file(self, input_path: str, output_path: str, weights: Dict[str, float] = None) -> None:
+        """批量预测文件中的文本（每行一条），将各模型概率和集成结果保存为CSV"""
+        with open(input_path, "r", encoding="utf8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+        print(f"读取 {len(texts)} 条文本: {input_path}")
         
-        if total_weight == 0:
-            return 0, 0.5
+        model_names, probs = self.predict_proba_batch(texts)
+        predictions, confidences = weighted_vote(model_names, probs, weights)
         
-        final_prob = weighted_prob / total_weight
-        final_pred = int(final_prob > 0.5)
-        final_conf = final_prob if final_pred == 1 else 1 - final_prob
+        result = pd.DataFrame({'text': texts})
+        for row, name in enumerate(model_names):
+            result[f'{name}_prob'] = probs[row]
+        result['prediction'] = predictions
+        result['confidence'] = confidences
         
-        return final_pred, final_conf
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        result.to_csv(output_path, index=False, encoding='utf-8-sig')
+        print(f"预测结果已保存到: {output_path}（正面 {int(predictions.sum())} 条，负面 {int(len(predictions) - predictions.sum())} 条）")
     
     def interactive_predict(self):
         """交互式预测模式"""
@@ -266,6 +347,10 @@ def main():
                         help='交互式预测模式（默认）')
     parser.add_argument('--ensemble', action='store_true',
                         help='使用集成预测')
+    parser.add_argument('--input_file', type=str,
+                        help='批量预测文件，每行一条文本')
+    parser.add_argument('--output_file', type=str, default='./predictions.csv',
+                        help='批量预测结果保存路径')
     
     args = parser.parse_args()
     
@@ -288,8 +373,11 @@ def main():
         # 加载所有模型
         predictor.load_all_models(args.model_dir, args.bert_path)
     
+    # 如果指定了文件，批量预测
+    if args.input_file:
+        predictor.predict_file(args.input_file, args.output_file)
     # 如果指定了文本，直接预测
-    if args.text:
+    elif args.text:
         if args.ensemble and len(predictor.models) > 1:
             pred, conf = predictor.ensemble_predict(args.text)
             sentiment = "正面" if pred == 1 else "负面"
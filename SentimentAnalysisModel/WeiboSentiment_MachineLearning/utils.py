@@ -3,12 +3,43 @@ import jieba
 import re
 import os
 import pickle
-from typing import List, Tuple, Any
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Any, Optional
+
+
+# 微博文本清洗规则（预编译），processing和processing_bert共用
+CLEAN_PATTERNS = [
+    re.compile(r"\{%.+?%\}"),     # 去除 {%xxx%} (地理定位, 微博话题等)
+    re.compile(r"@.+?( |$)"),     # 去除 @xxx (用户名)
+    re.compile(r"【.+?】"),        # 去除 【xx】 (里面的内容通常都不是用户自己写的)
+    re.compile("\u200b"),         # '\u200b'是这个数据集中的一个bad case, 不用特别在意
+]
+
+# 本模块所在目录，数据文件路径相对于它解析，不受调用方工作目录影响
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 分词结果缓存文件，按文本内容哈希保存processing的结果
+TOKENIZE_CACHE_PATH = os.path.join(MODULE_DIR, "data", "tokenize_cache.db")
+
+# 分词缓存最多保留的条数，超出后淘汰最久未使用的条目
+TOKENIZE_CACHE_MAX_ROWS = 500000
+
+# processing的逻辑变化时修改该版本号，使旧的分词缓存失效
+PROCESSING_VERSION = "1"
+
+# 需要分词的文本不少于该数量时才使用多进程
+PARALLEL_MIN_TEXTS = 5000
+
+# 每个子进程任务处理的文本条数
+PARALLEL_CHUNK_SIZE = 2000
 
 
 # 加载停用词
 stopwords = []
-stopwords_path = "data/stopwords.txt"
+stopwords_path = os.path.join(MODULE_DIR, "data", "stopwords.txt")
 if os.path.exists(stopwords_path):
     with open(stopwords_path, "r", encoding="utf8") as f:
         for w in f:
@@ -21,13 +52,15 @@ def load_corpus(path):
     """
     加载语料库
     """
-    data = []
+    labels = []
+    contents = []
     with open(path, "r", encoding="utf8") as f:
         for line in f:
             [_, seniment, content] = line.split(",", 2)
-            content = processing(content)
-            data.append((content, int(seniment)))
-    return data
+            contents.append(content)
+            labels.append(int(seniment))
+    contents = processing_batch(contents)
+    return list(zip(contents, labels))
 
 
 def load_corpus_bert(path):
@@ -43,23 +76,41 @@ def load_corpus_bert(path):
     return data
 
 
+def clean_text(text):
+    """
+    去除微博中的话题、用户名等非用户原创内容
+    """
+    for pattern in CLEAN_PATTERNS:
+        text = pattern.sub(" ", text)
+    return text
+
+
+def merge_negation(words):
+    """
+    对否定词`不`做特殊处理: 与其后面的词进行拼接（单次遍历）
+    """
+    merged = []
+    index = 0
+    while index < len(words):
+        if words[index] == "不" and index + 1 < len(words):
+            merged.append(words[index] + words[index + 1])
+            index += 2
+        else:
+            merged.append(words[index])
+            index += 1
+    return merged
+
+
 def processing(text):
     """
     数据预处理, 可以根据自己的需求进行重载
     """
     # 数据清洗部分
-    text = re.sub("\{%.+?%\}", " ", text)           # 去除 {%xxx%} (地理定位, 微博话题等)
-    text = re.sub("@.+?( |$)", " ", text)           # 去除 @xxx (用户名)
-    text = re.sub("【.+?】", " ", text)              # 去除 【xx】 (里面的内容通常都不是用户自己写的)
-    text = re.sub("\u200b", " ", text)              # '\u200b'是这个数据集中的一个bad case, 不用特别在意
+    text = clean_text(text)
     # 分词
     words = [w for w in jieba.lcut(text) if w.isalpha()]
     # 对否定词`不`做特殊处理: 与其后面的词进行拼接
-    while "不" in words:
-        index = words.index("不")
-        if index == len(words) - 1:
-            break
-        words[index: index+2] = ["".join(words[index: index+2])]  # 列表切片赋值的酷炫写法
+    words = merge_negation(words)
     # 用空格拼接成字符串
     result = " ".join(words)
     return result
@@ -70,11 +121,115 @@ def processing_bert(text):
     数据预处理, 可以根据自己的需求进行重载
     """
     # 数据清洗部分
-    text = re.sub("\{%.+?%\}", " ", text)           # 去除 {%xxx%} (地理定位, 微博话题等)
-    text = re.sub("@.+?( |$)", " ", text)           # 去除 @xxx (用户名)
-    text = re.sub("【.+?】", " ", text)              # 去除 【xx】 (里面的内容通常都不是用户自己写的)
-    text = re.sub("\u200b", " ", text)              # '\u200b'是这个数据集中的一个bad case, 不用特别在意
-    return text
+    return clean_text(text)
+
+
+def _text_key(text):
+    """分词缓存的键：处理版本 + 文本内容哈希"""
+    return hashlib.sha1(f"{PROCESSING_VERSION}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _init_tokenize_worker():
+    """子进程启动时加载一次jieba词典"""
+    jieba.initialize()
+
+
+def _processing_chunk(texts):
+    return [processing(text) for text in texts]
+
+
+class TokenizeCache:
+    """
+    分词结果的磁盘缓存（SQLite），重新训练和批量预测同一批文本时跳过jieba分词
+
+    每条记录保存最近一次使用的时间，条数超过max_rows时按LRU淘汰。
+    """
+
+    def __init__(self, path: str = TOKENIZE_CACHE_PATH, max_rows: int = TOKENIZE_CACHE_MAX_ROWS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_rows = max(1, max_rows)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS tokens "
+                          "(key TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tokens_last_used ON tokens (last_used)")
+        self.conn.commit()
+
+    def get_many(self, keys: List[str]) -> dict:
+        """批量查询，返回 {key: result}，并刷新命中条目的使用时间"""
+        found = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(f"SELECT key, result FROM tokens WHERE key IN ({placeholders})", batch)
+            found.update(rows)
+        if found:
+            now = time.time()
+            with self.conn:
+                self.conn.executemany("UPDATE tokens SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+        return found
+
+    def set_many(self, items: List[Tuple[str, str]]) -> None:
+        """批量写入 (key, result)，超出条数上限时淘汰最久未使用的条目"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO tokens (key, result, last_used) VALUES (?, ?, ?)",
+                                  [(key, result, now) for key, result in items])
+            excess = self.conn.execute("SELECT COUNT(*) FROM tokens").fetchone()[0] - self.max_rows
+            if excess > 0:
+                self.conn.execute("DELETE FROM tokens WHERE key IN "
+                                  "(SELECT key FROM tokens ORDER BY last_used LIMIT ?)", (excess,))
+
+    def close(self):
+        self.conn.close()
+
+
+def processing_batch(texts: List[str], workers: Optional[int] = None,
+                     cache_path: Optional[str] = TOKENIZE_CACHE_PATH) -> List[str]:
+    """
+    批量预处理，结果与逐条调用processing相同
+
+    重复文本只处理一次；已缓存的文本直接读取缓存；需要分词的文本较多时分片交给进程池，
+    每个子进程只加载一次jieba词典。单条文本（如逐条预测）直接分词，不读写缓存文件。
+
+    Args:
+        texts: 原始文本列表
+        workers: 进程数，为None时使用CPU核数，为1时不使用多进程
+        cache_path: 分词缓存文件路径，为None时不使用缓存
+
+    Returns:
+        与texts一一对应的预处理结果
+    """
+    keys = [_text_key(text) for text in texts]
+    unique = dict(zip(keys, texts))
+
+    # 单条文本分词比打开SQLite并提交事务更快
+    cache = TokenizeCache(cache_path) if cache_path and len(unique) > 1 else None
+    try:
+        results = cache.get_many(list(unique)) if cache else {}
+        missing = [key for key in unique if key not in results]
+
+        if missing:
+            missing_texts = [unique[key] for key in missing]
+            workers = workers or os.cpu_count() or 1
+            if workers > 1 and len(missing_texts) >= PARALLEL_MIN_TEXTS:
+                chunks = [missing_texts[start:start + PARALLEL_CHUNK_SIZE]
+                          for start in range(0, len(missing_texts), PARALLEL_CHUNK_SIZE)]
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_tokenize_worker) as executor:
+                    processed = [result for chunk in executor.map(_processing_chunk, chunks) for result in chunk]
+            else:
+                processed = _processing_chunk(missing_texts)
+
+            new_results = list(zip(missing, processed))
+            results.update(new_results)
+            if cache:
+                cache.set_many(new_results)
+    finally:
+        if cache:
+            cache.close()
+
+    return [results[key] for key in keys]
 
 
 def save_model(model: Any, model_path: str) -> None:
@@ -126,6 +126,10 @@ class XGBoostModel(BaseModel):
         
         return prediction, float(confidence)
     
+    def predict_proba_from_features(self, X) -> np.ndarray:
+        """根据已转换的特征矩阵预测正面概率"""
+        return np.asarray(self.model.predict(xgb.DMatrix(X)), dtype=np.float64)
+    
     def evaluate(self, test_data: List[Tuple[str, int]]) -> dict:
         """评估模型性能，包含AUC指标"""
         if not self.is_trained:
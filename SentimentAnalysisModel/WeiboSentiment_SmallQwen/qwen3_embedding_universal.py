@@ -5,6 +5,7 @@ Qwen3-Embedding通用训练脚本
 """
 import argparse
 import os
+import numpy as np
 import torch
 import torch.nn as nn
 from torch.utils.data import Dataset, DataLoader
@@ -14,39 +15,27 @@ import warnings
 from tqdm import tqdm
 
 from base_model import BaseQwenModel
+from feature_cache import FeatureStore
 from models_config import QWEN3_MODELS, MODEL_PATHS
 
 warnings.filterwarnings("ignore")
 
 
-class SentimentDataset(Dataset):
-    """情感分析数据集"""
+class EmbeddingFeatureDataset(Dataset):
+    """从特征缓存读取预先计算的embedding的情感分析数据集"""
     
-    def __init__(self, data: List[Tuple[str, int]], tokenizer, max_length=512):
-        self.texts = [item[0] for item in data]
-        self.labels = [item[1] for item in data]
-        self.tokenizer = tokenizer
-        self.max_length = max_length
+    def __init__(self, store: FeatureStore, rows: np.ndarray, labels: List[int]):
+        self.features = store.features
+        self.rows = rows
+        self.labels = labels
     
     def __len__(self):
-        return len(self.texts)
+        return len(self.labels)
     
     def __getitem__(self, idx):
-        text = str(self.texts[idx])
-        label = self.labels[idx]
-        
-        encoding = self.tokenizer(
-            text,
-            max_length=self.max_length,
-            padding='max_length',
-            truncation=True,
-            return_tensors='pt'
-        )
-        
         return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'label': torch.tensor(label, dtype=torch.float)
+            'embedding': torch.from_numpy(np.asarray(self.features[self.rows[idx]], dtype=np.float32)),
+            'label': torch.tensor(self.labels[idx], dtype=torch.float)
         }
 
 
@@ -76,7 +65,10 @@ class SentimentClassifier(nn.Module):
             outputs = self.embedding_model(input_ids=input_ids, attention_mask=attention_mask)
             embeddings = outputs.last_hidden_state[:, 0, :]
         
-        # 通过分类头
+        return self.classify_embeddings(embeddings)
+    
+    def classify_embeddings(self, embeddings):
+        """对已计算好的embedding只运行分类头"""
         logits = self.classifier(embeddings)
         return logits.squeeze()
 
@@ -84,7 +76,7 @@ class SentimentClassifier(nn.Module):
 class Qwen3EmbeddingUniversal(BaseQwenModel):
     """通用Qwen3-Embedding模型"""
     
-    def __init__(self, model_size: str = "0.6B"):
+    def __init__(self, model_size: str = "0.6B", feature_cache_dir: str = "./models/feature_cache"):
         if model_size not in QWEN3_MODELS:
             raise ValueError(f"不支持的模型大小: {model_size}")
             
@@ -93,6 +85,7 @@ class Qwen3EmbeddingUniversal(BaseQwenModel):
         self.config = QWEN3_MODELS[model_size]
         self.model_name_hf = self.config["embedding_model"]
         self.embedding_dim = self.config["embedding_dim"]
+        self.feature_cache_dir = feature_cache_dir
         
         self.tokenizer = None
         self.embedding_model = None
@@ -159,8 +152,26 @@ class Qwen3EmbeddingUniversal(BaseQwenModel):
                 print(f"从HuggingFace下载也失败: {e2}")
                 raise RuntimeError(f"无法加载{self.model_size}模型，所有方法都失败了")
     
+    def _encode_texts(self, texts: List[str], max_length: int = 512) -> np.ndarray:
+        """用冻结的embedding模型编码一批文本，返回首个token的embedding"""
+        encodings = self.tokenizer(
+            texts,
+            max_length=max_length,
+            padding=True,
+            truncation=True,
+            return_tensors='pt'
+        )
+        input_ids = encodings['input_ids'].to(self.device)
+        attention_mask = encodings['attention_mask'].to(self.device)
+        
+        with torch.no_grad():
+            outputs = self.embedding_model(input_ids=input_ids, attention_mask=attention_mask)
+            embeddings = outputs.last_hidden_state[:, 0, :]
+        
+        return embeddings.float().cpu().numpy()
+    
     def train(self, train_data: List[Tuple[str, int]], **kwargs) -> None:
-        """训练模型"""
+        """训练模型（embedding模型参数冻结，先把语料编码进特征缓存，再只训练分类头）"""
         print(f"开始训练 Qwen3-Embedding-{self.model_size} 模型...")
         
         # 加载embedding模型
@@ -175,8 +186,21 @@ class Qwen3EmbeddingUniversal(BaseQwenModel):
         print(f"超参数: batch_size={batch_size}, lr={learning_rate}, epochs={num_epochs}")
         print(f"嵌入维度: {self.embedding_dim}")
         
+        # 预计算embedding：模型只对缓存中没有的文本运行一次，之后每个epoch直接读取缓存
+        self.embedding_model.eval()
+        store = FeatureStore(
+            kwargs.get('feature_cache_dir', self.feature_cache_dir),
+            f"qwen3-embedding|{self.model_name_hf}|first_token|max_length={max_length}",
+            self.embedding_dim
+        )
+        rows = store.encode_corpus(
+            [str(item[0]) for item in train_data],
+            lambda texts: self._encode_texts(texts, max_length),
+            batch_size=kwargs.get('encode_batch_size', batch_size)
+        )
+        
         # 创建数据集
-        train_dataset = SentimentDataset(train_data, self.tokenizer, max_length)
+        train_dataset = EmbeddingFeatureDataset(store, rows, [item[1] for item in train_data])
         train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
         
         # 创建分类器
@@ -189,20 +213,19 @@ class Qwen3EmbeddingUniversal(BaseQwenModel):
         criterion = nn.BCELoss()
         optimizer = torch.optim.Adam(self.classifier_model.classifier.parameters(), lr=learning_rate)
         
-        # 训练循环
-        self.classifier_model.train()
+        # 训练循环（只有分类头处于训练模式）
+        self.classifier_model.classifier.train()
         for epoch in range(num_epochs):
             total_loss = 0
             num_batches = 0
             
             progress_bar = tqdm(train_loader, desc=f"Epoch {epoch+1}/{num_epochs}")
             for batch in progress_bar:
-                input_ids = batch['input_ids'].to(self.device)
-                attention_mask = batch['attention_mask'].to(self.device)
+                embeddings = batch['embedding'].to(self.device)
                 labels = batch['label'].to(self.device)
                 
                 # 前向传播
-                outputs = self.classifier_model(input_ids, attention_mask)
+                outputs = self.classifier_model.classify_embeddings(embeddings).view(-1)
                 loss = criterion(outputs, labels)
                 
                 # 反向传播
@@ -339,6 +362,8 @@ def main():
     parser.add_argument('--batch_size', type=int, help='批大小（可选，使用推荐值）')
     parser.add_argument('--learning_rate', type=float, help='学习率（可选，使用推荐值）')
     parser.add_argument('--eval_only', action='store_true', help='仅评估模式')
+    parser.add_argument('--feature_cache_dir', type=str, default='./models/feature_cache',
+                        help='embedding特征缓存目录')
     
     args = parser.parse_args()
     
@@ -372,7 +397,7 @@ def main():
     os.makedirs('./models', exist_ok=True)
     
     # 创建模型
-    model = Qwen3EmbeddingUniversal(args.model_size)
+    model = Qwen3EmbeddingUniversal(args.model_size, args.feature_cache_dir)
     
     # 确定模型保存路径
     model_path = args.model_path or MODEL_PATHS["embedding"][args.model_size]
@@ -144,22 +144,21 @@ def execute_research(query: str, config: Settings):
         agent._generate_report_structure(query)
         progress_bar.progress(20)
 
-        # 处理段落
+        # 处理段落（启用段落并发时多个段落同时研究，进度回调仍在当前线程中执行）
         total_paragraphs = len(agent.state.paragraphs)
-        for i in range(total_paragraphs):
-            status_text.text(f"正在处理段落 {i + 1}/{total_paragraphs}: {agent.state.paragraphs[i].title}")
-
-            # 初始搜索和总结
-            agent._initial_search_and_summary(i)
-            progress_value = 20 + (i + 0.5) / total_paragraphs * 60
-            progress_bar.progress(int(progress_value))
-
-            # 反思循环
-            agent._reflection_loop(i)
-            agent.state.paragraphs[i].research.mark_completed()
-
-            progress_value = 20 + (i + 1) / total_paragraphs * 60
-            progress_bar.progress(int(progress_value))
+        summarized = set()
+
+        def on_paragraph_progress(i, stage, completed, total):
+            if stage == "summarized":
+                summarized.add(i)
+            # 初始总结完成计半个段落，反思完成计一个段落
+            done = completed + 0.5 * (len(summarized) - completed)
+            progress_bar.progress(int(20 + done / total * 60))
+            if completed < total:
+                status_text.text(f"正在处理段落，已完成 {completed}/{total}，最近更新: {agent.state.paragraphs[i].title}")
+
+        status_text.text(f"正在处理段落 1/{total_paragraphs}: {agent.state.paragraphs[0].title}" if total_paragraphs else "正在处理段落...")
+        agent._process_paragraphs(progress_callback=on_paragraph_progress)
 
         # 生成最终报告
         status_text.text("正在生成最终报告...")
@@ -2,6 +2,7 @@
 Flask主应用 - 统一管理三个Streamlit应用
 """
 
+import gzip
 import os
 import sys
 import subprocess
@@ -17,6 +18,9 @@ from loguru import logger
 import importlib
 from pathlib import Path
 from MindSpider.main import MindSpider
+from ForumEngine.message_bus import get_message_bus
+from utils.process_output import ProcessOutputPipeline, rotated_log_paths
+from utils.log_cursor import tail_log_page, read_log_after
 
 # 导入ReportEngine
 try:
@@ -309,6 +313,8 @@ def init_forum_log():
                 start_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 f.write(f"=== ForumEngine 系统初始化 - {start_time} ===\n")
             logger.info(f"ForumEngine: forum.log 已初始化")
+        init_line = f"=== ForumEngine 系统初始化 - {start_time} ==="
+        get_message_bus().publish(init_line, line=init_line)
     except Exception as e:
         logger.exception(f"ForumEngine: 初始化forum.log失败: {e}")
 
@@ -371,72 +377,30 @@ def parse_forum_log_line(line):
     
     return None
 
-# Forum日志监听器
-def monitor_forum_log():
-    """监听forum.log文件变化并推送到前端"""
-    import time
-    from pathlib import Path
-    
-    forum_log_file = LOG_DIR / "forum.log"
-    last_position = 0
-    processed_lines = set()  # 用于跟踪已处理的行，避免重复
+# /api/forum/log 按游标分页时单页最多返回的消息数
+FORUM_LOG_PAGE_SIZE = 500
+
+# 论坛消息推送：订阅ForumEngine消息总线，直接推送到前端，不再轮询forum.log
+def push_forum_message(message):
+    """把论坛消息总线上的新消息推送到前端"""
+    line = message['line']
     
-    # 如果文件存在，获取初始位置
-    if forum_log_file.exists():
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            # 初始化时读取所有现有行，避免重复处理
-            existing_lines = f.readlines()
-            for line in existing_lines:
-                line_hash = hash(line.strip())
-                processed_lines.add(line_hash)
-            last_position = f.tell()
+    # 解析日志行并发送forum消息
+    parsed_message = parse_forum_log_line(line)
+    if parsed_message:
+        parsed_message['seq'] = message['seq']
+        socketio.emit('forum_message', parsed_message)
     
-    while True:
-        try:
-            if forum_log_file.exists():
-                with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    f.seek(last_position)
-                    new_lines = f.readlines()
-                    
-                    if new_lines:
-                        for line in new_lines:
-                            line = line.rstrip('\n\r')
-                            if line.strip():
-                                line_hash = hash(line.strip())
-                                
-                                # 避免重复处理同一行
-                                if line_hash in processed_lines:
-                                    continue
-                                
-                                processed_lines.add(line_hash)
-                                
-                                # 解析日志行并发送forum消息
-                                parsed_message = parse_forum_log_line(line)
-                                if parsed_message:
-                                    socketio.emit('forum_message', parsed_message)
-                                
-                                # 只有在控制台显示forum时才发送控制台消息
-                                timestamp = datetime.now().strftime('%H:%M:%S')
-                                formatted_line = f"[{timestamp}] {line}"
-                                socketio.emit('console_output', {
-                                    'app': 'forum',
-                                    'line': formatted_line
-                                })
-                        
-                        last_position = f.tell()
-                        
-                        # 清理processed_lines集合，避免内存泄漏（保留最近1000行的哈希）
-                        if len(processed_lines) > 1000:
-                            processed_lines.clear()
-            
-            time.sleep(1)  # 每秒检查一次
-        except Exception as e:
-            logger.error(f"Forum日志监听错误: {e}")
-            time.sleep(5)
+    # 只有在控制台显示forum时才发送控制台消息
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    formatted_line = f"[{timestamp}] {line}"
+    socketio.emit('console_output', {
+        'app': 'forum',
+        'line': formatted_line,
+        'seq': message['seq']
+    })
 
-# 启动Forum日志监听线程
-forum_monitor_thread = threading.Thread(target=monitor_forum_log, daemon=True)
-forum_monitor_thread.start()
+get_message_bus().subscribe(push_forum_message)
 
 # 全局变量存储进程信息
 processes = {
@@ -460,8 +424,43 @@ output_queues = {
     'forum': Queue()
 }
 
+# 各应用的输出管道，应用启动时创建，重启时替换
+output_pipelines = {}
+output_pipelines_lock = threading.Lock()
+
+# 从子进程stdout每次读取的最大字节数
+PROCESS_READ_CHUNK_SIZE = 65536
+
+def emit_console_output(frame):
+    """推送一帧合并后的控制台输出"""
+    socketio.emit('console_output', frame)
+
+def open_output_pipeline(app_name):
+    """关闭应用旧的输出管道，清空日志（含轮转文件）后创建新的管道"""
+    close_output_pipeline(app_name)
+    log_file_path = LOG_DIR / f"{app_name}.log"
+    for path in [log_file_path, *rotated_log_paths(log_file_path)]:
+        if path.exists():
+            path.unlink()
+    
+    pipeline = ProcessOutputPipeline(app_name, log_file_path, emit_console_output).start()
+    with output_pipelines_lock:
+        output_pipelines[app_name] = pipeline
+    return pipeline
+
+def close_output_pipeline(app_name):
+    """写入剩余输出并关闭应用的输出管道"""
+    with output_pipelines_lock:
+        pipeline = output_pipelines.pop(app_name, None)
+    if pipeline is not None:
+        pipeline.close()
+
 def write_log_to_file(app_name, line):
-    """将日志写入文件"""
+    """将日志写入文件；应用的输出管道存在时交给管道批量写入，不推送给前端"""
+    pipeline = output_pipelines.get(app_name)
+    if pipeline is not None:
+        pipeline.write(line, emit=False)
+        return
     try:
         log_file_path = LOG_DIR / f"{app_name}.log"
         with open(log_file_path, 'a', encoding='utf-8') as f:
@@ -470,46 +469,56 @@ def write_log_to_file(app_name, line):
     except Exception as e:
         logger.error(f"Error writing log for {app_name}: {e}")
 
+# /api/output 按游标分页时单页最多返回的行数
+OUTPUT_PAGE_SIZE = 1000
+# 不带游标请求 /api/output 时返回的最近行数
+OUTPUT_TAIL_LINES = 1000
+# JSON响应超过该大小且客户端支持时使用gzip压缩
+GZIP_MIN_SIZE = 1024
+
 def read_log_from_file(app_name, tail_lines=None):
-    """从文件读取日志"""
+    """从文件读取日志，指定tail_lines时从文件末尾向前读取，只读最后几行"""
     try:
         log_file_path = LOG_DIR / f"{app_name}.log"
         if not log_file_path.exists():
             return []
         
+        if tail_lines:
+            return tail_log_page(log_file_path, tail_lines)['lines']
+        
         with open(log_file_path, 'r', encoding='utf-8') as f:
             lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
-            
-            if tail_lines:
-                return lines[-tail_lines:]
-            return lines
+            return [line.rstrip('\n\r') for line in lines if line.strip()]
     except Exception as e:
         logger.exception(f"Error reading log for {app_name}: {e}")
         return []
 
+def _format_output_lines(data):
+    """把读取到的字节解码为带时间戳的非空行"""
+    timestamp = datetime.now().strftime('%H:%M:%S')
+    lines = []
+    for raw_line in data.split(b'\n'):
+        line = raw_line.decode('utf-8', errors='replace').strip()
+        if line:
+            lines.append(f"[{timestamp}] {line}")
+    return lines
+
 def read_process_output(process, app_name):
-    """读取进程输出并写入文件"""
+    """读取进程输出，交给输出管道批量写入文件并合并推送"""
     import select
     import sys
     
+    pipeline = output_pipelines.get(app_name) or open_output_pipeline(app_name)
+    # 上次读取末尾尚未以换行结束的部分
+    partial = b''
+    
     while True:
         try:
             if process.poll() is not None:
                 # 进程结束，读取剩余输出
-                remaining_output = process.stdout.read()
-                if remaining_output:
-                    lines = remaining_output.decode('utf-8', errors='replace').split('\n')
-                    for line in lines:
-                        line = line.strip()
-                        if line:
-                            timestamp = datetime.now().strftime('%H:%M:%S')
-                            formatted_line = f"[{timestamp}] {line}"
-                            write_log_to_file(app_name, formatted_line)
-                            socketio.emit('console_output', {
-                                'app': app_name,
-                                'line': formatted_line
-                            })
+                remaining_output = partial + (process.stdout.read() or b'')
+                pipeline.write_many(_format_output_lines(remaining_output))
+                pipeline.flush()
                 break
             
             # 使用非阻塞读取
@@ -517,41 +526,23 @@ def read_process_output(process, app_name):
                 # Windows下使用不同的方法
                 output = process.stdout.readline()
                 if output:
-                    line = output.decode('utf-8', errors='replace').strip()
-                    if line:
-                        timestamp = datetime.now().strftime('%H:%M:%S')
-                        formatted_line = f"[{timestamp}] {line}"
-                        
-                        # 写入日志文件
-                        write_log_to_file(app_name, formatted_line)
-                        
-                        # 发送到前端
-                        socketio.emit('console_output', {
-                            'app': app_name,
-                            'line': formatted_line
-                        })
+                    pipeline.write_many(_format_output_lines(output))
                 else:
                     # 没有输出时短暂休眠
                     time.sleep(0.1)
             else:
-                # Unix系统使用select
+                # Unix系统使用select，可读时一次读出管道中已有的全部输出
                 ready, _, _ = select.select([process.stdout], [], [], 0.1)
                 if ready:
-                    output = process.stdout.readline()
-                    if output:
-                        line = output.decode('utf-8', errors='replace').strip()
-                        if line:
-                            timestamp = datetime.now().strftime('%H:%M:%S')
-                            formatted_line = f"[{timestamp}] {line}"
-                            
-                            # 写入日志文件
-                            write_log_to_file(app_name, formatted_line)
-                            
-                            # 发送到前端
-                            socketio.emit('console_output', {
-                                'app': app_name,
-                                'line': formatted_line
-                            })
+                    chunk = os.read(process.stdout.fileno(), PROCESS_READ_CHUNK_SIZE)
+                    if not chunk:
+                        # 管道已关闭，等待进程退出
+                        time.sleep(0.1)
+                        continue
+                    data = partial + chunk
+                    end = data.rfind(b'\n') + 1
+                    partial = data[end:]
+                    pipeline.write_many(_format_output_lines(data[:end]))
                             
         except Exception as e:
             error_msg = f"Error reading output for {app_name}: {e}"
@@ -569,10 +560,8 @@ def start_streamlit_app(app_name, script_path, port):
         if not os.path.exists(script_path):
             return False, f"文件不存在: {script_path}"
         
-        # 清空之前的日志文件
-        log_file_path = LOG_DIR / f"{app_name}.log"
-        if log_file_path.exists():
-            log_file_path.unlink()
+        # 清空之前的日志文件，创建新的输出管道
+        open_output_pipeline(app_name)
         
         # 创建启动日志
         start_msg = f"[{datetime.now().strftime('%H:%M:%S')}] 启动 {app_name} 应用..."
@@ -720,6 +709,7 @@ def cleanup_processes():
     """清理所有进程"""
     for app_name in STREAMLIT_SCRIPTS:
         stop_streamlit_app(app_name)
+        close_output_pipeline(app_name)
 
     processes['forum']['status'] = 'stopped'
     try:
@@ -800,31 +790,65 @@ def stop_app(app_name):
     success, message = stop_streamlit_app(app_name)
     return jsonify({'success': success, 'message': message})
 
+@app.after_request
+def gzip_large_response(response):
+    """客户端支持时压缩较大的JSON响应（控制台输出等轮询接口）"""
+    if (response.direct_passthrough
+            or response.status_code != 200
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(gzip.compress(data, compresslevel=5))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/api/output/<app_name>')
 def get_output(app_name):
-    """获取应用输出"""
+    """获取应用输出
+
+    参数:
+        after: 字节偏移游标（上次响应的next_offset），只返回其后新增的行；
+               不传时返回最近的 OUTPUT_TAIL_LINES 行
+        limit: 传入after时单页最多返回的行数
+    """
     if app_name not in processes:
         return jsonify({'success': False, 'message': '未知应用'})
     
-    # 特殊处理Forum Engine
-    if app_name == 'forum':
-        try:
-            forum_log_content = read_log_from_file('forum')
+    try:
+        log_file_path = LOG_DIR / f"{app_name}.log"
+        after = request.args.get('after', type=int)
+        if after is None:
+            page = tail_log_page(log_file_path, OUTPUT_TAIL_LINES) if log_file_path.exists() else {
+                'lines': [], 'next_offset': 0
+            }
             return jsonify({
                 'success': True,
-                'output': forum_log_content,
-                'total_lines': len(forum_log_content)
+                'output': page['lines'],
+                'total_lines': len(page['lines']),
+                'next_offset': page['next_offset'],
+                'has_more': False,
+                'reset': False
             })
-        except Exception as e:
-            return jsonify({'success': False, 'message': f'读取forum日志失败: {str(e)}'})
-    
-    # 从文件读取完整日志
-    output_lines = read_log_from_file(app_name)
-    
-    return jsonify({
-        'success': True,
-        'output': output_lines
-    })
+        
+        limit = request.args.get('limit', default=OUTPUT_PAGE_SIZE, type=int)
+        page = read_log_after(log_file_path, after, max(1, min(limit, OUTPUT_PAGE_SIZE)))
+        return jsonify({
+            'success': True,
+            'output': page['lines'],
+            'total_lines': len(page['lines']),
+            'next_offset': page['next_offset'],
+            'has_more': page['has_more'],
+            'reset': page['reset']
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'读取{app_name}日志失败: {str(e)}'})
 
 @app.route('/api/test_log/<app_name>')
 def test_log(app_name):
@@ -870,38 +894,52 @@ def stop_forum_monitoring_api():
     except Exception as e:
         return jsonify({'success': False, 'message': f'停止论坛失败: {str(e)}'})
 
+@app.route('/api/forum/host_metrics')
+def get_forum_host_metrics():
+    """获取论坛主持人发言队列深度与生成耗时指标"""
+    try:
+        from ForumEngine.monitor import get_host_metrics
+        return jsonify({'success': True, 'metrics': get_host_metrics()})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'获取主持人指标失败: {str(e)}'})
+
 @app.route('/api/forum/log')
 def get_forum_log():
-    """获取ForumEngine的forum.log内容"""
+    """获取论坛消息（来自ForumEngine消息总线的环形缓冲区，不再读取forum.log）
+
+    参数:
+        since: 游标，返回seq大于since的消息；不传时返回当前论坛会话的全部消息
+        limit: 传入since时单页最多返回的条数
+    """
     try:
-        forum_log_file = LOG_DIR / "forum.log"
-        if not forum_log_file.exists():
-            return jsonify({
-                'success': True,
-                'log_lines': [],
-                'parsed_messages': [],
-                'total_lines': 0
-            })
+        since = request.args.get('since', type=int)
+        limit = None
+        if since is not None:
+            limit = request.args.get('limit', default=FORUM_LOG_PAGE_SIZE, type=int)
+            limit = max(1, min(limit, FORUM_LOG_PAGE_SIZE))
         
-        with open(forum_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-            lines = [line.rstrip('\n\r') for line in lines if line.strip()]
+        page = get_message_bus().get_since(since, limit)
+        lines = [message['line'] for message in page['messages']]
         
         # 解析每一行日志并提取对话信息
         parsed_messages = []
-        for line in lines:
-            parsed_message = parse_forum_log_line(line)
+        for message in page['messages']:
+            parsed_message = parse_forum_log_line(message['line'])
             if parsed_message:
+                parsed_message['seq'] = message['seq']
                 parsed_messages.append(parsed_message)
         
         return jsonify({
             'success': True,
             'log_lines': lines,
             'parsed_messages': parsed_messages,
-            'total_lines': len(lines)
+            'total_lines': len(lines),
+            'next_seq': page['next_seq'],
+            'has_more': page['has_more'],
+            'truncated': page['truncated']
         })
     except Exception as e:
-        return jsonify({'success': False, 'message': f'读取forum.log失败: {str(e)}'})
+        return jsonify({'success': False, 'message': f'读取论坛消息失败: {str(e)}'})
 
 @app.route('/api/search', methods=['POST'])
 def search():
@@ -0,0 +1,144 @@
+"""
+测试MindSpider/BroadTopicExtraction/database_manager.py中的每日新闻批量保存
+
+在临时SQLite库的daily_news表上实际执行：
+1. 一批中有重复news_id时批量插入失败，回滚该批的保存点后逐条重试，其余新闻全部保存，返回的数量正确
+2. 保存事务失败时当天原有的新闻保持不变，其他日期的新闻不受影响
+3. 数据格式有误的单条新闻记录日志后跳过，不影响当天其他新闻
+4. 重新保存同一天时覆盖当天旧数据
+"""
+
+import sys
+import types
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+# 添加MindSpider目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "MindSpider"))
+
+# MindSpider的config.py由用户从config.py.example生成；这里只在导入期间提供settings，不连接真实数据库
+_saved_config = sys.modules.get("config")
+sys.modules["config"] = types.ModuleType("config")
+sys.modules["config"].settings = types.SimpleNamespace()
+try:
+    from BroadTopicExtraction import database_manager as news_db
+finally:
+    if _saved_config is None:
+        del sys.modules["config"]
+    else:
+        sys.modules["config"] = _saved_config
+
+
+DAY = date(2025, 1, 2)
+PREVIOUS_DAY = date(2025, 1, 1)
+
+
+@pytest.fixture
+def db(tmp_path):
+    """连接临时SQLite库的数据库管理器，表结构与mindspider_tables.sql中的daily_news一致"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'news.db'}")
+
+    # pysqlite默认自行管理事务，会使SAVEPOINT失效；改由SQLAlchemy发出BEGIN
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE daily_news (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                news_id VARCHAR(128) NOT NULL,
+                source_platform VARCHAR(32) NOT NULL,
+                title VARCHAR(500) NOT NULL,
+                url VARCHAR(512),
+                crawl_date DATE NOT NULL,
+                rank_position INTEGER,
+                add_ts BIGINT NOT NULL,
+                last_modify_ts BIGINT NOT NULL,
+                UNIQUE (news_id, source_platform, crawl_date)
+            )
+        """))
+
+    manager = news_db.DatabaseManager.__new__(news_db.DatabaseManager)
+    manager.engine = engine
+    yield manager
+    engine.dispose()
+
+
+def make_news(count, prefix="news"):
+    return [
+        {"id": f"weibo_{prefix}_{i}", "title": f"{prefix} {i}", "url": f"https://example.com/{prefix}/{i}",
+         "source": "weibo", "rank": i + 1}
+        for i in range(count)
+    ]
+
+
+def titles_on(db, crawl_date):
+    with db.engine.connect() as conn:
+        rows = conn.execute(text("SELECT title FROM daily_news WHERE crawl_date = :d ORDER BY id"),
+                            {"d": crawl_date}).all()
+    return [row[0] for row in rows]
+
+
+class TestSaveDailyNews:
+    """测试每日新闻的批量保存"""
+
+    def test_duplicate_in_chunk_retries_rows_one_by_one(self, db):
+        """第一批中有重复news_id时只有该批逐条插入，重复的一条被跳过，第二批照常批量插入"""
+        news = make_news(news_db.NEWS_INSERT_CHUNK_SIZE + 100)
+        news[news_db.NEWS_INSERT_CHUNK_SIZE - 1] = dict(news[10], title="重复的新闻")
+
+        saved = db.save_daily_news(news, DAY)
+
+        assert saved == len(news) - 1
+        titles = titles_on(db, DAY)
+        assert len(titles) == len(news) - 1
+        assert "重复的新闻" not in titles
+        assert titles[-1] == news[-1]["title"]
+
+    def test_failed_save_keeps_existing_rows(self, db, monkeypatch):
+        """删除和插入在同一事务中，第二批失败时整体回滚，当天原有新闻与其他日期的新闻都保持不变"""
+        assert db.save_daily_news(make_news(3, "old"), DAY) == 3
+        assert db.save_daily_news(make_news(2, "yesterday"), PREVIOUS_DAY) == 2
+
+        insert_chunk = news_db.DatabaseManager._insert_news_chunk
+        calls = []
+
+        def fail_on_second_chunk(conn, rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("数据库连接中断")
+            return insert_chunk(conn, rows)
+
+        monkeypatch.setattr(news_db.DatabaseManager, "_insert_news_chunk", staticmethod(fail_on_second_chunk))
+        saved = db.save_daily_news(make_news(news_db.NEWS_INSERT_CHUNK_SIZE + 1, "new"), DAY)
+
+        assert saved == 0
+        assert calls == [news_db.NEWS_INSERT_CHUNK_SIZE, 1]
+        assert titles_on(db, DAY) == ["old 0", "old 1", "old 2"]
+        assert titles_on(db, PREVIOUS_DAY) == ["yesterday 0", "yesterday 1"]
+
+    def test_malformed_item_is_skipped(self, db):
+        """标题不是字符串的新闻无法转换为数据行，跳过该条并保存其余新闻"""
+        news = make_news(3)
+        news[1]["title"] = 12345
+
+        assert db.save_daily_news(news, DAY) == 2
+        assert titles_on(db, DAY) == ["news 0", "news 2"]
+
+    def test_resave_replaces_same_day_only(self, db):
+        """重新保存同一天时覆盖当天旧数据，其他日期的新闻保留"""
+        db.save_daily_news(make_news(2, "yesterday"), PREVIOUS_DAY)
+        db.save_daily_news(make_news(3, "old"), DAY)
+
+        assert db.save_daily_news(make_news(2, "new"), DAY) == 2
+        assert titles_on(db, DAY) == ["new 0", "new 1"]
+        assert titles_on(db, PREVIOUS_DAY) == ["yesterday 0", "yesterday 1"]
@@ -0,0 +1,124 @@
+"""
+测试SentimentAnalysisModel/WeiboSentiment_MachineLearning/ensemble.py中的共享特征与加权投票
+
+1. SharedTextFeatures为每个模型给出的特征与该模型vectorizer.transform的结果相同（含binary、TF-IDF各参数）
+2. weighted_vote跳过NaN（预测失败）的模型，没有可用权重的文本返回 (0, 0.5)
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+# 按文件路径加载，避免把模型目录加入sys.path后与项目根目录的utils同名冲突
+project_root = Path(__file__).parent.parent
+module_path = project_root / "SentimentAnalysisModel" / "WeiboSentiment_MachineLearning" / "ensemble.py"
+spec = importlib.util.spec_from_file_location("weibo_ml_ensemble", module_path)
+ensemble = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ensemble)
+
+
+# 已分词、以空格拼接的文本，与processing的输出格式相同
+TRAIN_TEXTS = [
+    "今天 天气 不错 心情 很 好",
+    "不好 用 不推荐 购买 购买",
+    "服务 态度 很 好 下次 还 来",
+    "物流 太 慢 不满意",
+    "质量 不错 价格 实惠 实惠 实惠",
+]
+TEST_TEXTS = [
+    "天气 不错 实惠 实惠",
+    "物流 慢 不好 不好 不好",
+    "完全 没见过 的 词",
+    "",
+    "购买 服务 心情 态度 下次",
+]
+
+
+def fitted_vectorizers():
+    """分词方式相同但词表和加权方式不同的一组vectorizer，外加一个分词方式不同的"""
+    token_pattern = r"(?u)\b\w+\b"
+    vectorizers = {
+        'count': CountVectorizer(token_pattern=token_pattern).fit(TRAIN_TEXTS[:3]),
+        'count_binary': CountVectorizer(token_pattern=token_pattern, binary=True).fit(TRAIN_TEXTS[1:]),
+        'tfidf': TfidfVectorizer(token_pattern=token_pattern).fit(TRAIN_TEXTS),
+        'tfidf_binary_sublinear': TfidfVectorizer(token_pattern=token_pattern, binary=True,
+                                                  sublinear_tf=True, smooth_idf=False).fit(TRAIN_TEXTS[2:]),
+        'tf_l1': TfidfVectorizer(token_pattern=token_pattern, use_idf=False, norm='l1',
+                                 sublinear_tf=True).fit(TRAIN_TEXTS),
+        'bigram': TfidfVectorizer(token_pattern=token_pattern, ngram_range=(1, 2), max_features=8).fit(TRAIN_TEXTS),
+    }
+    return vectorizers
+
+
+class TestSharedTextFeatures:
+    """测试共享计数后的特征与各vectorizer自身transform一致"""
+
+    def test_matches_each_vectorizer_transform(self):
+        vectorizers = fitted_vectorizers()
+        shared = ensemble.SharedTextFeatures(vectorizers)
+
+        features = shared.transform(TEST_TEXTS)
+
+        assert sorted(features) == sorted(vectorizers)
+        for name, vectorizer in vectorizers.items():
+            expected = vectorizer.transform(TEST_TEXTS)
+            assert features[name].shape == expected.shape, name
+            assert features[name].dtype == expected.dtype, name
+            np.testing.assert_allclose(features[name].toarray(), expected.toarray(), err_msg=name)
+
+    def test_groups_by_analyzer(self):
+        """分词方式相同的vectorizer共用一个计数器，ngram_range不同的单独分组"""
+        shared = ensemble.SharedTextFeatures(fitted_vectorizers())
+
+        assert sorted(len(members) for _, members in shared.groups) == [1, 5]
+
+    def test_only_requested_models_and_unfitted_skipped(self):
+        vectorizers = fitted_vectorizers()
+        vectorizers['unfitted'] = CountVectorizer()
+        shared = ensemble.SharedTextFeatures(vectorizers)
+
+        assert 'unfitted' not in shared.model_names
+        assert list(shared.transform(TEST_TEXTS, ['count_binary'])) == ['count_binary']
+
+
+class TestWeightedVote:
+    """测试加权投票"""
+
+    def test_failed_model_rows_are_ignored(self):
+        """整行为NaN（模型预测失败）或单个NaN时只用其余模型的概率"""
+        probs = np.array([
+            [0.9, 0.2, np.nan],
+            [np.nan, np.nan, np.nan],
+            [0.7, 0.4, 0.3],
+        ])
+
+        predictions, confidences = ensemble.weighted_vote(['bayes', 'lstm', 'svm'], probs)
+
+        np.testing.assert_array_equal(predictions, [1, 0, 0])
+        np.testing.assert_allclose(confidences, [0.8, 0.7, 0.7])
+
+    def test_weights_and_zero_total_weight(self):
+        """按权重平均；某条文本的可用模型权重都为0时返回 (0, 0.5)"""
+        probs = np.array([
+            [0.9, np.nan],
+            [0.0, 0.8],
+        ])
+        weights = {'bayes': 3.0, 'svm': 1.0}
+
+        predictions, confidences = ensemble.weighted_vote(['bayes', 'svm'], probs, weights)
+        np.testing.assert_array_equal(predictions, [1, 1])
+        np.testing.assert_allclose(confidences, [0.675, 0.8])
+
+        predictions, confidences = ensemble.weighted_vote(['bayes', 'svm'], probs, {'bayes': 0.0})
+        np.testing.assert_array_equal(predictions, [0, 0])
+        np.testing.assert_allclose(confidences, [0.5, 0.5])
+
+    def test_all_models_failed(self):
+        probs = np.full((2, 3), np.nan)
+
+        predictions, confidences = ensemble.weighted_vote(['bayes', 'svm'], probs)
+
+        np.testing.assert_array_equal(predictions, [0, 0, 0])
+        np.testing.assert_allclose(confidences, [0.5, 0.5, 0.5])
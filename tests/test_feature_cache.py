@@ -0,0 +1,98 @@
+"""
+测试SentimentAnalysisModel下两份feature_cache.py中的特征缓存（WeiboSentiment_MachineLearning与WeiboSentiment_SmallQwen）
+
+1. 编码后的特征追加写入，经内存映射读回与编码结果一致，重复文本共用一行
+2. 重新打开缓存时已编码的文本不再编码
+3. 中断时写了一半的特征行或多出的索引行在加载时被截掉，缺失的文本重新编码
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+project_root = Path(__file__).parent.parent
+COPIES = ["WeiboSentiment_MachineLearning", "WeiboSentiment_SmallQwen"]
+
+DIM = 4
+
+
+def load_copy(directory):
+    """按文件路径加载一份feature_cache.py，两份同名模块互不覆盖"""
+    module_path = project_root / "SentimentAnalysisModel" / directory / "feature_cache.py"
+    spec = importlib.util.spec_from_file_location(f"feature_cache_{directory}", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=COPIES)
+def feature_cache(request):
+    return load_copy(request.param)
+
+
+class FakeEncoder:
+    """按文本长度生成确定的特征，记录被编码的文本"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        return np.array([[len(text), len(text) / 2, -1.0, 0.25] for text in texts], dtype=np.float32)
+
+
+def expected_features(texts):
+    return FakeEncoder()(texts)
+
+
+class TestFeatureStore:
+    """测试FeatureStore的追加、内存映射读取与中断恢复"""
+
+    def test_append_and_memmap_round_trip(self, feature_cache, tmp_path):
+        store = feature_cache.FeatureStore(str(tmp_path), "bert|128|cls", DIM)
+        encoder = FakeEncoder()
+        texts = ["好", "很不错", "好", "物流太慢了"]
+
+        rows = store.encode_corpus(texts, encoder, batch_size=2, show_progress=False)
+
+        assert sorted(encoder.encoded) == sorted(set(texts))
+        assert rows[0] == rows[2] and len(store) == 3
+        assert isinstance(store.features, np.memmap) and store.features.dtype == np.float16
+        np.testing.assert_allclose(store.get_features(rows), expected_features(texts))
+
+        reopened = feature_cache.FeatureStore(str(tmp_path), "bert|128|cls", DIM)
+        again = FakeEncoder()
+        np.testing.assert_array_equal(reopened.encode_corpus(texts, again, show_progress=False), rows)
+        assert again.encoded == []
+
+    def test_partial_row_truncated_on_load(self, feature_cache, tmp_path):
+        """特征文件末尾的半行和没有对应特征的索引行被丢弃，对应文本重新编码"""
+        store = feature_cache.FeatureStore(str(tmp_path), "qwen", DIM)
+        store.encode_corpus(["一", "二二"], FakeEncoder(), show_progress=False)
+        row_bytes = DIM * np.dtype(np.float16).itemsize
+
+        # 模拟写入第三行特征时中断：只写了半行，索引已写入
+        with open(store.features_path, "ab") as f:
+            f.write(b"\x00" * (row_bytes // 2))
+        with open(store.keys_path, "a", encoding="utf-8") as f:
+            f.write(feature_cache.text_hash("三三三") + "\n")
+
+        reopened = feature_cache.FeatureStore(str(tmp_path), "qwen", DIM)
+        assert len(reopened) == 2
+        assert Path(reopened.features_path).stat().st_size == 2 * row_bytes
+        assert len(Path(reopened.keys_path).read_text(encoding="utf-8").split()) == 2
+
+        encoder = FakeEncoder()
+        texts = ["二二", "三三三", "一"]
+        rows = reopened.encode_corpus(texts, encoder, show_progress=False)
+        assert encoder.encoded == ["三三三"]
+        np.testing.assert_allclose(reopened.get_features(rows), expected_features(texts))
+
+    def test_model_key_selects_separate_cache(self, feature_cache, tmp_path):
+        first = feature_cache.FeatureStore(str(tmp_path), "model-a", DIM)
+        first.encode_corpus(["文本"], FakeEncoder(), show_progress=False)
+
+        other = feature_cache.FeatureStore(str(tmp_path), "model-b", DIM)
+        assert len(other) == 0 and other.features.shape == (0, DIM)
@@ -0,0 +1,132 @@
+"""
+测试ForumEngine/host_worker.py中的主持人发言工作线程
+
+1. 投递立即返回，发言按投递顺序写回
+2. 多个窗口同时积压时按merge / latest策略合并
+3. 队列有界，会话重置后丢弃过期结果
+4. LogMonitor凑满窗口后投递给工作线程，不阻塞监控循环
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ForumEngine.host_worker import HostSpeechWorker, COALESCE_LATEST
+from ForumEngine.monitor import LogMonitor
+
+
+class BlockingHost:
+    """在release()之前阻塞的主持人生成函数，记录每次收到的发言"""
+
+    def __init__(self):
+        self.calls = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def __call__(self, speeches):
+        self.calls.append(list(speeches))
+        self.started.set()
+        self.gate.wait(timeout=5)
+        return f"主持人{len(self.calls)}"
+
+
+class TestHostSpeechWorker:
+    """测试HostSpeechWorker的排队、合并与指标"""
+
+    def test_results_written_in_order(self):
+        """逐个窗口生成时结果按投递顺序写回"""
+        written = []
+        worker = HostSpeechWorker(lambda speeches: "+".join(speeches), lambda content, source: written.append((source, content)))
+
+        worker.submit(["a", "b"])
+        assert worker.wait_idle(timeout=5)
+        worker.submit(["c"])
+        assert worker.wait_idle(timeout=5)
+        worker.stop()
+
+        assert written == [("HOST", "a+b"), ("HOST", "c")]
+        metrics = worker.get_metrics()
+        assert metrics['generated'] == 2
+        assert metrics['queue_depth'] == 0
+        assert metrics['avg_latency'] is not None
+
+    def test_merge_pending_windows(self):
+        """生成期间积压的窗口合并为一次生成"""
+        host = BlockingHost()
+        written = []
+        worker = HostSpeechWorker(host, lambda content, source: written.append(content))
+
+        worker.submit(["w1"])
+        assert host.started.wait(timeout=5)
+        worker.submit(["w2"])
+        worker.submit(["w3"])
+        assert worker.get_metrics()['queue_depth'] == 2
+        host.gate.set()
+        assert worker.wait_idle(timeout=5)
+        worker.stop()
+
+        assert host.calls == [["w1"], ["w2", "w3"]]
+        assert written == ["主持人1", "主持人2"]
+        assert worker.get_metrics()['coalesced_windows'] == 1
+
+    def test_latest_policy_and_bounded_queue(self):
+        """latest策略只回应最新窗口，队列满时丢弃最早的窗口"""
+        host = BlockingHost()
+        worker = HostSpeechWorker(host, lambda content, source: None, max_pending=2,
+                                  coalesce_policy=COALESCE_LATEST)
+
+        worker.submit(["w1"])
+        assert host.started.wait(timeout=5)
+        assert not worker.submit(["w2"])
+        assert not worker.submit(["w3"])
+        assert worker.submit(["w4"])
+        host.gate.set()
+        assert worker.wait_idle(timeout=5)
+        worker.stop()
+
+        assert host.calls == [["w1"], ["w4"]]
+        metrics = worker.get_metrics()
+        assert metrics['dropped_windows'] == 1
+        assert metrics['max_queue_depth'] == 2
+
+    def test_reset_discards_stale_result(self):
+        """会话重置后，正在生成的发言不再写回"""
+        host = BlockingHost()
+        written = []
+        worker = HostSpeechWorker(host, lambda content, source: written.append(content))
+
+        worker.submit(["旧会话"])
+        assert host.started.wait(timeout=5)
+        worker.reset()
+        host.gate.set()
+        assert worker.wait_idle(timeout=5)
+        worker.stop()
+
+        assert written == []
+        assert worker.get_metrics()['discarded_results'] == 1
+
+    def test_monitor_submits_without_blocking(self, tmp_path):
+        """LogMonitor投递发言窗口后立即返回，主持人发言随后写入论坛"""
+        monitor = LogMonitor(log_dir=str(tmp_path))
+        host = BlockingHost()
+        monitor.host_worker = HostSpeechWorker(host, monitor.write_to_forum_log)
+
+        monitor.agent_speeches_buffer = [f"[12:00:0{i}] [INSIGHT] 发言{i}" for i in range(6)]
+        started = time.monotonic()
+        monitor._trigger_host_speech()
+        assert time.monotonic() - started < 1
+        assert len(monitor.agent_speeches_buffer) == 1
+
+        host.gate.set()
+        assert monitor.host_worker.wait_idle(timeout=5)
+        monitor.host_worker.stop()
+
+        assert len(host.calls[0]) == 5
+        log_lines = (tmp_path / "forum.log").read_text(encoding="utf-8").splitlines()
+        assert log_lines[-1].endswith("[HOST] 主持人1")
+        assert monitor.get_host_metrics()['generated'] == 1
@@ -0,0 +1,258 @@
+"""
+测试InsightEngine/tools/search.py中的数据库查询工具
+
+通过 DATABASE_URL 指向临时SQLite库，实际执行生成的SQL：
+1. search_hot_content 使用命名绑定参数，各平台分支合并后按热度排序并截断
+2. 所有表都已迁移时读取 hotness_score，否则全部回退到逐行计算，排序不混用两种分值
+3. 短于ngram分词长度的话题关键词回退到LIKE
+4. 并发下发的查询按提交顺序合并去重，结果与完成顺序无关，在途查询数不超过上限
+5. MySQL索引合并默认不修改全局变量，明确允许时结束后恢复原值
+"""
+
+import asyncio
+import sqlite3
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+# 添加项目根目录和utils目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "utils"))
+
+import search_cache
+from search_cache import SearchResultCache
+from InsightEngine.utils import db as insight_db
+from InsightEngine.utils import fulltext
+from InsightEngine.tools.search import MediaCrawlerDB, QueryResult
+
+
+# 各平台表的字段（热度计算、时间过滤和结果格式化用到的列）
+HOT_TABLES = {
+    'bilibili_video': "title, nickname, video_url, create_time INTEGER, liked_count, video_comment, video_share_count, "
+                      "video_favorite_count, video_coin_count, video_danmaku, video_play_count",
+    'douyin_aweme': "title, nickname, aweme_url, create_time INTEGER, liked_count, comment_count, share_count, collected_count",
+    'weibo_note': "content, nickname, note_url, create_date_time, liked_count, comments_count, shared_count",
+    'xhs_note': "title, nickname, note_url, time INTEGER, liked_count, comment_count, share_count, collected_count",
+    'kuaishou_video': "title, nickname, video_url, create_time INTEGER, liked_count, viewd_count",
+    'zhihu_content': "title, user_nickname, content_url, created_time, voteup_count, comment_count",
+}
+ENGAGEMENT_COLUMNS = "like_num INTEGER, comment_num INTEGER, share_num INTEGER, collect_num INTEGER, view_num INTEGER"
+
+
+@pytest.fixture
+def hot_db(tmp_path, monkeypatch):
+    """建立各平台表的临时SQLite库，并让数据库工具和搜索缓存使用全新实例"""
+    db_path = tmp_path / "media_crawler.db"
+    conn = sqlite3.connect(db_path)
+    for table, columns in HOT_TABLES.items():
+        conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, {columns}, source_keyword, "
+                     f"hotness_score REAL, {ENGAGEMENT_COLUMNS})")
+
+    now_ms = int(time.time() * 1000)
+    old_ms = now_ms - 30 * 24 * 3600 * 1000
+    conn.executemany(
+        "INSERT INTO douyin_aweme (title, aweme_url, create_time, liked_count, comment_count, share_count, collected_count, source_keyword) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [("热门视频", "d1", now_ms, "100", "10", "0", "0", "kw"),
+         ("一般视频", "d2", now_ms, "10", "0", "0", "0", "kw"),
+         ("过期视频", "d3", old_ms, "99999", "0", "0", "0", "kw")])
+    conn.executemany(
+        "INSERT INTO xhs_note (title, note_url, time, liked_count, hotness_score, like_num, comment_num, share_num, collect_num, source_keyword) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [("已迁移笔记", "x1", now_ms, "1", 500.0, 300, 40, 0, 0, "kw")])
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{db_path}")
+    monkeypatch.setattr(insight_db, "_engine", None)
+    monkeypatch.setattr(search_cache, "_cache_instance", SearchResultCache())
+    monkeypatch.setattr(MediaCrawlerDB, "_table_columns_cache", {})
+    yield db_path
+    # 引擎绑定在后台事件循环上，测试结束后在同一循环上释放连接
+    if insight_db._engine is not None:
+        MediaCrawlerDB._run_coroutine(insight_db._engine.dispose())
+
+
+class TestSearchHotContent:
+    """测试search_hot_content实际执行的SQL"""
+
+    def test_ranks_across_tables_with_named_binds(self, hot_db, monkeypatch):
+        """各表都已迁移时直接读取 hotness_score，各分支按时间过滤后合并，按热度排序并截断到limit"""
+        client = MediaCrawlerDB()
+        migrated = ['hotness_score', 'like_num', 'comment_num', 'share_num', 'collect_num']
+        monkeypatch.setattr(client, "_get_table_columns", lambda table: migrated)
+        conn = sqlite3.connect(hot_db)
+        conn.execute("UPDATE douyin_aweme SET hotness_score = CAST(liked_count AS REAL) + 5 * CAST(comment_count AS REAL)")
+        conn.commit()
+        conn.close()
+
+        response = client.search_hot_content(time_period='week', limit=2)
+
+        assert response.error_message is None
+        assert [r.url for r in response.results] == ["x1", "d1"]
+        assert [r.hotness_score for r in response.results] == [500.0, 150.0]
+        assert response.results[0].engagement == {'likes': 300, 'comments': 40, 'shares': 0, 'favorites': 0}
+
+    def test_partial_migration_uses_one_scale(self, hot_db, monkeypatch):
+        """只有部分表迁移时全部回退到CAST公式，不把两种分值混在一起排序"""
+        client = MediaCrawlerDB()
+        # SQLite 没有 SHOW COLUMNS：只有 xhs_note 视为已迁移
+        migrated = {'xhs_note': ['hotness_score', 'like_num', 'comment_num', 'share_num', 'collect_num']}
+        monkeypatch.setattr(client, "_get_table_columns", lambda table: migrated.get(table, []))
+
+        response = client.search_hot_content(time_period='week', limit=3)
+
+        assert [r.url for r in response.results] == ["d1", "d2", "x1"]
+        assert [r.hotness_score for r in response.results] == [150.0, 10.0, 1.0]
+        assert response.results[1].engagement == {}
+
+    def test_fallback_formula_uses_shared_weights(self):
+        """回退公式的权重来自入库时计算 hotness_score 的同一份配置"""
+        formula = MediaCrawlerDB()._hotness_formula('kuaishou_video')
+        assert formula == "(COALESCE(CAST(liked_count AS UNSIGNED), 0) * 1.0 + COALESCE(CAST(viewd_count AS DECIMAL(20,2)), 0) * 0.1)"
+
+    def test_time_filter_excludes_old_rows(self, hot_db):
+        """超出时间范围的高热度内容不出现在结果中"""
+        response = MediaCrawlerDB().search_hot_content(time_period='week', limit=10)
+
+        assert "d3" not in [r.url for r in response.results]
+        assert [r.url for r in response.results] == ["d1", "d2", "x1"]
+
+    def test_column_cache_expires(self, monkeypatch):
+        """表结构缓存过期后重新读取，迁移后无需重启即可使用 hotness_score"""
+        client = MediaCrawlerDB()
+        monkeypatch.setattr(MediaCrawlerDB, "_table_columns_cache", {})
+        columns = [[{'Field': 'liked_count'}], [{'Field': 'liked_count'}, {'Field': 'hotness_score'}]]
+        monkeypatch.setattr(client, "_execute_query", lambda query, params=None: columns.pop(0))
+
+        assert client._get_table_columns('xhs_note') == ['liked_count']
+        assert client._get_table_columns('xhs_note') == ['liked_count']
+        cached_at, cached = MediaCrawlerDB._table_columns_cache['xhs_note']
+        MediaCrawlerDB._table_columns_cache['xhs_note'] = (cached_at - MediaCrawlerDB.COLUMNS_CACHE_TTL, cached)
+        assert client._get_table_columns('xhs_note') == ['liked_count', 'hotness_score']
+
+
+class FakeFetchAll:
+    """按查询返回预设行的fetch_all，越靠前的查询完成得越晚，并记录最大在途数"""
+
+    def __init__(self, rows_by_query):
+        self.rows_by_query = rows_by_query
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, query, params=None):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02 * (len(self.rows_by_query) - list(self.rows_by_query).index(query)))
+        self.in_flight -= 1
+        return self.rows_by_query[query]
+
+
+class TestRunJobs:
+    """测试_run_jobs的并发执行与合并"""
+
+    def make_jobs(self, queries):
+        formatter = lambda row: QueryResult(platform=row['platform'], content_type="note",
+                                            title_or_content=row['title'], url=row['url'])
+        return [(query, {}, formatter) for query in queries]
+
+    def test_merges_in_submission_order_with_dedup(self, monkeypatch):
+        """后提交的查询先完成时，仍保留先提交查询中的重复项，结果按提交顺序排列"""
+        fake = FakeFetchAll({
+            "q0": [{'platform': "weibo", 'title': "甲", 'url': "u1"}, {'platform': "weibo", 'title': "乙", 'url': "u2"}],
+            "q1": [{'platform': "douyin", 'title': "甲", 'url': "u1"}, {'platform': "douyin", 'title': "丙", 'url': "u3"}],
+            "q2": [{'platform': "xhs", 'title': "乙", 'url': "u2"}, {'platform': "xhs", 'title': "丁", 'url': "u4"}],
+        })
+        monkeypatch.setattr(insight_db, "fetch_all", fake)
+        jobs = self.make_jobs(["q0", "q1", "q2"])
+
+        results = MediaCrawlerDB()._run_jobs(jobs, deduplicate=True)
+
+        assert [(r.platform, r.url) for r in results] == [
+            ("weibo", "u1"), ("weibo", "u2"), ("douyin", "u3"), ("xhs", "u4")]
+        assert len(MediaCrawlerDB()._run_jobs(jobs)) == 6
+
+    def test_limits_in_flight_queries(self, monkeypatch):
+        """同时在途的查询数不超过max_concurrency"""
+        fake = FakeFetchAll({f"q{i}": [] for i in range(6)})
+        monkeypatch.setattr(insight_db, "fetch_all", fake)
+
+        MediaCrawlerDB(max_concurrency=2)._run_jobs(self.make_jobs(list(fake.rows_by_query)))
+
+        assert fake.max_in_flight == 2
+
+
+class TestTopicClause:
+    """测试话题匹配条件在全文索引与LIKE之间的选择"""
+
+    def test_short_topic_falls_back_to_like(self, monkeypatch):
+        """已建FULLTEXT索引时使用MATCH，短于ngram分词长度的关键词回退到LIKE"""
+        client = MediaCrawlerDB()
+        monkeypatch.setattr(fulltext, "is_postgres", lambda: False)
+        monkeypatch.setattr(client, "_get_fulltext_indexes", lambda: {'weibo_note': [['content', 'source_keyword']]})
+        fields = ['content', 'source_keyword']
+
+        clause, params = client._build_topic_clause('weibo_note', fields, '苹果')
+        assert clause.startswith("MATCH(") and params == {'term_ft': '"苹果"'}
+
+        clause, params = client._build_topic_clause('weibo_note', fields, '苹')
+        assert "MATCH" not in clause and params == {'term_0': '%苹%', 'term_1': '%苹%'}
+
+
+class FakeFulltextEngine:
+    """记录执行语句的异步引擎，@@GLOBAL 查询返回预设值，OPTIMIZE 可设置为失败"""
+
+    def __init__(self, global_value, fail_optimize=False):
+        self.global_value = global_value
+        self.fail_optimize = fail_optimize
+        self.statements = []
+
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append((sql, params))
+        if sql.startswith("OPTIMIZE") and self.fail_optimize:
+            raise RuntimeError("lock wait timeout")
+        result = MagicMock()
+        result.scalar.return_value = self.global_value
+        return result
+
+
+class TestOptimizeFulltext:
+    """测试MySQL索引合并对全局变量innodb_optimize_fulltext_only的处理"""
+
+    def run(self, engine, **kwargs):
+        return asyncio.run(fulltext._optimize_fulltext_only(engine, "weibo_note", **kwargs))
+
+    def test_skips_without_opt_in(self):
+        """变量未开启且未明确允许时不修改全局变量，也不执行OPTIMIZE"""
+        engine = FakeFulltextEngine(0)
+
+        assert self.run(engine) is False
+        assert [sql for sql, _ in engine.statements] == ["SELECT @@GLOBAL.innodb_optimize_fulltext_only"]
+
+    def test_uses_operator_setting(self):
+        """运维已开启变量时直接合并，不修改全局变量"""
+        engine = FakeFulltextEngine(1)
+
+        assert self.run(engine) is True
+        assert not any(sql.startswith("SET GLOBAL") for sql, _ in engine.statements)
+        assert engine.statements[-1][0] == "OPTIMIZE TABLE `weibo_note`"
+
+    def test_opt_in_restores_previous_value_on_failure(self, monkeypatch):
+        """明确允许时临时开启，OPTIMIZE失败也恢复原值"""
+        monkeypatch.setattr(fulltext, "is_postgres", lambda: False)
+        engine = FakeFulltextEngine(0, fail_optimize=True)
+
+        with pytest.raises(RuntimeError):
+            self.run(engine, toggle_global=True)
+        assert engine.statements[1][0] == "SET GLOBAL innodb_optimize_fulltext_only = ON"
+        assert engine.statements[-1] == ("SET GLOBAL innodb_optimize_fulltext_only = :previous", {'previous': 0})
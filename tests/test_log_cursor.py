@@ -0,0 +1,142 @@
+"""
+测试utils/log_cursor.py中按字节游标读取日志
+
+1. 尚未写完换行的最后一行不返回，写完后从游标处读到
+2. 块边界或max_bytes落在多字节UTF-8字符中间时行内容不乱码
+3. 日志被截断后旧游标超过文件大小时从头读取并标记reset
+4. limit限制单页行数，按next_offset翻页能读完全部行
+5. 进度条的回车刷新不拆行，limit截断时游标仍在行边界
+"""
+
+import sys
+from pathlib import Path
+
+# 添加utils目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "utils"))
+
+from log_cursor import read_log_after, tail_log_page
+
+
+def write(path, text, mode='w'):
+    with open(path, mode, encoding='utf-8', newline='') as f:
+        f.write(text)
+
+
+class TestTailLogPage:
+    """测试从文件末尾读取最后几行"""
+
+    def test_partial_trailing_line_is_left_for_cursor(self, tmp_path):
+        """末尾未写完的行不返回，next_offset指向它的开头，写完后由read_log_after读到"""
+        log = tmp_path / "app.log"
+        write(log, "第一行\n第二行\n正在写")
+
+        page = tail_log_page(log, 10)
+
+        assert page['lines'] == ["第一行", "第二行"]
+        assert page['next_offset'] == len("第一行\n第二行\n".encode('utf-8'))
+
+        write(log, "入的行\n", mode='a')
+        after = read_log_after(log, page['next_offset'])
+        assert after['lines'] == ["正在写入的行"]
+        assert after['next_offset'] == log.stat().st_size
+
+    def test_multibyte_across_block_boundary(self, tmp_path):
+        """块大小不是字符宽度的整数倍时，跨块的中文行仍能完整解码"""
+        log = tmp_path / "app.log"
+        lines = [f"第{i}行日志，舆情分析" for i in range(20)]
+        write(log, "".join(line + "\n" for line in lines))
+
+        for block_size in (5, 7, 16):
+            page = tail_log_page(log, 3, block_size=block_size)
+            assert page['lines'] == lines[-3:]
+            assert page['next_offset'] == log.stat().st_size
+
+    def test_reads_whole_small_file_and_skips_blank_lines(self, tmp_path):
+        """行数不足count时返回全部非空行"""
+        log = tmp_path / "app.log"
+        write(log, "a\n\n  \nb\r\n")
+
+        assert tail_log_page(log, 100, block_size=3) == {'lines': ["a", "b"], 'next_offset': log.stat().st_size}
+
+
+class TestReadLogAfter:
+    """测试按游标增量读取"""
+
+    def test_offset_past_eof_after_truncation_resets(self, tmp_path):
+        """日志被清空重写后旧游标超过文件大小，从头读取并返回reset=True"""
+        log = tmp_path / "app.log"
+        write(log, "旧的日志行\n" * 10)
+        old_offset = log.stat().st_size
+        write(log, "新会话\n")
+
+        page = read_log_after(log, old_offset)
+
+        assert page['reset'] is True
+        assert page['lines'] == ["新会话"]
+        assert page['next_offset'] == log.stat().st_size
+        assert page['has_more'] is False
+
+    def test_missing_file_returns_empty_page(self, tmp_path):
+        page = read_log_after(tmp_path / "missing.log", 0)
+
+        assert page == {'lines': [], 'next_offset': 0, 'has_more': False, 'reset': False}
+
+    def test_limit_pages_through_all_lines(self, tmp_path):
+        """limit限制单页行数，has_more为True时按next_offset继续读取"""
+        log = tmp_path / "app.log"
+        lines = [f"行{i}" for i in range(7)]
+        write(log, "\n".join(lines) + "\n\n")
+
+        collected = []
+        offset = 0
+        pages = 0
+        while True:
+            page = read_log_after(log, offset, limit=3)
+            collected.extend(page['lines'])
+            offset = page['next_offset']
+            pages += 1
+            assert len(page['lines']) <= 3
+            if not page['has_more']:
+                break
+
+        assert collected == lines
+        assert offset == log.stat().st_size
+        assert pages == 3
+
+    def test_max_bytes_cut_inside_multibyte_char(self, tmp_path):
+        """max_bytes截在多字节字符中间时只返回完整行，剩余部分下一页读到"""
+        log = tmp_path / "app.log"
+        write(log, "情感\n舆情分析\n")
+        first_line_bytes = len("情感\n".encode('utf-8'))
+
+        page = read_log_after(log, 0, max_bytes=first_line_bytes + 4)
+
+        assert page['lines'] == ["情感"]
+        assert page['next_offset'] == first_line_bytes
+        assert page['has_more'] is True
+        assert read_log_after(log, page['next_offset'])['lines'] == ["舆情分析"]
+
+    def test_single_line_longer_than_max_bytes_is_returned_in_chunks(self, tmp_path):
+        """单行超过max_bytes时按整块返回，游标仍然前进"""
+        log = tmp_path / "app.log"
+        write(log, "x" * 10 + "\n")
+
+        page = read_log_after(log, 0, max_bytes=4)
+
+        assert page['lines'] == ["xxxx"]
+        assert page['next_offset'] == 4
+
+    def test_carriage_return_progress_stays_in_one_line(self, tmp_path):
+        """进度条用'\\r'刷新时只按'\\n'分行，与tail_log_page行数一致，limit翻页的游标落在行边界"""
+        log = tmp_path / "app.log"
+        write(log, "a\n 10%\r 50%\r100%\nb\n")
+
+        assert tail_log_page(log, 10)['lines'] == ["a", " 10%\r 50%\r100%", "b"]
+
+        page = read_log_after(log, 0, limit=2)
+
+        assert page['lines'] == ["a", " 10%\r 50%\r100%"]
+        assert page['next_offset'] == len(b"a\n 10%\r 50%\r100%\n")
+        assert page['has_more'] is True
+        assert read_log_after(log, page['next_offset'])['lines'] == ["b"]
@@ -0,0 +1,84 @@
+"""
+测试ForumEngine/message_bus.py中的论坛消息总线
+
+1. 发布的消息按seq递增并同步推送给订阅者
+2. 环形缓冲区按since游标分页
+3. LogMonitor写入forum.log时同时发布到消息总线
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ForumEngine import message_bus
+from ForumEngine.message_bus import ForumMessageBus
+from ForumEngine.monitor import LogMonitor
+
+
+class TestForumMessageBus:
+    """测试ForumMessageBus的发布/订阅与分页"""
+
+    def test_publish_and_subscribe(self):
+        """订阅者按发布顺序收到结构化消息"""
+        bus = ForumMessageBus()
+        received = []
+        unsubscribe = bus.subscribe(received.append)
+
+        bus.publish("第一条", "INSIGHT")
+        bus.publish("第二条", "HOST")
+        unsubscribe()
+        bus.publish("第三条", "MEDIA")
+
+        assert [m['seq'] for m in received] == [1, 2]
+        assert received[0]['source'] == "INSIGHT"
+        assert received[0]['line'].endswith("[INSIGHT] 第一条")
+
+    def test_get_since_pagination(self):
+        """按since游标分页，next_seq可直接用于下一次请求"""
+        bus = ForumMessageBus()
+        for i in range(5):
+            bus.publish(f"消息{i}", "QUERY")
+
+        page = bus.get_since(0, limit=2)
+        assert [m['content'] for m in page['messages']] == ["消息0", "消息1"]
+        assert page['has_more']
+
+        page = bus.get_since(page['next_seq'], limit=10)
+        assert [m['content'] for m in page['messages']] == ["消息2", "消息3", "消息4"]
+        assert not page['has_more']
+
+        page = bus.get_since(page['next_seq'])
+        assert page['messages'] == []
+        assert page['next_seq'] == 5
+
+    def test_ring_buffer_and_session(self):
+        """环形缓冲区有界，不传since时只返回当前会话"""
+        bus = ForumMessageBus(capacity=3)
+        for i in range(5):
+            bus.publish(f"消息{i}", "MEDIA")
+
+        page = bus.get_since(0)
+        assert [m['seq'] for m in page['messages']] == [3, 4, 5]
+        assert page['truncated']
+
+        bus.start_session()
+        bus.publish("新会话", "SYSTEM")
+        page = bus.get_since()
+        assert [m['content'] for m in page['messages']] == ["新会话"]
+
+    def test_monitor_publishes_forum_messages(self, tmp_path, monkeypatch):
+        """LogMonitor写入论坛发言时发布到消息总线，forum.log仍保留审计记录"""
+        bus = ForumMessageBus()
+        monkeypatch.setattr(message_bus, "_bus_instance", bus)
+        monitor = LogMonitor(log_dir=str(tmp_path))
+
+        monitor.write_to_forum_log("多行\n内容", "INSIGHT")
+
+        page = bus.get_since(0)
+        assert len(page['messages']) == 1
+        assert page['messages'][0]['content'] == "多行\\n内容"
+        log_lines = (tmp_path / "forum.log").read_text(encoding="utf-8").splitlines()
+        assert log_lines == [page['messages'][0]['line']]
@@ -327,6 +327,89 @@ class TestLogMonitor:
         assert not any("JSON修复失败" in content for content in result)
 
 
+
+class TestLogTailing:
+    """测试LogMonitor基于字节偏移的增量读取"""
+    
+    def setup_method(self):
+        self.monitor = LogMonitor(log_dir="tests/test_logs")
+    
+    def test_incremental_read_and_partial_line(self, tmp_path):
+        """只读取新增的完整行，未写完的半行留到下次"""
+        log_file = tmp_path / "insight.log"
+        log_file.write_text("旧内容\n", encoding="utf-8")
+        self.monitor.reset_tail_position(log_file, "insight")
+        assert self.monitor.check_file_change(log_file, "insight") == 'idle'
+        
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("第一行\n第二")
+        assert self.monitor.check_file_change(log_file, "insight") == 'grow'
+        assert self.monitor.read_new_lines(log_file, "insight") == ["第一行"]
+        
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("行\n")
+        assert self.monitor.check_file_change(log_file, "insight") == 'grow'
+        assert self.monitor.read_new_lines(log_file, "insight") == ["第二行"]
+        assert self.monitor.check_file_change(log_file, "insight") == 'idle'
+    
+    def test_truncate_and_rotate_deliver_every_line(self, tmp_path):
+        """截断后从头读取新内容；轮转时先读完旧文件再从头读取新文件，不丢行"""
+        log_file = tmp_path / "media.log"
+        log_file.write_text("a\nb\n", encoding="utf-8")
+        self.monitor.reset_tail_position(log_file, "media")
+        
+        log_file.write_text("c\n", encoding="utf-8")
+        assert self.monitor.check_file_change(log_file, "media") == 'shrink'
+        assert self.monitor.check_file_change(log_file, "media") == 'grow'
+        assert self.monitor.read_new_lines(log_file, "media") == ["c"]
+        assert self.monitor.check_file_change(log_file, "media") == 'idle'
+        
+        # 轮转前写入但尚未读取的行，以及轮转后已写入新文件的行都要读到
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("d\n")
+        log_file.rename(tmp_path / "media.log.1")
+        log_file.write_text("new file content\n", encoding="utf-8")
+        assert self.monitor.check_file_change(log_file, "media") == 'grow'
+        assert self.monitor.read_new_lines(log_file, "media") == ["d", "new file content"]
+        
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write("e\n")
+        assert self.monitor.check_file_change(log_file, "media") == 'grow'
+        assert self.monitor.read_new_lines(log_file, "media") == ["e"]
+    
+    def test_deleted_and_recreated_file_starts_new_session(self, tmp_path):
+        """旧文件被删除后重建视为新的会话，从新文件开头读取"""
+        log_file = tmp_path / "query.log"
+        log_file.write_text("old\n", encoding="utf-8")
+        self.monitor.reset_tail_position(log_file, "query")
+        
+        log_file.unlink()
+        log_file.write_text("fresh\n", encoding="utf-8")
+        assert self.monitor.check_file_change(log_file, "query") == 'shrink'
+        assert self.monitor.check_file_change(log_file, "query") == 'grow'
+        assert self.monitor.read_new_lines(log_file, "query") == ["fresh"]
+    
+    def test_follows_pipeline_rotation(self, tmp_path):
+        """ProcessOutputPipeline按大小轮转日志时，监控器按顺序读到所有行"""
+        sys.path.insert(0, str(project_root / "utils"))
+        from process_output import ProcessOutputPipeline
+        
+        log_file = tmp_path / "insight.log"
+        pipeline = ProcessOutputPipeline("insight", log_file, lambda frame: None,
+                                         max_log_bytes=60, backup_count=5).start()
+        self.monitor.reset_tail_position(log_file, "insight")
+        received = []
+        for i in range(1, 7):
+            pipeline.write(f"line {i} " + "x" * 30)
+            pipeline.flush()
+            if self.monitor.check_file_change(log_file, "insight") == 'grow':
+                received += self.monitor.read_new_lines(log_file, "insight")
+        pipeline.close()
+        
+        assert pipeline.get_stats()['rotations'] > 0
+        assert [line.split()[1] for line in received] == ["1", "2", "3", "4", "5", "6"]
+
+
 def run_tests():
     """运行所有测试"""
     import pytest
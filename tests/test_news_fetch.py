@@ -0,0 +1,179 @@
+"""
+测试MindSpider/BroadTopicExtraction/get_today_news.py中的并发新闻获取
+
+通过 httpx.MockTransport 模拟新闻API：
+1. 429和5xx响应按指数退避重试，总请求数不超过 MAX_RETRIES + 1，重试成功后返回数据
+2. Retry-After 大于退避时间时按 Retry-After 等待
+3. 带ETag的响应被缓存，下次请求带If-None-Match，304时复用缓存数据并标记not_modified
+4. get_popular_news 的结果按传入的新闻源顺序返回，与响应完成顺序无关
+5. HostRateLimiter 限制同一主机同时在途的请求数
+"""
+
+import asyncio
+import sys
+import types
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import httpx
+
+# 添加MindSpider目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "MindSpider"))
+
+# MindSpider的config.py由用户从config.py.example生成；这里只在导入期间提供settings，不连接真实数据库
+_saved_config = sys.modules.get("config")
+sys.modules["config"] = types.ModuleType("config")
+sys.modules["config"].settings = types.SimpleNamespace()
+try:
+    from BroadTopicExtraction import get_today_news as news
+finally:
+    if _saved_config is None:
+        del sys.modules["config"]
+    else:
+        sys.modules["config"] = _saved_config
+
+
+def make_collector(handler):
+    """不连接数据库的收集器，所有请求交给handler处理"""
+    collector = news.NewsCollector.__new__(news.NewsCollector)
+    collector.db_manager = None
+    collector.supported_sources = list(news.SOURCE_NAMES.keys())
+    collector._conditional_cache = {}
+    collector._create_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return collector
+
+
+def fetch(collector, source="weibo"):
+    async def run():
+        async with collector._create_client() as client:
+            return await collector.fetch_news(source, client)
+    return asyncio.run(run())
+
+
+def record_sleeps(monkeypatch):
+    """替换重试等待，只记录等待时长"""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(news.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def source_of(request):
+    return parse_qs(urlsplit(str(request.url)).query)["id"][0]
+
+
+class TestFetchRetries:
+    """测试单个新闻源的重试"""
+
+    def test_retries_until_success(self, monkeypatch):
+        delays = record_sleeps(monkeypatch)
+        statuses = iter([429, 502])
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            status = next(statuses, 200)
+            return httpx.Response(status, json={"items": [{"title": "热搜"}]} if status == 200 else None)
+
+        result = fetch(make_collector(handler))
+
+        assert result["status"] == "success"
+        assert result["data"] == {"items": [{"title": "热搜"}]}
+        assert len(requests) == 3
+        assert delays == [news.RETRY_BACKOFF, news.RETRY_BACKOFF * 2]
+
+    def test_attempts_are_capped(self, monkeypatch):
+        delays = record_sleeps(monkeypatch)
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(503)
+
+        result = fetch(make_collector(handler))
+
+        assert result["status"] == "http_error"
+        assert "503" in result["error"]
+        assert len(requests) == news.MAX_RETRIES + 1
+        assert len(delays) == news.MAX_RETRIES
+
+    def test_retry_after_raises_delay(self, monkeypatch):
+        delays = record_sleeps(monkeypatch)
+        responses = iter([httpx.Response(429, headers={"Retry-After": "7"})])
+
+        def handler(request):
+            return next(responses, None) or httpx.Response(200, json={"items": []})
+
+        result = fetch(make_collector(handler))
+
+        assert result["status"] == "success"
+        assert delays == [7.0]
+
+    def test_not_modified_reuses_cached_payload(self):
+        payload = {"items": [{"title": "第一条"}]}
+        seen_etags = []
+
+        def handler(request):
+            seen_etags.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json=payload, headers={"ETag": '"v1"'})
+
+        collector = make_collector(handler)
+        first = fetch(collector)
+        second = fetch(collector)
+
+        assert seen_etags == [None, '"v1"']
+        assert "not_modified" not in first
+        assert second["status"] == "success"
+        assert second["not_modified"] is True
+        assert second["data"] == payload
+
+
+class TestGetPopularNews:
+    """测试多个新闻源的并发获取"""
+
+    def test_results_keep_source_order(self):
+        sources = ["weibo", "zhihu", "toutiao"]
+        # 越靠前的新闻源响应越慢，完成顺序与传入顺序相反
+        latency = {"weibo": 0.3, "zhihu": 0.15, "toutiao": 0.0}
+        completed = []
+
+        async def handler(request):
+            source = source_of(request)
+            await asyncio.sleep(latency[source])
+            completed.append(source)
+            return httpx.Response(200, json={"items": [{"title": source}]})
+
+        results = asyncio.run(make_collector(handler).get_popular_news(sources))
+
+        assert completed == list(reversed(sources))
+        assert [result["source"] for result in results] == sources
+        assert [result["data"]["items"][0]["title"] for result in results] == sources
+
+
+class TestHostRateLimiter:
+    """测试按主机限流"""
+
+    def test_limits_in_flight_requests_per_host(self):
+        limiter = news.HostRateLimiter(max_concurrent=2, min_interval=0)
+        in_flight = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        async def request(host):
+            async with limiter.slot(host):
+                in_flight[host] += 1
+                peak[host] = max(peak[host], in_flight[host])
+                await asyncio.sleep(0.01)
+                in_flight[host] -= 1
+
+        async def run():
+            await asyncio.gather(*(request(host) for host in "aaaaabbb"))
+
+        asyncio.run(run())
+
+        assert peak == {"a": 2, "b": 2}
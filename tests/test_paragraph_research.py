@@ -0,0 +1,125 @@
+"""
+测试utils/paragraph_research.py中的段落并发研究
+
+1. 并发研究时每个段落的总结写回自己的段落，与完成顺序无关
+2. 进度回调在调用线程中执行，每个段落各有一次summarized和completed事件
+3. 在途LLM调用数不超过MAX_CONCURRENT_LLM_CALLS
+4. 工作线程出错时异常在调用线程重新抛出，尚未开始的段落被取消
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录和utils目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "utils"))
+
+from paragraph_research import ParagraphResearchMixin
+
+
+class StubResearch:
+    def __init__(self):
+        self.latest_summary = ""
+        self.is_completed = False
+
+    def mark_completed(self):
+        self.is_completed = True
+
+
+class StubLLM:
+    """越靠前的段落返回越慢的LLM，记录最大在途调用数"""
+
+    def __init__(self, total):
+        self.total = total
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def summarize(self, paragraph_index, text):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02 * (self.total - paragraph_index))
+        with self.lock:
+            self.in_flight -= 1
+        return f"{text}的总结"
+
+
+class StubAgent(ParagraphResearchMixin):
+    """只实现段落研究所需接口的Agent，LLM为桩"""
+
+    def __init__(self, titles, fail_on=None, **config):
+        self.config = SimpleNamespace(**config)
+        self.state = SimpleNamespace(paragraphs=[SimpleNamespace(title=title, research=StubResearch())
+                                                 for title in titles])
+        self.llm = StubLLM(len(titles))
+        self.fail_on = fail_on
+        self.started = []
+        self._init_concurrency_limits()
+
+    def _initial_search_and_summary(self, paragraph_index):
+        self.started.append(paragraph_index)
+        paragraph = self.state.paragraphs[paragraph_index]
+        if paragraph.title == self.fail_on:
+            raise RuntimeError("搜索服务不可用")
+        with self._llm_slots:
+            paragraph.research.latest_summary = self.llm.summarize(paragraph_index, paragraph.title)
+
+    def _reflection_loop(self, paragraph_index):
+        with self._llm_slots:
+            self.llm.summarize(paragraph_index, "反思")
+
+
+class TestParagraphResearch:
+    """测试ParagraphResearchMixin的逐段与并发研究"""
+
+    def test_concurrent_results_stay_with_their_paragraphs(self):
+        """并发研究时靠后的段落先完成，各段落总结仍写回各自的段落"""
+        titles = ["背景", "传播", "情感", "建议"]
+        agent = StubAgent(titles, PARAGRAPH_CONCURRENCY=4)
+        caller = threading.current_thread()
+        events = []
+
+        agent._process_paragraphs(lambda *event: events.append((threading.current_thread(), event)))
+
+        assert [p.research.latest_summary for p in agent.state.paragraphs] == [f"{t}的总结" for t in titles]
+        assert all(p.research.is_completed for p in agent.state.paragraphs)
+        assert all(thread is caller for thread, _ in events)
+        completed = [event for _, event in events if event[1] == "completed"]
+        assert [event[2] for event in completed] == [1, 2, 3, 4]
+        assert completed[0][0] == 3
+        assert sorted(event[0] for _, event in events if event[1] == "summarized") == [0, 1, 2, 3]
+
+    def test_serial_mode_reports_progress_in_order(self):
+        """默认并发数为1时逐段处理，进度按段落顺序回调"""
+        agent = StubAgent(["背景", "传播"])
+        events = []
+
+        agent._process_paragraphs(lambda *event: events.append(event))
+
+        assert agent.paragraph_concurrency == 1
+        assert events == [(0, "summarized", 0, 2), (0, "completed", 1, 2),
+                          (1, "summarized", 1, 2), (1, "completed", 2, 2)]
+
+    def test_llm_calls_limited_by_slots(self):
+        """段落并发数大于LLM调用上限时，在途LLM调用数不超过上限"""
+        agent = StubAgent([str(i) for i in range(6)], PARAGRAPH_CONCURRENCY=6, MAX_CONCURRENT_LLM_CALLS=2)
+
+        agent._process_paragraphs()
+
+        assert agent.llm.max_in_flight == 2
+
+    def test_worker_error_propagates(self):
+        """某个段落失败时异常在调用线程抛出，未开始的段落不再执行"""
+        agent = StubAgent(["出错"] + [str(i) for i in range(5)], fail_on="出错", PARAGRAPH_CONCURRENCY=2)
+
+        with pytest.raises(RuntimeError, match="搜索服务不可用"):
+            agent._process_paragraphs()
+
+        assert len(agent.started) < 6
@@ -0,0 +1,161 @@
+"""
+测试utils/process_output.py中的子进程输出管道
+
+1. 多行输出批量写入持久打开的日志文件，合并为少量携带lines数组的推送帧
+2. 推送期间积压的行按每帧行数上限拆分推送
+3. 推送按每秒行数限速，待推送行超出上限时只丢弃最早的行并报告数量，日志文件完整
+4. 磁盘写入跟不上时write阻塞，待写入的行数有界
+5. 日志超过大小上限时轮转，保留指定个数的备份
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加utils目录到路径（与各引擎的导入方式一致）
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "utils"))
+
+from process_output import ProcessOutputPipeline, rotated_log_paths
+
+
+def wait_for(predicate, timeout=5.0):
+    """轮询直到条件成立或超时"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestProcessOutputPipeline:
+    """测试ProcessOutputPipeline的批量写入、背压与轮转"""
+
+    def test_batches_lines_into_frames(self, tmp_path):
+        """连续写入的行合并为少量帧，不推送的行只写入文件"""
+        frames = []
+        log_path = tmp_path / "insight.log"
+        pipeline = ProcessOutputPipeline("insight", log_path, frames.append, flush_interval=10).start()
+
+        pipeline.write("启动", emit=False)
+        pipeline.write_many([f"行{i}" for i in range(100)])
+        pipeline.flush()
+        pipeline.write("最后一行")
+        pipeline.close()
+
+        assert [frame['app'] for frame in frames] == ["insight", "insight"]
+        assert frames[0]['lines'] == [f"行{i}" for i in range(100)]
+        assert frames[1]['lines'] == ["最后一行"]
+        assert log_path.read_text(encoding="utf-8").splitlines() == ["启动"] + [f"行{i}" for i in range(100)] + ["最后一行"]
+        stats = pipeline.get_stats()
+        assert stats['lines'] == 102 and stats['frames'] == 2 and stats['dropped_lines'] == 0
+
+    def test_size_bound_triggers_flush(self, tmp_path):
+        """积压行数达到上限时不等待时间间隔立即写入"""
+        written = threading.Event()
+        pipeline = ProcessOutputPipeline("media", tmp_path / "media.log", lambda frame: written.set(),
+                                         flush_interval=10, max_batch_lines=10).start()
+
+        pipeline.write_many([str(i) for i in range(10)])
+        assert written.wait(timeout=5)
+        pipeline.close()
+        assert len((tmp_path / "media.log").read_text(encoding="utf-8").splitlines()) == 10
+
+    def test_splits_backlog_into_bounded_frames(self, tmp_path):
+        """推送期间积压的行在下一次写入时全部推送，每帧不超过max_frame_lines行"""
+        frames = []
+        gate = threading.Event()
+        started = threading.Event()
+
+        def slow_emit(frame):
+            frames.append(frame)
+            started.set()
+            gate.wait(timeout=5)
+
+        log_path = tmp_path / "query.log"
+        pipeline = ProcessOutputPipeline("query", log_path, slow_emit, flush_interval=0.01,
+                                         max_frame_lines=8).start()
+        pipeline.write("first")
+        assert started.wait(timeout=5)
+        pipeline.write_many([str(i) for i in range(20)])
+        gate.set()
+        pipeline.close()
+
+        assert [len(frame['lines']) for frame in frames] == [1, 8, 8, 4]
+        assert [line for frame in frames[1:] for line in frame['lines']] == [str(i) for i in range(20)]
+        assert len(log_path.read_text(encoding="utf-8").splitlines()) == 21
+
+    def test_burst_drops_oldest_pending_lines(self, tmp_path):
+        """突发输出超出待推送上限时丢弃最早的行，下一帧报告丢弃数量，日志文件不丢行"""
+        frames = []
+        log_path = tmp_path / "query.log"
+        pipeline = ProcessOutputPipeline("query", log_path, frames.append, flush_interval=10,
+                                         max_pending_emit_lines=50).start()
+
+        pipeline.write_many([str(i) for i in range(1000)])
+        pipeline.close()
+
+        assert [line for frame in frames for line in frame['lines']] == [str(i) for i in range(950, 1000)]
+        assert frames[0]['dropped'] == 950
+        assert len(log_path.read_text(encoding="utf-8").splitlines()) == 1000
+        assert pipeline.get_stats()['dropped_lines'] == 950
+
+    def test_emit_rate_limit_holds_back_burst(self, tmp_path):
+        """emit不阻塞时按每秒行数限速推送，其余行留在有界的待推送缓冲区"""
+        frames = []
+        pipeline = ProcessOutputPipeline("media", tmp_path / "media.log", frames.append, flush_interval=0.01,
+                                         max_emit_lines_per_second=20).start()
+
+        pipeline.write_many([str(i) for i in range(100)])
+        time.sleep(0.2)
+        emitted = sum(len(frame['lines']) for frame in frames)
+        pending = pipeline.get_stats()['pending_emit_lines']
+        pipeline.close()
+
+        assert 1 <= emitted <= 30 and pending == 100 - emitted
+        assert [line for frame in frames for line in frame['lines']] == [str(i) for i in range(100)]
+
+    def test_write_blocks_when_log_writes_fall_behind(self, tmp_path):
+        """写入日志阻塞期间待写入的行达到上限时write阻塞，写入恢复后继续且不丢行"""
+        gate = threading.Event()
+        written = []
+        pipeline = ProcessOutputPipeline("insight", tmp_path / "insight.log", lambda frame: None,
+                                         flush_interval=0.01, max_batch_lines=5, max_pending_write_lines=10)
+
+        def slow_write(lines):
+            gate.wait(timeout=5)
+            written.extend(lines)
+
+        pipeline._write_lines = slow_write
+        pipeline.start()
+        writer = threading.Thread(target=lambda: [pipeline.write(str(i)) for i in range(100)])
+        writer.start()
+
+        assert wait_for(lambda: pipeline.get_stats()['write_waits'] >= 1)
+        assert writer.is_alive() and pipeline.get_stats()['pending_lines'] <= 10
+        gate.set()
+        writer.join(timeout=5)
+        pipeline.close()
+
+        assert not writer.is_alive()
+        assert written == [str(i) for i in range(100)]
+
+    def test_rotates_by_size(self, tmp_path):
+        """日志超过大小上限后轮转，只保留backup_count个备份"""
+        log_path = tmp_path / "insight.log"
+        pipeline = ProcessOutputPipeline("insight", log_path, lambda frame: None,
+                                         max_log_bytes=100, backup_count=2).start()
+        for batch in range(4):
+            pipeline.write_many([f"{batch}-{i}" + "x" * 20 for i in range(3)])
+            pipeline.flush()
+        pipeline.close()
+
+        backups = rotated_log_paths(log_path, 2)
+        assert [path.name for path in backups] == ["insight.log.1", "insight.log.2"]
+        assert log_path.read_text(encoding="utf-8").startswith("3-0")
+        assert backups[0].read_text(encoding="utf-8").startswith("2-0")
+        assert backups[1].read_text(encoding="utf-8").startswith("1-0")
+        assert not (tmp_path / "insight.log.3").exists()
+        assert pipeline.get_stats()['rotations'] == 3
@@ -0,0 +1,125 @@
+"""
+测试ReportEngine/nodes/html_generation_node.py中的分章节生成
+
+1. 模板按二级标题或顶格列表项拆分为章节，章节前的标题作为报告标题
+2. 章节并行生成，按模板顺序填入HTML外壳，流式事件报告完成进度
+3. 每个章节只收到与其相关的报告摘录
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.nodes.html_generation_node import (
+    HTMLGenerationNode,
+    select_section_excerpts,
+    split_template_sections,
+)
+
+
+class FakeLLM:
+    """按章节返回HTML片段的LLM客户端，越靠前的章节返回越慢"""
+
+    def __init__(self, total):
+        self.total = total
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def stream_invoke_to_string(self, system_prompt, message):
+        data = json.loads(message)
+        with self.lock:
+            self.messages.append(data)
+        time.sleep(0.05 * (self.total - data['section_index']))
+        return f"```html\n<section><h2>{data['section_title']}</h2></section>\n```"
+
+
+class TestSplitTemplateSections:
+    """测试split_template_sections的章节拆分"""
+
+    def test_splits_on_second_level_headings(self):
+        """按##拆分，#标题作为报告标题，###及正文归入所属章节"""
+        template = "# 舆情分析报告\n\n## 一、事件概述\n正文\n### 1.1 背景\n\n## 二、**舆论走势**\n- 要点"
+
+        outline = split_template_sections(template)
+
+        assert outline['title'] == "舆情分析报告"
+        assert [section['title'] for section in outline['sections']] == ["一、事件概述", "二、舆论走势"]
+        assert outline['sections'][0]['outline'] == "## 一、事件概述\n正文\n### 1.1 背景"
+
+    def test_splits_on_top_level_items_without_headings(self):
+        """没有二级标题时按顶格列表项拆分，子列表归入所属章节"""
+        template = "### 品牌声誉报告\n- **1.0 报告摘要**\n  - 核心结论\n- **2.0 声量分析**\n  - 平台分布"
+
+        outline = split_template_sections(template)
+
+        assert outline['title'] == "品牌声誉报告"
+        assert [section['title'] for section in outline['sections']] == ["1.0 报告摘要", "2.0 声量分析"]
+        assert outline['sections'][1]['outline'] == "- **2.0 声量分析**\n  - 平台分布"
+
+    def test_preamble_is_not_a_section(self):
+        """第一个章节之前的说明文字不作为章节，也不并入章节大纲"""
+        template = "模板说明：请按以下结构撰写\n\n## 概述\n内容"
+
+        outline = split_template_sections(template)
+
+        assert outline['title'] == ""
+        assert outline['sections'] == [{'title': "概述", 'outline': "## 概述\n内容"}]
+
+    def test_plain_text_has_no_sections(self):
+        outline = split_template_sections("没有任何结构的模板")
+        assert outline == {'title': "", 'sections': []}
+
+
+class TestRunSectioned:
+    """测试run_sectioned的并行生成与合并"""
+
+    def test_merges_sections_in_template_order(self):
+        """章节完成顺序与模板顺序不同时，最终HTML仍按模板顺序排列"""
+        titles = ["概述", "传播路径", "情感分析", "建议"]
+        template = "# 报告\n" + "\n".join(f"## {title}\n要点" for title in titles)
+        llm = FakeLLM(len(titles))
+        events = []
+
+        html = HTMLGenerationNode(llm).run_sectioned(
+            {'query': "测试话题", 'selected_template': template},
+            max_workers=4, stream_callback=lambda event, data: events.append((event, data)),
+        )
+
+        positions = [html.index(f"<h2>{title}</h2>") for title in titles]
+        assert positions == sorted(positions)
+        assert "正在生成" not in html
+
+        assert events[0][0] == "shell" and events[0][1]['sections'] == titles
+        section_events = [data for event, data in events if event == "section"]
+        assert [data['completed'] for data in section_events] == [1, 2, 3, 4]
+        assert section_events[0]['index'] == 3
+        assert all(data['status'] == "completed" and data['total'] == 4 for data in section_events)
+
+    def test_sections_receive_relevant_excerpts(self):
+        """报告较长时每个章节只收到相关段落，而不是完整报告"""
+        paragraphs = [f"关于传播路径的分析{i}：" + "转发链路扩散" * 100 for i in range(10)]
+        paragraphs += [f"关于情感倾向的分析{i}：" + "网友情绪负面" * 100 for i in range(10)]
+        report = "\n\n".join(paragraphs)
+        template = "## 传播路径\n- 转发链路与扩散节点\n## 情感倾向\n- 网友情绪变化"
+        llm = FakeLLM(2)
+
+        HTMLGenerationNode(llm).run_sectioned(
+            {'query': "测试话题", 'selected_template': template, 'query_engine_report': report},
+            max_workers=2, source_chars=3000,
+        )
+
+        by_title = {data['section_title']: data['query_engine_report'] for data in llm.messages}
+        assert all(len(excerpt) < len(report) for excerpt in by_title.values())
+        assert "转发链路扩散" in by_title["传播路径"] and "网友情绪负面" not in by_title["传播路径"]
+        assert "网友情绪负面" in by_title["情感倾向"] and "转发链路扩散" not in by_title["情感倾向"]
+        assert all(data['media_engine_report'] == "" for data in llm.messages)
+
+    def test_short_source_is_sent_unchanged(self):
+        """不超过字数上限的报告原样发送"""
+        assert select_section_excerpts("短报告", "章节", 1000) == "短报告"
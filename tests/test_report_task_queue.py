@@ -0,0 +1,149 @@
+"""
+测试ReportEngine/task_queue.py中的报告任务队列
+
+1. 相同输入的任务在排队或生成期间只提交一次
+2. 单个工作线程按提交顺序执行任务
+3. 排队中的任务取消后不再执行；生成中的任务协作式停止并让出工作线程
+4. stop()在当前任务结束后停止工作线程，排队中的任务保留并可从数据库恢复
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.task_queue import ReportTaskQueue
+
+
+def wait_for(predicate, timeout=5.0):
+    """轮询直到条件成立或超时"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+class RecordingRunner:
+    """记录执行顺序的run_fn，gate未放行前阻塞"""
+
+    def __init__(self, blocking=False):
+        self.calls = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        if not blocking:
+            self.gate.set()
+
+    def __call__(self, task):
+        self.calls.append(task.query)
+        self.started.set()
+        self.gate.wait(timeout=5)
+        task.update_status("completed", 100)
+
+
+class TestReportTaskQueue:
+    """测试ReportTaskQueue的提交、顺序、取消与停止"""
+
+    def test_submit_reuses_active_task(self):
+        """相同查询在排队期间重复提交时复用同一任务"""
+        task_queue = ReportTaskQueue(RecordingRunner(), persist_path="")
+
+        first, created = task_queue.submit("武汉大学")
+        again, created_again = task_queue.submit("武汉大学")
+        other, created_other = task_queue.submit("清华大学")
+
+        assert created and not created_again and created_other
+        assert again is first and other is not first
+        assert task_queue.get_stats()['queued'] == 2
+
+    def test_single_worker_runs_in_submission_order(self):
+        """单个工作线程按提交顺序依次执行"""
+        runner = RecordingRunner()
+        task_queue = ReportTaskQueue(runner, worker_count=1, persist_path="")
+        tasks = [task_queue.submit(query)[0] for query in ("a", "b", "c")]
+
+        task_queue.start()
+        assert wait_for(lambda: all(task.status == "completed" for task in tasks))
+        task_queue.stop()
+
+        assert runner.calls == ["a", "b", "c"]
+
+    def test_cancel_pending_task_is_skipped(self):
+        """排队中的任务取消后工作线程跳过，不再执行"""
+        runner = RecordingRunner(blocking=True)
+        task_queue = ReportTaskQueue(runner, worker_count=1, persist_path="")
+        task_queue.start()
+        running, _ = task_queue.submit("running")
+        assert runner.started.wait(timeout=5)
+        queued, _ = task_queue.submit("queued")
+
+        assert task_queue.cancel(queued.task_id)
+        assert not task_queue.cancel(queued.task_id)
+        runner.gate.set()
+        assert wait_for(lambda: running.status == "completed")
+        task_queue.stop()
+
+        assert runner.calls == ["running"]
+        assert queued.status == "cancelled"
+
+    def test_cancel_running_task_frees_worker(self):
+        """生成中的任务取消后run_fn提前结束，工作线程继续执行下一个任务"""
+        started = threading.Event()
+        calls = []
+
+        def run_fn(task):
+            calls.append(task.query)
+            if task.query == "long":
+                started.set()
+                # 模拟逐章节生成，每个章节开始前检查取消标志
+                while not task.is_cancelled():
+                    time.sleep(0.01)
+                return
+            task.update_status("completed", 100)
+
+        task_queue = ReportTaskQueue(run_fn, worker_count=1, persist_path="")
+        task_queue.start()
+        long_task, _ = task_queue.submit("long")
+        next_task, _ = task_queue.submit("next")
+        assert started.wait(timeout=5)
+
+        assert task_queue.cancel(long_task.task_id)
+        assert wait_for(lambda: next_task.status == "completed")
+        task_queue.stop()
+
+        assert long_task.status == "cancelled"
+        assert calls == ["long", "next"]
+
+    def test_stop_keeps_pending_tasks(self, tmp_path):
+        """stop()等待当前任务结束后退出，排队中的任务保留在数据库中，新队列启动后继续执行"""
+        db_path = str(tmp_path / "report_tasks.db")
+        runner = RecordingRunner(blocking=True)
+        task_queue = ReportTaskQueue(runner, worker_count=1, persist_path=db_path)
+        task_queue.start()
+        first, _ = task_queue.submit("first")
+        assert runner.started.wait(timeout=5)
+        second, _ = task_queue.submit("second")
+
+        stopper = threading.Thread(target=task_queue.stop)
+        stopper.start()
+        # 排队任务已被取出、只剩退出信号后再让当前任务结束
+        assert wait_for(lambda: list(task_queue._queue.queue) == [None])
+        runner.gate.set()
+        stopper.join(timeout=5)
+
+        assert not stopper.is_alive()
+        assert first.status == "completed" and second.status == "pending"
+        assert runner.calls == ["first"]
+
+        restored_runner = RecordingRunner()
+        restored = ReportTaskQueue(restored_runner, worker_count=1, persist_path=db_path)
+        restored.start()
+        assert wait_for(lambda: restored.get(second.task_id).status == "completed")
+        restored.stop()
+        assert restored_runner.calls == ["second"]
+        assert restored.get(first.task_id).status == "completed"
@@ -0,0 +1,127 @@
+"""
+测试utils/search_cache.py中的搜索结果缓存
+
+1. 规范化参数后相同的查询命中缓存，命中返回独立副本
+2. 按工具的TTL过期，内存LRU有界
+3. SQLite共享文件在多个缓存实例（进程）间共享
+4. 失败或空响应、抛出异常的调用不写入缓存
+"""
+
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import List
+
+# 添加utils目录到路径（与各引擎的导入方式一致）
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "utils"))
+
+import search_cache
+from search_cache import SearchResultCache, cached_search, normalize_params, resolve_ttl
+
+
+@dataclass
+class FakeResponse:
+    query: str
+    results: List[str] = field(default_factory=list)
+
+
+class FakeAgency:
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    @cached_search("fake", cacheable=lambda response: bool(response.results))
+    def search_news_last_24_hours(self, query: str, max_results: int = 5) -> FakeResponse:
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("API不可用")
+        return FakeResponse(query=query, results=[f"{query}-{i}" for i in range(max_results)] if query != "空" else [])
+
+    @cached_search("fake", tool_param="tool_name")
+    def search_concurrently(self, tool_name: str, topics: List[str], **tool_kwargs) -> FakeResponse:
+        self.calls += 1
+        return FakeResponse(query=",".join(topics), results=list(topics))
+
+
+class TestSearchResultCache:
+    """测试SearchResultCache与cached_search装饰器"""
+
+    def setup_method(self):
+        self.cache = SearchResultCache()
+        search_cache._cache_instance = self.cache
+
+    def teardown_method(self):
+        search_cache._cache_instance = None
+
+    def test_normalized_params_hit(self):
+        """大小写和空白不同的同一查询命中缓存，命中返回的是独立副本"""
+        agency = FakeAgency()
+        first = agency.search_news_last_24_hours("  Nvidia   GTC ")
+        first.results.append("调用方修改")
+        second = agency.search_news_last_24_hours(query="nvidia gtc", max_results=5)
+
+        assert agency.calls == 1
+        assert "调用方修改" not in second.results
+        stats = self.cache.get_stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["tools"]["search_news_last_24_hours"] == {"hits": 1, "misses": 1}
+
+    def test_failures_are_not_cached(self):
+        """抛出异常和空响应都不写入缓存"""
+        agency = FakeAgency()
+        agency.fail = True
+        try:
+            agency.search_news_last_24_hours("突发")
+        except RuntimeError:
+            pass
+        agency.fail = False
+        agency.search_news_last_24_hours("突发")
+        agency.search_news_last_24_hours("空")
+        agency.search_news_last_24_hours("空")
+        assert agency.calls == 4
+
+    def test_ttl_and_lru(self):
+        """条目到期后失效，内存缓存超出上限时淘汰最久未使用的条目"""
+        cache = SearchResultCache(max_entries=2)
+        cache.set("a", 1, ttl=0.05)
+        cache.set("b", 2, ttl=60)
+        assert cache.get("b") == (True, 2)
+        cache.set("c", 3, ttl=60)
+        cache.set("d", 4, ttl=60)
+        assert cache.get("b") == (False, None)
+        assert cache.get("d") == (True, 4)
+        assert cache.get_stats()["evictions"] == 2
+
+        cache.set("e", 5, ttl=0.05)
+        time.sleep(0.1)
+        assert cache.get("e") == (False, None)
+
+    def test_shared_store(self, tmp_path):
+        """一个实例写入的结果可被另一个实例（另一个Streamlit进程）命中"""
+        path = str(tmp_path / "search_cache.db")
+        writer = SearchResultCache(persist_path=path)
+        reader = SearchResultCache(persist_path=path)
+        writer.set("key", FakeResponse(query="q", results=["r"]), ttl=60, tool="basic_search_news")
+
+        hit, value = reader.get("key", "basic_search_news")
+        assert hit and value.results == ["r"]
+        assert reader.get_stats()["store_hits"] == 1
+        writer.close()
+        reader.close()
+
+    def test_tool_ttls(self):
+        """24小时内搜索缓存时间短，历史日期区间缓存时间长，工具名可来自调用参数"""
+        yesterday = (date.today() - timedelta(days=1)).isoformat()
+        assert resolve_ttl("search_news_last_24_hours", {}) < resolve_ttl("search_news_by_date", {})
+        assert resolve_ttl("search_news_by_date", {"end_date": yesterday}) == search_cache.HISTORICAL_TTL
+        assert normalize_params({"topics": [" A ", "b"], "platform": None}) == {"topics": ["a", "b"]}
+
+        agency = FakeAgency()
+        agency.search_concurrently("search_topic_globally", ["话题"], limit_per_table=10)
+        agency.search_concurrently("search_topic_globally", ["话题"], limit_per_table=10)
+        agency.search_concurrently("search_topic_globally", ["话题"], limit_per_table=20)
+        assert agency.calls == 2
+        assert self.cache.get_stats()["tools"]["search_topic_globally"] == {"hits": 1, "misses": 2}
@@ -0,0 +1,131 @@
+"""
+测试InsightEngine/tools/sentiment_cache.py中的情感分析结果缓存
+
+1. 批量分析时命中缓存的文本不再进入模型，只有未命中的文本被推理
+2. 多个线程同时读写同一缓存（含SQLite持久化）时结果完整、内存条数有界
+3. 持久化文件在新的缓存实例中仍可命中
+4. 整批推理失败退回逐条推理时，每条文本只计一次未命中
+5. 共享缓存上各调用方按快照单独统计，互不清零
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from InsightEngine.tools.sentiment_analyzer import SentimentResult, WeiboMultilingualSentimentAnalyzer
+from InsightEngine.tools.sentiment_cache import SentimentResultCache
+
+
+def make_value(label):
+    return {'sentiment_label': label, 'confidence': 0.9, 'probability_distribution': {label: 0.9}}
+
+
+class FakeAnalyzer(WeiboMultilingualSentimentAnalyzer):
+    """不加载模型的分析器，记录每次送入模型的文本"""
+
+    def __init__(self, cache):
+        super().__init__(cache=cache)
+        # 测试环境可能没有安装torch，跳过依赖检查
+        self.is_disabled = False
+        self.is_initialized = True
+        self.inferred = []
+
+    def _predict_chunk(self, raw_texts, processed_texts):
+        self.inferred.extend(processed_texts)
+        return [SentimentResult(text=raw, success=True, **make_value("正面")) for raw in raw_texts]
+
+
+class FailingBatchAnalyzer(FakeAnalyzer):
+    """整批推理失败、逐条推理时也没有可用模型的分析器"""
+
+    def _predict_chunk(self, raw_texts, processed_texts):
+        raise RuntimeError("显存不足")
+
+
+class TestSentimentResultCache:
+    """测试SentimentResultCache的命中、并发与持久化"""
+
+    def test_batch_only_infers_cache_misses(self):
+        """第二次批量分析只推理新文本，结果按输入顺序返回"""
+        analyzer = FakeAnalyzer(SentimentResultCache())
+
+        first = analyzer.analyze_batch(["好评", "差评"], show_progress=False)
+        second = analyzer.analyze_batch(["差评", "新的文本", "  好评 "], show_progress=False)
+
+        assert analyzer.inferred == ["好评", "差评", "新的文本"]
+        assert first.success_count == 2 and second.success_count == 3
+        assert [r.text for r in second.results] == ["差评", "新的文本", "  好评 "]
+        assert analyzer.get_cache_stats()['hits'] == 2
+
+    def test_concurrent_access_from_threads(self, tmp_path):
+        """多个线程并发写入和读取同一缓存，不丢失条目且内存LRU不超过上限"""
+        cache = SentimentResultCache(max_entries=50, persist_path=str(tmp_path / "sentiment.db"))
+        errors = []
+
+        def worker(worker_id):
+            try:
+                for i in range(40):
+                    key = cache.make_key("model", f"{worker_id}-{i}")
+                    cache.set(key, make_value(f"{worker_id}-{i}"))
+                    assert cache.get(key)['sentiment_label'] == f"{worker_id}-{i}"
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        stats = cache.get_stats()
+        assert stats['entries'] == 50 and stats['misses'] == 0
+        keys = [cache.make_key("model", f"{n}-{i}") for n in range(8) for i in range(40)]
+        assert len(cache.get_many(keys)) == 320
+        cache.close()
+
+    def test_persisted_entries_survive_new_instance(self, tmp_path):
+        """写入SQLite的结果在新实例（如Streamlit重启后）中仍可命中"""
+        path = str(tmp_path / "sentiment.db")
+        cache = SentimentResultCache(persist_path=path)
+        key = cache.make_key("model", "文本")
+        cache.set(key, make_value("负面"))
+        cache.close()
+
+        reopened = SentimentResultCache(persist_path=path)
+        assert reopened.get(key) == make_value("负面")
+        assert reopened.get_stats()['hits'] == 1
+        reopened.close()
+
+    def test_fallback_counts_each_miss_once(self):
+        """批量查询已计入未命中，退回逐条推理时不再查询缓存"""
+        cache = SentimentResultCache()
+        analyzer = FailingBatchAnalyzer(cache)
+
+        result = analyzer.analyze_batch(["好评", "差评"], show_progress=False)
+
+        assert result.success_count == 0
+        assert cache.get_stats()['misses'] == 2 and cache.get_stats()['hits'] == 0
+
+    def test_stats_since_snapshot_are_scoped_per_caller(self):
+        """一个调用方开始新的统计不会清掉其他调用方看到的累计统计"""
+        cache = SentimentResultCache()
+        key = cache.make_key("model", "文本")
+        cache.get(key)
+        cache.set(key, make_value("正面"))
+        cache.record_inference(2.0, 1)
+
+        since = cache.stats_snapshot()
+        cache.get(key)
+        cache.get(key)
+
+        scoped = cache.get_stats(since)
+        assert (scoped['hits'], scoped['misses'], scoped['hit_rate']) == (2, 0, 1.0)
+        assert scoped['estimated_seconds_saved'] == 4.0
+        total = cache.get_stats()
+        assert (total['hits'], total['misses']) == (2, 1)
+        assert total['estimated_seconds_saved'] == 4.0
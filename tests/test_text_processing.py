@@ -0,0 +1,76 @@
+"""
+测试各引擎utils/text_processing.py中的搜索结果打包
+
+1. 剩余预算不足时停止，其余结果不再计算指纹
+2. 近似重复的结果被跳过
+3. 放不下的结果截断填充剩余预算
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from InsightEngine.utils import text_processing
+from InsightEngine.utils.text_processing import (
+    MIN_PARTIAL_RESULT_TOKENS,
+    estimate_tokens,
+    pack_search_results_for_prompt,
+)
+
+
+def make_result(text, score=None):
+    result = {'content': text}
+    if score is not None:
+        result['score'] = score
+    return result
+
+
+class TestPackSearchResults:
+    """测试pack_search_results_for_prompt的预算、去重与截断"""
+
+    def test_stops_before_fingerprinting_when_budget_exhausted(self, monkeypatch):
+        """预算用尽后剩余结果直接计入dropped，不再计算指纹"""
+        fingerprinted = []
+        original = text_processing._content_fingerprint
+        monkeypatch.setattr(text_processing, "_content_fingerprint",
+                            lambda content: fingerprinted.append(content) or original(content))
+        results = [make_result(f"第{i}条结果 " + "内容" * 200) for i in range(50)]
+        budget = estimate_tokens(results[0]['content']) * 2
+
+        packed, stats = pack_search_results_for_prompt(results, token_budget=budget)
+
+        assert len(packed) == 2 and stats['kept'] == 2
+        assert stats['dropped'] == 48 and stats['duplicates'] == 0
+        assert len(fingerprinted) == 2
+        assert stats['tokens_used'] == budget
+        assert stats['tokens_dropped'] == sum(estimate_tokens(r['content']) for r in results[2:])
+
+    def test_skips_near_duplicates(self):
+        """与已选结果近似重复（转发、改动个别字）的内容被跳过，按score保留较高的一条"""
+        original = "某地发布暴雨红色预警，全市中小学停课一天，地铁部分线路临时停运，请市民减少出行" * 3
+        repost = "转发：" + original
+        other = "另一条完全不同的新闻内容，讨论新能源汽车销量在第三季度持续增长的情况" * 3
+        results = [make_result(repost, score=1), make_result(original, score=5), make_result(other, score=3)]
+
+        packed, stats = pack_search_results_for_prompt(results, token_budget=None)
+
+        assert packed == [original, other]
+        assert stats['duplicates'] == 1 and stats['kept'] == 2
+
+    def test_truncates_last_result_to_remaining_budget(self):
+        """放不下的结果在剩余预算足够时截断填充，不超出预算"""
+        first = "甲" * 1000
+        second = "乙" * 1000
+        budget = 1000 + MIN_PARTIAL_RESULT_TOKENS + 100
+
+        packed, stats = pack_search_results_for_prompt([make_result(first), make_result(second)],
+                                                       token_budget=budget)
+
+        assert packed[0] == first
+        assert packed[1].startswith("乙") and packed[1].endswith("...")
+        assert stats['truncated'] == 1 and stats['kept'] == 2
+        assert stats['tokens_used'] <= budget
+        assert stats['tokens_dropped'] == 1000 - estimate_tokens(packed[1])
@@ -0,0 +1,103 @@
+"""
+测试SentimentAnalysisModel/WeiboSentiment_MachineLearning/utils.py中的批量分词与分词缓存
+
+1. merge_negation与原先逐个查找`不`并拼接的循环结果一致
+2. processing_batch串行、多进程、命中缓存三种路径的结果都与逐条processing相同
+3. TokenizeCache超过条数上限时淘汰最久未使用的条目
+4. 默认缓存路径相对于模块目录解析，与当前工作目录无关
+"""
+
+import importlib.util
+import itertools
+import os
+import sys
+import time
+from pathlib import Path
+
+# 按文件路径加载，避免与项目根目录的utils目录同名冲突
+project_root = Path(__file__).parent.parent
+module_path = project_root / "SentimentAnalysisModel" / "WeiboSentiment_MachineLearning" / "utils.py"
+spec = importlib.util.spec_from_file_location("weibo_ml_utils", module_path)
+ml_utils = importlib.util.module_from_spec(spec)
+# 多进程分词按模块名序列化任务函数，需要能按该名字找到模块
+sys.modules["weibo_ml_utils"] = ml_utils
+spec.loader.exec_module(ml_utils)
+
+
+def legacy_merge_negation(words):
+    """改为单次遍历之前processing中的写法"""
+    words = list(words)
+    while "不" in words:
+        index = words.index("不")
+        if index == len(words) - 1:
+            break
+        words[index: index+2] = ["".join(words[index: index+2])]
+    return words
+
+
+TEXTS = [
+    "今天天气不错，心情很好",
+    "这个产品不好用，不推荐 @某用户 购买",
+    "【转发】不知道该说什么{%北京%}",
+    "今天天气不错，心情很好",
+    "不",
+    "服务不不好",
+]
+
+
+class TestMergeNegation:
+    """测试否定词拼接"""
+
+    def test_matches_legacy_loop(self):
+        """所有由`不`和普通词组成的短序列上与原循环结果一致"""
+        vocabulary = ["不", "好", "喜欢", "是"]
+        for length in range(6):
+            for words in itertools.product(vocabulary, repeat=length):
+                assert ml_utils.merge_negation(list(words)) == legacy_merge_negation(words), words
+
+
+class TestProcessingBatch:
+    """测试批量预处理三种路径的结果一致"""
+
+    def test_serial_parallel_and_cached_match_processing(self, tmp_path, monkeypatch):
+        expected = [ml_utils.processing(text) for text in TEXTS]
+        cache_path = str(tmp_path / "tokenize_cache.db")
+
+        assert ml_utils.processing_batch(TEXTS, workers=1, cache_path=None) == expected
+
+        monkeypatch.setattr(ml_utils, "PARALLEL_MIN_TEXTS", 1)
+        monkeypatch.setattr(ml_utils, "PARALLEL_CHUNK_SIZE", 2)
+        assert ml_utils.processing_batch(TEXTS, workers=2, cache_path=cache_path) == expected
+
+        # 第二次全部命中缓存：把processing换成会报错的函数，确认没有再分词
+        def fail(text):
+            raise AssertionError(f"不应重新分词: {text}")
+        monkeypatch.setattr(ml_utils, "processing", fail)
+        assert ml_utils.processing_batch(TEXTS, workers=1, cache_path=cache_path) == expected
+
+    def test_single_text_skips_cache_file(self, tmp_path):
+        """单条文本直接分词，不创建缓存文件"""
+        cache_path = tmp_path / "tokenize_cache.db"
+
+        assert ml_utils.processing_batch(["不喜欢"], cache_path=str(cache_path)) == [ml_utils.processing("不喜欢")]
+        assert not cache_path.exists()
+
+
+class TestTokenizeCache:
+    """测试分词缓存的LRU淘汰"""
+
+    def test_prunes_least_recently_used(self, tmp_path):
+        cache = ml_utils.TokenizeCache(str(tmp_path / "cache.db"), max_rows=3)
+        cache.set_many([("a", "A"), ("b", "B"), ("c", "C")])
+        time.sleep(0.01)
+        # 读取a使其成为最近使用，随后写入d时淘汰最久未使用的b
+        assert cache.get_many(["a"]) == {"a": "A"}
+        time.sleep(0.01)
+        cache.set_many([("d", "D")])
+
+        assert cache.get_many(["a", "b", "c", "d"]) == {"a": "A", "c": "C", "d": "D"}
+        cache.close()
+
+    def test_default_path_independent_of_cwd(self):
+        assert os.path.isabs(ml_utils.TOKENIZE_CACHE_PATH)
+        assert Path(ml_utils.TOKENIZE_CACHE_PATH).parent == module_path.parent / "data"
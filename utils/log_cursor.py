@@ -0,0 +1,87 @@
+"""
+按字节游标读取日志文件
+app.py 与 FoxTrends/app.py 的 /api/output、/api/forum/log 共用：首次加载从文件末尾向前只读取最后几行，
+之后客户端带上次响应的 next_offset 增量读取，读取量与日志文件的总大小无关。
+
+游标始终落在完整行的边界上：尚未写完换行的最后一行不返回，留到下次读取。
+"""
+
+import os
+
+
+# 从文件末尾向前读取日志时每次读取的字节数
+TAIL_READ_BLOCK_SIZE = 8192
+
+# 按游标增量读取时单次最多读取的字节数
+DEFAULT_MAX_BYTES = 1024 * 1024
+
+
+def tail_log_page(log_file_path, count, block_size=TAIL_READ_BLOCK_SIZE):
+    """
+    从文件末尾按块向前读取最后count个非空的完整行（读取量只与count有关，与文件大小无关）
+
+    Returns:
+        {'lines', 'next_offset'}；尚未写完换行的最后一行不返回，next_offset指向它的开头，
+        可直接作为 read_log_after 的游标
+    """
+    with open(log_file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        position = size
+        data = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            data = f.read(read_size) + data
+            # 第一段可能是被块边界截断的半行，最后一段可能尚未写完，都不计入
+            if sum(1 for line in data.split(b'\n')[1:-1] if line.strip()) >= count:
+                break
+
+    # 按字节拼接完所有块后再解码，块边界落在多字节字符中间时不会产生乱码
+    end = data.rfind(b'\n') + 1
+    raw_lines = data[:end].split(b'\n')
+    if position > 0:
+        raw_lines = raw_lines[1:]
+    lines = [line.decode('utf-8', errors='replace').rstrip('\r') for line in raw_lines if line.strip()]
+    return {'lines': lines[-count:], 'next_offset': position + end}
+
+
+def read_log_after(log_file_path, offset, limit=None, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    从字节偏移offset开始读取新增的完整行，最多limit行（None表示不限行数）、max_bytes字节
+
+    Returns:
+        {'lines', 'next_offset', 'has_more', 'reset'}；日志被清空或重建导致offset超过文件大小时
+        从头读取并返回reset=True
+    """
+    size = log_file_path.stat().st_size if log_file_path.exists() else 0
+    reset = offset < 0 or offset > size
+    if reset:
+        offset = 0
+    if offset >= size:
+        return {'lines': [], 'next_offset': offset, 'has_more': False, 'reset': reset}
+
+    with open(log_file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read(max_bytes)
+
+    # 只返回以换行结尾的完整行，正在写入的最后一行留到下次读取；单行超过max_bytes时按整块返回
+    end = data.rfind(b'\n') + 1
+    if end == 0 and len(data) >= max_bytes:
+        end = len(data)
+
+    # 与 tail_log_page 一样只按 b'\n' 分行：进度条的 '\r' 刷新属于同一行，游标不会落在行中间
+    lines = []
+    consumed = 0
+    while consumed < end:
+        line_end = data.find(b'\n', consumed, end) + 1 or end
+        line = data[consumed:line_end].decode('utf-8', errors='replace').rstrip('\n').rstrip('\r')
+        consumed = line_end
+        if line.strip():
+            lines.append(line)
+            if limit and len(lines) >= limit:
+                break
+
+    next_offset = offset + consumed
+    return {'lines': lines, 'next_offset': next_offset, 'has_more': next_offset < size, 'reset': reset}
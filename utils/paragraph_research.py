@@ -0,0 +1,119 @@
+"""
+段落并发研究
+Insight、Media、Query三个引擎的DeepSearchAgent共用：报告结构生成后各段落互不依赖，
+可在线程池中同时执行搜索、总结和反思；在途LLM调用和搜索调用分别受信号量约束。
+
+使用方需提供 self.config、self.state，以及 _initial_search_and_summary(i) 和 _reflection_loop(i)，
+并在初始化时调用 _init_concurrency_limits()。
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from loguru import logger
+
+
+class ParagraphResearchMixin:
+    """按PARAGRAPH_CONCURRENCY逐段或并发研究报告段落"""
+
+    def _init_concurrency_limits(self):
+        """
+        读取段落并发配置（默认关闭），创建限制在途LLM调用和搜索调用数量的信号量
+
+        配置项（未配置时使用默认值）：
+            PARAGRAPH_CONCURRENCY: 同时研究的段落数，默认1即逐段串行
+            MAX_CONCURRENT_LLM_CALLS: 同时在途的LLM调用数，默认等于段落并发数
+            MAX_CONCURRENT_SEARCH_CALLS: 同时在途的搜索调用数，默认等于段落并发数
+        """
+        self.paragraph_concurrency = max(1, getattr(self.config, 'PARAGRAPH_CONCURRENCY', None) or 1)
+        max_llm_calls = getattr(self.config, 'MAX_CONCURRENT_LLM_CALLS', None) or self.paragraph_concurrency
+        max_search_calls = getattr(self.config, 'MAX_CONCURRENT_SEARCH_CALLS', None) or self.paragraph_concurrency
+        self._llm_slots = threading.BoundedSemaphore(max(1, max_llm_calls))
+        self._search_slots = threading.BoundedSemaphore(max(1, max_search_calls))
+        # 各段落线程只修改自己的Paragraph，段落完成标记等跨线程操作在此锁内进行
+        self._state_lock = threading.Lock()
+
+    def _process_paragraphs(self, progress_callback: Optional[Callable[[int, str, int, int], None]] = None):
+        """
+        处理所有段落
+
+        Args:
+            progress_callback: 进度回调 callback(段落索引, 阶段, 已完成段落数, 段落总数)，
+                阶段为 "summarized"（初始总结完成）或 "completed"（反思完成）；
+                并发模式下回调同样在调用线程中执行，Streamlit可直接在回调中更新组件
+        """
+        total_paragraphs = len(self.state.paragraphs)
+
+        if self.paragraph_concurrency > 1 and total_paragraphs > 1:
+            self._process_paragraphs_concurrently(progress_callback)
+            return
+
+        for i in range(total_paragraphs):
+            logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
+            logger.info("-" * 50)
+
+            # 初始搜索和总结
+            self._initial_search_and_summary(i)
+            if progress_callback:
+                progress_callback(i, "summarized", i, total_paragraphs)
+
+            # 反思循环
+            self._reflection_loop(i)
+
+            # 标记段落完成
+            self.state.paragraphs[i].research.mark_completed()
+
+            progress = (i + 1) / total_paragraphs * 100
+            logger.info(f"段落处理完成 ({progress:.1f}%)")
+            if progress_callback:
+                progress_callback(i, "completed", i + 1, total_paragraphs)
+
+    def _process_paragraphs_concurrently(self, progress_callback: Optional[Callable[[int, str, int, int], None]] = None):
+        """
+        并发处理所有段落
+
+        各段落在最终格式化之前互不依赖，在线程池中同时执行搜索、总结和反思，
+        总耗时接近最慢的一个段落；LLM调用和搜索调用分别受在途数量上限约束。
+        工作线程只投递进度事件，进度回调在调用线程中执行。
+        """
+        total_paragraphs = len(self.state.paragraphs)
+        workers = min(self.paragraph_concurrency, total_paragraphs)
+        logger.info(f"\n[步骤 2] 并发处理 {total_paragraphs} 个段落（并发数: {workers}）")
+
+        events = queue.Queue()
+        completed_count = 0
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="paragraph-research")
+        try:
+            for i in range(total_paragraphs):
+                executor.submit(self._research_paragraph, i, events)
+
+            while completed_count < total_paragraphs:
+                paragraph_index, stage, error = events.get()
+                if error is not None:
+                    raise error
+                if stage == "completed":
+                    completed_count += 1
+                    progress = completed_count / total_paragraphs * 100
+                    logger.info(f"段落处理完成: {self.state.paragraphs[paragraph_index].title} ({progress:.1f}%)")
+                if progress_callback:
+                    progress_callback(paragraph_index, stage, completed_count, total_paragraphs)
+        finally:
+            # 出错时取消尚未开始的段落，等待正在执行的段落结束
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _research_paragraph(self, paragraph_index: int, events: queue.Queue):
+        """在工作线程中完成单个段落的初始搜索、总结和反思循环"""
+        try:
+            logger.info(f"[段落 {paragraph_index + 1}] 开始处理: {self.state.paragraphs[paragraph_index].title}")
+            self._initial_search_and_summary(paragraph_index)
+            events.put((paragraph_index, "summarized", None))
+
+            self._reflection_loop(paragraph_index)
+            with self._state_lock:
+                self.state.paragraphs[paragraph_index].research.mark_completed()
+            events.put((paragraph_index, "completed", None))
+        except Exception as e:
+            logger.exception(f"[段落 {paragraph_index + 1}] 处理失败: {str(e)}")
+            events.put((paragraph_index, "failed", e))
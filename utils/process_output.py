@@ -0,0 +1,278 @@
+"""
+Streamlit子进程输出管道
+app.py为每个应用创建一个管道：读取线程只把行放入缓冲区，后台线程按时间间隔或积压的行数/字节数
+批量写入持久打开的日志文件，并把同一批的行合并为一个Socket.IO帧推送。
+
+背压：
+- 推送按每秒行数限速，Socket.IO的emit不会阻塞，限速保证突发输出不会堆进各客户端的发送队列；
+  待推送行超过上限时丢弃最早的行并在下一帧中报告数量，前端可从日志文件补齐，日志文件不受影响。
+- 待写入日志的行超过上限时（磁盘写入跟不上）write会阻塞，读取线程随之停止读取子进程输出。
+
+日志超过大小上限时按 <app>.log.1、<app>.log.2 ... 轮转。
+"""
+
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+
+# 两次批量写入之间的最长间隔（秒）
+DEFAULT_FLUSH_INTERVAL = 0.2
+
+# 缓冲区积压的行数或字节数达到上限时不等间隔结束，立即写入
+DEFAULT_MAX_BATCH_LINES = 500
+DEFAULT_MAX_BATCH_BYTES = 256 * 1024
+
+# 单个Socket.IO帧最多携带的行数
+DEFAULT_MAX_FRAME_LINES = 500
+
+# 每秒最多推送的行数，小于等于0时不限速
+DEFAULT_MAX_EMIT_LINES_PER_SECOND = 2000
+
+# 待推送行的上限，超出后丢弃最早的行
+DEFAULT_MAX_PENDING_EMIT_LINES = 5000
+
+# 待写入日志的行数上限，超出后write阻塞直到写入完成
+DEFAULT_MAX_PENDING_WRITE_LINES = 20000
+
+# 单个日志文件的大小上限和保留的轮转文件个数
+DEFAULT_MAX_LOG_BYTES = 20 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 2
+
+
+def rotated_log_paths(log_path: Path, backup_count: int = DEFAULT_LOG_BACKUP_COUNT) -> List[Path]:
+    """返回日志轮转后的备份文件路径，按从新到旧排列"""
+    log_path = Path(log_path)
+    return [log_path.with_name(f"{log_path.name}.{index}") for index in range(1, backup_count + 1)]
+
+
+class ProcessOutputPipeline:
+    """单个应用的输出管道：批量写入日志文件并合并推送"""
+
+    def __init__(self, app_name: str, log_path, emit: Callable[[Dict], None],
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_batch_lines: int = DEFAULT_MAX_BATCH_LINES,
+                 max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+                 max_frame_lines: int = DEFAULT_MAX_FRAME_LINES,
+                 max_emit_lines_per_second: int = DEFAULT_MAX_EMIT_LINES_PER_SECOND,
+                 max_pending_emit_lines: int = DEFAULT_MAX_PENDING_EMIT_LINES,
+                 max_pending_write_lines: int = DEFAULT_MAX_PENDING_WRITE_LINES,
+                 max_log_bytes: int = DEFAULT_MAX_LOG_BYTES,
+                 backup_count: int = DEFAULT_LOG_BACKUP_COUNT):
+        """
+        Args:
+            app_name: 应用名，写入推送帧的app字段
+            log_path: 日志文件路径
+            emit: 推送函数，接收 {'app', 'lines'[, 'dropped']} 字典
+            max_log_bytes: 日志文件大小上限，小于等于0时不轮转
+        """
+        self.app_name = app_name
+        self.log_path = Path(log_path)
+        self.emit = emit
+        self.flush_interval = flush_interval
+        self.max_batch_lines = max_batch_lines
+        self.max_batch_bytes = max_batch_bytes
+        self.max_frame_lines = max_frame_lines
+        self.max_emit_lines_per_second = max_emit_lines_per_second
+        self.max_pending_emit_lines = max(1, max_pending_emit_lines)
+        self.max_pending_write_lines = max(1, max_pending_write_lines)
+        self.max_log_bytes = max_log_bytes
+        self.backup_count = backup_count
+
+        self._condition = threading.Condition()
+        # 写文件和推送都只在持有该锁时进行，保证后台线程和flush()调用方不会交错
+        self._io_lock = threading.Lock()
+        self._write_buffer: List[str] = []
+        self._write_buffer_bytes = 0
+        self._emit_buffer = deque()
+        self._dropped = 0
+        # 推送限速的令牌桶：每秒补充max_emit_lines_per_second个，最多积累一秒的量
+        self._emit_tokens = float(max(0, max_emit_lines_per_second))
+        self._emit_refilled_at = time.monotonic()
+        self._file = None
+        self._file_size = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._stats = {
+            'lines': 0,
+            'batches': 0,
+            'frames': 0,
+            'dropped_lines': 0,
+            'write_waits': 0,
+            'rotations': 0,
+        }
+
+    def start(self) -> 'ProcessOutputPipeline':
+        """打开日志文件并启动后台写入线程"""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._open_file()
+        self._thread = threading.Thread(target=self._run, name=f"output-{self.app_name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, line: str, emit: bool = True):
+        """
+        追加一行输出，通常立即返回
+
+        Args:
+            line: 不含换行符的一行
+            emit: 是否推送给前端，为False时只写入日志文件
+        """
+        self.write_many([line], emit=emit)
+
+    def write_many(self, lines: List[str], emit: bool = True):
+        """追加多行输出；待写入的行超过max_pending_write_lines时阻塞，直到后台线程取走缓冲区"""
+        if not lines:
+            return
+        with self._condition:
+            if len(self._write_buffer) >= self.max_pending_write_lines and not self._closed:
+                self._stats['write_waits'] += 1
+                self._condition.notify_all()
+                while len(self._write_buffer) >= self.max_pending_write_lines and not self._closed:
+                    self._condition.wait()
+            if self._closed:
+                return
+            self._write_buffer.extend(lines)
+            self._write_buffer_bytes += sum(len(line.encode('utf-8')) + 1 for line in lines)
+            if emit:
+                self._emit_buffer.extend(lines)
+                overflow = len(self._emit_buffer) - self.max_pending_emit_lines
+                if overflow > 0:
+                    # 推送跟不上时丢弃最早的行，前端可通过 /api/output 从日志文件补齐
+                    for _ in range(overflow):
+                        self._emit_buffer.popleft()
+                    self._dropped += overflow
+                    self._stats['dropped_lines'] += overflow
+            self._stats['lines'] += len(lines)
+            if self._batch_ready():
+                self._condition.notify_all()
+
+    def flush(self):
+        """立即写入并推送缓冲区中的所有行（不受推送限速限制）"""
+        with self._io_lock:
+            self._flush_pending(drain=True)
+
+    def close(self, timeout: float = 5.0):
+        """停止后台线程，写入并推送剩余的行后关闭日志文件"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        with self._io_lock:
+            self._flush_pending(drain=True)
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_stats(self) -> Dict:
+        """返回写入行数、批次数、推送帧数、丢弃行数、写入等待次数和轮转次数"""
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pending_lines'] = len(self._write_buffer)
+            stats['pending_emit_lines'] = len(self._emit_buffer)
+        return stats
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and not self._batch_ready():
+                    self._condition.wait(timeout=self.flush_interval)
+                if self._closed:
+                    return
+            with self._io_lock:
+                self._flush_pending()
+
+    def _batch_ready(self) -> bool:
+        return (len(self._write_buffer) >= min(self.max_batch_lines, self.max_pending_write_lines)
+                or self._write_buffer_bytes >= self.max_batch_bytes)
+
+    def _take_emit_lines(self, drain: bool) -> List[str]:
+        """按令牌桶取出本次可推送的行（调用方需持有_condition），drain为True时全部取出"""
+        now = time.monotonic()
+        rate = self.max_emit_lines_per_second
+        if rate > 0:
+            self._emit_tokens = min(float(rate), self._emit_tokens + (now - self._emit_refilled_at) * rate)
+        self._emit_refilled_at = now
+        if drain or rate <= 0:
+            count = len(self._emit_buffer)
+        else:
+            count = min(len(self._emit_buffer), int(self._emit_tokens))
+        if rate > 0:
+            self._emit_tokens = max(0.0, self._emit_tokens - count)
+        return [self._emit_buffer.popleft() for _ in range(count)]
+
+    def _flush_pending(self, drain: bool = False):
+        with self._condition:
+            lines = self._write_buffer
+            self._write_buffer = []
+            self._write_buffer_bytes = 0
+            frame_lines = self._take_emit_lines(drain)
+            dropped = 0
+            if frame_lines:
+                dropped = self._dropped
+                self._dropped = 0
+            if lines:
+                # 唤醒因待写入行过多而阻塞的write调用
+                self._condition.notify_all()
+
+        if lines:
+            self._write_lines(lines)
+
+        for start in range(0, len(frame_lines), self.max_frame_lines):
+            frame = {'app': self.app_name, 'lines': frame_lines[start:start + self.max_frame_lines]}
+            if dropped:
+                frame['dropped'] = dropped
+                dropped = 0
+            try:
+                self.emit(frame)
+                with self._condition:
+                    self._stats['frames'] += 1
+            except Exception as e:
+                logger.error(f"推送 {self.app_name} 输出失败: {e}")
+
+    def _write_lines(self, lines: List[str]):
+        data = ''.join(line + '\n' for line in lines)
+        try:
+            if self._file is None:
+                self._open_file()
+            elif self.max_log_bytes > 0 and 0 < self._file_size and self._file_size + len(data.encode('utf-8')) > self.max_log_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            # 追加模式下写入后的位置即文件大小，也包含其他写入方追加的内容
+            self._file_size = self._file.tell()
+            with self._condition:
+                self._stats['batches'] += 1
+        except Exception as e:
+            logger.error(f"写入 {self.app_name} 日志失败: {e}")
+
+    def _open_file(self):
+        self._file = open(self.log_path, 'a', encoding='utf-8')
+        self._file.seek(0, 2)
+        self._file_size = self._file.tell()
+
+    def _rotate(self):
+        """关闭当前日志，依次后移备份文件后重新打开空日志"""
+        self._file.close()
+        self._file = None
+        if self.backup_count > 0:
+            backups = rotated_log_paths(self.log_path, self.backup_count)
+            if backups[-1].exists():
+                backups[-1].unlink()
+            for older, newer in zip(reversed(backups[:-1]), reversed(backups[1:])):
+                if older.exists():
+                    older.replace(newer)
+            self.log_path.replace(backups[0])
+        else:
+            self.log_path.unlink()
+        self._open_file()
+        with self._condition:
+            self._stats['rotations'] += 1
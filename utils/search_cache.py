@@ -0,0 +1,392 @@
+"""
+搜索结果缓存
+Tavily（QueryEngine）、Bocha（MediaEngine）和 MediaCrawlerDB（InsightEngine）的搜索工具共用，
+以（命名空间 + 工具名 + 规范化后的参数）为键，内存中按LRU淘汰，并写入三个Streamlit进程共享的SQLite文件。
+
+同一查询在反思循环、不同引擎和重复研究热门话题时会被反复调用，命中缓存可同时减少等待时间和付费API调用。
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+# 内存中最多缓存的响应条数
+DEFAULT_CACHE_MAX_ENTRIES = 512
+
+# SQLite文件中最多保留的响应条数，超出后删除最早写入的条目
+DEFAULT_STORE_MAX_ENTRIES = 20000
+
+# 设置该环境变量可修改共享缓存文件路径，设置为空字符串时只使用进程内缓存
+CACHE_PATH_ENV = "SEARCH_CACHE_PATH"
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "search_cache.db")
+
+# 未单独配置的工具使用的缓存时间（秒）
+DEFAULT_TTL = 1800
+
+# 各工具的缓存时间（秒）：时效性越强缓存越短，明确日期范围的搜索结果基本不变
+TOOL_TTLS = {
+    # QueryEngine - Tavily
+    "basic_search_news": 1800,
+    "deep_search_news": 3600,
+    "search_news_last_24_hours": 600,
+    "search_news_last_week": 3600,
+    "search_images_for_news": 6 * 3600,
+    "search_news_by_date": 6 * 3600,
+    # MediaEngine - Bocha
+    "comprehensive_search": 1800,
+    "web_search_only": 1800,
+    "search_for_structured_data": 600,  # 天气、股票等模态卡变化快
+    "search_last_24_hours": 600,
+    "search_last_week": 3600,
+    # InsightEngine - MediaCrawlerDB（爬虫持续入库）
+    "search_hot_content": 600,
+    "search_topic_globally": 1800,
+    "search_topic_by_date": 6 * 3600,
+    "get_comments_for_topic": 1800,
+    "search_topic_on_platform": 1800,
+}
+
+# 结束日期早于今天的历史区间搜索使用的缓存时间（秒）
+HISTORICAL_TTL = 7 * 24 * 3600
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """规范化工具参数：去掉None，字符串去除首尾空白并合并连续空白、转为小写，列表逐项规范化"""
+    def _normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.split()).lower()
+        if isinstance(value, (list, tuple)):
+            return [_normalize(item) for item in value]
+        if isinstance(value, dict):
+            return normalize_params(value)
+        return value
+
+    return {key: _normalize(value) for key, value in sorted(params.items()) if value is not None}
+
+
+def resolve_ttl(tool: str, params: Dict[str, Any]) -> int:
+    """
+    计算缓存时间
+
+    Args:
+        tool: 工具名
+        params: 规范化后的参数
+
+    Returns:
+        缓存秒数，结束日期早于今天的历史区间搜索使用 HISTORICAL_TTL
+    """
+    end_date = params.get("end_date")
+    if isinstance(end_date, str):
+        try:
+            if date.fromisoformat(end_date) < date.today():
+                return HISTORICAL_TTL
+        except ValueError:
+            pass
+    return TOOL_TTLS.get(tool, DEFAULT_TTL)
+
+
+class SearchResultCache:
+    """
+    搜索响应缓存
+
+    缓存值为搜索工具返回的响应对象，以pickle序列化保存；每次命中都反序列化出新对象，
+    调用方修改返回的响应（例如附加情感分析结果）不会影响缓存。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        persist_path: Optional[str] = None,
+        store_max_entries: int = DEFAULT_STORE_MAX_ENTRIES,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 内存中最多保留的条数，超出后淘汰最久未使用的条目
+            persist_path: SQLite文件路径，为None时只使用内存缓存
+            store_max_entries: SQLite文件中最多保留的条数
+        """
+        self.max_entries = max(1, max_entries)
+        self.store_max_entries = max(1, store_max_entries)
+        self.persist_path = persist_path
+        # {key: (过期时间, 序列化后的响应)}
+        self._memory: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_prune = 0
+
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._tool_stats: Dict[str, Dict[str, int]] = {}
+
+        if persist_path:
+            self._open_store(persist_path)
+
+    def _open_store(self, path: str) -> None:
+        """打开（必要时创建）SQLite共享文件"""
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            # 多个Streamlit进程同时读写同一文件，写锁冲突时最多等待5秒
+            self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_created ON search_cache(created_at)")
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"搜索缓存文件不可用，改为仅使用内存缓存: {e}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(namespace: str, tool: str, params: Dict[str, Any]) -> str:
+        """根据命名空间、工具名和规范化后的参数生成缓存键"""
+        digest = hashlib.sha256()
+        digest.update(f"{namespace}\x00{tool}\x00".encode("utf-8"))
+        digest.update(json.dumps(params, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _record(self, tool: str, hit: bool) -> None:
+        """记录单个工具的命中情况（调用方需持有锁）"""
+        stats = self._tool_stats.setdefault(tool, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+    def _remember(self, key: str, expires_at: float, payload: bytes) -> None:
+        """写入内存LRU（调用方需持有锁）"""
+        self._memory[key] = (expires_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str, tool: str = "") -> Tuple[bool, Any]:
+        """
+        查询缓存
+
+        Returns:
+            (是否命中, 响应对象)
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._memory[key]
+                entry = None
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+            elif self._conn is not None:
+                entry = self._load_from_store(key, now)
+                if entry is not None:
+                    self._remember(key, *entry)
+                    self.hits += 1
+                    self.store_hits += 1
+            if entry is None:
+                self.misses += 1
+            self._record(tool, entry is not None)
+
+        if entry is None:
+            return False, None
+        try:
+            return True, pickle.loads(entry[1])
+        except Exception as e:
+            logger.warning(f"搜索缓存条目无法反序列化，忽略: {e}")
+            return False, None
+
+    def _load_from_store(self, key: str, now: float) -> Optional[Tuple[float, bytes]]:
+        """从SQLite中读取未过期的条目（调用方需持有锁）"""
+        assert self._conn is not None
+        try:
+            row = self._conn.execute(
+                "SELECT expires_at, payload FROM search_cache WHERE cache_key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"读取搜索缓存文件失败: {e}")
+            return None
+        return (row[0], bytes(row[1])) if row else None
+
+    def set(self, key: str, value: Any, ttl: float, tool: str = "") -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 可pickle序列化的响应对象
+            ttl: 缓存秒数
+            tool: 工具名（用于统计和排查）
+        """
+        if ttl <= 0:
+            return
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.warning(f"搜索响应无法序列化，跳过缓存: {e}")
+            return
+
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, expires_at, payload)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO search_cache (cache_key, tool, payload, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, tool, sqlite3.Binary(payload), now, expires_at),
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= 100:
+                    self._prune_store(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"写入搜索缓存文件失败: {e}")
+
+    def _prune_store(self, now: float) -> None:
+        """删除已过期的条目，并把文件中的条数限制在 store_max_entries 以内（调用方需持有锁）"""
+        assert self._conn is not None
+        self._writes_since_prune = 0
+        self._conn.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            """
+            DELETE FROM search_cache WHERE cache_key IN (
+                SELECT cache_key FROM search_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.store_max_entries,),
+        )
+
+    def clear(self, include_store: bool = False) -> None:
+        """清空内存缓存，可选同时清空共享文件"""
+        with self._lock:
+            self._memory.clear()
+            if include_store and self._conn is not None:
+                self._conn.execute("DELETE FROM search_cache")
+                self._conn.commit()
+
+    def reset_stats(self) -> None:
+        """重置命中统计（例如每次研究开始时）"""
+        with self._lock:
+            self.hits = 0
+            self.store_hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self._tool_stats = {}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            包含命中/未命中次数、命中率和各工具命中情况的字典
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "store_hits": self.store_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "persistent": self._conn is not None,
+                "tools": {tool: dict(stats) for tool, stats in self._tool_stats.items()},
+            }
+
+    def close(self) -> None:
+        """关闭共享文件连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache_instance: Optional[SearchResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchResultCache:
+    """获取进程内的全局搜索缓存（共享文件路径见 SEARCH_CACHE_PATH）"""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            persist_path = os.environ.get(CACHE_PATH_ENV, DEFAULT_CACHE_PATH) or None
+            _cache_instance = SearchResultCache(persist_path=persist_path)
+    return _cache_instance
+
+
+def cached_search(
+    namespace: str,
+    tool: Optional[str] = None,
+    tool_param: Optional[str] = None,
+    cacheable: Optional[Callable[[Any], bool]] = None,
+):
+    """
+    搜索工具缓存装饰器
+
+    Args:
+        namespace: 命名空间，区分不同搜索后端（如 tavily / bocha / mediacrawler_db）
+        tool: 工具名，默认使用被装饰方法名
+        tool_param: 工具名由调用参数决定时的参数名（如 search_topics_concurrently 的 tool_name）
+        cacheable: 判断响应是否可以缓存的函数，默认缓存所有非None响应；失败或空结果不应缓存
+
+    被装饰的方法抛出异常时不写入缓存。
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        tool_name = tool or func.__name__
+
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {}
+            for name, value in list(bound.arguments.items())[1:]:
+                if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+                    params.update(value)
+                else:
+                    params[name] = value
+            params = normalize_params(params)
+            effective_tool = params.get(tool_param, tool_name) if tool_param else tool_name
+
+            cache = get_search_cache()
+            key = cache.make_key(namespace, tool_name, params)
+            hit, value = cache.get(key, effective_tool)
+            if hit:
+                logger.info(f"  ⚡ 搜索缓存命中: {effective_tool}")
+                return value
+
+            value = func(self, *args, **kwargs)
+            if value is not None and (cacheable is None or cacheable(value)):
+                cache.set(key, value, resolve_ttl(effective_tool, params), effective_tool)
+            return value
+
+        return wrapper
+
+    return decorator